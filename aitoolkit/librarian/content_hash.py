@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Content Hash
+
+blake2b content hashes for conditional reads. A read tool returns the hash
+of what it read; a later call passing that hash as `if_none_match` gets a
+small "unchanged" response instead of the content again.
+
+Hashes are remembered per path together with the file's (mtime, size), so
+checking whether a previously read file changed costs one stat.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+HASH_DIGEST_SIZE = 16
+MAX_REMEMBERED_HASHES = 8192
+
+def content_hash(data: bytes) -> str:
+    """Return the hex blake2b digest of some content."""
+    return hashlib.blake2b(data, digest_size=HASH_DIGEST_SIZE).hexdigest()
+
+class ContentHashes:
+    """
+    Remembered content hashes keyed by path and validated by mtime and size.
+    """
+
+    def __init__(self, max_entries: int = MAX_REMEMBERED_HASHES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hashes: "OrderedDict[str, Tuple[Tuple[int, int], str]]" = OrderedDict()
+
+    def remember(self, path: str, stats: os.stat_result, digest: str) -> None:
+        """Record the hash of a file's content at the given stat."""
+        with self._lock:
+            self._hashes[path] = ((stats.st_mtime_ns, stats.st_size), digest)
+            self._hashes.move_to_end(path)
+            while len(self._hashes) > self.max_entries:
+                self._hashes.popitem(last=False)
+
+    def lookup(self, path: str) -> Optional[Tuple[str, os.stat_result]]:
+        """
+        Get the remembered hash of a file if it has not changed since.
+
+        Returns:
+            Tuple of (hash, current stat), or None if unknown or changed
+        """
+        with self._lock:
+            remembered = self._hashes.get(path)
+        if remembered is None:
+            return None
+        try:
+            stats = os.stat(path)
+        except OSError:
+            return None
+        if remembered[0] != (stats.st_mtime_ns, stats.st_size):
+            return None
+        return remembered[1], stats
+
+# Hashes shared by the read tools
+_shared_hashes = ContentHashes()
+
+def remember_hash(path: str, stats: os.stat_result, digest: str) -> None:
+    """Record a file's content hash in the shared table."""
+    _shared_hashes.remember(path, stats, digest)
+
+def known_hash(path: str) -> Optional[Tuple[str, os.stat_result]]:
+    """Look up a file's content hash in the shared table."""
+    return _shared_hashes.lookup(path)
+
+def unchanged_result(path: str, digest: str, size: int, modified: float) -> Dict[str, Any]:
+    """Build the response returned when the content matches `if_none_match`."""
+    return {
+        "status": "unchanged",
+        "path": path,
+        "content_hash": digest,
+        "size": size,
+        "modified": modified,
+        "message": "Content unchanged since the given hash; reuse the copy you already have."
+    }
+
+def check_unchanged(path: str, if_none_match: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Answer a conditional read from the remembered hash, with one stat.
+
+    Args:
+        path: Absolute path of the file
+        if_none_match: Hash returned by an earlier read, if any
+
+    Returns:
+        The "unchanged" response, or None if the file must be read
+    """
+    if not if_none_match:
+        return None
+    known = known_hash(path)
+    if known is None or known[0] != if_none_match:
+        return None
+    digest, stats = known
+    return unchanged_result(path, digest, stats.st_size, stats.st_mtime)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Content Sniffer
+
+Classifies a file as text or binary, and guesses its encoding, from the
+first few KB instead of decoding the whole file.
+
+The prefix is checked for byte-order marks, NUL bytes, the share of bytes
+that are not valid UTF-8 and the share of control characters. Verdicts are
+cached per (path, mtime, size), so a file is sniffed once per version.
+"""
+
+import os
+import codecs
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+SNIFF_BYTES = 8192
+MAX_CACHED_VERDICTS = 4096
+
+# Above these shares of the prefix, a file is considered binary
+MAX_INVALID_UTF8_RATIO = 0.30
+MAX_CONTROL_RATIO = 0.10
+
+# Longest BOMs first so UTF-32 LE is not mistaken for UTF-16 LE
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16")
+)
+
+# Control bytes that do not appear in text (everything below 0x20 except
+# tab, line feed, form feed, carriage return and escape, plus DEL)
+_CONTROL_BYTES = bytes(b for b in range(0x20) if b not in (0x09, 0x0A, 0x0C, 0x0D, 0x1B)) + b"\x7f"
+
+def _invalid_utf8_bytes(prefix: bytes, truncated: bool) -> int:
+    """Count the bytes of a prefix that are not valid UTF-8."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    # A character cut at the end of the prefix is not an error
+    text = decoder.decode(prefix, final=not truncated)
+    # Replacement characters already in the file are not errors
+    return text.count("\ufffd") - prefix.count(b"\xef\xbf\xbd")
+
+def sniff_bytes(prefix: bytes, truncated: bool = False) -> Dict[str, Any]:
+    """
+    Classify a file from its first bytes.
+
+    Args:
+        prefix: The first bytes of the file
+        truncated: Whether the file continues past the prefix
+
+    Returns:
+        Dictionary with "binary" (bool), "encoding" (the likely text encoding,
+        None for binary files) and "reason"
+    """
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return {"binary": False, "encoding": encoding, "reason": "bom"}
+
+    if not prefix:
+        return {"binary": False, "encoding": "utf-8", "reason": "empty"}
+
+    if b"\x00" in prefix:
+        return {"binary": True, "encoding": None, "reason": "nul_bytes"}
+
+    control_ratio = sum(prefix.count(bytes((b,))) for b in _CONTROL_BYTES) / len(prefix)
+    if control_ratio > MAX_CONTROL_RATIO:
+        return {"binary": True, "encoding": None, "reason": "control_bytes"}
+
+    invalid = _invalid_utf8_bytes(prefix, truncated)
+    if invalid == 0:
+        return {"binary": False, "encoding": "utf-8", "reason": "utf8"}
+    if invalid / len(prefix) > MAX_INVALID_UTF8_RATIO:
+        return {"binary": True, "encoding": None, "reason": "invalid_utf8"}
+
+    # Mostly UTF-8-compatible text with some high bytes: a legacy 8-bit encoding
+    try:
+        prefix.decode("cp1252")
+        return {"binary": False, "encoding": "cp1252", "reason": "legacy_8bit"}
+    except UnicodeDecodeError:
+        return {"binary": False, "encoding": "latin-1", "reason": "legacy_8bit"}
+
+class ContentSniffer:
+    """
+    Cache of sniffing verdicts keyed by path and validated by mtime and size.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_VERDICTS):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._verdicts: "OrderedDict[str, Tuple[Tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.sniffs = 0
+
+    def sniff(self, path: str, stats: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """
+        Classify a file, reading at most SNIFF_BYTES of it.
+
+        Args:
+            path: Path of the file
+            stats: The file's os.stat result, if already known
+
+        Returns:
+            The verdict from sniff_bytes (shared; do not modify)
+        """
+        stats = stats or os.stat(path)
+        signature = (stats.st_mtime_ns, stats.st_size)
+
+        with self._lock:
+            cached = self._verdicts.get(path)
+            if cached is not None and cached[0] == signature:
+                self._verdicts.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+
+        with open(path, 'rb') as f:
+            prefix = f.read(SNIFF_BYTES)
+        verdict = sniff_bytes(prefix, truncated=stats.st_size > len(prefix))
+
+        with self._lock:
+            self._verdicts[path] = (signature, verdict)
+            self._verdicts.move_to_end(path)
+            self.sniffs += 1
+            while len(self._verdicts) > self.max_entries:
+                self._verdicts.popitem(last=False)
+        return verdict
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of cached verdicts, cache hits and prefixes read."""
+        with self._lock:
+            return {"entries": len(self._verdicts), "hits": self.hits, "sniffs": self.sniffs}
+
+# Sniffer shared by the read tools
+_shared_sniffer = ContentSniffer()
+
+def sniff_file(path: str, stats: Optional[os.stat_result] = None) -> Dict[str, Any]:
+    """Classify a file through the shared verdict cache."""
+    return _shared_sniffer.sniff(path, stats)
@@ -9,9 +9,36 @@ import os
 import json
 import ast
 import re
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set, Any, Optional, Tuple, Union
+from typing import Dict, List, Set, Any, Optional, Tuple, Union, Iterable
+
+try:
+    from .index_store import IndexStore, get_index_store, index_store_enabled
+    from .symbol_index import SymbolIndex, file_symbols, load_symbol_index, save_symbol_index
+    from .import_graph import ImportGraph, graph_entry, load_import_graph, save_import_graph
+    from .trigram_index import update_trigram_index
+    from .search_index import SearchIndex, search_entry, load_search_index, save_search_index
+    from .process_worker import worker_main
+except ImportError:
+    # Running as a standalone script
+    from index_store import IndexStore, get_index_store, index_store_enabled
+    from symbol_index import SymbolIndex, file_symbols, load_symbol_index, save_symbol_index
+    from import_graph import ImportGraph, graph_entry, load_import_graph, save_import_graph
+    from trigram_index import update_trigram_index
+    from search_index import SearchIndex, search_entry, load_search_index, save_search_index
+    from process_worker import worker_main
+
+# Manifest used for incremental re-indexing (stored in .ai_reference)
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Parallel parsing configuration
+INDEX_WORKERS_ENV = "AI_LIBRARIAN_INDEX_WORKERS"
+PARALLEL_PARSE_THRESHOLD = 32  # Below this many files the pool startup cost dominates
+PARSE_CHUNK_SIZE = 16
 
 def scan_directory(directory: str, exclude_dirs: Optional[List[str]] = None) -> List[str]:
     """
@@ -39,6 +66,226 @@ def scan_directory(directory: str, exclude_dirs: Optional[List[str]] = None) ->
     
     return python_files
 
+def _get_docstring(node: ast.AST) -> Optional[str]:
+    """Return the docstring of a class or function node, if any."""
+    if (len(node.body) > 0 and 
+        isinstance(node.body[0], ast.Expr) and 
+        isinstance(node.body[0].value, (ast.Str, ast.Constant))):
+        
+        if hasattr(node.body[0].value, 's'):  # Python < 3.8
+            return node.body[0].value.s
+        return node.body[0].value.value  # Python >= 3.8
+    return None
+
+def _annotation_type(annotation: Optional[ast.AST]) -> Optional[str]:
+    """Return a simple string representation of a type annotation."""
+    if isinstance(annotation, ast.Name):
+        return annotation.id
+    elif isinstance(annotation, ast.Attribute):
+        return extract_attribute_path(annotation)
+    elif isinstance(annotation, ast.Subscript):
+        return "complex_type"
+    return None
+
+def _call_info(node: ast.Call) -> Dict[str, Any]:
+    """Describe a call node by its callee name and line."""
+    call_name = "unknown"
+    if isinstance(node.func, ast.Name):
+        call_name = node.func.id
+    elif isinstance(node.func, ast.Attribute):
+        call_name = extract_attribute_path(node.func)
+    
+    return {
+        "name": call_name,
+        "line": node.lineno
+    }
+
+def _build_function_info(
+    node: ast.FunctionDef,
+    content: str,
+    lines: List[str],
+    calls: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Assemble the function details shared by the extractor and extract_function_info."""
+    # Get parameters
+    parameters = []
+    for arg in node.args.args:
+        param = {"name": arg.arg}
+        param_type = _annotation_type(getattr(arg, 'annotation', None))
+        if param_type is not None:
+            param["type"] = param_type
+        parameters.append(param)
+    
+    start_line = node.lineno
+    end_line = find_end_line(node, content, lines)
+    
+    return {
+        "start_line": start_line,
+        "end_line": end_line,
+        "docstring": _get_docstring(node),
+        "parameters": parameters,
+        "return_type": _annotation_type(node.returns),
+        "calls": calls,
+        "code_snippet": extract_code_snippet(content, start_line, end_line, lines=lines)
+    }
+
+class _ModuleExtractor(ast.NodeVisitor):
+    """
+    Single-pass extractor for the structure of a module.
+
+    Collects imports, classes (with methods and class variables), top-level
+    functions, constants and per-function calls in one traversal, sharing a
+    single line table for end-line detection and code snippets. Every class and
+    function definition, including nested ones, is also recorded as a symbol
+    with its qualified name and line range.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self.lines = content.splitlines()
+        self.classes = {}
+        self.functions = {}
+        self.imports = []
+        self.constants = {}
+        self.symbols = []
+        self.referenced_names = set()
+        self.called_names = set()
+        self._qualified_names = []
+        self._scopes = []
+        self._class_info = {}
+        self._call_stack = []
+
+    def _direct_parent(self, node: ast.AST) -> Optional[ast.AST]:
+        """Return the enclosing module or class if node sits directly in its body."""
+        scope, body_ids = self._scopes[-1]
+        return scope if id(node) in body_ids else None
+
+    def _visit_scope(self, node: ast.AST) -> None:
+        self._scopes.append((node, {id(child) for child in node.body}))
+        self.generic_visit(node)
+        self._scopes.pop()
+
+    def _add_symbol(self, node: ast.AST, kind: str, end_line: int) -> None:
+        """Record a definition and make it the parent of nested definitions."""
+        parent = self._qualified_names[-1] if self._qualified_names else None
+        qualified_name = f"{parent}.{node.name}" if parent else node.name
+        self.symbols.append({
+            "name": node.name,
+            "qualified_name": qualified_name,
+            "kind": kind,
+            "start_line": node.lineno,
+            "end_line": end_line,
+            "parent": parent
+        })
+        self._qualified_names.append(qualified_name)
+
+    def visit_Module(self, node: ast.Module) -> None:
+        self._visit_scope(node)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for name in node.names:
+            self.imports.append({"name": name.name, "line": node.lineno})
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module = node.module or ""
+        for name in node.names:
+            import_info = {
+                "name": f"{module}.{name.name}" if module else name.name,
+                "line": node.lineno
+            }
+            if node.level:
+                # Relative import; needed to resolve the module against the importing package
+                import_info["level"] = node.level
+            self.imports.append(import_info)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if isinstance(node.ctx, ast.Load):
+            self.referenced_names.add(node.id)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        self.referenced_names.add(node.attr)
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        # Get base classes
+        bases = []
+        for base in node.bases:
+            if isinstance(base, ast.Name):
+                bases.append(base.id)
+            elif isinstance(base, ast.Attribute):
+                bases.append(extract_attribute_path(base))
+            else:
+                bases.append("unknown_base")
+        
+        end_line = find_end_line(node, self.content, self.lines)
+        class_info = {
+            "start_line": node.lineno,
+            "end_line": end_line,
+            "docstring": _get_docstring(node),
+            "bases": bases,
+            "methods": {},
+            "class_variables": [],
+            "code_snippet": extract_code_snippet(self.content, node.lineno, end_line, lines=self.lines)
+        }
+        self.classes[node.name] = class_info
+        self._class_info[node] = class_info
+        
+        self._add_symbol(node, "class", end_line)
+        self._visit_scope(node)
+        self._qualified_names.pop()
+
+    def _visit_function(self, node: ast.AST) -> None:
+        parent = self._direct_parent(node)
+        kind = "method" if isinstance(self._scopes[-1][0], ast.ClassDef) else "function"
+        self._add_symbol(node, kind, find_end_line(node, self.content, self.lines))
+        
+        calls = []
+        self._call_stack.append(calls)
+        self._visit_scope(node)
+        self._call_stack.pop()
+        self._qualified_names.pop()
+        
+        if isinstance(parent, ast.Module):
+            self.functions[node.name] = _build_function_info(node, self.content, self.lines, calls)
+        elif isinstance(parent, ast.ClassDef):
+            self._class_info[parent]["methods"][node.name] = _build_function_info(
+                node, self.content, self.lines, calls
+            )
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        parent = self._direct_parent(node)
+        if isinstance(parent, ast.Module):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id.isupper():
+                    self.constants[target.id] = {
+                        "line": node.lineno,
+                        "value": extract_assignment_value(node.value)
+                    }
+        elif isinstance(parent, ast.ClassDef):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self._class_info[parent]["class_variables"].append({
+                        "name": target.id,
+                        "line": node.lineno
+                    })
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if isinstance(node.func, ast.Name):
+            self.called_names.add(node.func.id)
+        elif isinstance(node.func, ast.Attribute):
+            self.called_names.add(node.func.attr)
+        
+        if self._call_stack:
+            # Calls in nested definitions also belong to every enclosing function
+            call = _call_info(node)
+            for calls in self._call_stack:
+                calls.append(call)
+        self.generic_visit(node)
+
 def parse_python_file(file_path: str) -> Dict[str, Any]:
     """
     Parse a Python file and extract its detailed structure.
@@ -56,95 +303,20 @@ def parse_python_file(file_path: str) -> Dict[str, Any]:
         
         tree = ast.parse(content)
         
-        classes = {}
-        functions = {}
-        imports = []
-        constants = {}
-        
-        # Extract imports
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for name in node.names:
-                    imports.append({"name": name.name, "line": node.lineno})
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module or ""
-                for name in node.names:
-                    imports.append({
-                        "name": f"{module}.{name.name}" if module else name.name,
-                        "line": node.lineno
-                    })
-        
-        # Extract classes with detailed information
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                methods = {}
-                class_vars = []
-                
-                # Get docstring
-                docstring = None
-                if (len(node.body) > 0 and 
-                    isinstance(node.body[0], ast.Expr) and 
-                    isinstance(node.body[0].value, (ast.Str, ast.Constant))):
-                    
-                    if hasattr(node.body[0].value, 's'):  # Python < 3.8
-                        docstring = node.body[0].value.s
-                    else:  # Python >= 3.8
-                        docstring = node.body[0].value.value
-                
-                # Get base classes
-                bases = []
-                for base in node.bases:
-                    if isinstance(base, ast.Name):
-                        bases.append(base.id)
-                    elif isinstance(base, ast.Attribute):
-                        bases.append(extract_attribute_path(base))
-                    else:
-                        bases.append("unknown_base")
-                
-                # Extract methods and class variables
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef):
-                        method_info = extract_function_info(item, content)
-                        methods[item.name] = method_info
-                    elif isinstance(item, ast.Assign):
-                        for target in item.targets:
-                            if isinstance(target, ast.Name):
-                                class_vars.append({
-                                    "name": target.id,
-                                    "line": item.lineno
-                                })
-                
-                classes[node.name] = {
-                    "start_line": node.lineno,
-                    "end_line": find_end_line(node, content),
-                    "docstring": docstring,
-                    "bases": bases,
-                    "methods": methods,
-                    "class_variables": class_vars,
-                    "code_snippet": extract_code_snippet(content, node.lineno, find_end_line(node, content))
-                }
-        
-        # Extract standalone functions
-        for node in ast.iter_child_nodes(tree):
-            if isinstance(node, ast.FunctionDef):
-                functions[node.name] = extract_function_info(node, content)
-        
-        # Extract constants
-        for node in ast.iter_child_nodes(tree):
-            if isinstance(node, ast.Assign):
-                for target in node.targets:
-                    if isinstance(target, ast.Name) and target.id.isupper():
-                        constants[target.id] = {
-                            "line": node.lineno,
-                            "value": extract_assignment_value(node.value)
-                        }
+        extractor = _ModuleExtractor(content)
+        extractor.visit(tree)
         
         return {
             "path": file_path,
-            "classes": classes,
-            "functions": functions,
-            "imports": imports,
-            "constants": constants
+            "classes": extractor.classes,
+            "functions": extractor.functions,
+            "imports": extractor.imports,
+            "constants": extractor.constants,
+            "symbols": extractor.symbols,
+            "references": {
+                "names": sorted(extractor.referenced_names),
+                "calls": sorted(extractor.called_names)
+            }
         }
     except Exception as e:
         print(f"Error parsing {file_path}: {e}")
@@ -154,81 +326,29 @@ def parse_python_file(file_path: str) -> Dict[str, Any]:
             "classes": {},
             "functions": {},
             "imports": [],
-            "constants": {}
+            "constants": {},
+            "symbols": []
         }
 
-def extract_function_info(node: ast.FunctionDef, content: str) -> Dict[str, Any]:
+def extract_function_info(node: ast.FunctionDef, content: str, lines: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Extract detailed information about a function or method.
     
     Args:
         node: AST node for the function
         content: Source code content
+        lines: Optional pre-split lines of content
     
     Returns:
         Dictionary with function details
     """
-    # Get docstring
-    docstring = None
-    if (len(node.body) > 0 and 
-        isinstance(node.body[0], ast.Expr) and 
-        isinstance(node.body[0].value, (ast.Str, ast.Constant))):
-        
-        if hasattr(node.body[0].value, 's'):  # Python < 3.8
-            docstring = node.body[0].value.s
-        else:  # Python >= 3.8
-            docstring = node.body[0].value.value
-    
-    # Get parameters
-    parameters = []
-    for arg in node.args.args:
-        param = {"name": arg.arg}
-        if hasattr(arg, 'annotation') and arg.annotation is not None:
-            if isinstance(arg.annotation, ast.Name):
-                param["type"] = arg.annotation.id
-            elif isinstance(arg.annotation, ast.Attribute):
-                param["type"] = extract_attribute_path(arg.annotation)
-            elif isinstance(arg.annotation, ast.Subscript):
-                param["type"] = "complex_type"
-        parameters.append(param)
-    
-    # Get return type
-    return_type = None
-    if node.returns:
-        if isinstance(node.returns, ast.Name):
-            return_type = node.returns.id
-        elif isinstance(node.returns, ast.Attribute):
-            return_type = extract_attribute_path(node.returns)
-        elif isinstance(node.returns, ast.Subscript):
-            return_type = "complex_type"
+    if lines is None:
+        lines = content.splitlines()
     
     # Get function calls
-    calls = []
-    for child_node in ast.walk(node):
-        if isinstance(child_node, ast.Call):
-            call_name = "unknown"
-            if isinstance(child_node.func, ast.Name):
-                call_name = child_node.func.id
-            elif isinstance(child_node.func, ast.Attribute):
-                call_name = extract_attribute_path(child_node.func)
-            
-            calls.append({
-                "name": call_name,
-                "line": child_node.lineno
-            })
+    calls = [_call_info(child_node) for child_node in ast.walk(node) if isinstance(child_node, ast.Call)]
     
-    start_line = node.lineno
-    end_line = find_end_line(node, content)
-    
-    return {
-        "start_line": start_line,
-        "end_line": end_line,
-        "docstring": docstring,
-        "parameters": parameters,
-        "return_type": return_type,
-        "calls": calls,
-        "code_snippet": extract_code_snippet(content, start_line, end_line)
-    }
+    return _build_function_info(node, content, lines, calls)
 
 def extract_attribute_path(node: ast.Attribute) -> str:
     """
@@ -262,6 +382,9 @@ def extract_assignment_value(node: ast.AST) -> Any:
         String or primitive representing the value
     """
     if isinstance(node, ast.Constant):
+        if isinstance(node.value, (bytes, complex)) or node.value is Ellipsis:
+            # Not JSON serializable
+            return repr(node.value)
         return node.value
     elif isinstance(node, ast.Str):
         return node.s
@@ -279,13 +402,14 @@ def extract_assignment_value(node: ast.AST) -> Any:
         return "function_call"
     return "complex_value"
 
-def find_end_line(node: ast.AST, content: str) -> int:
+def find_end_line(node: ast.AST, content: str, lines: Optional[List[str]] = None) -> int:
     """
     Find the end line number of a node.
     
     Args:
         node: AST node
         content: Source code content
+        lines: Optional pre-split lines of content
     
     Returns:
         End line number
@@ -301,7 +425,8 @@ def find_end_line(node: ast.AST, content: str) -> int:
             max_line = max(max_line, child.lineno)
     
     # Add extra lines based on the indentation pattern
-    lines = content.splitlines()
+    if lines is None:
+        lines = content.splitlines()
     if max_line < len(lines):
         node_line = lines[node.lineno - 1]
         node_indent = len(node_line) - len(node_line.lstrip())
@@ -322,7 +447,13 @@ def find_end_line(node: ast.AST, content: str) -> int:
     
     return max_line
 
-def extract_code_snippet(content: str, start_line: int, end_line: int, context_lines: int = 2) -> str:
+def extract_code_snippet(
+    content: str,
+    start_line: int,
+    end_line: int,
+    context_lines: int = 2,
+    lines: Optional[List[str]] = None
+) -> str:
     """
     Extract a code snippet with surrounding context.
     
@@ -331,11 +462,13 @@ def extract_code_snippet(content: str, start_line: int, end_line: int, context_l
         start_line: Starting line number
         end_line: Ending line number
         context_lines: Number of context lines before and after
+        lines: Optional pre-split lines of content
     
     Returns:
         Code snippet as a string
     """
-    lines = content.splitlines()
+    if lines is None:
+        lines = content.splitlines()
     
     # Adjust for list indexing (0-based)
     start_idx = max(0, start_line - 1 - context_lines)
@@ -343,20 +476,28 @@ def extract_code_snippet(content: str, start_line: int, end_line: int, context_l
     
     return "\n".join(lines[start_idx:end_idx])
 
-def analyze_dependencies(files_info: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+def analyze_dependencies(
+    files_info: Dict[str, Dict[str, Any]],
+    known_components: Optional[Iterable[str]] = None
+) -> Dict[str, List[str]]:
     """
     Analyze dependencies between components.
-    
+
     Args:
         files_info: Dictionary containing information about all files
-    
+        known_components: Optional names of components defined outside files_info
+            (used by incremental updates, where only changed files are parsed)
+
     Returns:
         Dictionary mapping components to their dependencies
     """
     dependencies = {}
-    
+
     # First, build a map of all components
     all_components = {}
+    for component_name in known_components or []:
+        all_components[component_name] = {"file": None, "type": "unknown"}
+
     for file_path, info in files_info.items():
         for class_name in info.get("classes", {}):
             all_components[class_name] = {"file": file_path, "type": "class"}
@@ -398,6 +539,22 @@ def analyze_dependencies(files_info: Dict[str, Dict[str, Any]]) -> Dict[str, Lis
     
     return dependencies
 
+def mini_librarian_path_for(file_path: str, ai_ref_path: str) -> str:
+    """
+    Get the mini-librarian path of a source file, relative to .ai_reference.
+    
+    Args:
+        file_path: Path to the source file
+        ai_ref_path: Path to the .ai_reference directory
+    
+    Returns:
+        Relative path of the mini-librarian JSON file
+    """
+    # Create a safe filename
+    rel_path = os.path.relpath(file_path, ai_ref_path)
+    safe_filename = rel_path.replace('\\', '_').replace('/', '_').replace('.', '_') + '.json'
+    return os.path.join("scripts", safe_filename)
+
 def generate_mini_librarians(files_info: Dict[str, Dict[str, Any]], scripts_dir: str) -> Dict[str, str]:
     """
     Generate mini-librarian JSON files for all Python files.
@@ -412,12 +569,10 @@ def generate_mini_librarians(files_info: Dict[str, Dict[str, Any]], scripts_dir:
     mini_librarians = {}
     
     for file_path, info in files_info.items():
-        # Create a safe filename
-        rel_path = os.path.relpath(file_path, os.path.dirname(scripts_dir))
-        safe_filename = rel_path.replace('\\', '_').replace('/', '_').replace('.', '_') + '.json'
-        
         # Create the full path
-        mini_librarian_path = os.path.join(scripts_dir, safe_filename)
+        mini_librarian_path = os.path.join(
+            os.path.dirname(scripts_dir), mini_librarian_path_for(file_path, os.path.dirname(scripts_dir))
+        )
         
         # Ensure the directory exists
         os.makedirs(os.path.dirname(mini_librarian_path), exist_ok=True)
@@ -722,98 +877,498 @@ The project follows this general structure:
         
         f.write("```\n")
 
-def initialize_enhanced_librarian(project_path: str) -> Tuple[str, int, int]:
+def compute_file_hash(file_path: str) -> str:
     """
-    Initialize or update an enhanced AI Librarian for a project.
-    
+    Compute a content hash for a file.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(ai_ref_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the per-file content manifest used for incremental re-indexing.
+
+    Args:
+        ai_ref_path: Path to the .ai_reference directory
+
+    Returns:
+        Manifest dictionary, or None if it is missing, unreadable or outdated
+    """
+    manifest_path = os.path.join(ai_ref_path, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except Exception as e:
+        print(f"Error reading manifest {manifest_path}: {e}")
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+
+    return manifest
+
+def save_manifest(
+    ai_ref_path: str,
+    manifest_files: Dict[str, Dict[str, Any]],
+    changes: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Write the per-file content manifest.
+
+    Args:
+        ai_ref_path: Path to the .ai_reference directory
+        manifest_files: Mapping of relative file paths to their mtime, size and hash
+        changes: The change set applied by this update, kept for clients asking
+            what changed in the last generation
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "updated": datetime.now().isoformat(),
+        "files": manifest_files
+    }
+    if changes is not None:
+        manifest["changes"] = changes
+
+    manifest_path = os.path.join(ai_ref_path, MANIFEST_FILENAME)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+
+def detect_file_changes(
+    project_path: str,
+    python_files: List[str],
+    manifest_files: Dict[str, Dict[str, Any]]
+) -> Tuple[Dict[str, List[str]], Dict[str, Dict[str, Any]]]:
+    """
+    Compare the current Python files against the manifest.
+
+    Files whose mtime and size match the manifest are treated as unchanged without
+    being read. Otherwise the content hash decides, so a file that was only touched
+    is not reparsed.
+
     Args:
         project_path: Path to the project root
-        
+        python_files: Paths of the Python files currently in the project
+        manifest_files: Manifest entries from the previous run
+
     Returns:
-        Tuple containing (status message, file count, component count)
+        Tuple of (changes, new manifest entries), where changes maps "added",
+        "modified" and "deleted" to lists of relative paths and "renamed" to
+        a list of {"from", "to"} pairs
+    """
+    changes = {"added": [], "modified": [], "deleted": []}
+    new_manifest = {}
+
+    for file_path in python_files:
+        rel_path = os.path.relpath(file_path, project_path).replace('\\', '/')
+        _check_manifest_entry(file_path, rel_path, manifest_files.get(rel_path), changes, new_manifest)
+
+    for rel_path in manifest_files:
+        if rel_path not in new_manifest:
+            changes["deleted"].append(rel_path)
+
+    detect_renames(changes, manifest_files, new_manifest)
+    return changes, new_manifest
+
+def detect_renames(
+    changes: Dict[str, Any],
+    manifest_files: Dict[str, Dict[str, Any]],
+    new_manifest: Dict[str, Dict[str, Any]]
+) -> None:
+    """
+    Pair deleted and added files with identical content as renames.
+
+    Matching pairs are moved from changes["added"] and changes["deleted"]
+    into changes["renamed"].
+
+    Args:
+        changes: Change set from detect_file_changes or detect_path_changes
+        manifest_files: Manifest entries from the previous run
+        new_manifest: Manifest entries of the current run
+    """
+    deleted_by_hash = {}
+    for rel_path in changes["deleted"]:
+        content_hash = manifest_files.get(rel_path, {}).get("hash")
+        if content_hash:
+            deleted_by_hash.setdefault(content_hash, []).append(rel_path)
+
+    renamed = []
+    added = []
+    for rel_path in changes["added"]:
+        sources = deleted_by_hash.get(new_manifest.get(rel_path, {}).get("hash"))
+        if sources:
+            renamed.append({"from": sources.pop(0), "to": rel_path})
+        else:
+            added.append(rel_path)
+
+    renamed_from = {pair["from"] for pair in renamed}
+    changes["added"] = added
+    changes["deleted"] = [rel_path for rel_path in changes["deleted"] if rel_path not in renamed_from]
+    changes["renamed"] = renamed
+
+def changed_paths_for(changes: Dict[str, Any]) -> List[str]:
     """
+    List every relative path touched by a change set.
+
+    Args:
+        changes: Change set with "added", "modified", "deleted" and "renamed"
+
+    Returns:
+        Sorted list of relative paths, suitable as `changed_paths`
+    """
+    paths = set(changes.get("added", [])) | set(changes.get("modified", [])) | set(changes.get("deleted", []))
+    for pair in changes.get("renamed", []):
+        paths.add(pair["from"])
+        paths.add(pair["to"])
+    return sorted(paths)
+
+def _check_manifest_entry(
+    file_path: str,
+    rel_path: str,
+    previous: Optional[Dict[str, Any]],
+    changes: Dict[str, List[str]],
+    new_manifest: Dict[str, Dict[str, Any]]
+) -> None:
+    """Compare one file against its manifest entry, recording the result."""
     try:
-        # Create the .ai_reference directory
-        ai_ref_path = os.path.join(project_path, ".ai_reference")
-        os.makedirs(ai_ref_path, exist_ok=True)
-        
-        # Create subdirectories
-        scripts_path = os.path.join(ai_ref_path, "scripts")
-        diagnostics_path = os.path.join(ai_ref_path, "diagnostics")
-        os.makedirs(scripts_path, exist_ok=True)
-        os.makedirs(diagnostics_path, exist_ok=True)
-        
-        # Scan Python files
-        python_files = scan_directory(project_path)
-        
-        # Parse Python files
-        files_info = {}
-        component_count = 0
-        
-        print(f"Scanning {len(python_files)} Python files...")
+        stats = os.stat(file_path)
+    except OSError:
+        return
+
+    if (previous and previous.get("mtime") == stats.st_mtime and
+            previous.get("size") == stats.st_size):
+        new_manifest[rel_path] = previous
+        return
+
+    try:
+        content_hash = compute_file_hash(file_path)
+    except OSError:
+        return
+
+    new_manifest[rel_path] = {
+        "mtime": stats.st_mtime,
+        "size": stats.st_size,
+        "hash": content_hash
+    }
+
+    if previous is None:
+        changes["added"].append(rel_path)
+    elif previous.get("hash") != content_hash:
+        changes["modified"].append(rel_path)
+
+def _is_indexed_rel_path(rel_path: str, exclude_dirs: Optional[List[str]] = None) -> bool:
+    """Check whether a relative path is a Python file that scan_directory would return."""
+    if exclude_dirs is None:
+        exclude_dirs = ['venv', 'env', '.venv', '.env', '__pycache__', 'node_modules', '.git']
+
+    parts = rel_path.split('/')
+    if not parts[-1].endswith('.py') or parts[0] == '..':
+        return False
+    return not any(part in exclude_dirs or part.startswith('.') for part in parts[:-1])
+
+def detect_path_changes(
+    project_path: str,
+    changed_paths: Iterable[str],
+    manifest_files: Dict[str, Dict[str, Any]]
+) -> Tuple[Dict[str, List[str]], Dict[str, Dict[str, Any]]]:
+    """
+    Compare only the given paths against the manifest.
+
+    Used when a file watcher reports which paths changed, so the rest of the
+    project is neither walked nor stat'ed. Directory paths cover every indexed
+    file below them, which handles directories that were deleted or moved.
+
+    Args:
+        project_path: Path to the project root
+        changed_paths: Changed file or directory paths relative to the project
+        manifest_files: Manifest entries from the previous run
+
+    Returns:
+        Tuple of (changes, new manifest entries) like detect_file_changes
+    """
+    changes = {"added": [], "modified": [], "deleted": []}
+    new_manifest = dict(manifest_files)
+
+    candidates = set()
+    for rel_path in changed_paths:
+        rel_path = rel_path.replace('\\', '/').strip('/')
+        full_path = os.path.join(project_path, rel_path)
+
+        if rel_path in ('', '.'):
+            # The whole project changed
+            candidates.update(manifest_files)
+            full_path = project_path
+        else:
+            candidates.add(rel_path)
+            prefix = rel_path + '/'
+            candidates.update(path for path in manifest_files if path.startswith(prefix))
+
+        if os.path.isdir(full_path):
+            candidates.update(
+                os.path.relpath(file_path, project_path).replace('\\', '/')
+                for file_path in scan_directory(full_path)
+            )
+
+    for rel_path in sorted(candidates):
+        if not _is_indexed_rel_path(rel_path):
+            continue
+
+        previous = manifest_files.get(rel_path)
+        new_manifest.pop(rel_path, None)
+        _check_manifest_entry(os.path.join(project_path, rel_path), rel_path, previous, changes, new_manifest)
+
+        if previous is not None and rel_path not in new_manifest:
+            changes["deleted"].append(rel_path)
+
+    detect_renames(changes, manifest_files, new_manifest)
+    return changes, new_manifest
+
+def _load_json_file(path: str) -> Optional[Dict[str, Any]]:
+    """Load a JSON file, returning None if it is missing or invalid."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        return None
+
+def get_index_worker_count(max_workers: Optional[int] = None) -> int:
+    """
+    Resolve the number of worker processes used for parsing.
+
+    Args:
+        max_workers: Explicit worker count; falls back to the AI_LIBRARIAN_INDEX_WORKERS
+            environment variable and then to the CPU count
+
+    Returns:
+        Number of worker processes (at least 1)
+    """
+    if max_workers is None:
+        env_value = os.environ.get(INDEX_WORKERS_ENV, "")
+        try:
+            max_workers = int(env_value) if env_value else None
+        except ValueError:
+            print(f"Ignoring invalid {INDEX_WORKERS_ENV} value: {env_value}")
+            max_workers = None
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    return max(1, max_workers)
+
+def _parse_batch(file_paths: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Parse a batch of files in a worker process.
+
+    parse_python_file already reports syntax and I/O errors per file; anything else
+    is caught here so one bad file cannot fail the rest of its batch.
+    """
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append((file_path, parse_python_file(file_path)))
+        except Exception as e:
+            results.append((file_path, {
+                "path": file_path,
+                "error": str(e),
+                "classes": {},
+                "functions": {},
+                "imports": [],
+                "constants": {},
+                "symbols": []
+            }))
+    return results
+
+def parse_files_parallel(
+    python_files: List[str],
+    max_workers: Optional[int] = None,
+    chunk_size: int = PARSE_CHUNK_SIZE
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse Python files on a process pool.
+
+    Files are submitted in chunks to amortize inter-process overhead. Results are
+    merged in input order, so the output does not depend on worker scheduling.
+    Small inputs or a single worker are parsed in-process.
+
+    Args:
+        python_files: Paths of the files to parse
+        max_workers: Number of worker processes (see get_index_worker_count)
+        chunk_size: Number of files per submitted batch
+
+    Returns:
+        Dictionary mapping each file path to its parse result
+    """
+    workers = min(get_index_worker_count(max_workers), max(1, len(python_files) // max(1, chunk_size)))
+
+    print(f"Scanning {len(python_files)} Python files...")
+
+    if workers <= 1 or len(python_files) < PARALLEL_PARSE_THRESHOLD:
+        results = {}
         for i, file_path in enumerate(python_files):
             if i % 20 == 0:
                 print(f"Processed {i}/{len(python_files)} files...")
-                
-            file_info = parse_python_file(file_path)
-            files_info[file_path] = file_info
-            
-            # Count components
-            component_count += len(file_info.get("classes", {})) + len(file_info.get("functions", {}))
-        
-        # Analyze dependencies
-        print("Analyzing component dependencies...")
-        dependencies = analyze_dependencies(files_info)
-        
-        # Generate mini-librarians
-        print("Generating mini-librarians...")
-        mini_librarians = generate_mini_librarians(files_info, scripts_path)
-        
-        # Extract project info
-        print("Extracting project information...")
-        project_info = extract_project_info(project_path, files_info)
-        
-        # Generate enhanced component registry
-        print("Generating enhanced component registry...")
-        component_registry = generate_enhanced_component_registry(project_path, files_info, dependencies)
-        
-        # Write component registry
-        registry_path = os.path.join(ai_ref_path, "component_registry.json")
-        with open(registry_path, 'w', encoding='utf-8') as f:
-            json.dump(component_registry, f, indent=2)
-        
-        # Generate script index
-        script_index = {
-            "files": {},
-            "version": "0.2.0",
-            "project_info": project_info
-        }
-        
-        for file_path, mini_librarian_path in mini_librarians.items():
-            rel_path = os.path.relpath(file_path, project_path).replace('\\', '/')
-            
-            # Extract classes and functions for quick reference
-            file_info = files_info[file_path]
-            script_index["files"][rel_path] = {
-                "path": rel_path,
-                "classes": list(file_info.get("classes", {}).keys()),
-                "functions": list(file_info.get("functions", {}).keys()),
-                "mini_librarian": mini_librarian_path
-            }
-        
-        # Write script index
-        script_index_path = os.path.join(ai_ref_path, "script_index.json")
-        with open(script_index_path, 'w', encoding='utf-8') as f:
-            json.dump(script_index, f, indent=2)
-        
-        # Generate diagnostics
-        print("Generating diagnostics...")
-        generate_diagnostics(project_path, files_info, diagnostics_path)
-        
-        # Create README
-        readme_path = os.path.join(ai_ref_path, "README.md")
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(f"""# AI Librarian for {os.path.basename(project_path)}
+            results[file_path] = parse_python_file(file_path)
+        return results
+
+    chunks = [python_files[i:i + chunk_size] for i in range(0, len(python_files), chunk_size)]
+    parsed = {}
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Workers must not re-import the server's __main__ (see process_worker)
+            with worker_main():
+                futures = {executor.submit(_parse_batch, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    batch_results = future.result()
+                except Exception as e:
+                    # A crashed worker only costs us its batch; parse it in-process
+                    print(f"Parse batch failed ({e}), retrying in-process")
+                    batch_results = _parse_batch(futures[future])
+                parsed.update(batch_results)
+                print(f"Processed {len(parsed)}/{len(python_files)} files...")
+    except Exception as e:
+        print(f"Process pool unavailable ({e}), parsing remaining files in-process")
+
+    # Merge in input order; anything the pool did not finish is parsed here
+    return {
+        file_path: parsed[file_path] if file_path in parsed else parse_python_file(file_path)
+        for file_path in python_files
+    }
+
+def _script_index_entry(rel_path: str, file_info: Dict[str, Any], mini_librarian_path: str) -> Dict[str, Any]:
+    """Build the script index entry for a single file."""
+    return {
+        "path": rel_path,
+        "classes": list(file_info.get("classes", {}).keys()),
+        "functions": list(file_info.get("functions", {}).keys()),
+        "mini_librarian": mini_librarian_path
+    }
+
+def _count_components(script_index: Dict[str, Any]) -> int:
+    """Count the classes and functions listed in a script index."""
+    return sum(
+        len(entry.get("classes", [])) + len(entry.get("functions", []))
+        for entry in script_index.get("files", {}).values()
+    )
+
+def patch_component_registry(
+    registry: Dict[str, Any],
+    project_path: str,
+    changed_info: Dict[str, Dict[str, Any]],
+    removed_paths: Iterable[str]
+) -> Dict[str, Any]:
+    """
+    Update a component registry in place for a set of changed files.
+
+    Components owned by changed or removed files are dropped, components from the
+    changed files are regenerated, and dependencies on components that no longer
+    exist are pruned.
+
+    Args:
+        registry: Existing component registry
+        project_path: Path to the project root
+        changed_info: Parsed information for added and modified files
+        removed_paths: Relative paths of modified and deleted files
+
+    Returns:
+        The patched registry
+    """
+    stale_rel = set(removed_paths)
+    stale_rel.update(os.path.relpath(file_path, project_path).replace('\\', '/') for file_path in changed_info)
+    stale_files = {os.path.join(project_path, rel_path) for rel_path in stale_rel}
+    deleted_count = len(stale_rel) - len(changed_info)
+
+    components = {
+        name: info for name, info in registry.get("components", {}).items()
+        if info.get("primary_file") not in stale_files
+    }
+
+    dependencies = analyze_dependencies(changed_info, known_components=components.keys())
+    changed_registry = generate_enhanced_component_registry(project_path, changed_info, dependencies)
+    components.update(changed_registry["components"])
+
+    for info in components.values():
+        if "dependencies" in info:
+            info["dependencies"] = [dep for dep in info["dependencies"] if dep in components]
+
+    workflow = {
+        name: info for name, info in registry.get("workflow", {}).items()
+        if info.get("entry_point") not in stale_rel
+    }
+    workflow.update(changed_registry["workflow"])
+
+    registry["components"] = components
+    registry["workflow"] = workflow
+    registry["latest_changes"] = {
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "description": "Incremental component registry update",
+        "changes": [
+            f"Reindexed {len(changed_info)} added or modified files",
+            f"Dropped components from {deleted_count} deleted files"
+        ]
+    }
+
+    return registry
+
+def _patch_project_info(
+    project_info: Dict[str, Any],
+    project_path: str,
+    script_index: Dict[str, Any],
+    changed_info: Dict[str, Dict[str, Any]],
+    removed_paths: Iterable[str]
+) -> Dict[str, Any]:
+    """Refresh project information after an incremental update."""
+    stale_rel = set(removed_paths)
+    stale_rel.update(os.path.relpath(p, project_path).replace('\\', '/') for p in changed_info)
+
+    changed_project_info = extract_project_info(project_path, changed_info)
+
+    entry_points = [
+        entry_point for entry_point in project_info.get("entry_points", [])
+        if os.path.relpath(entry_point, project_path).replace('\\', '/') not in stale_rel
+    ]
+    entry_points.extend(changed_project_info["entry_points"])
+
+    files = script_index.get("files", {}).values()
+    project_info.update({
+        "project_name": os.path.basename(project_path),
+        "total_files": len(script_index.get("files", {})),
+        "total_classes": sum(len(entry.get("classes", [])) for entry in files),
+        "total_functions": sum(len(entry.get("functions", [])) for entry in files),
+        "entry_points": entry_points,
+        "updated": datetime.now().isoformat()
+    })
+    if changed_project_info["project_type"] != "unknown":
+        project_info["project_type"] = changed_project_info["project_type"]
+
+    return project_info
+
+def _write_readme(
+    ai_ref_path: str,
+    project_path: str,
+    project_info: Dict[str, Any],
+    component_registry: Dict[str, Any]
+) -> None:
+    """Write the .ai_reference README."""
+    readme_path = os.path.join(ai_ref_path, "README.md")
+    with open(readme_path, 'w', encoding='utf-8') as f:
+        f.write(f"""# AI Librarian for {os.path.basename(project_path)}
 
 This directory contains the AI Librarian reference system, which helps AI assistants 
 understand and navigate the codebase effectively.
@@ -825,7 +1380,7 @@ understand and navigate the codebase effectively.
 {_format_key_components(component_registry)}
 
 ## Project Structure
-- {len(files_info)} Python files
+- {project_info.get("total_files", 0)} Python files
 - {len(component_registry["components"])} components identified
 - {project_info.get("total_classes", 0)} classes
 - {project_info.get("total_functions", 0)} functions
@@ -836,12 +1391,348 @@ understand and navigate the codebase effectively.
 
 Last updated: {datetime.now().isoformat()}
 """)
-        
+
+def _store_file_results(
+    project_path: str,
+    ai_ref_path: str,
+    files_info: Dict[str, Dict[str, Any]],
+    store: Optional[IndexStore]
+) -> Dict[str, str]:
+    """
+    Persist per-file parse results as mini-librarians.
+
+    With an index store the results go to the database and the JSON files are
+    only written on export; otherwise one JSON file is written per source file.
+
+    Returns:
+        Dictionary mapping file paths to mini-librarian paths
+    """
+    if store is None:
+        return generate_mini_librarians(files_info, os.path.join(ai_ref_path, "scripts"))
+
+    mini_librarians = {
+        file_path: mini_librarian_path_for(file_path, ai_ref_path) for file_path in files_info
+    }
+    # Previously exported JSON for these files is now stale
+    for mini_librarian_path in mini_librarians.values():
+        try:
+            os.remove(os.path.join(ai_ref_path, mini_librarian_path))
+        except OSError:
+            pass
+    store.replace_files({
+        os.path.relpath(file_path, project_path).replace('\\', '/'): (info, mini_librarians[file_path])
+        for file_path, info in files_info.items()
+    })
+    return mini_librarians
+
+def _write_index_files(
+    ai_ref_path: str,
+    script_index: Dict[str, Any],
+    component_registry: Dict[str, Any],
+    store: Optional[IndexStore]
+) -> None:
+    """
+    Write the script index and component registry.
+
+    With an index store the registry is also stored in the database, and the JSON
+    summaries are written compactly for readers that do not use the store.
+    """
+    indent = 2
+    if store is not None:
+        store.set_components(component_registry.get("components", {}))
+        for key in ("workflow", "latest_changes"):
+            store.set_meta(key, component_registry.get(key))
+        store.set_meta("project_info", script_index.get("project_info", {}))
+        indent = None
+
+    registry_path = os.path.join(ai_ref_path, "component_registry.json")
+    with open(registry_path, 'w', encoding='utf-8') as f:
+        json.dump(component_registry, f, indent=indent)
+
+    script_index_path = os.path.join(ai_ref_path, "script_index.json")
+    with open(script_index_path, 'w', encoding='utf-8') as f:
+        json.dump(script_index, f, indent=indent)
+
+def _full_rebuild(
+    project_path: str,
+    ai_ref_path: str,
+    python_files: List[str],
+    max_workers: Optional[int] = None,
+    store: Optional[IndexStore] = None
+) -> Tuple[str, int, int]:
+    """Rebuild every artifact in .ai_reference from scratch."""
+    diagnostics_path = os.path.join(ai_ref_path, "diagnostics")
+
+    # Parse Python files
+    files_info = parse_files_parallel(python_files, max_workers)
+    component_count = sum(
+        len(info.get("classes", {})) + len(info.get("functions", {})) for info in files_info.values()
+    )
+
+    # Analyze dependencies
+    print("Analyzing component dependencies...")
+    dependencies = analyze_dependencies(files_info)
+
+    # Generate mini-librarians
+    print("Generating mini-librarians...")
+    if store is not None:
+        store.clear()
+        scripts_path = os.path.join(ai_ref_path, "scripts")
+        for filename in os.listdir(scripts_path):
+            if filename.endswith(".json"):
+                os.remove(os.path.join(scripts_path, filename))
+    mini_librarians = _store_file_results(project_path, ai_ref_path, files_info, store)
+
+    # Extract project info
+    print("Extracting project information...")
+    project_info = extract_project_info(project_path, files_info)
+
+    # Generate enhanced component registry
+    print("Generating enhanced component registry...")
+    component_registry = generate_enhanced_component_registry(project_path, files_info, dependencies)
+
+    # Generate script index
+    script_index = {
+        "files": {},
+        "version": "0.2.0",
+        "project_info": project_info
+    }
+
+    for file_path, mini_librarian_path in mini_librarians.items():
+        rel_path = os.path.relpath(file_path, project_path).replace('\\', '/')
+        script_index["files"][rel_path] = _script_index_entry(rel_path, files_info[file_path], mini_librarian_path)
+
+    # Write script index and component registry
+    _write_index_files(ai_ref_path, script_index, component_registry, store)
+
+    # Write the symbol location index (the index store keeps its own symbols table)
+    if store is None:
+        save_symbol_index(ai_ref_path, SymbolIndex({
+            os.path.relpath(file_path, project_path).replace('\\', '/'): file_symbols(info)
+            for file_path, info in files_info.items()
+        }))
+
+    # Write the import graph and symbol-reference table
+    save_import_graph(ai_ref_path, ImportGraph({
+        os.path.relpath(file_path, project_path).replace('\\', '/'): graph_entry(info)
+        for file_path, info in files_info.items()
+    }))
+
+    # Write the BM25 search index over symbols, docstrings and paths
+    search_entries = {}
+    for file_path, info in files_info.items():
+        rel_path = os.path.relpath(file_path, project_path).replace('\\', '/')
+        search_entries[rel_path] = search_entry(rel_path, info)
+    save_search_index(ai_ref_path, SearchIndex(search_entries))
+
+    # Generate diagnostics
+    print("Generating diagnostics...")
+    generate_diagnostics(project_path, files_info, diagnostics_path)
+
+    _write_readme(ai_ref_path, project_path, project_info, component_registry)
+
+    return (
+        f"Enhanced AI Librarian generated for {len(files_info)} files",
+        len(files_info),
+        component_count
+    )
+
+def _incremental_update(
+    project_path: str,
+    ai_ref_path: str,
+    changes: Dict[str, List[str]],
+    script_index: Dict[str, Any],
+    component_registry: Dict[str, Any],
+    max_workers: Optional[int] = None,
+    store: Optional[IndexStore] = None
+) -> Tuple[str, int, int]:
+    """Reparse only added and modified files and patch the existing artifacts."""
+    # A renamed file is indexed under its new path and dropped under the old one
+    renamed = changes.get("renamed", [])
+    deleted_rel = changes["deleted"] + [pair["from"] for pair in renamed]
+    changed_rel = changes["added"] + changes["modified"] + [pair["to"] for pair in renamed]
+    removed_rel = changes["modified"] + deleted_rel
+
+    if not changed_rel and not deleted_rel:
+        file_count = len(script_index.get("files", {}))
         return (
-            f"Enhanced AI Librarian generated for {len(files_info)} files",
-            len(files_info),
-            component_count
+            f"Enhanced AI Librarian is up to date ({file_count} files)",
+            file_count,
+            _count_components(script_index)
+        )
+
+    print(f"Incremental update: {len(changes['added'])} added, "
+          f"{len(changes['modified'])} modified, {len(changes['deleted'])} deleted, {len(renamed)} renamed")
+
+    # Parse only the changed files
+    changed_files = [os.path.join(project_path, rel_path) for rel_path in changed_rel]
+    changed_info = parse_files_parallel(changed_files, max_workers)
+
+    # Drop mini-librarians of deleted files
+    if store is not None:
+        store.delete_files(deleted_rel)
+    for rel_path in deleted_rel:
+        entry = script_index["files"].pop(rel_path, None)
+        if entry and entry.get("mini_librarian"):
+            try:
+                os.remove(os.path.join(ai_ref_path, entry["mini_librarian"]))
+            except OSError:
+                pass
+
+    # Regenerate mini-librarians of changed files and patch the script index
+    mini_librarians = _store_file_results(project_path, ai_ref_path, changed_info, store)
+    for file_path, mini_librarian_path in mini_librarians.items():
+        rel_path = os.path.relpath(file_path, project_path).replace('\\', '/')
+        script_index["files"][rel_path] = _script_index_entry(rel_path, changed_info[file_path], mini_librarian_path)
+
+    # Patch the component registry and project info
+    patch_component_registry(component_registry, project_path, changed_info, removed_rel)
+    project_info = _patch_project_info(
+        script_index.get("project_info", {}), project_path, script_index, changed_info, removed_rel
+    )
+    script_index["project_info"] = project_info
+
+    _write_index_files(ai_ref_path, script_index, component_registry, store)
+
+    # Patch the symbol location index
+    if store is None:
+        symbol_index = load_symbol_index(ai_ref_path) or SymbolIndex()
+        symbol_index.remove_files(deleted_rel)
+        symbol_index.update_files({
+            os.path.relpath(file_path, project_path).replace('\\', '/'): file_symbols(info)
+            for file_path, info in changed_info.items()
+        })
+        save_symbol_index(ai_ref_path, symbol_index)
+
+    # Patch the import graph; the derived tables depend on every file, so they are recomputed
+    import_graph = load_import_graph(ai_ref_path)
+    graph_files = dict(import_graph.files) if import_graph else {}
+    for rel_path in deleted_rel:
+        graph_files.pop(rel_path, None)
+    for file_path, info in changed_info.items():
+        graph_files[os.path.relpath(file_path, project_path).replace('\\', '/')] = graph_entry(info)
+    save_import_graph(ai_ref_path, ImportGraph(graph_files))
+
+    # Patch the search index
+    search_entries = {}
+    for file_path, info in changed_info.items():
+        rel_path = os.path.relpath(file_path, project_path).replace('\\', '/')
+        search_entries[rel_path] = search_entry(rel_path, info)
+    search_index = load_search_index(ai_ref_path) or SearchIndex()
+    search_index.remove_files(deleted_rel)
+    search_index.update_files(search_entries)
+    save_search_index(ai_ref_path, search_index)
+
+    _write_readme(ai_ref_path, project_path, project_info, component_registry)
+
+    file_count = len(script_index["files"])
+    return (
+        f"Enhanced AI Librarian updated incrementally: {len(changes['added'])} added, "
+        f"{len(changes['modified'])} modified, {len(changes['deleted'])} deleted, "
+        f"{len(renamed)} renamed ({file_count} files indexed)",
+        file_count,
+        _count_components(script_index)
+    )
+
+def initialize_enhanced_librarian(
+    project_path: str,
+    full_rebuild: bool = False,
+    max_workers: Optional[int] = None,
+    use_index_store: Optional[bool] = None,
+    changed_paths: Optional[Iterable[str]] = None
+) -> Tuple[str, int, int]:
+    """
+    Initialize or update an enhanced AI Librarian for a project.
+
+    A manifest of every indexed file (mtime, size and content hash) is kept in
+    .ai_reference. When it is present, only added or modified files are reparsed,
+    deleted files are dropped, and the component registry and script index are
+    patched in place. Diagnostics are only regenerated on a full rebuild.
+
+    With the SQLite index store enabled, per-file results are kept in
+    .ai_reference/index.db instead of one JSON mini-librarian per file.
+
+    When a file watcher already knows which paths changed, passing them as
+    `changed_paths` limits the update to those paths without walking the project.
+
+    Args:
+        project_path: Path to the project root
+        full_rebuild: Ignore the manifest and rebuild everything from scratch
+        max_workers: Number of parser processes; defaults to the
+            AI_LIBRARIAN_INDEX_WORKERS environment variable or the CPU count
+        use_index_store: Store the index in SQLite; defaults to the
+            AI_LIBRARIAN_INDEX_STORE environment variable or an existing index.db
+        changed_paths: Changed file or directory paths relative to the project;
+            None checks every file
+
+    Returns:
+        Tuple containing (status message, file count, component count)
+    """
+    try:
+        # Create the .ai_reference directory
+        ai_ref_path = os.path.join(project_path, ".ai_reference")
+        os.makedirs(ai_ref_path, exist_ok=True)
+        
+        # Create subdirectories
+        scripts_path = os.path.join(ai_ref_path, "scripts")
+        diagnostics_path = os.path.join(ai_ref_path, "diagnostics")
+        os.makedirs(scripts_path, exist_ok=True)
+        os.makedirs(diagnostics_path, exist_ok=True)
+        
+        # Load the previous manifest and index artifacts
+        manifest = None if full_rebuild else load_manifest(ai_ref_path)
+        script_index = _load_json_file(os.path.join(ai_ref_path, "script_index.json"))
+        component_registry = _load_json_file(os.path.join(ai_ref_path, "component_registry.json"))
+
+        store = None
+        if index_store_enabled(project_path, use_index_store):
+            store = get_index_store(project_path, create=True)
+            # A new store has to be filled by a full rebuild
+            if store is not None and store.file_count() == 0:
+                manifest = None
+        elif load_symbol_index(ai_ref_path) is None:
+            # Indexes from before the symbol index existed need a full rebuild
+            manifest = None
+        if load_import_graph(ai_ref_path) is None:
+            # Likewise for indexes from before the import graph existed
+            manifest = None
+        if load_search_index(ai_ref_path) is None:
+            # ...and from before the search index existed
+            manifest = None
+
+        can_patch = (
+            manifest is not None and
+            script_index is not None and isinstance(script_index.get("files"), dict) and
+            component_registry is not None and isinstance(component_registry.get("components"), dict)
         )
+
+        if can_patch and changed_paths is not None:
+            changes, manifest_files = detect_path_changes(project_path, changed_paths, manifest.get("files", {}))
+        else:
+            # Scan Python files
+            python_files = scan_directory(project_path)
+            changes, manifest_files = detect_file_changes(
+                project_path, python_files, manifest.get("files", {}) if can_patch else {}
+            )
+
+        if can_patch:
+            result = _incremental_update(
+                project_path, ai_ref_path, changes, script_index, component_registry, max_workers, store
+            )
+        else:
+            result = _full_rebuild(project_path, ai_ref_path, python_files, max_workers, store)
+
+        save_manifest(ai_ref_path, manifest_files, changes)
+
+        # Refresh the trigram index used by find_implementation
+        try:
+            update_trigram_index(
+                project_path, rebuild=full_rebuild, changed_paths=changed_paths if can_patch else None
+            )
+        except Exception as e:
+            print(f"Error updating trigram index: {e}")
+
+        return result
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -892,8 +1783,12 @@ if __name__ == "__main__":
     if len(sys.argv) > 1:
         project_path = sys.argv[1]
         print(f"Initializing enhanced AI Librarian for {project_path}")
-        message, file_count, component_count = initialize_enhanced_librarian(project_path)
+        full_rebuild = "--full" in sys.argv[2:]
+        use_index_store = True if "--sqlite" in sys.argv[2:] else None
+        message, file_count, component_count = initialize_enhanced_librarian(
+            project_path, full_rebuild, use_index_store=use_index_store
+        )
         print(message)
         print(f"Found {component_count} components in {file_count} files")
     else:
-        print("Usage: python enhanced_indexer.py <project_path>")
+        print("Usage: python enhanced_indexer.py <project_path> [--full] [--sqlite]")
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+File Cache
+
+A byte-budgeted LRU cache for file reads made by the AI Librarian server.
+
+Entries are kept in an OrderedDict in access order, so lookups, inserts and
+evictions are O(1). Every entry is charged for the memory its content uses,
+and the least recently used entries are evicted once the byte budget or the
+entry limit is exceeded. Files larger than the per-entry limit are either
+refused ("reject") or admitted as long as they fit in the whole budget
+("admit").
+
+The cache is split into shards selected by a hash of the path. Each shard
+has its own lock, byte budget and LRU order, so lookups of different files do
+not contend, and file stats are taken outside the lock. Shard lock wait times
+are recorded and reported with the statistics.
+
+Besides whole files, the cache holds ranges of files (a byte or line range
+read from a large file), keyed by the file path plus a range key. Ranges of a
+file live in the same shard as the file and are validated against its mtime.
+
+Statistics are kept overall and per size class, including evictions and the
+bytes currently held.
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+try:
+    from .shared_state import InstrumentedLock
+except ImportError:
+    from shared_state import InstrumentedLock
+
+CACHE_MAX_BYTES_ENV = "AI_LIBRARIAN_CACHE_MAX_BYTES"
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 100
+DEFAULT_MAX_AGE = 60
+OVERSIZE_POLICIES = ("reject", "admit")
+DEFAULT_SHARDS = 4
+
+# Upper bounds of the size classes used for statistics
+SIZE_CLASSES = (
+    ("small", 16 * 1024),
+    ("medium", 256 * 1024),
+    ("large", 4 * 1024 * 1024),
+    ("huge", None)
+)
+
+# Fixed per-entry overhead charged on top of the content (dict and metadata)
+ENTRY_OVERHEAD = 512
+
+def size_class(size: int) -> str:
+    """Return the name of the size class of an entry of `size` bytes."""
+    for name, limit in SIZE_CLASSES:
+        if limit is None or size < limit:
+            return name
+    return SIZE_CLASSES[-1][0]
+
+def entry_size(file_data: Dict[str, Any]) -> int:
+    """
+    Estimate the memory held by a cache entry.
+
+    The content is measured with sys.getsizeof, which is O(1) and reflects
+    the compact string representation actually stored.
+    """
+    size = ENTRY_OVERHEAD
+    content = file_data.get("content")
+    if content is not None:
+        size += sys.getsizeof(content)
+    return size
+
+def _new_class_stats() -> Dict[str, int]:
+    return {"hits": 0, "stale": 0, "insertions": 0, "evictions": 0, "rejections": 0, "entries": 0, "bytes": 0}
+
+class _FileCacheShard:
+    """
+    One independently locked LRU partition of a FileCache.
+    """
+
+    def __init__(self, name: str):
+        self.lock = InstrumentedLock(name, register=False)
+        self.entries = OrderedDict()  # key -> (entry, size, path)
+        self.max_bytes = 0
+        self.max_entries = 0
+        self.bytes_held = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.class_stats = {name: _new_class_stats() for name, _ in SIZE_CLASSES}
+
+    def remove(self, key: str, evicted: bool = False) -> None:
+        entry, size, path = self.entries.pop(key)
+        self.bytes_held -= size
+        class_stats = self.class_stats[size_class(size)]
+        class_stats["entries"] -= 1
+        class_stats["bytes"] -= size
+        if evicted:
+            self.evictions += 1
+            class_stats["evictions"] += 1
+
+    def evict_to_fit(self, incoming: int) -> None:
+        """Evict least recently used entries until `incoming` more bytes fit."""
+        while self.entries and (
+            self.bytes_held + incoming > self.max_bytes or
+            len(self.entries) + (1 if incoming else 0) > self.max_entries
+        ):
+            self.remove(next(iter(self.entries)), evicted=True)
+
+class FileCache:
+    """
+    Thread-safe byte-budgeted LRU cache of file read results, split into
+    independently locked shards.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_entry_bytes: Optional[int] = None,
+        oversize_policy: str = "reject",
+        shards: int = DEFAULT_SHARDS
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Total byte budget; defaults to AI_LIBRARIAN_CACHE_MAX_BYTES or 64 MiB
+            max_entries: Maximum number of entries
+            max_age: Seconds after which an entry expires
+            max_entry_bytes: Entries above this size follow `oversize_policy`;
+                defaults to a quarter of the budget
+            oversize_policy: "reject" to refuse oversized entries, "admit" to
+                accept them as long as they fit in their shard's budget
+            shards: Number of shards; the budget and entry limit are split
+                evenly between them
+        """
+        if max_bytes is None:
+            try:
+                max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+            except ValueError:
+                max_bytes = DEFAULT_MAX_BYTES
+
+        self._config_lock = threading.Lock()
+        self._shards = [_FileCacheShard(f"file_cache[{i}]") for i in range(max(1, int(shards)))]
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.configure(max_bytes=max_bytes, max_entry_bytes=max_entry_bytes, oversize_policy=oversize_policy)
+
+    def _shard_for(self, path: str) -> _FileCacheShard:
+        return self._shards[hash(path) % len(self._shards)]
+
+    @property
+    def bytes_held(self) -> int:
+        return sum(shard.bytes_held for shard in self._shards)
+
+    def configure(
+        self,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_age: Optional[float] = None,
+        max_entry_bytes: Optional[int] = None,
+        oversize_policy: Optional[str] = None
+    ) -> None:
+        """
+        Change the cache limits; entries over the new limits are evicted.
+
+        Arguments left as None keep their current value, except that
+        max_entry_bytes follows a changed max_bytes unless given.
+        """
+        if oversize_policy is not None and oversize_policy not in OVERSIZE_POLICIES:
+            raise ValueError(f"oversize_policy must be one of {', '.join(OVERSIZE_POLICIES)}")
+
+        with self._config_lock:
+            if max_bytes is not None:
+                self.max_bytes = max(0, int(max_bytes))
+                if max_entry_bytes is None:
+                    max_entry_bytes = self.max_bytes // 4
+            if max_entry_bytes is not None:
+                self.max_entry_bytes = max(0, int(max_entry_bytes))
+            if max_entries is not None:
+                self.max_entries = max(0, int(max_entries))
+            if max_age is not None:
+                self.max_age = max_age
+            if oversize_policy is not None:
+                self.oversize_policy = oversize_policy
+
+            count = len(self._shards)
+            for shard in self._shards:
+                with shard.lock:
+                    # Round up so the shards together hold at least the configured limits
+                    shard.max_bytes = -(-self.max_bytes // count)
+                    shard.max_entries = -(-self.max_entries // count)
+                    shard.evict_to_fit(0)
+
+    @staticmethod
+    def _key(path: str, range_key: Optional[str]) -> str:
+        return path if range_key is None else f"{path}#{range_key}"
+
+    def get(self, path: str, range_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached entry if it is present, not expired and the file is unchanged.
+
+        Args:
+            path: Path of the file
+            range_key: Identifies a cached range of the file, e.g. "bytes=0-65535";
+                None for the whole file
+
+        Returns:
+            The cached file data, or None on a miss
+        """
+        key = self._key(path, range_key)
+        shard = self._shard_for(path)
+        with shard.lock:
+            item = shard.entries.get(key)
+            if item is None:
+                shard.misses += 1
+                return None
+        entry, size, _ = item
+
+        # Validate outside the shard lock: os.stat may block on slow filesystems
+        current_time = time.time()
+        valid = current_time - entry["cached_at"] <= self.max_age
+        if valid:
+            try:
+                valid = os.stat(path).st_mtime <= entry["modified"]
+            except Exception:
+                # If there's an error checking the file, assume it's invalid
+                valid = False
+
+        with shard.lock:
+            class_stats = shard.class_stats[size_class(size)]
+            current = shard.entries.get(key)
+            if current is None or current[0] is not entry:
+                # Evicted or replaced while we were checking
+                shard.misses += 1
+                return None
+
+            if not valid:
+                shard.remove(key)
+                shard.misses += 1
+                class_stats["stale"] += 1
+                return None
+
+            shard.entries.move_to_end(key)
+            entry["last_accessed"] = current_time
+            shard.hits += 1
+            class_stats["hits"] += 1
+            return entry
+
+    def set(self, path: str, file_data: Dict[str, Any], range_key: Optional[str] = None) -> bool:
+        """
+        Add or replace a cache entry.
+
+        Args:
+            path: Path of the file
+            file_data: File data dictionary; must include the file's "modified" time
+            range_key: Identifies a range of the file, None for the whole file
+
+        Returns:
+            True if the entry was cached, False if the admission policy refused it
+        """
+        size = entry_size(file_data)
+        current_time = time.time()
+        entry = {
+            **file_data,
+            "cached_at": current_time,
+            "last_accessed": current_time
+        }
+
+        key = self._key(path, range_key)
+        shard = self._shard_for(path)
+        with shard.lock:
+            class_stats = shard.class_stats[size_class(size)]
+            if key in shard.entries:
+                shard.remove(key)
+
+            oversized = size > self.max_entry_bytes
+            if size > shard.max_bytes or shard.max_entries == 0 or (oversized and self.oversize_policy == "reject"):
+                shard.rejections += 1
+                class_stats["rejections"] += 1
+                return False
+
+            shard.evict_to_fit(size)
+
+            shard.entries[key] = (entry, size, path)
+            shard.bytes_held += size
+            class_stats["insertions"] += 1
+            class_stats["entries"] += 1
+            class_stats["bytes"] += size
+            return True
+
+    def invalidate(self, path: str) -> None:
+        """Drop the entries of a file, whole and ranges, if cached."""
+        shard = self._shard_for(path)
+        with shard.lock:
+            for key in [key for key, item in shard.entries.items() if item[2] == path]:
+                shard.remove(key)
+
+    def clear(self) -> Dict[str, Any]:
+        """
+        Drop every entry and reset the statistics.
+
+        Returns:
+            The statistics from before the reset
+        """
+        stats = self.stats()
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.bytes_held = 0
+                shard.reset_stats()
+        return stats
+
+    def paths(self) -> List[str]:
+        """Return the cached keys (paths, or path#range), least recently used first within each shard."""
+        paths = []
+        for shard in self._shards:
+            with shard.lock:
+                paths.extend(shard.entries.keys())
+        return paths
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Per size class, the hit ratio is hits / (hits + insertions + rejections):
+        every insertion or rejection follows a lookup that missed, and the size
+        of a missing file is only known once it is inserted. "stale" counts
+        entries dropped on lookup because they expired or the file changed.
+        "lock_wait" sums the wait times of the shard locks.
+        """
+        totals = {"entries": 0, "bytes_held": 0, "hits": 0, "misses": 0, "evictions": 0, "rejections": 0}
+        class_totals = {name: _new_class_stats() for name, _ in SIZE_CLASSES}
+        lock_wait = {"acquisitions": 0, "contended": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0}
+
+        for shard in self._shards:
+            with shard.lock:
+                totals["entries"] += len(shard.entries)
+                totals["bytes_held"] += shard.bytes_held
+                totals["hits"] += shard.hits
+                totals["misses"] += shard.misses
+                totals["evictions"] += shard.evictions
+                totals["rejections"] += shard.rejections
+                for name, class_stats in shard.class_stats.items():
+                    for key, value in class_stats.items():
+                        class_totals[name][key] += value
+            lock_stats = shard.lock.stats()
+            lock_wait["acquisitions"] += lock_stats["acquisitions"]
+            lock_wait["contended"] += lock_stats["contended"]
+            lock_wait["total_wait_ms"] += lock_stats["total_wait_ms"]
+            lock_wait["max_wait_ms"] = max(lock_wait["max_wait_ms"], lock_stats["max_wait_ms"])
+
+        by_size_class = {}
+        for name, limit in SIZE_CLASSES:
+            class_stats = class_totals[name]
+            lookups = class_stats["hits"] + class_stats["insertions"] + class_stats["rejections"]
+            class_stats["hit_ratio"] = class_stats["hits"] / lookups if lookups else 0
+            class_stats["max_bytes"] = limit
+            by_size_class[name] = class_stats
+
+        total = totals["hits"] + totals["misses"]
+        return {
+            "entries": totals["entries"],
+            "bytes_held": totals["bytes_held"],
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "max_entry_bytes": self.max_entry_bytes,
+            "max_age": self.max_age,
+            "oversize_policy": self.oversize_policy,
+            "shards": len(self._shards),
+            "hits": totals["hits"],
+            "misses": totals["misses"],
+            "hit_ratio": totals["hits"] / total if total else 0,
+            "evictions": totals["evictions"],
+            "rejections": totals["rejections"],
+            "by_size_class": by_size_class,
+            "lock_wait": lock_wait
+        }
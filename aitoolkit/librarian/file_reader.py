@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+File Reader
+
+File reading shared by the AI Librarian's read tools.
+
+`read_whole_file` reads a file once, after sniffing its prefix to tell text
+from binary. `read_path` wraps it the way the read tools report a file
+(access checks, index fallback for missing files, cache); `check_readable`
+is its access check on its own, for reads of part of a file.
+`read_paths` reads a batch of files on a bounded thread pool so batch reads
+scale with I/O concurrency instead of file count. Each file has a timeout,
+results come back in request order, and a total byte cap truncates contents
+once the batch grows too large.
+
+Text results carry a blake2b "content_hash". Passing it back as
+`if_none_match` turns the read into an "unchanged" response when the file
+has not changed.
+"""
+
+import os
+import mimetypes
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+try:
+    from .json_cache import load_json
+    from .content_sniffer import sniff_file
+    from .content_hash import content_hash, remember_hash, check_unchanged, unchanged_result
+except ImportError:
+    from json_cache import load_json
+    from content_sniffer import sniff_file
+    from content_hash import content_hash, remember_hash, check_unchanged, unchanged_result
+
+# Configure logging
+logger = logging.getLogger("ai_librarian.file_reader")
+
+READ_WORKERS_ENV = "AI_LIBRARIAN_READ_WORKERS"
+
+DEFAULT_READ_WORKERS = 8
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_MAX_TOTAL_BYTES = 8 * 1024 * 1024
+
+def _default_workers() -> int:
+    try:
+        return max(1, int(os.environ.get(READ_WORKERS_ENV, DEFAULT_READ_WORKERS)))
+    except ValueError:
+        return DEFAULT_READ_WORKERS
+
+# Shared I/O pool. Reads that hang past their timeout keep a worker busy, so
+# the pool is bounded to keep a stuck network mount from spawning threads.
+_read_pool: Optional[ThreadPoolExecutor] = None
+_read_pool_lock = threading.Lock()
+
+def get_read_pool() -> ThreadPoolExecutor:
+    """Return the shared thread pool used for parallel reads."""
+    global _read_pool
+    with _read_pool_lock:
+        if _read_pool is None:
+            _read_pool = ThreadPoolExecutor(max_workers=_default_workers(), thread_name_prefix="librarian-read")
+        return _read_pool
+
+def _indexed_only_result(path: str, allowed_directories: List[str]) -> Optional[Dict[str, Any]]:
+    """Describe a missing file that still exists in a project's script index."""
+    for allowed_dir in allowed_directories:
+        if not path.startswith(allowed_dir):
+            continue
+
+        rel_path = os.path.relpath(path, allowed_dir)
+        script_index_path = os.path.join(allowed_dir, ".ai_reference", "script_index.json")
+        script_index = load_json(script_index_path, {})
+        if isinstance(script_index, dict) and rel_path in script_index.get("files", {}):
+            return {
+                "status": "indexed_only",
+                "path": path,
+                "message": "File not found directly but exists in the index. Use index_query tool instead.",
+                "indexed_path": rel_path,
+                "index_location": script_index_path
+            }
+    return None
+
+def read_whole_file(path: str, encoding: str = "utf-8") -> Dict[str, Any]:
+    """
+    Read a whole file as text, or describe it if it is binary.
+
+    The file is classified from its first few KB before anything else is
+    read, so binary files are never read in full. A text file is read once
+    as bytes and decoded; when the caller asks for the default UTF-8, the
+    sniffed encoding (a BOM-marked UTF-8/16/32 or a legacy 8-bit encoding)
+    is used instead.
+
+    Args:
+        path: Absolute path of the file
+        encoding: Text encoding requested by the caller
+
+    Returns:
+        Result dictionary with status "success" or "binary"
+    """
+    stats = os.stat(path)
+
+    # Try to determine MIME type
+    mime_type, _ = mimetypes.guess_type(path)
+
+    verdict = sniff_file(path, stats)
+    if not verdict["binary"]:
+        if encoding.lower().replace("_", "-") in ("utf-8", "utf8") and verdict["encoding"]:
+            encoding = verdict["encoding"]
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            content = data.decode(encoding)
+            digest = content_hash(data)
+            remember_hash(path, stats, digest)
+            return {
+                "status": "success",
+                "path": path,
+                "content": content,
+                "content_hash": digest,
+                "size": stats.st_size,
+                "mime_type": mime_type or "text/plain",
+                "encoding": encoding,
+                "modified": stats.st_mtime,
+                "created": stats.st_ctime,
+                "from_cache": False
+            }
+        except UnicodeDecodeError:
+            pass  # Undecodable past the sniffed prefix: report it as binary
+
+    return {
+        "status": "binary",
+        "path": path,
+        "size": stats.st_size,
+        "mime_type": mime_type or "application/octet-stream",
+        "encoding": "binary",
+        "message": f"Binary file detected ({stats.st_size} bytes). Content not displayed.",
+        "modified": stats.st_mtime,
+        "created": stats.st_ctime,
+        "from_cache": False
+    }
+
+def conditional_result(result: Dict[str, Any], if_none_match: Optional[str]) -> Dict[str, Any]:
+    """Replace a read result by an "unchanged" response if its hash matches."""
+    if if_none_match and result.get("content_hash") == if_none_match:
+        return unchanged_result(result.get("path"), if_none_match, result.get("size", 0), result.get("modified"))
+    return result
+
+def check_readable(path: str, allowed_directories: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Check that a read tool may read a file.
+
+    Args:
+        path: Absolute path of the file
+        allowed_directories: Directories the file must be within
+
+    Returns:
+        None if the file can be read, otherwise the result to report: an
+        error, or "indexed_only" for a missing file known to the index
+    """
+    # Check if path is within allowed directories
+    if not any(path.startswith(allowed_dir) for allowed_dir in allowed_directories):
+        return {
+            "status": "error",
+            "message": f"Access denied: {path} is not within allowed directories"
+        }
+
+    # Check if file exists, or is at least known to the index
+    if not os.path.isfile(path):
+        indexed = _indexed_only_result(path, allowed_directories)
+        return indexed or {
+            "status": "error",
+            "message": f"File not found: {path}"
+        }
+
+    # Check if we have read permission
+    if not os.access(path, os.R_OK):
+        return {
+            "status": "error",
+            "message": f"Permission denied: Cannot read {path}"
+        }
+    return None
+
+def read_path(
+    path: str,
+    allowed_directories: List[str],
+    file_cache=None,
+    use_cache: bool = True,
+    encoding: str = "utf-8",
+    if_none_match: Optional[str] = None
+) -> Tuple[str, Dict[str, Any], bool]:
+    """
+    Read one file for a read tool.
+
+    Args:
+        path: Path to the file
+        allowed_directories: Directories the file must be within
+        file_cache: FileCache to consult and fill, if any
+        use_cache: Whether to use the file cache
+        encoding: Text encoding
+        if_none_match: Content hash from an earlier read; if the file still
+            matches it, an "unchanged" result is returned instead
+
+    Returns:
+        Tuple of (absolute path, result dictionary, whether it was a cache hit)
+    """
+    path = os.path.abspath(path)
+    try:
+        refused = check_readable(path, allowed_directories)
+        if refused is not None:
+            return path, refused, False
+
+        # A conditional read of an unchanged file costs one stat
+        unchanged = check_unchanged(path, if_none_match)
+        if unchanged is not None:
+            return path, unchanged, True
+
+        # Check cache first if enabled
+        if use_cache and file_cache is not None:
+            cached_data = file_cache.get(path)
+            if cached_data:
+                result = {**cached_data}
+                result["from_cache"] = True
+                return path, conditional_result(result, if_none_match), True
+
+        result = read_whole_file(path, encoding)
+        if use_cache and file_cache is not None:
+            file_cache.set(path, result)
+        return path, conditional_result(result, if_none_match), False
+
+    except Exception as e:
+        logger.error(f"Error reading file {path}: {str(e)}")
+        return path, {
+            "status": "error",
+            "message": f"Error reading file: {str(e)}"
+        }, False
+
+def _truncate_result(result: Dict[str, Any], remaining: int) -> Dict[str, Any]:
+    """Cut a result's content down to `remaining` bytes and mark it truncated."""
+    content = result.get("content", "")
+    encoded = content.encode("utf-8", errors="replace")
+    kept = encoded[:max(0, remaining)].decode("utf-8", errors="ignore")
+    returned = len(kept.encode("utf-8"))
+
+    truncated = {**result}
+    truncated["content"] = kept
+    truncated["truncated"] = True
+    truncated["returned_bytes"] = returned
+    truncated["message"] = (
+        f"Content truncated to {returned} of {len(encoded)} bytes: the batch reached its total byte cap. "
+        "Read this file on its own to get the rest."
+    )
+    return truncated
+
+def read_paths(
+    paths: List[str],
+    read_one: Callable[[str], Tuple[str, Dict[str, Any], bool]],
+    parallel: bool = True,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+    max_total_bytes: Optional[int] = DEFAULT_MAX_TOTAL_BYTES
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+    """
+    Read a batch of files, optionally in parallel.
+
+    Results are assembled in request order. A read that does not finish
+    within `timeout` seconds of its turn is reported as an error (the worker
+    is left to finish in the background). Once the returned contents reach
+    `max_total_bytes`, the remaining contents are truncated or emptied and
+    carry `"truncated": True`.
+
+    Args:
+        paths: Paths to read
+        read_one: Function reading one path, as read_path with its other
+            arguments bound
+        parallel: Read on the shared thread pool instead of sequentially
+        max_workers: Maximum number of reads in flight at once; defaults to
+            the pool size
+        timeout: Seconds to wait for each file; None waits indefinitely
+        max_total_bytes: Cap on the total content returned; None disables it
+
+    Returns:
+        Tuple of (results keyed by absolute path, statistics with cache
+        hits/misses, unchanged files, timeouts, truncated files and bytes
+        returned)
+    """
+    stats = {"hits": 0, "misses": 0, "unchanged": 0, "timeouts": 0, "truncated": 0, "total_bytes": 0}
+    outcomes: List[Tuple[str, Optional[Dict[str, Any]], bool]] = []
+
+    if parallel and len(paths) > 1:
+        pool = get_read_pool()
+        # Keep at most `window` reads of this batch in flight; a new read is
+        # submitted each time the oldest one is collected
+        window = max(1, max_workers or _default_workers())
+        futures = [pool.submit(read_one, path) for path in paths[:window]]
+        for index, path in enumerate(paths):
+            future = futures[index]
+            try:
+                outcomes.append(future.result(timeout=timeout))
+            except FutureTimeoutError:
+                future.cancel()
+                stats["timeouts"] += 1
+                outcomes.append((os.path.abspath(path), {
+                    "status": "error",
+                    "message": f"Timed out after {timeout} seconds reading {path}"
+                }, False))
+            except Exception as e:
+                outcomes.append((os.path.abspath(path), {
+                    "status": "error",
+                    "message": f"Error processing file: {str(e)}"
+                }, False))
+            if index + window < len(paths):
+                futures.append(pool.submit(read_one, paths[index + window]))
+    else:
+        outcomes = [read_one(path) for path in paths]
+
+    results = {}
+    remaining = max_total_bytes
+    for path, result, cache_hit in outcomes:
+        if result.get("status") in ("success", "binary", "unchanged"):
+            stats["hits" if cache_hit else "misses"] += 1
+        if result.get("status") == "unchanged":
+            stats["unchanged"] += 1
+
+        if "content" in result:
+            size = result.get("size", 0)
+            if remaining is not None and size > remaining:
+                result = _truncate_result(result, remaining)
+                stats["truncated"] += 1
+                size = result["returned_bytes"]
+            if remaining is not None:
+                remaining -= size
+            stats["total_bytes"] += size
+
+        results[path] = result
+
+    return results, stats
@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+Project File Watcher
+
+This module streams file create/modify/delete/move events for a project so the
+AI Librarian can re-index changed files within seconds, instead of walking every
+project on a timer.
+
+Backends, in order of preference:
+
+- inotify: Linux kernel notifications through ctypes (no extra dependency)
+- watchdog: the optional `watchdog` package (pip install watchdog)
+- polling: a periodic os.scandir snapshot diff, used when neither is available
+
+The backend can be forced with the AI_LIBRARIAN_WATCHER environment variable
+("inotify", "watchdog", "polling" or "auto").
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import logging
+import threading
+import ctypes
+import ctypes.util
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Callable, Iterable, Set, Tuple
+
+try:
+    from .trigram_index import DEFAULT_CODE_EXTENSIONS
+except ImportError:
+    # Running as a standalone script
+    from trigram_index import DEFAULT_CODE_EXTENSIONS
+
+# Optional watchdog backend
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object
+
+# Configure logging
+logger = logging.getLogger("ai_librarian.file_watcher")
+
+WATCHER_BACKEND_ENV = "AI_LIBRARIAN_WATCHER"
+DEFAULT_POLL_INTERVAL = 30.0
+EXCLUDED_DIRS = ['venv', 'env', '__pycache__', 'node_modules']
+
+# inotify constants (from <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+               IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR | IN_EXCL_UNLINK)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+def _load_libc():
+    """Load libc with the inotify functions, or return None when unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+_libc = _load_libc()
+INOTIFY_AVAILABLE = _libc is not None
+
+class WatcherError(Exception):
+    """Raised when a watcher backend cannot watch a project."""
+
+@dataclass
+class FileEvent:
+    """A change to a file or directory inside a watched project."""
+    event_type: str  # "created", "modified", "deleted", "moved" or "overflow"
+    path: str
+    dest_path: Optional[str] = None
+    is_directory: bool = False
+
+def normalize_project_path(project_path: str) -> str:
+    """Key a project the same way whether it was given relative or with a trailing slash."""
+    return os.path.abspath(project_path)
+
+def is_excluded_dir(name: str) -> bool:
+    """Check whether a directory is skipped by the indexers."""
+    return name.startswith('.') or name in EXCLUDED_DIRS
+
+def is_watched_path(project_path: str, path: str, extensions: Iterable[str], is_directory: bool = False) -> bool:
+    """
+    Check whether a path inside a project is relevant to the indexers.
+
+    Args:
+        project_path: Path to the project root
+        path: Absolute path of the changed file or directory
+        extensions: File extensions that are indexed
+        is_directory: Whether the path is a directory
+
+    Returns:
+        True if the path is outside excluded directories and, for files, has an indexed extension
+    """
+    rel_path = os.path.relpath(path, project_path)
+    if rel_path.startswith(os.pardir):
+        return False
+
+    parts = rel_path.replace('\\', '/').split('/')
+    dir_parts = parts if is_directory else parts[:-1]
+    if any(is_excluded_dir(part) for part in dir_parts if part != '.'):
+        return False
+
+    return is_directory or path.endswith(tuple(extensions))
+
+def snapshot_files(project_path: str, extensions: Iterable[str]) -> Dict[str, Tuple[float, int]]:
+    """
+    Take an (mtime, size) snapshot of the watched files of a project.
+
+    Args:
+        project_path: Path to the project root
+        extensions: File extensions to include
+
+    Returns:
+        Mapping of absolute file paths to (mtime, size)
+    """
+    extensions = tuple(extensions)
+    snapshot = {}
+    stack = [project_path]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not is_excluded_dir(entry.name):
+                            stack.append(entry.path)
+                    elif entry.name.endswith(extensions):
+                        stats = entry.stat()
+                        snapshot[entry.path] = (stats.st_mtime, stats.st_size)
+                except OSError:
+                    continue
+
+    return snapshot
+
+class BaseWatcher:
+    """
+    Common interface of the watcher backends.
+
+    Events are delivered to `callback(project_path, events)` from the
+    watcher's own thread.
+    """
+
+    backend = "base"
+
+    def __init__(
+        self,
+        project_path: str,
+        callback: Callable[[str, List[FileEvent]], None],
+        extensions: Optional[Iterable[str]] = None
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            project_path: Path to the project root
+            callback: Called with the project path and a batch of events
+            extensions: File extensions to report (defaults to the indexed code files)
+        """
+        self.project_path = normalize_project_path(project_path)
+        self.callback = callback
+        self.extensions = tuple(extensions or DEFAULT_CODE_EXTENSIONS)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def _emit(self, events: List[FileEvent]) -> None:
+        """Deliver the relevant events of a batch."""
+        relevant = [
+            event for event in events
+            if event.event_type == "overflow" or
+            is_watched_path(self.project_path, event.path, self.extensions, event.is_directory) or
+            (event.dest_path and
+             is_watched_path(self.project_path, event.dest_path, self.extensions, event.is_directory))
+        ]
+        if relevant:
+            try:
+                self.callback(self.project_path, relevant)
+            except Exception as e:
+                logger.error(f"Error handling file events for {self.project_path}: {str(e)}")
+
+class InotifyWatcher(BaseWatcher):
+    """
+    Linux inotify watcher.
+
+    inotify is not recursive, so every directory of the project gets its own
+    watch; watches are added for directories created or moved in later.
+    """
+
+    backend = "inotify"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fd = -1
+        self._watches = {}  # watch descriptor -> directory path
+
+    def start(self) -> None:
+        if not INOTIFY_AVAILABLE:
+            raise WatcherError("inotify is not available on this platform")
+
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise WatcherError(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+
+        try:
+            self._add_tree(self.project_path)
+        except WatcherError:
+            os.close(self._fd)
+            self._fd = -1
+            raise
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name="inotify-watcher")
+        self._thread.start()
+
+    def stop(self) -> None:
+        super().stop()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _add_watch(self, directory: str) -> None:
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return
+            if err == errno.ENOSPC:
+                raise WatcherError("inotify watch limit reached (fs.inotify.max_user_watches)")
+            raise WatcherError(f"inotify_add_watch failed for {directory}: {os.strerror(err)}")
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory: str, events: Optional[List[FileEvent]] = None) -> None:
+        """
+        Watch a directory and its subdirectories.
+
+        When `events` is given, "created" events are appended for the files
+        already inside, since they appeared before the watches existed.
+        """
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if not is_excluded_dir(d)]
+            self._add_watch(root)
+            if events is not None:
+                for filename in files:
+                    events.append(FileEvent("created", os.path.join(root, filename)))
+
+    def _remove_tree(self, directory: str) -> None:
+        """Drop the watches of a directory that was moved away."""
+        prefix = directory + os.sep
+        for wd, path in list(self._watches.items()):
+            if path == directory or path.startswith(prefix):
+                _libc.inotify_rm_watch(self._fd, wd)
+                self._watches.pop(wd, None)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                readable, _, _ = select.select([self._fd], [], [], 0.5)
+                if not readable:
+                    continue
+                data = os.read(self._fd, 64 * 1024)
+            except (OSError, ValueError):
+                if self._stop_event.is_set():
+                    break
+                logger.error(f"inotify read failed for {self.project_path}")
+                self._emit([FileEvent("overflow", self.project_path)])
+                break
+
+            self._emit(self._parse_events(data))
+
+    def _parse_events(self, data: bytes) -> List[FileEvent]:
+        """Convert raw inotify records into FileEvents, pairing moves by cookie."""
+        events = []
+        moved_from = {}  # cookie -> (path, is_directory)
+        offset = 0
+
+        while offset + _INOTIFY_EVENT.size <= len(data):
+            wd, mask, cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            name = data[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + length].rstrip(b'\0')
+            offset += _INOTIFY_EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                events.append(FileEvent("overflow", self.project_path))
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None or mask & IN_DELETE_SELF:
+                continue
+
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            is_directory = bool(mask & IN_ISDIR)
+
+            if is_directory and is_excluded_dir(os.fsdecode(name)):
+                continue
+
+            if mask & IN_CREATE:
+                if is_directory:
+                    try:
+                        self._add_tree(path, events)
+                    except WatcherError as e:
+                        logger.warning(f"{str(e)}; falling back to a rescan of {self.project_path}")
+                        events.append(FileEvent("overflow", self.project_path))
+                events.append(FileEvent("created", path, is_directory=is_directory))
+            elif mask & IN_DELETE:
+                events.append(FileEvent("deleted", path, is_directory=is_directory))
+            elif mask & (IN_MODIFY | IN_CLOSE_WRITE):
+                events.append(FileEvent("modified", path))
+            elif mask & IN_MOVED_FROM:
+                moved_from[cookie] = (path, is_directory)
+            elif mask & IN_MOVED_TO:
+                source = moved_from.pop(cookie, None)
+                if is_directory:
+                    if source:
+                        self._remove_tree(source[0])
+                    try:
+                        self._add_tree(path, events)
+                    except WatcherError as e:
+                        logger.warning(f"{str(e)}; falling back to a rescan of {self.project_path}")
+                        events.append(FileEvent("overflow", self.project_path))
+                if source:
+                    events.append(FileEvent("moved", source[0], dest_path=path, is_directory=is_directory))
+                else:
+                    events.append(FileEvent("created", path, is_directory=is_directory))
+
+        # Files moved out of the project never get a matching IN_MOVED_TO
+        for path, is_directory in moved_from.values():
+            if is_directory:
+                self._remove_tree(path)
+            events.append(FileEvent("deleted", path, is_directory=is_directory))
+
+        return events
+
+class _WatchdogHandler(FileSystemEventHandler):
+    """Forward watchdog events to a WatchdogWatcher."""
+
+    def __init__(self, watcher: "WatchdogWatcher"):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type not in ("created", "modified", "deleted", "moved"):
+            return
+        if event.event_type == "modified" and event.is_directory:
+            return
+        self.watcher._emit([FileEvent(
+            event.event_type,
+            os.fsdecode(event.src_path),
+            dest_path=os.fsdecode(event.dest_path) if event.event_type == "moved" else None,
+            is_directory=event.is_directory
+        )])
+
+class WatchdogWatcher(BaseWatcher):
+    """Watcher backed by the optional watchdog package."""
+
+    backend = "watchdog"
+
+    def start(self) -> None:
+        if not WATCHDOG_AVAILABLE:
+            raise WatcherError("watchdog is not installed")
+
+        try:
+            self._observer = Observer()
+            self._observer.schedule(_WatchdogHandler(self), self.project_path, recursive=True)
+            self._observer.start()
+        except Exception as e:
+            raise WatcherError(f"watchdog could not watch {self.project_path}: {str(e)}")
+
+    def stop(self) -> None:
+        super().stop()
+        observer = getattr(self, "_observer", None)
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=5)
+
+class PollingWatcher(BaseWatcher):
+    """Fallback watcher that diffs an (mtime, size) snapshot on an interval."""
+
+    backend = "polling"
+
+    def __init__(self, *args, interval: float = DEFAULT_POLL_INTERVAL, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.interval = interval
+        self._snapshot = {}
+
+    def start(self) -> None:
+        self._snapshot = snapshot_files(self.project_path, self.extensions)
+        self._thread = threading.Thread(target=self._run, daemon=True, name="polling-watcher")
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._emit(self.poll())
+            except Exception as e:
+                logger.error(f"Error polling {self.project_path}: {str(e)}")
+
+    def poll(self) -> List[FileEvent]:
+        """Take a new snapshot and return the differences to the previous one."""
+        current = snapshot_files(self.project_path, self.extensions)
+        previous = self._snapshot
+        self._snapshot = current
+
+        events = []
+        for path, signature in current.items():
+            old_signature = previous.get(path)
+            if old_signature is None:
+                events.append(FileEvent("created", path))
+            elif old_signature != signature:
+                events.append(FileEvent("modified", path))
+        for path in previous:
+            if path not in current:
+                events.append(FileEvent("deleted", path))
+        return events
+
+_BACKENDS = {
+    "inotify": InotifyWatcher,
+    "watchdog": WatchdogWatcher,
+    "polling": PollingWatcher
+}
+
+def create_watcher(
+    project_path: str,
+    callback: Callable[[str, List[FileEvent]], None],
+    extensions: Optional[Iterable[str]] = None,
+    backend: Optional[str] = None,
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> BaseWatcher:
+    """
+    Create and start the best available watcher for a project.
+
+    Args:
+        project_path: Path to the project root
+        callback: Called with the project path and a batch of events
+        extensions: File extensions to report (defaults to the indexed code files)
+        backend: "inotify", "watchdog", "polling" or "auto"; defaults to the
+            AI_LIBRARIAN_WATCHER environment variable or "auto"
+        poll_interval: Seconds between scans for the polling backend
+
+    Returns:
+        The started watcher
+    """
+    backend = (backend or os.environ.get(WATCHER_BACKEND_ENV) or "auto").lower()
+    if backend in _BACKENDS:
+        order = [backend]
+    else:
+        order = ["inotify", "watchdog"]
+
+    for name in order:
+        if name == "polling":
+            break
+        watcher = _BACKENDS[name](project_path, callback, extensions)
+        try:
+            watcher.start()
+            return watcher
+        except WatcherError as e:
+            logger.info(f"{name} watcher unavailable for {project_path}: {str(e)}")
+
+    watcher = PollingWatcher(project_path, callback, extensions, interval=poll_interval)
+    watcher.start()
+    return watcher
+
+class ChangeCollector:
+    """
+    Accumulate file events per project until the project has been quiet for a
+    while, so a burst of saves (or a git checkout) triggers a single re-index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}      # project path -> set of relative paths
+        self._rescan = set()    # projects that need a full change scan
+        self._last_event = {}   # project path -> time of the latest event
+
+    def add_events(self, project_path: str, events: List[FileEvent]) -> None:
+        """Record a batch of events for a project."""
+        project_path = normalize_project_path(project_path)
+        with self._lock:
+            pending = self._pending.setdefault(project_path, set())
+            for event in events:
+                if event.event_type == "overflow":
+                    self._rescan.add(project_path)
+                    continue
+                for path in (event.path, event.dest_path):
+                    if path:
+                        pending.add(os.path.relpath(path, project_path).replace('\\', '/'))
+            self._last_event[project_path] = time.time()
+
+    def request_rescan(self, project_path: str) -> None:
+        """Ask for a full change scan of a project, e.g. after its watcher started."""
+        project_path = normalize_project_path(project_path)
+        with self._lock:
+            self._rescan.add(project_path)
+            self._pending.setdefault(project_path, set())
+            self._last_event[project_path] = time.time()
+
+    def discard(self, project_path: str) -> None:
+        """Forget the pending changes of a project."""
+        project_path = normalize_project_path(project_path)
+        with self._lock:
+            self._pending.pop(project_path, None)
+            self._rescan.discard(project_path)
+            self._last_event.pop(project_path, None)
+
+    def drain_ready(self, quiet_period: float) -> Dict[str, Optional[Set[str]]]:
+        """
+        Take the changes of every project that has been quiet for `quiet_period` seconds.
+
+        Returns:
+            Mapping of normalized project paths to their changed relative
+            paths, or None when the project needs a full change scan
+        """
+        now = time.time()
+        ready = {}
+        with self._lock:
+            for project_path, last_event in list(self._last_event.items()):
+                if now - last_event < quiet_period:
+                    continue
+                paths = self._pending.pop(project_path, set())
+                del self._last_event[project_path]
+                if project_path in self._rescan:
+                    self._rescan.discard(project_path)
+                    ready[project_path] = None
+                elif paths:
+                    ready[project_path] = paths
+        return ready
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Filesystem Walker
+
+A shared directory walker for the AI Librarian's search tools.
+
+- Built on os.scandir, so file types come from the directory entries without
+  extra stat calls.
+- Exclude globs are compiled into one regular expression and checked once per
+  entry against its name and its path relative to the walk root. An excluded
+  directory is not entered, so nothing below it is ever checked.
+- `.gitignore` files are honoured, including negations, anchored patterns,
+  directory-only patterns and `**`.
+- The top-level directories are walked in parallel, and matches are streamed
+  to the caller as they are found. The walk stops as soon as the caller has
+  enough results.
+"""
+
+import os
+import re
+import queue
+import fnmatch
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple, Callable, Pattern
+
+DEFAULT_EXCLUDED_NAMES = ('__pycache__', 'node_modules', '.git', 'venv', 'env')
+DEFAULT_WALK_WORKERS = 8
+_QUEUE_SIZE = 1024
+_DONE = object()
+
+def compile_globs(patterns: Optional[List[str]]) -> Optional[Pattern]:
+    """
+    Compile fnmatch-style globs into one case-insensitive regular expression.
+
+    Args:
+        patterns: Glob patterns, e.g. ["*.pyc", "build", "tests/*"]
+
+    Returns:
+        The compiled expression, or None if there are no patterns
+    """
+    patterns = [p for p in (patterns or []) if p]
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns), re.IGNORECASE)
+
+def _gitignore_glob_to_regex(glob: str) -> str:
+    """Translate the glob part of a .gitignore pattern to a regular expression."""
+    parts = []
+    i = 0
+    while i < len(glob):
+        if glob.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("/**", i) and i + 3 == len(glob):
+            parts.append("/.*")
+            i += 3
+        elif glob.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif glob[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif glob[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif glob[i] == "[":
+            end = glob.find("]", i + 1)
+            if end == -1:
+                parts.append(re.escape(glob[i]))
+                i += 1
+            else:
+                body = glob[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end + 1
+        elif glob[i] == "\\" and i + 1 < len(glob):
+            parts.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(glob[i]))
+            i += 1
+    return "".join(parts)
+
+class GitIgnore:
+    """
+    The .gitignore rules in effect for one directory, including those
+    inherited from its parents. Later rules override earlier ones.
+    """
+
+    def __init__(self, rules: Tuple[Tuple[str, Pattern, bool, bool], ...] = ()):
+        # Each rule: (base directory relative to the walk root, regex, negated, directory only)
+        self.rules = rules
+
+    @staticmethod
+    def parse(text: str, base: str) -> List[Tuple[str, Pattern, bool, bool]]:
+        """Parse the content of a .gitignore located in `base` (relative to the walk root)."""
+        rules = []
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            line = line.lstrip("/")
+            regex = _gitignore_glob_to_regex(line)
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            rules.append((base, re.compile(f"^{regex}$"), negated, directory_only))
+        return rules
+
+    def child(self, directory: str, rel_directory: str) -> "GitIgnore":
+        """Return the rules for a subdirectory, adding its own .gitignore if present."""
+        try:
+            with open(os.path.join(directory, ".gitignore"), 'r', encoding='utf-8', errors='replace') as f:
+                added = self.parse(f.read(), rel_directory)
+        except OSError:
+            return self
+        return GitIgnore(self.rules + tuple(added)) if added else self
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Check whether a path relative to the walk root is ignored."""
+        ignored = False
+        for base, regex, negated, directory_only in self.rules:
+            if directory_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + "/"):
+                    continue
+                candidate = rel_path[len(base) + 1:]
+            else:
+                candidate = rel_path
+            if regex.match(candidate):
+                ignored = not negated
+        return ignored
+
+class WalkFilter:
+    """
+    The exclusion rules of a walk: default excluded names, hidden entries,
+    compiled exclude globs and .gitignore files.
+    """
+
+    def __init__(
+        self,
+        exclude_patterns: Optional[List[str]] = None,
+        skip_hidden: bool = True,
+        excluded_names=DEFAULT_EXCLUDED_NAMES,
+        respect_gitignore: bool = True
+    ):
+        self.exclude = compile_globs(exclude_patterns)
+        self.skip_hidden = skip_hidden
+        self.excluded_names = frozenset(excluded_names or ())
+        self.respect_gitignore = respect_gitignore
+
+    def excludes(self, name: str, rel_path: str, is_dir: bool, gitignore: Optional[GitIgnore]) -> bool:
+        """Check whether an entry is excluded from the walk."""
+        if self.skip_hidden and name.startswith('.'):
+            return True
+        if name in self.excluded_names:
+            return True
+        if self.exclude is not None and (self.exclude.match(name) or self.exclude.match(rel_path)):
+            return True
+        if gitignore is not None and gitignore.rules and gitignore.is_ignored(rel_path, is_dir):
+            return True
+        return False
+
+def _iter_tree(
+    root: str,
+    rel_dir: str,
+    walk_filter: WalkFilter,
+    gitignore: Optional[GitIgnore],
+    accept: Callable[[str, str], bool],
+    stop: threading.Event
+) -> Iterator[str]:
+    """Depth-first walk of one subtree, yielding the accepted files."""
+    stack = [(rel_dir, gitignore)]
+    while stack and not stop.is_set():
+        rel_dir, gitignore = stack.pop()
+        directory = os.path.join(root, rel_dir) if rel_dir else root
+
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        # Only directories that have a .gitignore pay for reading one
+        if gitignore is not None and rel_dir and any(entry.name == ".gitignore" for entry in entries):
+            gitignore = gitignore.child(directory, rel_dir)
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if walk_filter.excludes(entry.name, rel_path, is_dir, gitignore):
+                continue
+            if is_dir:
+                subdirs.append((rel_path, gitignore))
+            elif accept(entry.name, rel_path):
+                yield rel_path
+        # Reverse so the stack visits subdirectories in name order
+        stack.extend(reversed(subdirs))
+
+def iter_files(
+    root: str,
+    accept: Optional[Callable[[str, str], bool]] = None,
+    exclude_patterns: Optional[List[str]] = None,
+    respect_gitignore: bool = True,
+    skip_hidden: bool = True,
+    excluded_names=DEFAULT_EXCLUDED_NAMES,
+    parallel: bool = True,
+    max_workers: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Stream the files under a directory that pass the filters.
+
+    Matches are yielded as soon as they are found; stop iterating (or close
+    the generator) to end the walk early. In parallel mode, each top-level
+    directory is walked by its own worker, so the order of the results is not
+    deterministic.
+
+    Args:
+        root: Directory to walk
+        accept: Function (name, path relative to root) deciding whether a
+            file is a match; None accepts every file
+        exclude_patterns: Globs excluding files and directories, matched
+            against names and relative paths
+        respect_gitignore: Skip paths ignored by .gitignore files
+        skip_hidden: Skip entries whose name starts with a dot
+        excluded_names: Directory and file names that are always skipped
+        parallel: Walk the top-level directories concurrently
+        max_workers: Maximum number of concurrent subtree walks
+
+    Yields:
+        Paths of matching files, relative to root and using "/" separators
+    """
+    root = os.path.abspath(root)
+    accept = accept or (lambda name, rel_path: True)
+    walk_filter = WalkFilter(exclude_patterns, skip_hidden, excluded_names, respect_gitignore)
+    gitignore = GitIgnore().child(root, "") if respect_gitignore else None
+    stop = threading.Event()
+
+    try:
+        with os.scandir(root) as entries:
+            top_entries = sorted(entries, key=lambda entry: entry.name)
+    except OSError:
+        return
+
+    top_dirs = []
+    for entry in top_entries:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if walk_filter.excludes(entry.name, entry.name, is_dir, gitignore):
+            continue
+        if is_dir:
+            top_dirs.append(entry.name)
+        elif accept(entry.name, entry.name):
+            yield entry.name
+
+    if not parallel or len(top_dirs) < 2:
+        for top_dir in top_dirs:
+            yield from _iter_tree(root, top_dir, walk_filter, gitignore, accept, stop)
+        return
+
+    # Parallel fan-out: one task per top-level directory, results through a bounded queue
+    results: "queue.Queue" = queue.Queue(maxsize=_QUEUE_SIZE)
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def walk(top_dir: str) -> None:
+        try:
+            for rel_path in _iter_tree(root, top_dir, walk_filter, gitignore, accept, stop):
+                if not put(rel_path):
+                    return
+        finally:
+            put(_DONE)
+
+    workers = max(1, min(max_workers or DEFAULT_WALK_WORKERS, len(top_dirs)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="librarian-walk")
+    try:
+        for top_dir in top_dirs:
+            executor.submit(walk, top_dir)
+        pending = len(top_dirs)
+        while pending:
+            item = results.get()
+            if item is _DONE:
+                pending -= 1
+            else:
+                yield item
+    finally:
+        # Reached when the walk finished or the consumer stopped early
+        stop.set()
+        executor.shutdown(wait=False)
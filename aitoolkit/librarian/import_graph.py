@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Import Graph
+
+This module maintains `.ai_reference/import_graph.json`, which holds:
+
+- the imports of every indexed file resolved to project files, as a forward
+  (file -> files it imports) and reverse (file -> files importing it) adjacency list
+- a symbol-reference table mapping every top-level class and function to the
+  files that reference or call it, built from the names each file's AST uses
+
+With it, `find_related_files` answers import and reference questions with
+dictionary lookups instead of reading mini-librarians and source files.
+"""
+
+import os
+import json
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+IMPORT_GRAPH_FILENAME = "import_graph.json"
+IMPORT_GRAPH_VERSION = 1
+
+def module_name_for_path(rel_path: str) -> str:
+    """Convert a relative Python file path to its dotted module name."""
+    module = os.path.splitext(rel_path)[0].replace("\\", "/").replace("/", ".")
+    if module.endswith(".__init__"):
+        module = module[:-len(".__init__")]
+    elif module == "__init__":
+        module = ""
+    return module
+
+def graph_entry(info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the data the import graph needs from a parsed file.
+
+    Args:
+        info: Parse result from enhanced_indexer.parse_python_file
+
+    Returns:
+        Dictionary with the file's imports, defined symbols and referenced names
+    """
+    imports = []
+    for imp in info.get("imports", []):
+        if isinstance(imp, dict):
+            imports.append({"name": imp.get("name", ""), "level": imp.get("level", 0)})
+        elif isinstance(imp, str):
+            imports.append({"name": imp, "level": 0})
+
+    references = info.get("references", {})
+    return {
+        "imports": imports,
+        "classes": sorted(info.get("classes", {}).keys()),
+        "functions": sorted(info.get("functions", {}).keys()),
+        "names": references.get("names", []),
+        "calls": references.get("calls", [])
+    }
+
+class ImportGraph:
+    """
+    Resolved import graph and symbol-reference table for a project.
+    """
+
+    def __init__(self, files: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Initialize the graph.
+
+        Args:
+            files: Mapping of relative file paths to their graph entries
+        """
+        self.files = dict(files or {})
+        self.rebuild()
+
+    def update_files(self, files: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the entries of the given files and rebuild the derived tables."""
+        self.files.update(files)
+        self.rebuild()
+
+    def remove_files(self, rel_paths) -> None:
+        """Drop the given files and rebuild the derived tables."""
+        for rel_path in rel_paths:
+            self.files.pop(rel_path, None)
+        self.rebuild()
+
+    def _resolve(self, name: str, level: int, importer: str) -> Optional[str]:
+        """Resolve an imported name to the project file that defines its module."""
+        if level:
+            # Relative import: start from the importing file's package
+            package = module_name_for_path(importer).split(".")
+            if not importer.endswith("__init__.py"):
+                package = package[:-1]
+            if level > 1:
+                package = package[:-(level - 1)]
+            parts = [p for p in package if p] + [p for p in name.split(".") if p]
+        else:
+            parts = name.split(".")
+
+        # Longest module prefix first, e.g. a.b.C -> a.b
+        for end in range(len(parts), 0, -1):
+            module = ".".join(parts[:end])
+            if module in self._modules:
+                return self._modules[module]
+
+        if level:
+            return None
+
+        # The project root may itself be a package, e.g. `aitoolkit.librarian.x`
+        # imported from inside an indexed `aitoolkit` directory
+        for start in range(1, len(parts)):
+            for end in range(len(parts), start, -1):
+                module = ".".join(parts[start:end])
+                if module in self._modules:
+                    return self._modules[module]
+
+        # Scripts that extend sys.path import modules by a shorter name
+        for end in range(len(parts), 0, -1):
+            candidates = self._module_suffixes.get(".".join(parts[:end]))
+            if candidates and len(candidates) == 1:
+                return candidates[0]
+
+        return None
+
+    def rebuild(self) -> None:
+        """Recompute the forward/reverse adjacency and the symbol-reference table."""
+        self._modules = {}
+        self._module_suffixes = {}
+        for rel_path in sorted(self.files):
+            module = module_name_for_path(rel_path)
+            if not module:
+                continue
+            self._modules[module] = rel_path
+            parts = module.split(".")
+            for start in range(1, len(parts)):
+                self._module_suffixes.setdefault(".".join(parts[start:]), []).append(rel_path)
+
+        self.imports = {}
+        self.imported_by = {}
+        for rel_path in sorted(self.files):
+            edges = {}
+            for imp in self.files[rel_path].get("imports", []):
+                target = self._resolve(imp["name"], imp.get("level", 0), rel_path)
+                if target and target != rel_path and target not in edges:
+                    edges[target] = imp["name"]
+
+            self.imports[rel_path] = [{"path": target, "import": name} for target, name in edges.items()]
+            for target, name in edges.items():
+                self.imported_by.setdefault(target, []).append({"path": rel_path, "import": name})
+
+        # Symbol-reference table for the top-level classes and functions of the project
+        self.symbol_references = {}
+        for rel_path in sorted(self.files):
+            entry = self.files[rel_path]
+            for kind in ("classes", "functions"):
+                for name in entry.get(kind, []):
+                    self.symbol_references.setdefault(name, {
+                        "defined_in": [],
+                        "referenced_by": [],
+                        "called_by": []
+                    })["defined_in"].append(rel_path)
+
+        for rel_path in sorted(self.files):
+            entry = self.files[rel_path]
+            for name in entry.get("names", []):
+                if name in self.symbol_references:
+                    self.symbol_references[name]["referenced_by"].append(rel_path)
+            for name in entry.get("calls", []):
+                if name in self.symbol_references:
+                    self.symbol_references[name]["called_by"].append(rel_path)
+
+    def get_imports(self, rel_path: str) -> List[Dict[str, str]]:
+        """Return the project files imported by a file."""
+        return self.imports.get(rel_path, [])
+
+    def get_importers(self, rel_path: str) -> List[Dict[str, str]]:
+        """Return the project files importing a file."""
+        return self.imported_by.get(rel_path, [])
+
+    def get_symbol_references(self, name: str) -> Dict[str, List[str]]:
+        """Return where a top-level class or function is defined, referenced and called."""
+        return self.symbol_references.get(name, {"defined_in": [], "referenced_by": [], "called_by": []})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the graph, including the derived tables."""
+        return {
+            "version": IMPORT_GRAPH_VERSION,
+            "files": self.files,
+            "imports": self.imports,
+            "imported_by": self.imported_by,
+            "symbol_references": self.symbol_references
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ImportGraph":
+        """Restore a serialized graph without recomputing the derived tables."""
+        graph = cls.__new__(cls)
+        graph.files = data.get("files", {})
+        graph.imports = data.get("imports", {})
+        graph.imported_by = data.get("imported_by", {})
+        graph.symbol_references = data.get("symbol_references", {})
+        graph._modules = None
+        graph._module_suffixes = None
+        return graph
+
+# Loaded graphs, keyed by path and invalidated when the file changes
+_graph_cache: Dict[str, Tuple[Tuple[float, int], ImportGraph]] = {}
+_graph_cache_lock = threading.Lock()
+
+def load_import_graph(ai_ref_path: str) -> Optional[ImportGraph]:
+    """
+    Load the import graph of a project.
+
+    Args:
+        ai_ref_path: Path to the .ai_reference directory
+
+    Returns:
+        The ImportGraph, or None if it is missing, unreadable or outdated
+    """
+    graph_path = os.path.join(ai_ref_path, IMPORT_GRAPH_FILENAME)
+    try:
+        stats = os.stat(graph_path)
+    except OSError:
+        return None
+
+    signature = (stats.st_mtime, stats.st_size)
+    with _graph_cache_lock:
+        cached = _graph_cache.get(graph_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    try:
+        with open(graph_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != IMPORT_GRAPH_VERSION:
+        return None
+
+    graph = ImportGraph.from_dict(data)
+    with _graph_cache_lock:
+        _graph_cache[graph_path] = (signature, graph)
+    return graph
+
+def save_import_graph(ai_ref_path: str, graph: ImportGraph) -> None:
+    """
+    Write the import graph of a project.
+
+    Args:
+        ai_ref_path: Path to the .ai_reference directory
+        graph: The graph to write
+    """
+    graph_path = os.path.join(ai_ref_path, IMPORT_GRAPH_FILENAME)
+    # Readers do not wait for the indexer: replace the file whole so they
+    # never see a half-written one
+    temp_path = graph_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(graph.to_dict(), f, separators=(',', ':'))
+    os.replace(temp_path, graph_path)
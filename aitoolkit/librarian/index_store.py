@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+SQLite Index Store
+
+This module provides an optional SQLite-backed store for the AI Librarian index.
+When enabled, the per-file parse results (mini-librarians), symbols, imports,
+calls, constants and the component registry live in `.ai_reference/index.db`
+instead of a fan-out of JSON files, and tools query it directly. The JSON
+mini-librarians can still be produced on demand with `export_json`.
+
+Usage:
+    from aitoolkit.librarian.index_store import get_index_store
+
+    store = get_index_store(project_path)
+    if store:
+        symbols = store.find_symbols("TaskBoard")
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+
+try:
+    from .symbol_index import file_symbols
+except ImportError:
+    # Running as a standalone script
+    from symbol_index import file_symbols
+
+try:
+    import sqlite3
+    SQLITE_AVAILABLE = True
+except ImportError:
+    SQLITE_AVAILABLE = False
+
+# Configure logging
+logger = logging.getLogger("ai_librarian.index_store")
+
+INDEX_DB_FILENAME = "index.db"
+INDEX_STORE_ENV = "AI_LIBRARIAN_INDEX_STORE"
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mini_librarian TEXT,
+    info TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbols (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    qualified_name TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    file TEXT NOT NULL,
+    start_line INTEGER,
+    end_line INTEGER,
+    parent TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS idx_symbols_qualified_name ON symbols(qualified_name);
+CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file);
+CREATE TABLE IF NOT EXISTS imports (
+    file TEXT NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_imports_name ON imports(name);
+CREATE INDEX IF NOT EXISTS idx_imports_file ON imports(file);
+CREATE TABLE IF NOT EXISTS calls (
+    file TEXT NOT NULL,
+    caller TEXT NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_calls_name ON calls(name);
+CREATE INDEX IF NOT EXISTS idx_calls_file ON calls(file);
+CREATE TABLE IF NOT EXISTS constants (
+    file TEXT NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_constants_name ON constants(name);
+CREATE INDEX IF NOT EXISTS idx_constants_file ON constants(file);
+CREATE TABLE IF NOT EXISTS components (
+    name TEXT PRIMARY KEY,
+    info TEXT NOT NULL
+);
+"""
+
+# Tables holding rows derived from a single file
+_FILE_TABLES = ("symbols", "imports", "calls", "constants")
+
+def index_store_enabled(project_path: str, use_index_store: Optional[bool] = None) -> bool:
+    """
+    Decide whether a project's index should live in the SQLite store.
+
+    Args:
+        project_path: Path to the project root
+        use_index_store: Explicit choice; when None the AI_LIBRARIAN_INDEX_STORE
+            environment variable decides, and an existing index.db keeps the store enabled
+
+    Returns:
+        True if the SQLite store should be used
+    """
+    if not SQLITE_AVAILABLE:
+        return False
+
+    if use_index_store is not None:
+        return use_index_store
+
+    env_value = os.environ.get(INDEX_STORE_ENV, "").lower()
+    if env_value in ("sqlite", "true", "1", "yes", "y"):
+        return True
+    if env_value in ("json", "false", "0", "no", "n"):
+        return False
+
+    return os.path.exists(os.path.join(project_path, ".ai_reference", INDEX_DB_FILENAME))
+
+def _iter_symbols(rel_path: str, info: Dict[str, Any]) -> Iterable[Tuple]:
+    """Yield symbol rows for every class, function and method of a parsed file."""
+    for symbol in file_symbols(info):
+        yield (symbol["name"], symbol["qualified_name"], symbol["kind"], rel_path,
+               symbol.get("start_line"), symbol.get("end_line"), symbol.get("parent"))
+
+def _iter_calls(rel_path: str, info: Dict[str, Any]) -> Iterable[Tuple]:
+    """Yield call rows for every function and method of a parsed file."""
+    for class_name, class_info in info.get("classes", {}).items():
+        for method_name, method_info in class_info.get("methods", {}).items():
+            for call in method_info.get("calls", []):
+                yield (rel_path, f"{class_name}.{method_name}", call.get("name"), call.get("line"))
+
+    for func_name, func_info in info.get("functions", {}).items():
+        for call in func_info.get("calls", []):
+            yield (rel_path, func_name, call.get("name"), call.get("line"))
+
+class IndexStore:
+    """
+    SQLite-backed storage for the AI Librarian index of a single project.
+
+    A single connection is shared between threads and serialized with a lock;
+    the database runs in WAL mode so other processes (such as a concurrent
+    indexer run) can read while it is being written.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (and if necessary create) an index store.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)",
+            (json.dumps(SCHEMA_VERSION),)
+        )
+        self._conn.commit()
+        # Writes through this connection; data_version only counts other connections' commits
+        self._writes = 0
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    # ----- Writes -----
+
+    def _delete_file_rows(self, rel_paths: List[str]) -> None:
+        for table in _FILE_TABLES:
+            self._conn.executemany(f"DELETE FROM {table} WHERE file = ?", [(p,) for p in rel_paths])
+        self._conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in rel_paths])
+
+    def replace_files(self, entries: Dict[str, Tuple[Dict[str, Any], Optional[str]]]) -> None:
+        """
+        Insert or replace the parse results of a set of files.
+
+        Args:
+            entries: Mapping of relative file path to (parse result, mini-librarian path)
+        """
+        with self._lock, self._conn:
+            self._writes += 1
+            rel_paths = list(entries.keys())
+            self._delete_file_rows(rel_paths)
+
+            self._conn.executemany(
+                "INSERT INTO files (path, mini_librarian, info) VALUES (?, ?, ?)",
+                [(rel_path, mini_librarian, json.dumps(info, separators=(',', ':')))
+                 for rel_path, (info, mini_librarian) in entries.items()]
+            )
+
+            for rel_path, (info, _) in entries.items():
+                self._conn.executemany(
+                    "INSERT INTO symbols (name, qualified_name, kind, file, start_line, end_line, parent) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    list(_iter_symbols(rel_path, info))
+                )
+                self._conn.executemany(
+                    "INSERT INTO imports (file, name, line) VALUES (?, ?, ?)",
+                    [(rel_path, imp.get("name") if isinstance(imp, dict) else imp,
+                      imp.get("line") if isinstance(imp, dict) else None)
+                     for imp in info.get("imports", [])]
+                )
+                self._conn.executemany(
+                    "INSERT INTO calls (file, caller, name, line) VALUES (?, ?, ?, ?)",
+                    list(_iter_calls(rel_path, info))
+                )
+                self._conn.executemany(
+                    "INSERT INTO constants (file, name, line, value) VALUES (?, ?, ?, ?)",
+                    [(rel_path, name, const.get("line"), json.dumps(const.get("value"), default=str))
+                     for name, const in info.get("constants", {}).items()]
+                )
+
+    def delete_files(self, rel_paths: Iterable[str]) -> None:
+        """
+        Remove files and everything derived from them.
+
+        Args:
+            rel_paths: Relative paths of the files to remove
+        """
+        with self._lock, self._conn:
+            self._writes += 1
+            self._delete_file_rows(list(rel_paths))
+
+    def clear(self) -> None:
+        """Remove all indexed files and components."""
+        with self._lock, self._conn:
+            self._writes += 1
+            for table in _FILE_TABLES + ("files", "components"):
+                self._conn.execute(f"DELETE FROM {table}")
+
+    def set_components(self, components: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Replace the component registry.
+
+        Args:
+            components: Mapping of component names to their registry entries
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM components")
+            self._conn.executemany(
+                "INSERT INTO components (name, info) VALUES (?, ?)",
+                [(name, json.dumps(info, separators=(',', ':'))) for name, info in components.items()]
+            )
+
+    def set_meta(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable metadata value."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, json.dumps(value))
+            )
+
+    # ----- Reads -----
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """Return a metadata value, or default if it is not set."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def file_count(self) -> int:
+        """Return the number of indexed files."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def list_files(self) -> List[str]:
+        """Return the relative paths of all indexed files."""
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM files ORDER BY path").fetchall()
+        return [row["path"] for row in rows]
+
+    def get_file_info(self, rel_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the full parse result (mini-librarian) of a file.
+
+        Args:
+            rel_path: Relative path of the file
+
+        Returns:
+            Parse result dictionary, or None if the file is not indexed
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT info FROM files WHERE path = ?", (rel_path,)).fetchone()
+        return json.loads(row["info"]) if row else None
+
+    def change_marker(self) -> tuple:
+        """Return a value that changes whenever the stored index is modified, by any process."""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        return (self._writes, data_version)
+
+    def symbol_names(self) -> List[str]:
+        """Return all distinct simple and qualified symbol names."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name FROM symbols UNION SELECT qualified_name FROM symbols"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_component(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the registry entry of a component, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT info FROM components WHERE name = ?", (name,)).fetchone()
+        return json.loads(row["info"]) if row else None
+
+    def find_symbols(self, name: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find symbols by simple or qualified name.
+
+        Args:
+            name: Symbol name (e.g. "submit_task") or qualified name (e.g. "TaskBoard.submit_task")
+            kind: Optional kind filter ("class", "function" or "method")
+
+        Returns:
+            List of symbol dictionaries with file and line range
+        """
+        column = "qualified_name" if "." in name else "name"
+        query = f"SELECT name, qualified_name, kind, file, start_line, end_line, parent FROM symbols WHERE {column} = ?"
+        params = [name]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY file, start_line"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def search_symbols(self, text: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Find symbols whose name contains the given text (case-insensitive).
+
+        Args:
+            text: Text to look for in symbol names
+            limit: Maximum number of symbols to return
+
+        Returns:
+            List of symbol dictionaries with file and line range
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, qualified_name, kind, file, start_line, end_line, parent FROM symbols "
+                "WHERE name LIKE ? ESCAPE '\\' ORDER BY file, start_line LIMIT ?",
+                (f"%{_escape_like(text)}%", limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search_files(self, pattern: str) -> List[str]:
+        """
+        Find files whose path or any class/function name contains a pattern.
+
+        Args:
+            pattern: Case-insensitive text to look for
+
+        Returns:
+            Sorted list of matching relative file paths
+        """
+        like = f"%{_escape_like(pattern)}%"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM files WHERE path LIKE ? ESCAPE '\\' "
+                "UNION SELECT file FROM symbols WHERE kind != 'method' AND name LIKE ? ESCAPE '\\' "
+                "ORDER BY 1",
+                (like, like)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_imports(self, rel_path: str) -> List[str]:
+        """Return the names imported by a file."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name FROM imports WHERE file = ? ORDER BY line", (rel_path,)
+            ).fetchall()
+        return [row["name"] for row in rows]
+
+    def find_importers(self, module: str) -> List[Dict[str, Any]]:
+        """
+        Find files importing a module, or a name from it.
+
+        Args:
+            module: Dotted module name (e.g. "aitoolkit.librarian.task_board")
+
+        Returns:
+            List of {"file", "name"} dictionaries
+        """
+        basename = module.rsplit(".", 1)[-1]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT file, name FROM imports "
+                "WHERE name = ? OR name LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\' "
+                "OR name = ? OR name LIKE ? ESCAPE '\\' ORDER BY file",
+                (module, f"{_escape_like(module)}.%", f"%.{_escape_like(basename)}",
+                 basename, f"%.{_escape_like(basename)}.%")
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_callers(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Find calls to a function or class by name.
+
+        Matches plain calls (`name(...)`) and attribute calls (`obj.name(...)`).
+
+        Args:
+            name: Called name
+
+        Returns:
+            List of {"file", "caller", "name", "line"} dictionaries
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file, caller, name, line FROM calls "
+                "WHERE name = ? OR name LIKE ? ESCAPE '\\' ORDER BY file, line",
+                (name, f"%.{_escape_like(name)}")
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_file_symbols(self, rel_path: str) -> List[Dict[str, Any]]:
+        """Return all symbols defined in a file."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, qualified_name, kind, file, start_line, end_line, parent FROM symbols "
+                "WHERE file = ? ORDER BY start_line", (rel_path,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    # ----- Export -----
+
+    def export_json(self, ai_ref_path: str) -> int:
+        """
+        Write the JSON mini-librarian of every indexed file.
+
+        Args:
+            ai_ref_path: Path to the .ai_reference directory
+
+        Returns:
+            Number of files written
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, mini_librarian, info FROM files WHERE mini_librarian IS NOT NULL"
+            ).fetchall()
+
+        for row in rows:
+            mini_librarian_path = os.path.join(ai_ref_path, row["mini_librarian"])
+            os.makedirs(os.path.dirname(mini_librarian_path), exist_ok=True)
+            with open(mini_librarian_path, 'w', encoding='utf-8') as f:
+                json.dump(json.loads(row["info"]), f, indent=2)
+
+        return len(rows)
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards in user supplied text."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+# Open stores, keyed by database path
+_stores: Dict[str, IndexStore] = {}
+_stores_lock = threading.Lock()
+
+def get_index_store(project_path: str, create: bool = False) -> Optional[IndexStore]:
+    """
+    Get the shared index store of a project.
+
+    Args:
+        project_path: Path to the project root
+        create: Create the database if it does not exist yet
+
+    Returns:
+        The project's IndexStore, or None if SQLite is unavailable or no store exists
+    """
+    if not SQLITE_AVAILABLE:
+        return None
+
+    db_path = os.path.join(os.path.abspath(project_path), ".ai_reference", INDEX_DB_FILENAME)
+
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is not None:
+            if os.path.exists(db_path):
+                return store
+            # The database was removed underneath us
+            store.close()
+            del _stores[db_path]
+
+        if not create and not os.path.exists(db_path):
+            return None
+
+        try:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            store = IndexStore(db_path)
+        except Exception as e:
+            logger.error(f"Error opening index store {db_path}: {str(e)}")
+            return None
+
+        _stores[db_path] = store
+        return store
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Parsed JSON Cache
+
+An in-memory cache of parsed index files (component registries, script
+indexes, mini-librarians, Tool Index registries). Entries are keyed by path
+and invalidated when the file's mtime or size changes, so each index file is
+parsed once per change instead of once per query.
+
+Every (re)parse bumps a generation counter, both per path and globally, which
+callers can use to tell whether an index changed since they last looked.
+
+Parsed objects are shared between callers and must be treated as read-only.
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+DEFAULT_MAX_ENTRIES = 256
+
+class ParsedJSONCache:
+    """
+    Thread-safe LRU cache of parsed JSON files, validated by mtime and size.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of parsed files kept in memory
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # path -> (signature, generation, data)
+        self._generations = {}          # path -> latest generation
+        self.generation = 0
+        self.hits = 0
+        self.loads = 0
+
+    def load(self, path: str, default: Any = None) -> Any:
+        """
+        Get the parsed content of a JSON file.
+
+        Args:
+            path: Path of the JSON file
+            default: Returned when the file is missing or invalid
+
+        Returns:
+            The parsed (shared, read-only) object, or `default`
+        """
+        path = os.path.abspath(path)
+        try:
+            stats = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return default
+
+        signature = (stats.st_mtime_ns, stats.st_size)
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and cached[0] == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return cached[2]
+
+        # Parse outside the lock so a large file does not block other lookups
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self.invalidate(path)
+            return default
+
+        with self._lock:
+            self.generation += 1
+            self._generations[path] = self.generation
+            self._entries[path] = (signature, self.generation, data)
+            self._entries.move_to_end(path)
+            self.loads += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return data
+
+    def get_generation(self, path: str) -> int:
+        """
+        Get the generation at which a file was last parsed.
+
+        Args:
+            path: Path of the JSON file
+
+        Returns:
+            The generation number, or 0 if it has not been parsed
+        """
+        with self._lock:
+            return self._generations.get(os.path.abspath(path), 0)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Drop a parsed file, or every parsed file when no path is given.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of cached files, hits, parses and the global generation."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "loads": self.loads,
+                "generation": self.generation
+            }
+
+# Cache shared by the server tools
+_shared_cache = ParsedJSONCache()
+
+def get_json_cache() -> ParsedJSONCache:
+    """Return the process-wide parsed JSON cache."""
+    return _shared_cache
+
+def load_json(path: str, default: Any = None) -> Any:
+    """
+    Load a JSON file through the shared cache.
+
+    Args:
+        path: Path of the JSON file
+        default: Returned when the file is missing or invalid
+
+    Returns:
+        The parsed (shared, read-only) object, or `default`
+    """
+    return _shared_cache.load(path, default)
+
+def load_json_dict(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a JSON file through the shared cache, accepting only objects.
+
+    Args:
+        path: Path of the JSON file
+
+    Returns:
+        The parsed (shared, read-only) dictionary, or None if the file is
+        missing, invalid or not a JSON object
+    """
+    data = _shared_cache.load(path)
+    return data if isinstance(data, dict) else None
+
+def load_script_index(ai_ref_path: str) -> Optional[Dict[str, Any]]:
+    """Load a project's script_index.json through the shared cache."""
+    return load_json_dict(os.path.join(ai_ref_path, "script_index.json"))
+
+def load_component_registry(ai_ref_path: str) -> Optional[Dict[str, Any]]:
+    """Load a project's component_registry.json through the shared cache."""
+    return load_json_dict(os.path.join(ai_ref_path, "component_registry.json"))
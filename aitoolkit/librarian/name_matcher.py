@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Name Matcher
+
+Fuzzy lookup of component names for `query_component`. When a name is not
+found exactly, the closest known names are suggested with a similarity score
+instead of a bare "not found".
+
+Names are normalized (lowercase, underscores dropped) and split into padded
+trigrams. A trigram posting index narrows the candidates to names sharing
+trigrams with the query; they are scored by trigram overlap (Dice), refined
+with a sequence-similarity ratio, and boosted when the query is contained in
+the name (a missing prefix such as "Board" for "TaskBoard").
+
+The exact and normalized lookups are dictionary hits, so a miss is answered
+without scanning any index files. Matchers are cached per index and rebuilt
+only when the index changes.
+"""
+
+import heapq
+import difflib
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Any, Optional, Iterable, Callable
+
+DEFAULT_SUGGESTIONS = 5
+DEFAULT_MIN_SCORE = 0.5
+# Candidates re-scored with the sequence ratio after the trigram pass
+RERANK_CANDIDATES = 32
+MAX_CACHED_MATCHERS = 16
+
+def normalize_name(name: str) -> str:
+    """Normalize a name for case- and underscore-insensitive comparison."""
+    return name.lower().replace("_", "")
+
+def name_trigrams(key: str) -> List[str]:
+    """Return the distinct trigrams of a normalized name, padded at both ends."""
+    padded = f"${key}$"
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+class NameMatcher:
+    """
+    Exact, normalized and fuzzy lookups over a fixed set of names.
+    """
+
+    def __init__(self, names: Iterable[str], locations: Optional[Dict[str, List[str]]] = None):
+        """
+        Build the lookup tables.
+
+        Args:
+            names: Known names (simple and qualified)
+            locations: Optional mapping of names to the files defining them
+        """
+        self.names = list(dict.fromkeys(name for name in names if name))
+        self.locations = locations or {}
+        self._ids = {name: name_id for name_id, name in enumerate(self.names)}
+        self._keys = [normalize_name(name) for name in self.names]
+        self._grams = []
+        self._by_key: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        for name_id, key in enumerate(self._keys):
+            self._by_key.setdefault(key, []).append(name_id)
+            grams = name_trigrams(key)
+            self._grams.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(name_id)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def files_for(self, name: str) -> List[str]:
+        """Return the files defining a name exactly; empty for unknown names."""
+        return self.locations.get(name, [])
+
+    def suggest(
+        self,
+        query: str,
+        limit: int = DEFAULT_SUGGESTIONS,
+        min_score: float = DEFAULT_MIN_SCORE
+    ) -> List[Dict[str, Any]]:
+        """
+        Suggest the known names closest to a query.
+
+        Args:
+            query: The name that was not found
+            limit: Maximum number of suggestions
+            min_score: Minimum similarity (0 to 1) of a suggestion
+
+        Returns:
+            Suggestions, best first, each with "name" and "score"; names that
+            differ from the query only in case or underscores score 1.0
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        scores: Dict[int, float] = {}
+        for name_id in self._by_key.get(key, []):
+            if self.names[name_id] != query:
+                scores[name_id] = 1.0
+
+        # Trigram overlap with every name sharing at least one trigram
+        grams = name_trigrams(key)
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self._postings.get(gram, ()))
+        dice = {
+            name_id: 2.0 * shared / (len(grams) + self._grams[name_id])
+            for name_id, shared in overlap.items()
+        }
+
+        matcher = difflib.SequenceMatcher(b=key, autojunk=False)
+        for name_id, trigram_score in heapq.nlargest(RERANK_CANDIDATES, dice.items(), key=lambda item: item[1]):
+            if name_id in scores or self.names[name_id] == query:
+                continue
+            candidate = self._keys[name_id]
+            matcher.set_seq1(candidate)
+            score = (trigram_score + matcher.ratio()) / 2
+            if key in candidate:
+                # The query is part of the name, e.g. a missing prefix
+                score = max(score, 0.5 + 0.5 * len(key) / len(candidate))
+            scores[name_id] = score
+
+        ranked = sorted(
+            ((score, name_id) for name_id, score in scores.items() if score >= min_score),
+            key=lambda item: (-item[0], self.names[item[1]])
+        )
+        return [{"name": self.names[name_id], "score": round(score, 3)} for score, name_id in ranked[:limit]]
+
+# Matchers of the loaded indexes, rebuilt when their source changes
+_matchers: "OrderedDict[str, tuple]" = OrderedDict()
+_matchers_lock = threading.Lock()
+
+def get_name_matcher(key: str, source: Any, build: Callable[[], NameMatcher], signature: Any = None) -> NameMatcher:
+    """
+    Get the cached matcher of an index, building it if the index changed.
+
+    Args:
+        key: Cache key, e.g. the project's .ai_reference path and index kind
+        source: The loaded index object; a different object means the index
+            was reloaded
+        build: Function building the matcher
+        signature: Extra change marker for sources that change in place
+
+    Returns:
+        The matcher
+    """
+    with _matchers_lock:
+        cached = _matchers.get(key)
+        if cached is not None and cached[0] is source and cached[1] == signature:
+            _matchers.move_to_end(key)
+            return cached[2]
+
+    matcher = build()
+    with _matchers_lock:
+        _matchers[key] = (source, signature, matcher)
+        _matchers.move_to_end(key)
+        while len(_matchers) > MAX_CACHED_MATCHERS:
+            _matchers.popitem(last=False)
+    return matcher
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Process Backend
+
+Runs CPU-bound TaskBoard work (the AST-parsing chunks of component_analysis
+and diagnostics, deep analysis, security scans) in a pool of worker
+processes, so it does not compete with the server's request threads for the
+GIL.
+
+A task is shipped to the pool as a TaskEnvelope: the task id, a picklable
+handler (a module-level function, optionally wrapped in functools.partial),
+its parameters and the time it has left. The worker rebuilds a
+CancellationToken from that time budget, so handler checkpoints work the same
+way as on the thread backend. The result comes back through the future's done
+callback, without a thread waiting for it.
+
+The pool is started and warmed up on the first submit, not when the backend
+is created: the server builds its TaskBoards while server.py is still being
+imported, and processes must not be started from there. Workers start from
+process_worker rather than the parent's `__main__` (see worker_main).
+Cancelling a running task kills the worker process running it. That breaks
+the pool, so it is dropped and a new one started by the next submit; the
+board resubmits the other tasks that were in flight.
+
+Workers report back over one queue: the pid running each task, and the
+progress and partial results its handler reports through `token.progress`.
+The board drains it from its dispatcher with `poll`.
+"""
+
+import os
+import time
+import pickle
+import signal
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Callable, Set
+
+try:
+    from .task_cancellation import CancellationToken, PROCESS_KILL_GRACE, shutdown_executor
+    from .process_worker import worker_main, init_worker, warm_up, run_envelope
+except ImportError:
+    from task_cancellation import CancellationToken, PROCESS_KILL_GRACE, shutdown_executor
+    from process_worker import worker_main, init_worker, warm_up, run_envelope
+
+logger = logging.getLogger("ai_librarian.process_backend")
+
+# Seconds a cancellation waits for the worker of a just-started task to report its pid
+PID_REPORT_WAIT = 1.0
+
+def default_process_workers() -> int:
+    """One worker per core, leaving a core for the server."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+@dataclass
+class TaskEnvelope:
+    """Everything a worker process needs to run a task."""
+    task_id: str
+    task_type: str
+    handler: Callable[[Dict[str, Any], CancellationToken], Any]
+    parameters: Dict[str, Any]
+    timeout: Optional[float] = None
+    attempt: int = 1
+
+def is_picklable(envelope: TaskEnvelope) -> bool:
+    """Check whether an envelope can be sent to a worker process."""
+    try:
+        pickle.dumps(envelope)
+        return True
+    except Exception:
+        return False
+
+class ProcessBackend:
+    """
+    A warm process pool whose running tasks can be killed individually.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 on_progress: Optional[Callable[[str, str, tuple], None]] = None):
+        """
+        Set up the backend; the pool itself starts on the first submit.
+
+        Args:
+            max_workers: Number of worker processes; defaults to one per core
+                minus one
+            on_progress: Called as on_progress(task_id, method, args) for each
+                progress report of a worker, where method is a ProgressSink
+                method name
+        """
+        self.max_workers = max_workers or default_process_workers()
+        self.on_progress = on_progress
+        # Spawned workers do not inherit the server's threads and locks
+        self._context = multiprocessing.get_context("spawn")
+        self._reports = self._context.SimpleQueue()
+        self._progress_reports: List[tuple] = []
+        self._lock = threading.Lock()
+        self._pids: Dict[str, int] = {}
+        self._pending_kills: Set[str] = set()
+        self._closed = False
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._futures: Set[Future] = set()  # Unfinished futures of the current pool
+        self.restarts = 0
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """Start a pool with all its workers; the caller holds the lock."""
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._context,
+            initializer=init_worker,
+            initargs=(self._reports,)
+        )
+        # Start every worker now instead of one per heavy task
+        with worker_main():
+            for _ in range(self.max_workers):
+                executor.submit(warm_up)
+        return executor
+
+    def submit(self, envelope: TaskEnvelope) -> Future:
+        """
+        Send a task to the pool, starting the pool if needed.
+
+        Raises:
+            RuntimeError: If the backend is shut down
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The process pool is shut down")
+            if self._executor is None:
+                self._executor = self._create_executor()
+            executor, futures = self._executor, self._futures
+
+        with worker_main():
+            future = executor.submit(run_envelope, envelope)
+        futures.add(future)
+        future.add_done_callback(futures.discard)
+        return future
+
+    @property
+    def started(self) -> bool:
+        """Whether a pool is running."""
+        return self._executor is not None
+
+    def _drain_reports(self) -> None:
+        """
+        Record the pids reported by workers and set progress reports aside
+        for delivery; the caller holds the lock.
+        """
+        while not self._reports.empty():
+            kind, task_id, args = self._reports.get()
+            if kind == "started":
+                self._pids[task_id] = args[0]
+            elif self.on_progress is not None:
+                self._progress_reports.append((task_id, kind, args))
+
+    def poll(self) -> None:
+        """
+        Deliver the progress reported by workers, and kill workers of
+        cancelled tasks that have reported their pid since.
+        """
+        with self._lock:
+            self._drain_reports()
+            reports, self._progress_reports = self._progress_reports, []
+            ready = [task_id for task_id in self._pending_kills if task_id in self._pids]
+
+        # Outside the lock: the callback takes the board's locks
+        for task_id, kind, args in reports:
+            try:
+                self.on_progress(task_id, kind, args)
+            except Exception as e:
+                logger.warning(f"Error delivering progress of task {task_id}: {str(e)}")
+        for task_id in ready:
+            self.kill(task_id)
+
+    def kill(self, task_id: str) -> bool:
+        """
+        Kill the worker process running a task and replace the pool.
+
+        Args:
+            task_id: ID of the task to stop
+
+        Returns:
+            True if a worker was killed; False if the task's worker is not
+            known yet, in which case it is killed once it reports in
+        """
+        deadline = time.monotonic() + PID_REPORT_WAIT
+        while True:
+            with self._lock:
+                self._drain_reports()
+                pid = self._pids.pop(task_id, None)
+                if pid is not None or time.monotonic() >= deadline:
+                    break
+            time.sleep(0.02)
+
+        if pid is None:
+            with self._lock:
+                self._pending_kills.add(task_id)
+            logger.warning(f"Worker of task {task_id} has not started yet; it will be killed when it does")
+            return False
+
+        with self._lock:
+            self._pending_kills.discard(task_id)
+            # The pool breaks when one of its workers dies: the next submit
+            # starts a new one
+            old_executor, self._executor = self._executor, None
+            old_futures, self._futures = self._futures, set()
+            if old_executor is not None and not self._closed:
+                self.restarts += 1
+
+        logger.info(f"Killing worker process {pid} of task {task_id}")
+        _kill_pid(pid)
+        if old_executor is not None:
+            shutdown_executor(old_executor, old_futures)
+        return True
+
+    def forget(self, task_id: str) -> None:
+        """Drop the bookkeeping of a finished task."""
+        with self._lock:
+            self._drain_reports()
+            self._pids.pop(task_id, None)
+            self._pending_kills.discard(task_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the pool size, whether it runs and how often it was replaced."""
+        return {"workers": self.max_workers, "started": self.started, "restarts": self.restarts}
+
+    def shutdown(self) -> None:
+        """
+        Stop the pool without waiting for running tasks.
+
+        Tasks still running keep their worker until they are killed or
+        return; killing them no longer starts a replacement pool.
+        """
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+            futures = self._futures
+        if executor is not None:
+            shutdown_executor(executor, futures)
+
+def _kill_pid(pid: int) -> None:
+    """Terminate a process, and kill it if it is still there after the grace period."""
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        return
+
+    def kill_after_grace():
+        deadline = time.monotonic() + PROCESS_KILL_GRACE
+        while time.monotonic() < deadline:
+            try:
+                os.kill(pid, 0)
+            except OSError:
+                return
+            time.sleep(0.05)
+        try:
+            os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+        except OSError:
+            pass
+
+    threading.Thread(target=kill_after_grace, name=f"TaskBoard-Kill-{pid}", daemon=True).start()
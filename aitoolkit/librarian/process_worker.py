@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Process Worker
+
+Entry module of the librarian's worker processes (the TaskBoard's process
+backend and the indexer's parse pool).
+
+A spawned worker re-imports the parent's `__main__` module before it runs
+anything. When the parent is the server, that module is server.py: its
+import bootstraps the whole server, which would start a second server in
+every worker, and it dies with multiprocessing's "bootstrapping phase"
+error once that server tries to start processes of its own.
+
+Worker processes are therefore started inside `worker_main()`, which names
+this module as `__main__` in the preparation data multiprocessing sends to
+the processes it spawns, so a worker only imports what it needs to run a
+task. Only that data changes, and only for the thread inside `worker_main()`:
+the parent's own `sys.modules["__main__"]` is never replaced, so other server
+threads pickling or importing from `__main__` meanwhile are unaffected.
+Handlers sent to workers must live in importable modules, not in the
+parent's `__main__`.
+"""
+
+import os
+import threading
+import multiprocessing.spawn
+from contextlib import contextmanager
+from typing import Any, Optional
+
+try:
+    from .task_cancellation import CancellationToken
+    from .task_progress import ProgressSink
+except ImportError:
+    from task_cancellation import CancellationToken
+    from task_progress import ProgressSink
+
+# Set in each worker process by init_worker
+_report_queue = None
+
+# Depth of worker_main() blocks the current thread is in
+_worker_main = threading.local()
+
+# Name this module is imported under in the workers
+_MODULE_NAME = __spec__.name if __spec__ is not None else __name__
+
+def _worker_preparation_data(name):
+    """multiprocessing's spawn preparation data, with this module as `__main__` inside worker_main()."""
+    data = _worker_preparation_data.original(name)
+    if getattr(_worker_main, "depth", 0):
+        data.pop("init_main_from_path", None)
+        data["init_main_from_name"] = _MODULE_NAME
+    return data
+
+# The spawn start method looks the function up on every process start, so
+# wrapping it once covers every pool; outside worker_main() it is unchanged
+if not hasattr(multiprocessing.spawn.get_preparation_data, "original"):
+    _worker_preparation_data.original = multiprocessing.spawn.get_preparation_data
+    multiprocessing.spawn.get_preparation_data = _worker_preparation_data
+
+@contextmanager
+def worker_main():
+    """
+    Make processes started by this thread in this block import this module as their `__main__`.
+
+    Wrap the calls that can start pool workers: `ProcessPoolExecutor.submit`
+    starts them on demand, from the submitting thread.
+    """
+    _worker_main.depth = getattr(_worker_main, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _worker_main.depth -= 1
+
+def init_worker(report_queue) -> None:
+    """Pool initializer: keep the queue workers report back on."""
+    global _report_queue
+    _report_queue = report_queue
+
+def warm_up() -> int:
+    """No-op job that makes the pool start a worker."""
+    return os.getpid()
+
+class _QueueProgress(ProgressSink):
+    """Progress sink of a worker process, forwarding reports to the board."""
+
+    def __init__(self, task_id: str, report_queue):
+        self.task_id = task_id
+        self.report_queue = report_queue
+
+    def update(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        self.report_queue.put(("update", self.task_id, (done, total, message)))
+
+    def advance(self, count: int = 1, message: Optional[str] = None) -> None:
+        self.report_queue.put(("advance", self.task_id, (count, message)))
+
+    def set_total(self, total: int) -> None:
+        self.report_queue.put(("set_total", self.task_id, (total,)))
+
+    def publish(self, chunk: Any) -> None:
+        self.report_queue.put(("publish", self.task_id, (chunk,)))
+
+def run_envelope(envelope) -> Any:
+    """Run the handler of a TaskEnvelope in this worker."""
+    progress = None
+    if _report_queue is not None:
+        # Tell the board which process runs the task, so it can be killed
+        _report_queue.put(("started", envelope.task_id, (os.getpid(),)))
+        progress = _QueueProgress(envelope.task_id, _report_queue)
+    token = CancellationToken(envelope.timeout, progress)
+    return envelope.handler(envelope.parameters, token)
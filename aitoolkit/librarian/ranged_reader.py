@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Ranged Reader
+
+Partial reads of large files for `read_file`:
+
+- byte ranges (`offset`/`limit`), sliced from an mmap and aligned to the
+  character boundaries of the file's encoding: UTF-8 sequences, UTF-16/32
+  code units after the BOM, and no alignment for single-byte encodings
+- line ranges (`start_line`/`end_line`), resolved through a line-offset table
+  so a range is two array lookups and one slice. Tables of large files are
+  persisted in a private per-user cache directory, keyed by the file's mtime
+  and size, so they are built once per version of the file.
+- opaque cursors for paging through a file chunk by chunk; a cursor stops
+  working once the file changes
+
+Ranges are cached in the FileCache under a range key instead of caching the
+whole file.
+"""
+
+import os
+import sys
+import json
+import mmap
+import codecs
+import base64
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, NamedTuple
+
+try:
+    from .content_sniffer import sniff_file
+    from .content_hash import content_hash, unchanged_result
+except ImportError:
+    from content_sniffer import sniff_file
+    from content_hash import content_hash, unchanged_result
+
+LINE_INDEX_DIR_ENV = "AI_LIBRARIAN_LINE_INDEX_DIR"
+
+DEFAULT_CHUNK_BYTES = 64 * 1024
+# Line tables of files at least this large are written to disk
+LINE_INDEX_PERSIST_MIN_BYTES = 1024 * 1024
+LINE_INDEX_MEMORY_ENTRIES = 32
+LINE_INDEX_MAGIC = b"AILX1\n"
+
+class RangeError(ValueError):
+    """Raised for invalid ranges and stale or malformed cursors."""
+
+class RangeCodec(NamedTuple):
+    """How the byte ranges of a file are aligned to its characters."""
+    encoding: str       # Encoding the ranges are decoded with
+    utf8: bool          # Align to UTF-8 sequences
+    unit: int           # Code unit size of UTF-16/32, 1 otherwise
+    base: int           # Offset of the first character, after any BOM
+    big_endian: bool = False
+
+def _line_index_dir() -> str:
+    configured = os.environ.get(LINE_INDEX_DIR_ENV)
+    if configured:
+        return configured
+    # Not the shared temp directory: table names are predictable, so another
+    # user could plant tables there that make ranged reads return wrong lines
+    cache_home = (os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+                  or os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(cache_home, "ai_librarian", "line_index")
+
+def _is_private_dir(directory: str) -> bool:
+    """Check that a directory belongs to this user and nobody else can write to it."""
+    try:
+        stats = os.stat(directory)
+    except OSError:
+        return False
+    if not hasattr(os, "getuid"):
+        return True  # Windows: the per-user profile directory is private already
+    return stats.st_uid == os.getuid() and not stats.st_mode & 0o022
+
+def _line_index_path(path: str) -> str:
+    digest = hashlib.blake2b(path.encode("utf-8", errors="surrogateescape"), digest_size=16).hexdigest()
+    return os.path.join(_line_index_dir(), f"{digest}.idx")
+
+def _read_bytes(path: str, start: int, end: int) -> bytes:
+    """Read bytes [start, end) of a file through an mmap."""
+    if end <= start:
+        return b""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[start:end]
+
+def _build_line_offsets(path: str, size: int) -> array:
+    """Scan a file for the byte offset at which each line starts."""
+    offsets = array('Q', [0])
+    if size == 0:
+        return offsets
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            find = mapped.find
+            position = find(b"\n")
+            while position != -1:
+                offsets.append(position + 1)
+                position = find(b"\n", position + 1)
+    if offsets[-1] == size:
+        # A trailing newline does not start another line
+        offsets.pop()
+    return offsets
+
+def _load_persisted(index_path: str, signature: Tuple[int, int]) -> Optional[array]:
+    if not _is_private_dir(os.path.dirname(index_path)):
+        return None
+    try:
+        with open(index_path, 'rb') as f:
+            if f.read(len(LINE_INDEX_MAGIC)) != LINE_INDEX_MAGIC:
+                return None
+            header = json.loads(f.readline().decode("ascii"))
+            if (header.get("mtime_ns"), header.get("size")) != signature:
+                return None
+            offsets = array('Q')
+            offsets.frombytes(f.read())
+            return offsets
+    except (OSError, ValueError):
+        return None
+
+def _persist(index_path: str, signature: Tuple[int, int], offsets: array) -> None:
+    try:
+        directory = os.path.dirname(index_path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not _is_private_dir(directory):
+            return
+        temp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(LINE_INDEX_MAGIC)
+            f.write(json.dumps({"mtime_ns": signature[0], "size": signature[1]}).encode("ascii") + b"\n")
+            f.write(offsets.tobytes())
+        os.replace(temp_path, index_path)
+    except OSError:
+        pass  # The table is only an accelerator
+
+# Recently used line tables, keyed by path
+_line_tables: "OrderedDict[str, Tuple[Tuple[int, int], array]]" = OrderedDict()
+_line_tables_lock = threading.Lock()
+
+def get_line_offsets(path: str, stats: Optional[os.stat_result] = None) -> array:
+    """
+    Get the line-offset table of a file.
+
+    Args:
+        path: Absolute path of the file
+        stats: The file's os.stat result, if already known
+
+    Returns:
+        Array whose element i is the byte offset where line i + 1 starts
+    """
+    stats = stats or os.stat(path)
+    signature = (stats.st_mtime_ns, stats.st_size)
+
+    with _line_tables_lock:
+        cached = _line_tables.get(path)
+        if cached is not None and cached[0] == signature:
+            _line_tables.move_to_end(path)
+            return cached[1]
+
+    offsets = None
+    persist = stats.st_size >= LINE_INDEX_PERSIST_MIN_BYTES
+    if persist:
+        offsets = _load_persisted(_line_index_path(path), signature)
+    if offsets is None:
+        offsets = _build_line_offsets(path, stats.st_size)
+        if persist:
+            _persist(_line_index_path(path), signature, offsets)
+
+    with _line_tables_lock:
+        _line_tables[path] = (signature, offsets)
+        _line_tables.move_to_end(path)
+        while len(_line_tables) > LINE_INDEX_MEMORY_ENTRIES:
+            _line_tables.popitem(last=False)
+    return offsets
+
+def get_range_codec(path: str, encoding: str) -> RangeCodec:
+    """
+    Work out how byte ranges of a file in `encoding` are aligned.
+
+    UTF-16 and UTF-32 files with a BOM are decoded with the byte order the
+    BOM names, so a range that does not include the BOM still decodes.
+    """
+    try:
+        name = codecs.lookup(encoding).name
+    except LookupError:
+        return RangeCodec(encoding, False, 1, 0)
+    if name in ("utf-8", "utf-8-sig", "ascii"):
+        return RangeCodec(encoding, True, 1, 0)
+    if not name.startswith(("utf-16", "utf-32")):
+        # Single-byte (or unknown multibyte) encodings are not aligned
+        return RangeCodec(encoding, False, 1, 0)
+
+    unit = 2 if name.startswith("utf-16") else 4
+    if name.endswith(("-le", "-be")):
+        return RangeCodec(encoding, False, unit, 0, name.endswith("-be"))
+    with open(path, 'rb') as f:
+        head = f.read(unit)
+    if unit == 2:
+        boms = ((codecs.BOM_UTF16_LE, "utf-16-le", False), (codecs.BOM_UTF16_BE, "utf-16-be", True))
+    else:
+        boms = ((codecs.BOM_UTF32_LE, "utf-32-le", False), (codecs.BOM_UTF32_BE, "utf-32-be", True))
+    for bom, explicit, big_endian in boms:
+        if head == bom:
+            return RangeCodec(explicit, False, unit, len(bom), big_endian)
+    return RangeCodec(encoding, False, unit, 0, sys.byteorder == "big")
+
+def _surrogate_kind(unit: bytes, big_endian: bool) -> int:
+    """Return 0xD8 for a UTF-16 high surrogate, 0xDC for a low one, 0 otherwise."""
+    high_byte = unit[0] if big_endian else unit[1]
+    return high_byte & 0xFC if high_byte & 0xF8 == 0xD8 else 0
+
+def _align_up(offset: int, codec: RangeCodec, size: int) -> int:
+    """Round a byte offset up to the next code unit boundary."""
+    if codec.unit > 1:
+        offset += -(offset - codec.base) % codec.unit
+    return min(offset, size)
+
+def _align_start(path: str, start: int, size: int, codec: RangeCodec) -> int:
+    """Move a byte offset forward to the start of a character."""
+    if start >= size:
+        return max(0, size)
+    if start <= codec.base:
+        # Never start inside the BOM
+        return codec.base
+    if codec.utf8:
+        head = _read_bytes(path, start, min(size, start + 4))
+        skip = 0
+        while skip < len(head) and (head[skip] & 0xC0) == 0x80:
+            skip += 1
+        return start + skip
+    start = _align_up(start, codec, size)
+    if codec.unit == 2 and start + 2 <= size:
+        # Skip the second half of a surrogate pair
+        if _surrogate_kind(_read_bytes(path, start, start + 2), codec.big_endian) == 0xDC:
+            start += 2
+    return start
+
+def _align_end(data: bytes, codec: RangeCodec) -> bytes:
+    """Drop a character cut in half at the end of a slice."""
+    if codec.unit > 1:
+        data = data[:len(data) - len(data) % codec.unit]
+        if codec.unit == 2 and len(data) >= 2 and _surrogate_kind(data[-2:], codec.big_endian) == 0xD8:
+            data = data[:-2]
+        return data
+    if not codec.utf8:
+        return data
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0x80 == 0:
+            return data  # ASCII: nothing is cut
+        if byte & 0xC0 == 0xC0:
+            # Lead byte: keep it only if its whole sequence is present
+            needed = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return data if back >= needed else data[:-back]
+    return data
+
+def encode_cursor(path: str, offset: int, limit: int, end: int, signature: Tuple[int, int]) -> str:
+    """Encode the position of the next chunk of a file as an opaque cursor."""
+    payload = json.dumps({"p": path, "o": offset, "l": limit, "e": end, "m": signature[0], "s": signature[1]})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        return {
+            "path": data["p"],
+            "offset": int(data["o"]),
+            "limit": int(data["l"]),
+            "end": int(data["e"]),
+            "signature": (int(data["m"]), int(data["s"]))
+        }
+    except Exception:
+        raise RangeError("Invalid cursor")
+
+def _unchanged_range(result: Dict[str, Any], line_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the "unchanged" response of a range, keeping its position and cursor."""
+    unchanged = unchanged_result(result["path"], result["content_hash"], result["size"], result["modified"])
+    for key in ("offset", "end_offset", "has_more", "next_cursor"):
+        unchanged[key] = result[key]
+    unchanged.update(line_info)
+    return unchanged
+
+def read_range(
+    path: str,
+    encoding: str = "utf-8",
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    cursor: Optional[str] = None,
+    file_cache=None,
+    use_cache: bool = True,
+    if_none_match: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Read part of a file.
+
+    Either a byte range (`offset`, `limit`), a line range (`start_line`,
+    `end_line`, 1-based and inclusive, optionally capped at `limit` bytes) or
+    the continuation given by `cursor`. When more of the requested range
+    remains, the result has "has_more" and a "next_cursor".
+
+    Args:
+        path: Absolute path of the file
+        encoding: Text encoding
+        offset: First byte to read
+        limit: Maximum number of bytes to return
+        start_line: First line to read
+        end_line: Last line to read
+        cursor: Cursor returned by a previous ranged read
+        file_cache: FileCache in which ranges are cached
+        use_cache: Whether to use the file cache
+        if_none_match: Hash of the range from an earlier read; if the range
+            still matches it, an "unchanged" response is returned
+
+    Returns:
+        Dictionary with the content of the range and its position
+
+    Raises:
+        RangeError: If the range or cursor is invalid (including a
+            start_line past the last line), or the file changed since the
+            cursor was issued
+    """
+    stats = os.stat(path)
+    signature = (stats.st_mtime_ns, stats.st_size)
+    size = stats.st_size
+    line_info = {}
+
+    verdict = sniff_file(path, stats)
+    if verdict["binary"]:
+        return {
+            "status": "binary",
+            "path": path,
+            "size": size,
+            "encoding": "binary",
+            "message": f"Binary file detected ({size} bytes). Content not displayed.",
+            "modified": stats.st_mtime,
+            "from_cache": False
+        }
+    if encoding.lower().replace("_", "-") in ("utf-8", "utf8") and verdict["encoding"]:
+        encoding = verdict["encoding"]
+
+    if cursor is not None:
+        position = decode_cursor(cursor)
+        if position["path"] != path:
+            raise RangeError("Cursor belongs to a different file")
+        if position["signature"] != signature:
+            raise RangeError("File changed since the cursor was issued; start again without a cursor")
+        start, end, limit = position["offset"], position["end"], position["limit"]
+    elif start_line is not None or end_line is not None:
+        start_line = start_line or 1
+        if start_line < 1 or (end_line is not None and end_line < start_line):
+            raise RangeError("start_line must be >= 1 and end_line >= start_line")
+        offsets = get_line_offsets(path, stats)
+        total_lines = len(offsets) if size else 0
+        if start_line > total_lines:
+            raise RangeError(f"start_line {start_line} is past the end of the file ({total_lines} lines)")
+        # end_line past the end is clamped to the last line
+        last_line = min(end_line or total_lines, total_lines)
+        start = offsets[start_line - 1]
+        end = offsets[last_line] if last_line < total_lines else size
+        line_info = {
+            "start_line": start_line,
+            "end_line": last_line,
+            "total_lines": total_lines
+        }
+    else:
+        start = offset or 0
+        if start < 0:
+            raise RangeError("offset must be >= 0")
+        end = size
+
+    if limit is not None and limit <= 0:
+        raise RangeError("limit must be > 0")
+
+    codec = get_range_codec(path, encoding)
+    start = _align_start(path, min(start, size), size, codec)
+    # Line ends found by searching for b"\n" can fall inside a UTF-16/32 code unit
+    end = max(start, _align_up(min(end, size), codec, size))
+    stop = min(end, start + limit) if limit else end
+    range_key = f"bytes={start}-{stop}"
+
+    if use_cache and file_cache is not None:
+        cached = file_cache.get(path, range_key)
+        if cached:
+            if if_none_match and cached.get("content_hash") == if_none_match:
+                return _unchanged_range(cached, line_info)
+            return {**cached, **line_info, "from_cache": True}
+
+    data = _read_bytes(path, start, stop)
+    if stop < end:
+        aligned = _align_end(data, codec)
+        if not aligned:
+            # The limit is smaller than one character: return that character
+            aligned = _align_end(_read_bytes(path, start, min(end, start + 4)), codec) or data
+        data = aligned
+        stop = start + len(data)
+    content = data.decode(codec.encoding, errors="replace")
+
+    has_more = stop < end
+    result = {
+        "status": "success",
+        "path": path,
+        "content": content,
+        "content_hash": content_hash(data),
+        "size": size,
+        "encoding": encoding,
+        "modified": stats.st_mtime,
+        "offset": start,
+        "end_offset": stop,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(path, stop, limit or DEFAULT_CHUNK_BYTES, end, signature) if has_more else None,
+        "from_cache": False
+    }
+    if use_cache and file_cache is not None:
+        file_cache.set(path, result, range_key)
+    if if_none_match and result["content_hash"] == if_none_match:
+        return _unchanged_range(result, line_info)
+    result.update(line_info)
+    return result
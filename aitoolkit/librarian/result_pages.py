@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Result Pages
+
+Cursor-based pagination for tools that can return long result lists
+(search_files, find_implementation, directory_tree, find_related_files).
+
+The first call of a paged query stores its results in a server-side
+snapshot and returns the first `limit` items with an opaque `next_cursor`.
+Follow-up calls pass the cursor and are served from the snapshot, so the
+walk or scan behind the query is not run again.
+
+A snapshot either holds a complete result list or wraps a lazy iterator
+(e.g. a filesystem walk) that is only advanced as far as the pages that are
+actually requested. Snapshots expire `ttl` seconds after their last use and
+the least recently used ones are evicted beyond `max_snapshots`; an expired
+cursor tells the caller to run the query again.
+"""
+
+import json
+import time
+import uuid
+import base64
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+
+DEFAULT_SNAPSHOT_TTL = 300.0
+DEFAULT_MAX_SNAPSHOTS = 64
+MAX_PAGE_SIZE = 10000
+
+class CursorError(ValueError):
+    """Raised for malformed, expired or mismatched cursors."""
+
+class _Snapshot:
+    """The results of one paged query."""
+
+    def __init__(self, query: tuple, items: Iterable, meta: Dict[str, Any], total_count: Optional[int]):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.meta = meta
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        if isinstance(items, (list, tuple)):
+            self.items = list(items)
+            self.source: Optional[Iterator] = None
+            self.total_count = len(self.items)
+        else:
+            self.items = []
+            self.source = iter(items)
+            self.total_count = total_count
+
+    def _fill(self, count: int) -> None:
+        """Advance the source until `count` items are materialized or it ends."""
+        while self.source is not None and len(self.items) < count:
+            try:
+                self.items.append(next(self.source))
+            except StopIteration:
+                self.source = None
+                self.total_count = len(self.items)
+
+    def page(self, offset: int, limit: int) -> Dict[str, Any]:
+        """Return items [offset, offset + limit) and whether more follow."""
+        with self.lock:
+            # One item past the page tells whether there is a next page
+            self._fill(offset + limit + 1)
+            items = self.items[offset:offset + limit]
+            return {
+                "items": items,
+                "offset": offset,
+                "has_more": len(self.items) > offset + limit,
+                "total_count": self.total_count
+            }
+
+    def close(self) -> None:
+        """Stop the lazy source, releasing whatever it holds open."""
+        with self.lock:
+            source, self.source = self.source, None
+        close = getattr(source, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+
+def encode_page_cursor(snapshot_id: str, offset: int, limit: int) -> str:
+    """Encode a position in a snapshot as an opaque cursor."""
+    payload = json.dumps({"s": snapshot_id, "o": offset, "l": limit})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_page_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_page_cursor."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        return {"snapshot": str(data["s"]), "offset": int(data["o"]), "limit": int(data["l"])}
+    except Exception:
+        raise CursorError("Invalid cursor")
+
+def _check_limit(limit: int) -> int:
+    if limit <= 0:
+        raise CursorError("limit must be > 0")
+    return min(limit, MAX_PAGE_SIZE)
+
+class ResultSnapshots:
+    """
+    Snapshots of paged query results, with a TTL and an LRU bound.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_SNAPSHOT_TTL, max_snapshots: int = DEFAULT_MAX_SNAPSHOTS):
+        self.ttl = ttl
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[str, _Snapshot]" = OrderedDict()
+        self.created = 0
+        self.pages_served = 0
+        self.expired = 0
+
+    def _evict(self, now: float) -> List[_Snapshot]:
+        """Remove expired and excess snapshots; the caller holds the lock."""
+        dropped = []
+        for snapshot_id, snapshot in list(self._snapshots.items()):
+            if now - snapshot.last_used > self.ttl:
+                dropped.append(self._snapshots.pop(snapshot_id))
+                self.expired += 1
+        while len(self._snapshots) > self.max_snapshots:
+            dropped.append(self._snapshots.popitem(last=False)[1])
+        return dropped
+
+    def _page(self, snapshot: _Snapshot, offset: int, limit: int) -> Dict[str, Any]:
+        page = snapshot.page(offset, limit)
+        page["count"] = len(page["items"])
+        page["meta"] = snapshot.meta
+        page["next_cursor"] = encode_page_cursor(snapshot.id, offset + limit, limit) if page["has_more"] else None
+        return page
+
+    def open(
+        self,
+        query: tuple,
+        items: Iterable,
+        limit: int,
+        meta: Optional[Dict[str, Any]] = None,
+        total_count: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Snapshot the results of a query and return their first page.
+
+        Args:
+            query: Key identifying the query (tool name and arguments);
+                cursors are only accepted by the same query
+            items: The results, either a list or a lazy iterator that is
+                advanced as pages are requested
+            limit: Number of items per page
+            meta: Response fields shared by every page
+            total_count: Number of results of a lazy iterator, if known
+
+        Returns:
+            Page dictionary with "items", "offset", "count", "has_more",
+            "next_cursor", "total_count" (None while unknown) and "meta"
+        """
+        limit = _check_limit(limit)
+        snapshot = _Snapshot(query, items, meta or {}, total_count)
+        with self._lock:
+            self._snapshots[snapshot.id] = snapshot
+            self.created += 1
+            self.pages_served += 1
+            dropped = self._evict(time.monotonic())
+        for old in dropped:
+            old.close()
+        page = self._page(snapshot, 0, limit)
+        if not page["has_more"]:
+            # Everything fit in the first page: no cursor will refer to it
+            self.discard(snapshot.id)
+        return page
+
+    def next(self, cursor: str, query: tuple, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Serve the page a cursor points to from its snapshot.
+
+        Args:
+            cursor: Cursor returned by a previous page
+            query: Key of the query the caller is paging through
+            limit: Page size; defaults to the size the cursor was issued with
+
+        Returns:
+            Page dictionary, as returned by open
+
+        Raises:
+            CursorError: If the cursor is malformed, expired or belongs to
+                another query
+        """
+        position = decode_page_cursor(cursor)
+        limit = _check_limit(limit or position["limit"])
+        now = time.monotonic()
+        with self._lock:
+            dropped = self._evict(now)
+            snapshot = self._snapshots.get(position["snapshot"])
+            if snapshot is not None and snapshot.query == query:
+                snapshot.last_used = now
+                self._snapshots.move_to_end(snapshot.id)
+                self.pages_served += 1
+        for old in dropped:
+            old.close()
+
+        if snapshot is None:
+            raise CursorError("Cursor expired; run the query again without a cursor")
+        if snapshot.query != query:
+            raise CursorError("Cursor belongs to a different query")
+        return self._page(snapshot, position["offset"], limit)
+
+    def discard(self, snapshot_id: str) -> None:
+        """Drop a snapshot and stop its source."""
+        with self._lock:
+            snapshot = self._snapshots.pop(snapshot_id, None)
+        if snapshot is not None:
+            snapshot.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of live snapshots and pages served."""
+        with self._lock:
+            return {
+                "snapshots": len(self._snapshots),
+                "max_snapshots": self.max_snapshots,
+                "ttl_seconds": self.ttl,
+                "created": self.created,
+                "pages_served": self.pages_served,
+                "expired": self.expired
+            }
+
+def page_response(page: Dict[str, Any], items_key: str, noun: str) -> Dict[str, Any]:
+    """
+    Build a tool response from a page.
+
+    Args:
+        page: Page returned by ResultSnapshots.open or next
+        items_key: Response key holding the items (e.g. "matches")
+        noun: What the items are, for the message (e.g. "matching files")
+
+    Returns:
+        The page's shared fields plus its items and position
+    """
+    first, last = page["offset"] + 1, page["offset"] + page["count"]
+    if page["count"] == 0:
+        message = f"No {noun} found" if page["offset"] == 0 else f"No more {noun}"
+    elif page["total_count"] is not None:
+        message = f"Returned {noun} {first}-{last} of {page['total_count']}"
+    else:
+        message = f"Returned {noun} {first}-{last}"
+    if page["has_more"]:
+        message += "; pass next_cursor to get the next page"
+
+    return {
+        "status": "success",
+        **page["meta"],
+        items_key: page["items"],
+        "count": page["count"],
+        "offset": page["offset"],
+        "has_more": page["has_more"],
+        "truncated": page["has_more"],
+        "next_cursor": page["next_cursor"],
+        "total_count": page["total_count"],
+        "message": message
+    }
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Search Index
+
+This module maintains `.ai_reference/search_index.json`, an inverted index
+over what the indexer extracts from each file: its path, the names of its
+classes, functions, methods, parameters, constants and class variables, and
+its docstrings. Identifiers are split on snake_case and camelCase boundaries
+(`parseHTTPResponse` -> `parse`, `http`, `response`) and the whole identifier
+is kept as a term too, so exact names rank above partial matches.
+
+Files are ranked with BM25. Term frequencies are weighted by field, so a
+query term in a symbol name counts more than the same term in a docstring.
+With NumPy installed, the postings are arrays and a query is scored with a
+few vectorized operations per term; without it, a pure-Python loop computes
+the same scores.
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+SEARCH_INDEX_FILENAME = "search_index.json"
+SEARCH_INDEX_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Matching symbols listed per result
+MAX_MATCHED_SYMBOLS = 10
+
+# Term-frequency weight of a term occurrence, by the field it occurs in
+FIELD_WEIGHTS = {
+    "symbol": 3.0,      # class, function and method names
+    "path": 2.0,        # directory and file names
+    "identifier": 1.0,  # parameters, constants and class variables
+    "docstring": 1.0
+}
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have if in into is it its of on or
+that the this to was were will with not no but can do does self cls none
+true false return returns args
+""".split())
+
+_WORD = re.compile(r"[A-Za-z0-9_]+")
+_SUBWORD = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Words are split on underscores and camelCase boundaries; a compound word
+    also yields itself as a term. Stopwords and one-character terms are
+    dropped.
+
+    Args:
+        text: Identifier, path, docstring or query
+
+    Returns:
+        List of terms, with repetitions
+    """
+    terms = []
+    for word in _WORD.findall(text or ""):
+        parts = [part.lower() for part in _SUBWORD.findall(word)]
+        if len(parts) > 1:
+            whole = word.strip("_").lower()
+            if whole not in STOPWORDS:
+                terms.append(whole)
+        terms.extend(part for part in parts if len(part) > 1 and part not in STOPWORDS)
+    return terms
+
+def _function_texts(info: Dict[str, Any]) -> Iterable[Tuple[str, str]]:
+    yield "docstring", info.get("docstring") or ""
+    for param in info.get("parameters", []):
+        if isinstance(param, dict):
+            yield "identifier", param.get("name", "")
+
+def search_entry(rel_path: str, info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the search terms of a parsed file.
+
+    Args:
+        rel_path: Path of the file relative to the project
+        info: Parse result from enhanced_indexer.parse_python_file
+
+    Returns:
+        Dictionary with the file's weighted term frequencies ("terms"), its
+        weighted length and its symbols as [qualified name, kind, start line]
+    """
+    texts: List[Tuple[str, str]] = [("path", rel_path)]
+
+    for class_name, class_info in info.get("classes", {}).items():
+        texts.append(("docstring", class_info.get("docstring") or ""))
+        for variable in class_info.get("class_variables", []):
+            if isinstance(variable, dict):
+                texts.append(("identifier", variable.get("name", "")))
+        for method_info in class_info.get("methods", {}).values():
+            texts.extend(_function_texts(method_info))
+
+    for func_info in info.get("functions", {}).values():
+        texts.extend(_function_texts(func_info))
+
+    for constant in info.get("constants", {}):
+        texts.append(("identifier", constant))
+
+    symbols = []
+    for symbol in info.get("symbols", []):
+        texts.append(("symbol", symbol.get("name", "")))
+        symbols.append([symbol.get("qualified_name", symbol.get("name", "")), symbol.get("kind"), symbol.get("start_line")])
+
+    terms: Dict[str, float] = {}
+    for field, text in texts:
+        weight = FIELD_WEIGHTS[field]
+        for term in tokenize(text):
+            terms[term] = terms.get(term, 0.0) + weight
+
+    return {
+        "terms": terms,
+        "length": sum(terms.values()),
+        "symbols": symbols
+    }
+
+class SearchIndex:
+    """
+    BM25-ranked inverted index over the indexed files of a project.
+    """
+
+    def __init__(self, files: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Initialize the index.
+
+        Args:
+            files: Mapping of relative file paths to their search entries
+        """
+        self.files = dict(files or {})
+        self.rebuild()
+
+    def update_files(self, files: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the entries of the given files."""
+        self.files.update(files)
+        self.rebuild()
+
+    def remove_files(self, rel_paths: Iterable[str]) -> None:
+        """Drop the entries of the given files."""
+        for rel_path in rel_paths:
+            self.files.pop(rel_path, None)
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Recompute the postings and document-length norms from the entries."""
+        self.paths = sorted(self.files)
+        lengths = [self.files[rel_path].get("length", 0.0) for rel_path in self.paths]
+        average = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+        postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        for doc_id, rel_path in enumerate(self.paths):
+            for term, frequency in self.files[rel_path].get("terms", {}).items():
+                doc_ids, frequencies = postings.setdefault(term, ([], []))
+                doc_ids.append(doc_id)
+                frequencies.append(frequency)
+
+        # Per-document BM25 length normalization: k1 * (1 - b + b * length / average)
+        norms = [
+            BM25_K1 * (1 - BM25_B + BM25_B * (length / average if average else 0.0))
+            for length in lengths
+        ]
+
+        count = len(self.paths)
+        self.idf = {
+            term: math.log(1 + (count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            for term, (doc_ids, _) in postings.items()
+        }
+
+        if NUMPY_AVAILABLE:
+            self.postings = {
+                term: (np.asarray(doc_ids, dtype=np.int32), np.asarray(frequencies, dtype=np.float32))
+                for term, (doc_ids, frequencies) in postings.items()
+            }
+            self.norms = np.asarray(norms, dtype=np.float32)
+        else:
+            self.postings = postings
+            self.norms = norms
+
+    def _top(self, terms: List[str], top_k: int) -> List[Tuple[float, int]]:
+        """Return the (score, doc id) pairs of the top_k documents, best first."""
+        if NUMPY_AVAILABLE:
+            scores = np.zeros(len(self.paths), dtype=np.float32)
+            for term in terms:
+                doc_ids, frequencies = self.postings[term]
+                scores[doc_ids] += self.idf[term] * frequencies * (BM25_K1 + 1) / (frequencies + self.norms[doc_ids])
+            matched = np.flatnonzero(scores)
+            if len(matched) > top_k:
+                # Keep every document tied with the k-th score, so the tie-break below decides
+                kth_score = -np.partition(-scores[matched], top_k - 1)[top_k - 1]
+                matched = matched[scores[matched] >= kth_score]
+            # Best score first; ties go to the earlier path
+            best = matched[np.lexsort((matched, -scores[matched]))][:top_k]
+            return list(zip(scores[best].tolist(), best.tolist()))
+
+        scores: Dict[int, float] = {}
+        norms = self.norms
+        for term in terms:
+            idf = self.idf[term]
+            doc_ids, frequencies = self.postings[term]
+            for doc_id, frequency in zip(doc_ids, frequencies):
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norms[doc_id])
+        # Ties go to the earlier path, as in the NumPy branch
+        return heapq.nlargest(top_k, ((score, doc_id) for doc_id, score in scores.items()), key=lambda pair: (pair[0], -pair[1]))
+
+    def search(self, query: str, top_k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Rank the indexed files for a query.
+
+        Args:
+            query: Free-text query, identifiers or a mix
+            top_k: Number of files to return
+
+        Returns:
+            The best files, highest score first, each with its score, the
+            query terms it contains and the symbols whose names match
+        """
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self.postings]
+        if not terms or top_k <= 0:
+            return []
+
+        results = []
+        for score, doc_id in self._top(terms, top_k):
+            rel_path = self.paths[doc_id]
+            entry = self.files[rel_path]
+            matched_terms = [term for term in terms if term in entry.get("terms", {})]
+            matched = set(matched_terms)
+            # Symbols whose names contain the most query terms first
+            symbols = []
+            for name, kind, line in entry.get("symbols", []):
+                hits = len(matched.intersection(tokenize(name.rsplit(".", 1)[-1])))
+                if hits:
+                    symbols.append((hits, {"name": name, "kind": kind, "line": line}))
+            symbols.sort(key=lambda pair: -pair[0])
+            results.append({
+                "file": rel_path,
+                "score": round(float(score), 4),
+                "matched_terms": matched_terms,
+                "symbols": [symbol for _, symbol in symbols[:MAX_MATCHED_SYMBOLS]]
+            })
+        return results
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index."""
+        return {
+            "version": SEARCH_INDEX_VERSION,
+            "files": self.files
+        }
+
+# Loaded indexes, keyed by path and invalidated when the file changes
+_index_cache: Dict[str, Tuple[Tuple[float, int], SearchIndex]] = {}
+_index_cache_lock = threading.Lock()
+
+def load_search_index(ai_ref_path: str) -> Optional[SearchIndex]:
+    """
+    Load the search index of a project.
+
+    Args:
+        ai_ref_path: Path to the .ai_reference directory
+
+    Returns:
+        The SearchIndex, or None if it is missing, unreadable or outdated
+    """
+    index_path = os.path.join(ai_ref_path, SEARCH_INDEX_FILENAME)
+    try:
+        stats = os.stat(index_path)
+    except OSError:
+        return None
+
+    signature = (stats.st_mtime, stats.st_size)
+    with _index_cache_lock:
+        cached = _index_cache.get(index_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != SEARCH_INDEX_VERSION:
+        return None
+
+    index = SearchIndex(data.get("files", {}))
+    with _index_cache_lock:
+        _index_cache[index_path] = (signature, index)
+    return index
+
+def save_search_index(ai_ref_path: str, index: SearchIndex) -> None:
+    """
+    Write the search index of a project.
+
+    Args:
+        ai_ref_path: Path to the .ai_reference directory
+        index: The index to write
+    """
+    index_path = os.path.join(ai_ref_path, SEARCH_INDEX_FILENAME)
+    # Readers do not wait for the indexer: replace the file whole so they
+    # never see a half-written one
+    temp_path = index_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index.to_dict(), f, separators=(',', ':'))
+    os.replace(temp_path, index_path)
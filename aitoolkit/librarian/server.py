@@ -26,10 +26,12 @@ os.environ["MCP_PROGRESSIVE_LOADING"] = "true"  # Load features progressively
 os.environ["MCP_HEARTBEAT_INTERVAL"] = "5000"  # Send heartbeat every 5 seconds
 import sys
 import json
+import re
 import time
 import atexit
 import logging
 import threading
+import itertools
 import ast
 import os.path
 from pathlib import Path
@@ -48,15 +50,36 @@ if parent_dir not in sys.path:
 # Import dependencies with absolute paths to ensure consistency
 from aitoolkit.librarian.todos import TodoManager
 from aitoolkit.librarian.sanity_check_fixed import run_sanity_check
-from aitoolkit.librarian.enhanced_indexer import initialize_enhanced_librarian
+from aitoolkit.librarian.enhanced_indexer import (
+    initialize_enhanced_librarian,
+    load_manifest,
+    detect_file_changes,
+    changed_paths_for
+)
+from aitoolkit.librarian.index_store import get_index_store
+from aitoolkit.librarian.symbol_index import load_symbol_index
+from aitoolkit.librarian.name_matcher import NameMatcher, get_name_matcher
+from aitoolkit.librarian.import_graph import load_import_graph
+from aitoolkit.librarian.search_index import load_search_index, NUMPY_AVAILABLE
+from aitoolkit.librarian.file_watcher import ChangeCollector, create_watcher, normalize_project_path
+from aitoolkit.librarian.file_cache import FileCache
+from aitoolkit.librarian.fs_walker import iter_files, compile_globs
+from aitoolkit.librarian.ranged_reader import read_range, RangeError
+from aitoolkit.librarian.file_reader import read_path, read_paths, check_readable, DEFAULT_READ_TIMEOUT, DEFAULT_MAX_TOTAL_BYTES
+from aitoolkit.librarian.shared_state import InstrumentedLock, ProjectSnapshots, get_lock_stats, get_project_lock
+from aitoolkit.librarian.result_pages import ResultSnapshots, CursorError, page_response
+from aitoolkit.librarian.json_cache import load_json, load_json_dict, load_script_index, load_component_registry
+from aitoolkit.librarian.trigram_index import DEFAULT_CODE_EXTENSIONS, load_trigram_index
 from aitoolkit.librarian.edit_bookmark import EditBookmark
 from aitoolkit.utils.logging_manager import configure_logger
 
 # Import Unified Context Integration
 try:
-    from aitoolkit.librarian.unified_context_integration import register_unified_context_tools
+    from aitoolkit.librarian.unified_context_integration import register_unified_context_tools, apply_project_changes
 except ImportError:
     print("Unified Context Integration not available")
+    register_unified_context_tools = None
+    apply_project_changes = None
 
 # Import TaskBoard Integration
 try:
@@ -65,8 +88,12 @@ try:
         submit_background_task,
         get_task_status_mcp,
         get_task_result_mcp,
+        get_task_chunks_mcp,
+        watch_task_mcp,
         cancel_task_mcp,
-        list_tasks_mcp
+        list_tasks_mcp,
+        register_task_handler,
+        set_allowed_directories
     )
     # Import think tool from its dedicated module
     from aitoolkit.librarian.think_tool import think
@@ -103,7 +130,6 @@ except ImportError:
 # Import filesystem module for file operations
 import shutil
 import tempfile
-import fnmatch
 import mimetypes
 from pathlib import Path
 
@@ -159,32 +185,71 @@ mcp = FastMCP(
     }
 )
 
-# Thread synchronization lock
-state_lock = threading.Lock()
+# Lock for the small mutable parts of librarian_context (active projects,
+# timestamps, flags, git info). The file cache and the project snapshots have
+# their own locks, so cache hits and index reads never wait on this one.
+state_lock = InstrumentedLock("state")
 
 # Global context for AI Librarian
 librarian_context = {
-    "projects": {},  # Map of project paths to their librarian info
+    "snapshots": ProjectSnapshots(),  # Immutable per-project script index, component registry and indexed files
     "active_projects": set(),  # Set of currently monitored projects
     "last_update": {},  # Map of project paths to last update timestamp
-    "indexed_files": {},  # Map of project paths to their indexed files
-    "components": {},  # Map of project paths to their component registries
     "paused": False,   # Flag to temporarily pause monitoring
     "tool_index": None,  # Path to Tool Index directory if available
-    "file_cache": {},  # Cache for frequently accessed files
-    "cache_stats": {"hits": 0, "misses": 0},  # Statistics for cache performance
-    "cache_max_size": 100,  # Maximum number of files to cache
-    "cache_max_age": 60,  # Maximum age of cached files in seconds
+    "file_cache": FileCache(max_entries=100, max_age=60),  # Byte-budgeted LRU cache for frequently accessed files
+    "result_pages": ResultSnapshots(),  # Snapshots of paged tool results, served by cursor
     "git_info": {}  # Cache for git repository information
 }
 
 # File change monitoring thread
 monitoring_active = True
 
+# Seconds a project must be free of file events before it is re-indexed
+WATCHER_QUIET_PERIOD = 1.0
+
+# Held by the monitoring thread while it re-indexes changed projects, so a
+# MonitoringPauser can wait for an update that is already under way
+monitor_update_lock = threading.RLock()
+
+# File watchers of the active projects and the changes they reported
+project_watchers = {}
+change_collector = ChangeCollector()
+
+def sync_project_watchers(active_projects):
+    """
+    Start watchers for newly active projects and stop those of inactive ones.
+    
+    Args:
+        active_projects: Paths of the currently active projects
+    """
+    for project_path in active_projects:
+        if project_path in project_watchers:
+            continue
+        try:
+            watcher = create_watcher(project_path, change_collector.add_events)
+        except Exception as e:
+            logger.error(f"Error starting file watcher for {project_path}: {str(e)}")
+            continue
+        project_watchers[project_path] = watcher
+        # Pick up changes made before the watcher existed
+        change_collector.request_rescan(project_path)
+        logger.info(f"Watching {project_path} with the {watcher.backend} backend")
+
+    for project_path in list(project_watchers):
+        if project_path not in active_projects:
+            project_watchers.pop(project_path).stop()
+            change_collector.discard(project_path)
+            logger.info(f"Stopped watching {project_path}")
+
 def monitor_projects():
     """
     Monitor active projects for file changes and update the AI Librarian context.
     This runs in a separate thread to provide real-time updates.
+    
+    Each active project has a file watcher (inotify, watchdog or polling) that
+    reports changed paths. Once a project has been quiet for WATCHER_QUIET_PERIOD
+    seconds, only the reported paths are re-indexed.
     """
     logger.info("Starting project monitoring thread")
     
@@ -193,146 +258,183 @@ def monitor_projects():
 
     while monitoring_active:
         try:
-            # Check if monitoring is paused
             with state_lock:
-                if librarian_context["paused"]:
-                    time.sleep(1)  # Short sleep when paused
-                    continue
-
-                current_time = time.time()
+                paused = librarian_context["paused"]
                 # Make a copy of active projects to avoid modification during iteration
                 active_projects = list(librarian_context["active_projects"])
 
-            # Check each active project for changes
             for project_path in active_projects:
                 if not os.path.exists(project_path):
+                    logger.warning(f"Project path no longer exists: {project_path}")
                     with state_lock:
-                        logger.warning(f"Project path no longer exists: {project_path}")
-                        librarian_context["active_projects"].remove(project_path)
-                    continue
+                        librarian_context["active_projects"].discard(project_path)
+                    active_projects.remove(project_path)
 
-                # Only check every 30 seconds per project to avoid excessive file system operations
-                with state_lock:
-                    last_check = librarian_context["last_update"].get(project_path, 0)
+            sync_project_watchers(active_projects)
 
-                if current_time - last_check < 30:
-                    continue
+            # Events keep accumulating while monitoring is paused
+            if paused:
+                time.sleep(0.5)
+                continue
 
-                # Check for file changes
-                has_changes = check_project_changes(project_path)
-                if has_changes:
-                    with state_lock:
-                        logger.info(f"Changes detected in project: {project_path}")
-                        update_librarian_for_project(project_path)
-                        librarian_context["last_update"][project_path] = current_time
-                else:
+            with monitor_update_lock:
+                # Check again under the lock: a MonitoringPauser entered since
+                # the check above does not wait for updates started after it
+                with state_lock:
+                    paused = librarian_context["paused"]
+                ready = {} if paused else change_collector.drain_ready(WATCHER_QUIET_PERIOD)
+                # The collector keys projects by normalized path; map them back
+                # to the paths the active projects were registered under
+                project_paths = {normalize_project_path(path): path for path in active_projects}
+
+                for project_key, changed_paths in ready.items():
+                    project_path = project_paths.get(project_key)
+                    if project_path is None:
+                        continue
+                    if changed_paths is None:
+                        # Full check: one walk yields the change set handed to the indexer
+                        changes = check_project_changes(project_path)
+                        if changes is None:
+                            changed_paths = None
+                        elif not changes["has_changes"]:
+                            continue
+                        else:
+                            changed_paths = changed_paths_for(changes)
+                    logger.info(f"Changes detected in project: {project_path} "
+                                f"({'all' if changed_paths is None else len(changed_paths)} paths)")
+                    update_librarian_for_project(project_path, changed_paths=changed_paths)
                     with state_lock:
-                        librarian_context["last_update"][project_path] = current_time
+                        librarian_context["last_update"][project_path] = time.time()
 
             # Sleep to avoid high CPU usage
-            time.sleep(5)
+            time.sleep(0.5)
         except Exception as e:
             logger.error(f"Error in monitoring thread: {str(e)}")
             time.sleep(10)  # Sleep longer on error
 
+    for watcher in project_watchers.values():
+        watcher.stop()
+    project_watchers.clear()
+
 def check_project_changes(project_path):
     """
-    Check if a project has changes since the last update.
+    Compute what changed in a project since the last librarian generation.
+    
+    A single walk compares the project's Python files against the index
+    manifest. Files whose mtime and size are unchanged are not read.
     
     Args:
         project_path: Path to the project root
         
     Returns:
-        bool: True if changes detected, False otherwise
+        Dictionary with "added", "modified" and "deleted" lists of relative
+        paths, "renamed" {"from", "to"} pairs and "has_changes", or None if
+        the project has no manifest yet or the check failed
     """
     try:
-        # Get currently indexed files
-        with state_lock:
-            indexed_files = librarian_context["indexed_files"].get(project_path, {})
-
-        # Scan for Python files
-        current_files = {}
-        for root, _, files in os.walk(project_path):
-            # Skip hidden directories and common excluded dirs
-            if any(part.startswith('.') for part in Path(root).parts) or \
-               any(part in ['venv', 'env', '__pycache__', 'node_modules'] for part in Path(root).parts):
-                continue
-
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    try:
-                        mtime = os.path.getmtime(file_path)
-                        current_files[file_path] = mtime
-                    except OSError:
-                        pass
-
-        # Check for added, removed, or modified files
-        if set(indexed_files.keys()) != set(current_files.keys()):
-            return True
-
-        # Check for modified files
-        for file_path, mtime in current_files.items():
-            if file_path in indexed_files and indexed_files[file_path] != mtime:
-                return True
+        manifest = load_manifest(os.path.join(project_path, ".ai_reference"))
+        if manifest is None:
+            return None
 
-        return False
+        changes, _ = detect_file_changes(project_path, scan_directory(project_path), manifest.get("files", {}))
+        changes["has_changes"] = any(changes[key] for key in ("added", "modified", "deleted", "renamed"))
+        return changes
     except Exception as e:
         logger.error(f"Error checking project changes: {str(e)}")
-        return False
+        return None
 
-def update_librarian_for_project(project_path):
+def update_librarian_for_project(project_path, full_rebuild=False, use_index_store=None, changed_paths=None):
     """
     Update the AI Librarian for a project.
     
+    Only files that changed since the last run are reparsed, unless a full
+    rebuild is requested. Updates of the same project run one at a time,
+    under the project's indexing lock.
+    
     Args:
         project_path: Path to the project root
+        full_rebuild: Ignore the index manifest and rebuild everything
+        use_index_store: Keep the index in the SQLite store (None keeps the current setting)
+        changed_paths: Paths relative to the project reported by a file watcher;
+            None checks every file
+        
+    Returns:
+        The indexer's status message
     """
+    with get_project_lock(project_path):
+        return _update_librarian_locked(project_path, full_rebuild, use_index_store, changed_paths)
+
+def _update_librarian_locked(project_path, full_rebuild, use_index_store, changed_paths):
+    """Body of update_librarian_for_project; the caller holds the project's indexing lock."""
     try:
         # Use the already imported enhanced_indexer module (imported at the top)
         # Update the librarian files using the imported function
-        message, file_count, component_count = initialize_enhanced_librarian(project_path)
+        message, file_count, component_count = initialize_enhanced_librarian(
+            project_path, full_rebuild, use_index_store=use_index_store, changed_paths=changed_paths
+        )
         logger.info(f"Updated librarian for {project_path}: {message}")
 
         # Update our in-memory representation
         ai_ref_path = os.path.join(project_path, ".ai_reference")
 
-        # Read script index
-        script_index_path = os.path.join(ai_ref_path, "script_index.json")
-        if os.path.exists(script_index_path):
-            with open(script_index_path, 'r', encoding='utf-8') as f:
-                script_index = json.load(f)
-                with state_lock:
-                    librarian_context["projects"][project_path] = script_index
-
-        # Read component registry
-        component_registry_path = os.path.join(ai_ref_path, "component_registry.json")
-        if os.path.exists(component_registry_path):
-            with open(component_registry_path, 'r', encoding='utf-8') as f:
-                component_registry = json.load(f)
-                with state_lock:
-                    librarian_context["components"][project_path] = component_registry
-
-        # Update indexed files
-        current_files = {}
-        for root, _, files in os.walk(project_path):
-            if any(part.startswith('.') for part in Path(root).parts) or \
-               any(part in ['venv', 'env', '__pycache__', 'node_modules'] for part in Path(root).parts):
-                continue
-
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    try:
-                        mtime = os.path.getmtime(file_path)
-                        current_files[file_path] = mtime
-                    except OSError:
-                        pass
+        # Indexed files from the manifest the indexer just wrote
+        manifest = load_manifest(ai_ref_path) or {}
+        current_files = {
+            os.path.normpath(os.path.join(project_path, rel_path)): entry.get("mtime")
+            for rel_path, entry in manifest.get("files", {}).items()
+        }
 
-        with state_lock:
-            librarian_context["indexed_files"][project_path] = current_files
+        # Publish the new index as one snapshot; readers keep using the
+        # previous one until the reference is swapped
+        snapshot = {"indexed_files": current_files}
+        script_index = load_script_index(ai_ref_path)
+        if script_index is not None:
+            snapshot["script_index"] = script_index
+        component_registry = load_component_registry(ai_ref_path)
+        if component_registry is not None:
+            snapshot["component_registry"] = component_registry
+        librarian_context["snapshots"].publish(project_path, **snapshot)
+
+        # Let the unified context catch up with only what this update changed
+        changes = manifest.get("changes")
+        if apply_project_changes is not None and changes and changed_paths_for(changes):
+            apply_project_changes(project_path, changes)
+        return message
     except Exception as e:
         logger.error(f"Error updating librarian for {project_path}: {str(e)}")
+        return f"Error updating librarian: {str(e)}"
+
+def run_reindex_task(project_path, params, token):
+    """
+    TaskBoard handler of "reindex" tasks.
+    
+    Updates the project's librarian like generate_librarian, under the same
+    per-project indexing lock.
+    
+    Args:
+        project_path: Path to the project root
+        params: Optional "full_rebuild", "use_index_store" and "changed_paths"
+        token: Cancellation token of the task
+        
+    Returns:
+        Dictionary with the status and the indexer's message
+        
+    Raises:
+        RuntimeError: If the update failed, so the task is recorded as FAILED
+    """
+    token.check()
+    message = update_librarian_for_project(
+        project_path,
+        bool(params.get("full_rebuild")),
+        params.get("use_index_store"),
+        params.get("changed_paths")
+    )
+    if message.startswith("Error"):
+        raise RuntimeError(message)
+    return {"status": "success", "message": message}
+
+if TASKBOARD_AVAILABLE:
+    register_task_handler("reindex", run_reindex_task)
 
 # Create the monitoring thread but don't start it yet
 monitoring_thread = threading.Thread(target=monitor_projects, daemon=True)
@@ -377,24 +479,100 @@ def get_file_cache_stats() -> Dict[str, Any]:
     Get statistics about the file cache.
     
     Returns:
-        Dictionary with cache statistics including hit rate
+        Dictionary with cache statistics including hit rate, bytes held,
+        evictions and a breakdown by size class
     """
-    with state_lock:
-        entries = len(librarian_context["file_cache"])
-        hits = librarian_context["cache_stats"]["hits"]
-        misses = librarian_context["cache_stats"]["misses"]
-        total = hits + misses
-        hit_ratio = hits / total if total > 0 else 0
+    file_cache = librarian_context["file_cache"]
+    stats = file_cache.stats()
+    
+    return {
+        "status": "success",
+        "cache_entries": stats["entries"],
+        "cache_size_limit": stats["max_entries"],
+        "cache_age_limit": stats["max_age"],
+        "bytes_held": stats["bytes_held"],
+        "byte_budget": stats["max_bytes"],
+        "max_entry_bytes": stats["max_entry_bytes"],
+        "oversize_policy": stats["oversize_policy"],
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "hit_ratio": stats["hit_ratio"],
+        "evictions": stats["evictions"],
+        "rejections": stats["rejections"],
+        "by_size_class": stats["by_size_class"],
+        "shards": stats["shards"],
+        "lock_wait": stats["lock_wait"],
+        "cached_files": file_cache.paths()
+    }
+
+@mcp.tool()
+def get_lock_wait_stats() -> Dict[str, Any]:
+    """
+    Get contention statistics for the server's shared-state locks.
+    
+    Returns:
+        Dictionary with acquisitions, contended acquisitions and wait times
+        (in milliseconds) per lock, plus the generation of each project's
+        published index snapshot
+    """
+    snapshots = librarian_context["snapshots"].all()
+    return {
+        "status": "success",
+        "locks": get_lock_stats(),
+        "file_cache_lock_wait": librarian_context["file_cache"].stats()["lock_wait"],
+        "snapshots": {
+            project_path: {
+                "generation": snapshot.generation,
+                "published_at": snapshot.published_at,
+                "indexed_files": len(snapshot.indexed_files)
+            }
+            for project_path, snapshot in snapshots.items()
+        }
+    }
+
+@mcp.tool()
+def configure_file_cache(
+    max_bytes: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    max_entry_bytes: Optional[int] = None,
+    oversize_policy: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Change the limits of the file cache.
+    
+    Args:
+        max_bytes: Total byte budget of the cache
+        max_entries: Maximum number of cached files
+        max_entry_bytes: Files above this size follow the oversize policy
+            (defaults to a quarter of max_bytes when max_bytes changes)
+        oversize_policy: "reject" to never cache oversized files, or "admit"
+            to cache them as long as they fit in the whole budget
         
+    Returns:
+        Dictionary with the resulting cache limits
+    """
+    try:
+        file_cache = librarian_context["file_cache"]
+        file_cache.configure(
+            max_bytes=max_bytes,
+            max_entries=max_entries,
+            max_entry_bytes=max_entry_bytes,
+            oversize_policy=oversize_policy
+        )
+        stats = file_cache.stats()
         return {
             "status": "success",
-            "cache_entries": entries,
-            "cache_size_limit": librarian_context["cache_max_size"],
-            "cache_age_limit": librarian_context["cache_max_age"],
-            "hits": hits,
-            "misses": misses,
-            "hit_ratio": hit_ratio,
-            "cached_files": list(librarian_context["file_cache"].keys())
+            "byte_budget": stats["max_bytes"],
+            "cache_size_limit": stats["max_entries"],
+            "max_entry_bytes": stats["max_entry_bytes"],
+            "oversize_policy": stats["oversize_policy"],
+            "bytes_held": stats["bytes_held"],
+            "message": f"File cache limited to {stats['max_bytes']} bytes and {stats['max_entries']} entries"
+        }
+    except ValueError as e:
+        return {
+            "status": "error",
+            "message": str(e)
         }
 
 @mcp.tool()
@@ -454,69 +632,20 @@ def cache_get_file(file_path: str, encoding: str = "utf-8") -> Optional[Dict[str
     Returns:
         Cached file data or None if not available
     """
-    with state_lock:
-        # Check if file is in cache
-        if file_path not in librarian_context["file_cache"]:
-            librarian_context["cache_stats"]["misses"] += 1
-            return None
-            
-        # Get cached entry
-        cache_entry = librarian_context["file_cache"][file_path]
-        
-        # Check if cache entry is expired
-        current_time = time.time()
-        if current_time - cache_entry["cached_at"] > librarian_context["cache_max_age"]:
-            # Entry is expired, remove it
-            del librarian_context["file_cache"][file_path]
-            librarian_context["cache_stats"]["misses"] += 1
-            return None
-            
-        # Check if the file has been modified since it was cached
-        try:
-            stats = os.stat(file_path)
-            if stats.st_mtime > cache_entry["modified"]:
-                # File has been modified, remove from cache
-                del librarian_context["file_cache"][file_path]
-                librarian_context["cache_stats"]["misses"] += 1
-                return None
-        except Exception:
-            # If there's an error checking the file, assume it's invalid
-            del librarian_context["file_cache"][file_path]
-            librarian_context["cache_stats"]["misses"] += 1
-            return None
-            
-        # Cache hit
-        librarian_context["cache_stats"]["hits"] += 1
-        # Update access time
-        cache_entry["last_accessed"] = current_time
-        
-        return cache_entry
+    return librarian_context["file_cache"].get(file_path)
 
 def cache_set_file(file_path: str, file_data: Dict[str, Any]) -> None:
     """
     Add or update a file in the cache.
     
+    Files larger than the cache's per-entry limit are refused unless the
+    cache's oversize policy admits them.
+    
     Args:
         file_path: Path to the file
         file_data: File data dictionary
     """
-    with state_lock:
-        # Check if cache is full
-        if len(librarian_context["file_cache"]) >= librarian_context["cache_max_size"]:
-            # Remove the least recently accessed entry
-            lru_path = min(
-                librarian_context["file_cache"].items(),
-                key=lambda x: x[1]["last_accessed"]
-            )[0]
-            del librarian_context["file_cache"][lru_path]
-            
-        # Add the file to the cache
-        current_time = time.time()
-        librarian_context["file_cache"][file_path] = {
-            **file_data,
-            "cached_at": current_time,
-            "last_accessed": current_time
-        }
+    librarian_context["file_cache"].set(file_path, file_data)
 
 def clear_file_cache() -> Dict[str, Any]:
     """
@@ -525,24 +654,14 @@ def clear_file_cache() -> Dict[str, Any]:
     Returns:
         Dictionary with cache statistics
     """
-    with state_lock:
-        stats = {
-            "entries_cleared": len(librarian_context["file_cache"]),
-            "hits": librarian_context["cache_stats"]["hits"],
-            "misses": librarian_context["cache_stats"]["misses"],
-            "hit_ratio": 0
-        }
-        
-        # Calculate hit ratio
-        total_accesses = stats["hits"] + stats["misses"]
-        if total_accesses > 0:
-            stats["hit_ratio"] = stats["hits"] / total_accesses
-            
-        # Reset cache
-        librarian_context["file_cache"] = {}
-        librarian_context["cache_stats"] = {"hits": 0, "misses": 0}
-        
-        return stats
+    stats = librarian_context["file_cache"].clear()
+    return {
+        "entries_cleared": stats["entries"],
+        "bytes_cleared": stats["bytes_held"],
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "hit_ratio": stats["hit_ratio"]
+    }
 
 # Parse directories from command line args
 def initialize_allowed_directories():
@@ -571,6 +690,10 @@ def initialize_allowed_directories():
 # Get allowed directories
 ALLOWED_DIRECTORIES = initialize_allowed_directories()
 
+# Background tasks read and write project files too, so keep them to the same directories
+if TASKBOARD_AVAILABLE:
+    set_allowed_directories(ALLOWED_DIRECTORIES)
+
 # Initialize Tool Index integration
 def initialize_tool_index():
     """
@@ -666,8 +789,7 @@ def query_tool_index(query_type, query_params):
                     "_fallback_profile": True
                 }
 
-            with open(profile_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(profile_path)
 
         elif query_type == "relationship":
             rel_group = query_params.get("group")
@@ -678,16 +800,14 @@ def query_tool_index(query_type, query_params):
             # First check for a dedicated relationship file
             rel_path = os.path.join(tool_index_path, f"relationship_{rel_group}.json")
             if os.path.exists(rel_path):
-                with open(rel_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return load_json(rel_path)
 
             # Then check in the registry file
-            with open(registry_path, 'r', encoding='utf-8') as f:
-                registry = json.load(f)
-                if "relationships" in registry:
-                    for rel in registry["relationships"]:
-                        if rel.get("group_name") == rel_group:
-                            return rel
+            registry = load_json_dict(registry_path) or {}
+            if "relationships" in registry:
+                for rel in registry["relationships"]:
+                    if rel.get("group_name") == rel_group:
+                        return rel
 
             # Fallback for missing relationships
             logger.info(f"Relationship group not found: {rel_group}")
@@ -707,8 +827,7 @@ def query_tool_index(query_type, query_params):
 
             tree_path = os.path.join(tool_index_path, "decision_trees", f"{tree_id}.json")
             if os.path.exists(tree_path):
-                with open(tree_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return load_json(tree_path)
 
             # Fallback for missing decision trees
             logger.info(f"Decision tree not found: {tree_id}")
@@ -720,16 +839,14 @@ def query_tool_index(query_type, query_params):
             }
 
         elif query_type == "registry":
-            with open(registry_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(registry_path)
 
         elif query_type == "categories":
             categories_path = os.path.join(tool_index_path, "categories.json")
             if not os.path.exists(categories_path):
                 logger.info("Categories file not found, extracting from registry")
                 # Create a basic categories structure from registry
-                with open(registry_path, 'r', encoding='utf-8') as f:
-                    registry = json.load(f)
+                registry = load_json_dict(registry_path) or {}
 
                 # Extract relationships as categories
                 categories = {
@@ -748,8 +865,7 @@ def query_tool_index(query_type, query_params):
 
                 return categories
 
-            with open(categories_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(categories_path)
 
     except Exception as e:
         logger.error(f"Error querying Tool Index: {str(e)}")
@@ -803,8 +919,7 @@ def query_tool_index_for_taskboard(task_type):
             return None
 
         # Read and process registry
-        with open(registry_path, 'r', encoding='utf-8') as f:
-            registry = json.load(f)
+        registry = load_json_dict(registry_path) or {}
 
         # Check for TaskBoard integration section
         if "taskboard_integration" in registry:
@@ -964,8 +1079,22 @@ def resume_monitoring():
 
 # Context manager for pausing monitoring
 class MonitoringPauser:
+    """
+    Pause project monitoring for the duration of an operation.
+    
+    Args:
+        wait: Also wait for a re-index the monitoring thread has already
+            started. Read-only tools pass False: they read published
+            snapshots and need not wait for an update to finish.
+    """
+    def __init__(self, wait: bool = True):
+        self.wait = wait
+
     def __enter__(self):
         pause_monitoring()
+        if self.wait:
+            with monitor_update_lock:
+                pass
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -1317,25 +1446,161 @@ Diagnostic files help troubleshoot issues with code understanding and navigation
             logger.error(f"Error initializing AI Librarian: {str(e)}")
             return f"Error initializing AI Librarian: {str(e)}"
 
+def read_line_range(file_path: str, start_line: int, end_line: int, use_cache: bool = True) -> Optional[str]:
+    """
+    Read a range of lines from a source file.
+    
+    Uses the cached file content when available; otherwise only the lines up
+    to end_line are read from disk.
+    
+    Args:
+        file_path: Absolute path to the file
+        start_line: First line to return (1-based)
+        end_line: Last line to return (inclusive)
+        use_cache: Whether to use the file cache
+        
+    Returns:
+        The requested lines joined with newlines, or None if the file cannot be read
+    """
+    if use_cache:
+        file_data = cache_get_file(file_path)
+        if file_data and file_data.get("status") == "success" and isinstance(file_data.get("content"), str):
+            return "\n".join(file_data["content"].splitlines()[start_line - 1:end_line])
+
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = list(itertools.islice(f, start_line - 1, end_line))
+    except Exception as e:
+        logger.error(f"Error reading file {file_path}: {str(e)}")
+        return None
+
+    return "".join(lines).rstrip("\n")
+
+def query_component_from_symbols(
+    symbols: List[Dict[str, Any]],
+    project_path: str,
+    component_name: str,
+    use_cache: bool = True,
+    component_info: Optional[Dict[str, Any]] = None,
+    source: str = "symbol_index"
+) -> Dict[str, Any]:
+    """
+    Build a query_component response from indexed symbol locations.
+    
+    Symbol line ranges come from the index, so only the matching lines are
+    read from the source file; nothing is parsed.
+    
+    Args:
+        symbols: Matching symbols with file and line range
+        project_path: The root directory of the project
+        component_name: Component name, optionally qualified (e.g. "TaskBoard.submit_task")
+        use_cache: Whether to use the file cache
+        component_info: Optional component registry entry
+        source: Name of the index the symbols came from
+        
+    Returns:
+        Component information in the same shape as query_component
+    """
+    results = []
+    for symbol in symbols:
+        full_file_path = os.path.join(project_path, symbol["file"])
+        start_line = symbol["start_line"]
+        end_line = symbol["end_line"] or start_line
+        code = read_line_range(full_file_path, start_line, end_line, use_cache)
+        if code is None:
+            results.append({
+                "file_path": symbol["file"],
+                "error": "Error reading file"
+            })
+            continue
+
+        results.append({
+            "file_path": symbol["file"],
+            "component_type": symbol["kind"],
+            "qualified_name": symbol["qualified_name"],
+            "parent": symbol.get("parent"),
+            "line_range": f"{start_line}-{end_line}",
+            "code": code
+        })
+
+    result = {
+        "status": "success",
+        "component_name": component_name,
+        "found": True,
+        "results": results,
+        "count": len(results),
+        "source": source
+    }
+
+    if component_info:
+        result["description"] = component_info.get("description", "No description available")
+        result["dependencies"] = component_info.get("dependencies", [])
+
+    return result
+
+def script_index_matcher(ai_ref_path: str, script_index: Dict[str, Any]) -> NameMatcher:
+    """
+    Get the name matcher of a script index, mapping each class and function to its files.
+    
+    Args:
+        ai_ref_path: Path to the project's .ai_reference directory
+        script_index: The loaded script index
+        
+    Returns:
+        The cached matcher, rebuilt when the script index is reloaded
+    """
+    def build():
+        locations = {}
+        for file_path, file_info in script_index.get("files", {}).items():
+            for name in itertools.chain(file_info.get("classes", []), file_info.get("functions", [])):
+                locations.setdefault(name, []).append(file_path)
+        return NameMatcher(locations.keys(), locations)
+
+    return get_name_matcher(f"{ai_ref_path}#script_index", script_index, build)
+
+def component_not_found(component_name: str, matcher: Optional[NameMatcher]) -> Dict[str, Any]:
+    """
+    Build the query_component response for an unknown name, with fuzzy suggestions.
+    
+    Args:
+        component_name: The name that was not found
+        matcher: Name matcher of the index that was searched
+        
+    Returns:
+        Error response listing the closest known names with their scores
+    """
+    suggestions = matcher.suggest(component_name) if matcher is not None else []
+    message = f"Component '{component_name}' not found in the project."
+    if suggestions:
+        message += " Did you mean: " + ", ".join(suggestion["name"] for suggestion in suggestions) + "?"
+    return {
+        "status": "error",
+        "component_name": component_name,
+        "found": False,
+        "suggestions": suggestions,
+        "message": message
+    }
+
 @mcp.tool()
 def query_component(project_path: str, component_name: str, use_cache: bool = True) -> Dict[str, Any]:
     """
     Query information about a specific component in the project.
     
-    This tool searches for a component (class or function) in the project and returns
-    detailed information about it. It first checks the AI Librarian index for faster lookup,
-    and uses file caching to improve performance.
+    This tool searches for a component (class, function or method) in the project and returns
+    detailed information about it. Components are located through the AI Librarian's symbol
+    index, so only the component's lines are read, and file caching improves performance.
     
     Args:
         project_path: The root directory of the project
-        component_name: The name of the component to query
+        component_name: The name of the component to query, optionally qualified
+            (e.g. "TaskBoard.submit_task")
         use_cache: Whether to use the file cache (default: True)
         
     Returns:
         Detailed information about the component
     """
     # Pause monitoring during this operation
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
             # Check if project is in our active monitoring
             with state_lock:
@@ -1354,42 +1619,40 @@ def query_component(project_path: str, component_name: str, use_cache: bool = Tr
                     "message": f"AI Librarian not initialized at {project_path}. Run initialize_librarian first."
                 }
 
+            # Look the component up in the symbol location index (SQLite store or JSON)
+            store = get_index_store(project_path)
+            if store is not None:
+                symbols = store.find_symbols(component_name)
+                if not symbols:
+                    matcher = get_name_matcher(
+                        f"{ai_ref_path}#index_store", store,
+                        lambda: NameMatcher(store.symbol_names()), store.change_marker()
+                    )
+                    return component_not_found(component_name, matcher)
+                return query_component_from_symbols(
+                    symbols, project_path, component_name, use_cache,
+                    store.get_component(component_name), source="index_store"
+                )
+
+            symbol_index = load_symbol_index(ai_ref_path)
+            if symbol_index is not None:
+                symbols = symbol_index.lookup(component_name)
+                if not symbols:
+                    matcher = get_name_matcher(
+                        f"{ai_ref_path}#symbol_index", symbol_index,
+                        lambda: NameMatcher(symbol_index.all_names())
+                    )
+                    return component_not_found(component_name, matcher)
+                return query_component_from_symbols(symbols, project_path, component_name, use_cache)
+
             # Get script index - first check in-memory, then fallback to file
             script_index = None
             
             # Check for component registry first (faster lookup)
             component_registry_path = os.path.join(ai_ref_path, "component_registry.json")
             if os.path.exists(component_registry_path):
-                # Check cache first
-                registry_cached = False
-                if use_cache:
-                    registry_data = cache_get_file(component_registry_path)
-                    if registry_data and registry_data.get("content"):
-                        try:
-                            registry = json.loads(registry_data["content"])
-                            registry_cached = True
-                        except:
-                            logger.warning("Failed to parse cached registry, reading from disk")
-                
-                # If not cached or cache disabled, read from disk
-                if not registry_cached:
-                    try:
-                        with open(component_registry_path, 'r', encoding='utf-8') as f:
-                            registry = json.load(f)
-                            # Add to cache if enabled
-                            if use_cache:
-                                cache_set_file(component_registry_path, {
-                                    "status": "success",
-                                    "path": component_registry_path,
-                                    "content": json.dumps(registry),
-                                    "size": os.path.getsize(component_registry_path),
-                                    "mime_type": "application/json",
-                                    "encoding": "utf-8",
-                                    "modified": os.path.getmtime(component_registry_path)
-                                })
-                    except Exception as e:
-                        logger.warning(f"Error reading component registry: {str(e)}")
-                        registry = None
+                # Parsed once per registry change and shared between queries
+                registry = load_json_dict(component_registry_path)
                 
                 # If we found the component in registry, use that info directly
                 if registry and "components" in registry and component_name in registry["components"]:
@@ -1397,7 +1660,7 @@ def query_component(project_path: str, component_name: str, use_cache: bool = Tr
                     logger.info(f"Component found directly in registry: {component_name}")
                     
                     # Get the file containing the component
-                    file_path = component_info.get("file", "")
+                    file_path = component_info.get("file") or component_info.get("primary_file", "")
                     full_file_path = os.path.join(project_path, file_path)
                     
                     # Use our cached file reading for better performance
@@ -1470,10 +1733,10 @@ def query_component(project_path: str, component_name: str, use_cache: bool = Tr
                     }
             
             # Fall back to script index if registry approach failed
-            with state_lock:
-                if project_path in librarian_context["projects"]:
-                    script_index = librarian_context["projects"][project_path]
-                    logger.info("Using in-memory script index")
+            snapshot = librarian_context["snapshots"].get(project_path)
+            if snapshot is not None and snapshot.script_index is not None:
+                script_index = snapshot.script_index
+                logger.info("Using in-memory script index")
 
             if script_index is None:
                 script_index_path = os.path.join(ai_ref_path, "script_index.json")
@@ -1483,80 +1746,27 @@ def query_component(project_path: str, component_name: str, use_cache: bool = Tr
                         "message": f"Script index not found at {script_index_path}."
                     }
 
-                # Try to use cache for script index
-                script_index_cached = False
-                if use_cache:
-                    index_data = cache_get_file(script_index_path)
-                    if index_data and index_data.get("content"):
-                        try:
-                            script_index = json.loads(index_data["content"])
-                            script_index_cached = True
-                            logger.info("Using cached script index")
-                        except:
-                            logger.warning("Failed to parse cached index, reading from disk")
-                
-                # If not cached or parsing failed, read from disk
-                if not script_index_cached:
-                    with open(script_index_path, 'r', encoding='utf-8') as f:
-                        script_index = json.load(f)
-                        # Cache it for future use
-                        with state_lock:
-                            librarian_context["projects"][project_path] = script_index
-                        
-                        # Add to file cache if enabled
-                        if use_cache:
-                            cache_set_file(script_index_path, {
-                                "status": "success",
-                                "path": script_index_path,
-                                "content": json.dumps(script_index),
-                                "size": os.path.getsize(script_index_path),
-                                "mime_type": "application/json",
-                                "encoding": "utf-8",
-                                "modified": os.path.getmtime(script_index_path)
-                            })
+                script_index = load_json_dict(script_index_path)
+                if script_index is None:
+                    return {
+                        "status": "error",
+                        "message": f"Error loading script index from {script_index_path}."
+                    }
+                librarian_context["snapshots"].publish(project_path, script_index=script_index)
+
+            # Only the files defining the name are read; an unknown name is answered from the name index
+            matcher = script_index_matcher(ai_ref_path, script_index)
+            candidate_files = matcher.files_for(component_name)
+            if not candidate_files:
+                return component_not_found(component_name, matcher)
 
-            # Search for the component in all files
             results = []
 
-            for file_path, file_info in script_index["files"].items():
+            for file_path in candidate_files:
+                file_info = script_index["files"].get(file_path, {})
                 if (component_name in file_info.get("classes", []) or
                     component_name in file_info.get("functions", [])):
 
-                    # Read the mini-librarian for more details
-                    mini_librarian_path = os.path.join(ai_ref_path, file_info["mini_librarian"])
-                    
-                    # Check cache for mini-librarian
-                    mini_librarian = None
-                    if use_cache and os.path.exists(mini_librarian_path):
-                        mini_lib_data = cache_get_file(mini_librarian_path)
-                        if mini_lib_data and mini_lib_data.get("content"):
-                            try:
-                                mini_librarian = json.loads(mini_lib_data["content"])
-                                logger.info(f"Using cached mini-librarian for {file_path}")
-                            except:
-                                logger.warning(f"Failed to parse cached mini-librarian, reading from disk: {mini_librarian_path}")
-                    
-                    # If not cached or parsing failed, read from disk
-                    if mini_librarian is None and os.path.exists(mini_librarian_path):
-                        try:
-                            with open(mini_librarian_path, 'r', encoding='utf-8') as f:
-                                mini_librarian = json.load(f)
-                                
-                                # Add to cache if enabled
-                                if use_cache:
-                                    cache_set_file(mini_librarian_path, {
-                                        "status": "success",
-                                        "path": mini_librarian_path,
-                                        "content": json.dumps(mini_librarian),
-                                        "size": os.path.getsize(mini_librarian_path),
-                                        "mime_type": "application/json",
-                                        "encoding": "utf-8",
-                                        "modified": os.path.getmtime(mini_librarian_path)
-                                    })
-                        except Exception as e:
-                            logger.warning(f"Error reading mini-librarian {mini_librarian_path}: {str(e)}")
-                            mini_librarian = None
-
                     # Check if the file exists
                     full_file_path = os.path.join(project_path, file_path)
                     if os.path.exists(full_file_path):
@@ -1577,7 +1787,6 @@ def query_component(project_path: str, component_name: str, use_cache: bool = Tr
                                     file_content = f.read()
                                 
                                 # Extract the component's code
-                                import ast
                                 try:
                                     tree = ast.parse(file_content)
                                     for node in ast.walk(tree):
@@ -1628,10 +1837,7 @@ def query_component(project_path: str, component_name: str, use_cache: bool = Tr
                                 })
 
             if not results:
-                return {
-                    "status": "error",
-                    "message": f"Component '{component_name}' not found in the project."
-                }
+                return component_not_found(component_name, matcher)
 
             # Return structured results
             return {
@@ -1649,21 +1855,39 @@ def query_component(project_path: str, component_name: str, use_cache: bool = Tr
             }
 
 @mcp.tool()
-def find_implementation(project_path: str, search_text: str, file_pattern: str = None) -> Dict[str, Any]:
+def find_implementation(project_path: str, search_text: str, file_pattern: str = None,
+                        regex: bool = False, max_results: int = 100,
+                        limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
     """
     Find implementations containing the specified search text.
     
+    When the AI Librarian's trigram index is available, only files containing every
+    trigram of the search text are read; otherwise all code files are scanned.
+    
+    With a limit, results are paged: the scan stops once a page is full, and passing
+    the returned `next_cursor` resumes it from a server-side snapshot.
+    
     Args:
         project_path: The root directory of the project
-        search_text: The text to search for
+        search_text: The text to search for (case-insensitive)
         file_pattern: Optional pattern to filter files (e.g., "*.py")
+        regex: Treat search_text as a regular expression
+        max_results: Maximum number of matching files to return
+        limit: Maximum number of matching files per page; enables paging
+        cursor: Cursor returned by a previous page of the same search
         
     Returns:
         List of matching implementations with context
     """
     # Pause monitoring during this operation
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
+            # Follow-up pages come from the snapshot of the first one
+            result_pages = librarian_context["result_pages"]
+            query = ("find_implementation", os.path.abspath(project_path), search_text, file_pattern, regex, max_results)
+            if cursor is not None:
+                return page_response(result_pages.next(cursor, query, limit), "results", "matching files")
+
             # Check if project is in active monitoring
             with state_lock:
                 is_active = project_path in librarian_context["active_projects"]
@@ -1671,8 +1895,19 @@ def find_implementation(project_path: str, search_text: str, file_pattern: str =
             if is_active:
                 logger.info(f"Using in-memory context for searching: {search_text}")
 
-            results = []
-            search_text = search_text.lower()
+            # Build the line matcher
+            if regex:
+                try:
+                    compiled_pattern = re.compile(search_text, re.IGNORECASE)
+                except re.error as e:
+                    return {
+                        "status": "error",
+                        "message": f"Invalid regular expression '{search_text}': {str(e)}"
+                    }
+                line_matches = lambda line: compiled_pattern.search(line) is not None
+            else:
+                search_text = search_text.lower()
+                line_matches = lambda line: search_text in line.lower()
 
             # Determine which extensions to search based on file_pattern
             extensions = []
@@ -1684,7 +1919,7 @@ def find_implementation(project_path: str, search_text: str, file_pattern: str =
                     extensions.append(file_pattern)
             else:
                 # Default to common code files
-                extensions = [".py", ".js", ".ts", ".java", ".c", ".cpp", ".cs", ".go", ".rb", ".php"]
+                extensions = list(DEFAULT_CODE_EXTENSIONS)
 
             # Function to check if a file should be searched
             def should_search_file(filename):
@@ -1692,74 +1927,127 @@ def find_implementation(project_path: str, search_text: str, file_pattern: str =
                     return True
                 return any(filename.endswith(ext) for ext in extensions)
 
-            # Walk the directory tree
-            for root, dirs, files in os.walk(project_path):
-                # Skip hidden directories and common excluded directories
-                dirs[:] = [d for d in dirs if not d.startswith('.') and
-                          d not in ['venv', 'env', 'node_modules', '__pycache__', '.git']]
+            # Get candidate files from the trigram index when it covers the requested file types
+            trigram_index = None
+            if extensions and all(ext in DEFAULT_CODE_EXTENSIONS for ext in extensions):
+                trigram_index = load_trigram_index(project_path)
 
-                # Search files
-                for filename in files:
-                    if should_search_file(filename):
-                        file_path = os.path.join(root, filename)
-                        rel_path = os.path.relpath(file_path, project_path)
+            if trigram_index is not None:
+                if regex:
+                    candidates = trigram_index.regex_candidates(search_text)
+                else:
+                    candidates = trigram_index.literal_candidates(search_text)
+                candidate_files = [
+                    os.path.join(project_path, rel_path) for rel_path in candidates
+                    if should_search_file(rel_path)
+                ]
+            else:
+                # Walk the directory tree lazily, so reaching max_results ends the walk
+                candidate_files = (
+                    os.path.join(project_path, rel_path)
+                    for rel_path in iter_files(
+                        project_path,
+                        accept=lambda name, rel_path: should_search_file(name),
+                        respect_gitignore=False,
+                        parallel=False
+                    )
+                )
+
+            # Verify the candidates lazily, so a full page or max_results ends the scan
+            def iter_results():
+                for file_path in candidate_files:
+                    rel_path = os.path.relpath(file_path, project_path)
 
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-
-                            # Search for the text
-                            if search_text in content.lower():
-                                # Find matching lines with context
-                                lines = content.splitlines()
-                                matches = []
-
-                                for i, line in enumerate(lines):
-                                    if search_text in line.lower():
-                                        # Get context (3 lines before and after)
-                                        start = max(0, i - 3)
-                                        end = min(len(lines), i + 4)
-
-                                        # Format the context
-                                        context = []
-                                        for j in range(start, end):
-                                            line_num = j + 1
-                                            line_text = lines[j]
-                                            # Highlight the matching line
-                                            if j == i:
-                                                context.append(f"{line_num:4d}* {line_text}")
-                                            else:
-                                                context.append(f"{line_num:4d}  {line_text}")
-
-                                        matches.append("\n".join(context))
-
-                                if matches:
-                                    results.append({
-                                        "file": rel_path,
-                                        "matches": matches
-                                    })
-                        except UnicodeDecodeError:
-                            # Skip binary files
-                            pass
-                        except Exception as e:
-                            logger.error(f"Error searching file {file_path}: {str(e)}")
-                            # Don't include errors in results to avoid strange output
+                    try:
+                        with open(file_path, 'r', encoding='utf-8') as f:
+                            content = f.read()
+
+                        # Find matching lines with context
+                        lines = content.splitlines()
+                        matches = []
+
+                        for i, line in enumerate(lines):
+                            if line_matches(line):
+                                # Get context (3 lines before and after)
+                                start = max(0, i - 3)
+                                end = min(len(lines), i + 4)
+
+                                # Format the context
+                                context = []
+                                for j in range(start, end):
+                                    line_num = j + 1
+                                    line_text = lines[j]
+                                    # Highlight the matching line
+                                    if j == i:
+                                        context.append(f"{line_num:4d}* {line_text}")
+                                    else:
+                                        context.append(f"{line_num:4d}  {line_text}")
+
+                                matches.append("\n".join(context))
+
+                        if matches:
+                            yield {
+                                "file": rel_path,
+                                "matches": matches
+                            }
+                    except UnicodeDecodeError:
+                        # Skip binary files
+                        pass
+                    except FileNotFoundError:
+                        # The index can list files deleted since it was last updated
+                        pass
+                    except Exception as e:
+                        logger.error(f"Error searching file {file_path}: {str(e)}")
+                        # Don't include errors in results to avoid strange output
+
+            scan = iter_results()
+            source = "trigram_index" if trigram_index is not None else "filesystem_walk"
+
+            # Look up matching definitions in the index store, if the project has one
+            definitions = []
+            store = get_index_store(project_path)
+            if store is not None and not regex:
+                definitions = store.search_symbols(search_text)
+
+            if limit is not None:
+                meta = {"found": True, "search_text": search_text, "file_pattern": file_pattern, "source": source}
+                page = result_pages.open(query, itertools.islice(scan, max_results), limit, meta)
+                response = page_response(page, "results", "matching files")
+                response["found"] = bool(response["results"] or definitions)
+                if store is not None:
+                    response["definitions"] = definitions
+                return response
+
+            results = list(itertools.islice(scan, max_results))
+            # Only look for one more match when the cap was reached
+            truncated = len(results) == max_results and next(scan, None) is not None
+            scan.close()
 
             # Return structured results
-            if not results:
+            if not results and not definitions:
                 return {
                     "status": "success",
                     "found": False,
                     "message": f"No matches found for '{search_text}'"
                 }
 
-            return {
+            response = {
                 "status": "success",
                 "found": True,
                 "search_text": search_text,
                 "file_pattern": file_pattern,
                 "results": results,
-                "count": len(results)
+                "count": len(results),
+                "truncated": truncated,
+                "source": source
+            }
+            if store is not None:
+                response["definitions"] = definitions
+            return response
+        except CursorError as e:
+            return {
+                "status": "error",
+                "message": str(e)
             }
         except Exception as e:
             logger.error(f"Error finding implementation: {str(e)}")
@@ -1768,6 +2056,59 @@ def find_implementation(project_path: str, search_text: str, file_pattern: str =
                 "message": f"Error finding implementation: {str(e)}"
             }
 
+@mcp.tool()
+def search_code(project_path: str, query: str, top_k: int = 10) -> Dict[str, Any]:
+    """
+    Rank a project's files by relevance to a query.
+    
+    Uses the AI Librarian's BM25 search index over symbol names (split on camelCase
+    and snake_case), parameters, constants, docstrings and paths, so the best few
+    files can be read instead of every file a substring search matches.
+    
+    Args:
+        project_path: The root directory of the project
+        query: Free text or identifiers, e.g. "cancel running task" or "TaskBoard"
+        top_k: Number of files to return (default: 10)
+        
+    Returns:
+        Dictionary with the best-matching files, highest score first
+    """
+    try:
+        project_path = os.path.abspath(project_path)
+        if not validate_path(project_path, ALLOWED_DIRECTORIES):
+            return {
+                "status": "error",
+                "message": f"Access denied: {project_path} is not within allowed directories"
+            }
+
+        search_index = load_search_index(os.path.join(project_path, ".ai_reference"))
+        if search_index is None:
+            return {
+                "status": "error",
+                "message": f"Search index not found for {project_path}. Run generate_librarian first."
+            }
+
+        started = time.perf_counter()
+        results = search_index.search(query, top_k)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        return {
+            "status": "success",
+            "query": query,
+            "results": results,
+            "count": len(results),
+            "indexed_files": len(search_index),
+            "scoring": "numpy" if NUMPY_AVAILABLE else "python",
+            "elapsed_ms": round(elapsed_ms, 3),
+            "message": f"Found {len(results)} relevant files for '{query}'" if results else f"No indexed files match '{query}'"
+        }
+    except Exception as e:
+        logger.error(f"Error searching code: {str(e)}")
+        return {
+            "status": "error",
+            "message": f"Error searching code: {str(e)}"
+        }
+
 @mcp.tool()
 def initialize_tool_index(project_path: str) -> Dict[str, Any]:
     """
@@ -1876,12 +2217,18 @@ def initialize_tool_index(project_path: str) -> Dict[str, Any]:
             }
 
 @mcp.tool()
-def generate_librarian(project_path: str) -> str:
+def generate_librarian(project_path: str, full_rebuild: bool = False, use_index_store: Optional[bool] = None) -> str:
     """
     Generate or update the AI Librarian for a project.
     
+    Updates are incremental: only files added, modified or deleted since the
+    last run are reindexed. Set full_rebuild to regenerate everything.
+    
     Args:
         project_path: The root directory of the project
+        full_rebuild: Ignore the index manifest and rebuild from scratch
+        use_index_store: Keep the index in a SQLite database instead of per-file
+            JSON mini-librarians (None keeps the project's current setting)
         
     Returns:
         A success message with statistics or error information
@@ -1904,22 +2251,20 @@ def generate_librarian(project_path: str) -> str:
                     librarian_context["last_update"][project_path] = time.time()
                     logger.info(f"Added project to active monitoring: {project_path}")
 
-            # Force update the librarian
-            update_librarian_for_project(project_path)
+            # Force update the librarian; this waits for a reindex task or
+            # watcher update of the project that is still running
+            update_librarian_for_project(project_path, full_rebuild, use_index_store)
 
             # Get stats
             file_count = 0
             component_count = 0
 
-            # Count components from in-memory representation
-            with state_lock:
-                if project_path in librarian_context["components"]:
-                    component_registry = librarian_context["components"][project_path]
-                    component_count = len(component_registry.get("components", {}))
-
-                # Count files from in-memory representation
-                if project_path in librarian_context["indexed_files"]:
-                    file_count = len(librarian_context["indexed_files"][project_path])
+            # Count components and files from the published snapshot
+            snapshot = librarian_context["snapshots"].get(project_path)
+            if snapshot is not None:
+                if snapshot.component_registry is not None:
+                    component_count = len(snapshot.component_registry.get("components", {}))
+                file_count = len(snapshot.indexed_files)
 
             # Run diagnostic checks to verify librarian functionality
             diagnostic_results = run_librarian_diagnostics(project_path)
@@ -1934,6 +2279,102 @@ def generate_librarian(project_path: str) -> str:
             logger.error(f"Error generating librarian: {str(e)}")
             return f"Error generating librarian: {str(e)}"
 
+@mcp.tool()
+def export_librarian_index(project_path: str) -> Dict[str, Any]:
+    """
+    Export the SQLite index store of a project as JSON mini-librarians.
+    
+    Projects using the index store keep per-file details in .ai_reference/index.db.
+    This writes the per-file JSON mini-librarians under .ai_reference/scripts for
+    tools that read them directly.
+    
+    Args:
+        project_path: The root directory of the project
+        
+    Returns:
+        Dictionary with the number of exported files
+    """
+    with MonitoringPauser():
+        try:
+            store = get_index_store(project_path)
+            if store is None:
+                return {
+                    "status": "error",
+                    "message": f"No index store found for {project_path}. Run generate_librarian with use_index_store=True first."
+                }
+
+            ai_ref_path = os.path.join(project_path, ".ai_reference")
+            exported = store.export_json(ai_ref_path)
+
+            return {
+                "status": "success",
+                "message": f"Exported {exported} mini-librarians to {os.path.join(ai_ref_path, 'scripts')}",
+                "exported": exported
+            }
+        except Exception as e:
+            logger.error(f"Error exporting librarian index: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"Error exporting librarian index: {str(e)}"
+            }
+
+@mcp.tool()
+def get_project_changes(project_path: str) -> Dict[str, Any]:
+    """
+    Show what changed in a project's Python files since the last librarian generation.
+
+    Returns both the pending changes (files changed on disk since the index was
+    last written) and the change set the last generation applied.
+
+    Args:
+        project_path: The root directory of the project
+
+    Returns:
+        Dictionary with "pending" and "last_generation" change sets, each with
+        added, modified, deleted and renamed paths relative to the project
+    """
+    with MonitoringPauser(wait=False):
+        try:
+            project_path = os.path.abspath(project_path)
+            if not validate_path(project_path, ALLOWED_DIRECTORIES):
+                return {
+                    "status": "error",
+                    "message": f"Access denied: {project_path} is not within allowed directories"
+                }
+
+            manifest = load_manifest(os.path.join(project_path, ".ai_reference"))
+            if manifest is None:
+                return {
+                    "status": "error",
+                    "message": f"AI Librarian not initialized for {project_path}. Run generate_librarian first."
+                }
+
+            pending = check_project_changes(project_path)
+            if pending is None:
+                return {
+                    "status": "error",
+                    "message": f"Error checking changes for {project_path}"
+                }
+
+            counts = {key: len(pending[key]) for key in ("added", "modified", "deleted", "renamed")}
+            return {
+                "status": "success",
+                "project_path": project_path,
+                "last_generation_time": manifest.get("updated"),
+                "pending": pending,
+                "last_generation": manifest.get("changes"),
+                "message": (
+                    f"{counts['added']} added, {counts['modified']} modified, {counts['deleted']} deleted, "
+                    f"{counts['renamed']} renamed since the last generation"
+                )
+            }
+        except Exception as e:
+            logger.error(f"Error getting project changes: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"Error getting project changes: {str(e)}"
+            }
+
 @mcp.tool()
 def initialize_ai_dev_toolkit(project_path: str) -> Dict[str, Any]:
     """
@@ -1992,12 +2433,11 @@ def initialize_ai_dev_toolkit(project_path: str) -> Dict[str, Any]:
     # For AI Librarian
     file_count = 0
     component_count = 0
-    with state_lock:
-        if project_path in librarian_context["components"]:
-            component_registry = librarian_context["components"][project_path]
-            component_count = len(component_registry.get("components", {}))
-        if project_path in librarian_context["indexed_files"]:
-            file_count = len(librarian_context["indexed_files"][project_path])
+    snapshot = librarian_context["snapshots"].get(project_path)
+    if snapshot is not None:
+        if snapshot.component_registry is not None:
+            component_count = len(snapshot.component_registry.get("components", {}))
+        file_count = len(snapshot.indexed_files)
     
     # For Tool Reference
     tool_count = 0
@@ -2371,7 +2811,7 @@ def list_todos(project_path: str, status: str = "active", priority: str = None,
         Formatted list of matching to-do items
     """
     # Use monitoring pauser to prevent output corruption
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
             # Check if the AI Librarian exists
             ai_ref_path = os.path.join(project_path, ".ai_reference")
@@ -2530,7 +2970,7 @@ def search_todos(project_path: str, query: str) -> Dict[str, Any]:
         Formatted list of matching to-do items
     """
     # Use monitoring pauser to prevent output corruption
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
             # Check if the AI Librarian exists
             ai_ref_path = os.path.join(project_path, ".ai_reference")
@@ -2633,7 +3073,7 @@ def get_bookmark_content(project_path: str, bookmark_id: str) -> Dict[str, Any]:
         Dictionary with the bookmark content
     """
     # Pause monitoring during this operation
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
             # Initialize the edit bookmark manager
             bookmark_manager = EditBookmark(project_path)
@@ -2762,7 +3202,7 @@ def list_bookmarks(project_path: str) -> Dict[str, Any]:
         Dictionary with all active bookmarks
     """
     # Pause monitoring during this operation
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
             # Initialize the edit bookmark manager
             bookmark_manager = EditBookmark(project_path)
@@ -2823,162 +3263,90 @@ def remove_bookmark(project_path: str, bookmark_id: str) -> Dict[str, Any]:
                 "bookmark_id": bookmark_id,
                 "message": f"Removed bookmark '{bookmark_id}'"
             }
-        except Exception as e:
-            logger.error(f"Error removing bookmark: {str(e)}")
-            return {
-                "status": "error",
-                "message": f"Error removing bookmark: {str(e)}"
-            }
-
-@mcp.tool()
-def read_file(path: str, encoding: str = "utf-8", use_cache: bool = True) -> Dict[str, Any]:
-    """
-    Read the complete contents of a file.
-    
-    This tool allows reading the contents of a file within the allowed directories,
-    which is useful for examining code, configuration files, or documentation.
-    
-    For improved performance, it uses a file cache to avoid reading the same file repeatedly.
-    
-    Args:
-        path: Path to the file to read
-        encoding: File encoding (default: utf-8)
-        use_cache: Whether to use the file cache (default: True)
-        
-    Returns:
-        Dictionary with the file content and metadata
-    """
-    # Pause monitoring during this operation
-    with MonitoringPauser():
-        try:
-            # Normalize the path
-            path = os.path.abspath(path)
-
-            # Check if path is within allowed directories
-            if not any(path.startswith(allowed_dir) for allowed_dir in ALLOWED_DIRECTORIES):
-                return {
-                    "status": "error",
-                    "message": f"Access denied: {path} is not within allowed directories"
-                }
-
-            # Check if file exists
-            if not os.path.isfile(path):
-                # Special case: Check if there's an index that contains info about this
-                # Look for project roots that might have an .ai_reference directory
-                for allowed_dir in ALLOWED_DIRECTORIES:
-                    if path.startswith(allowed_dir):
-                        # Check for .ai_reference in the project
-                        rel_path = os.path.relpath(path, allowed_dir)
-                        ai_ref_path = os.path.join(allowed_dir, ".ai_reference")
-                        script_index_path = os.path.join(ai_ref_path, "script_index.json")
-                        
-                        if os.path.exists(script_index_path):
-                            try:
-                                with open(script_index_path, 'r', encoding='utf-8') as f:
-                                    script_index = json.load(f)
-                                
-                                # Look for this path in the script index
-                                if rel_path in script_index.get("files", {}):
-                                    # We found a reference, suggest using indexed info
-                                    return {
-                                        "status": "indexed_only",
-                                        "path": path,
-                                        "message": f"File not found directly but exists in the index. Use index_query tool instead.",
-                                        "indexed_path": rel_path,
-                                        "index_location": script_index_path
-                                    }
-                            except Exception:
-                                pass  # Continue with normal error handling
-                
-                return {
-                    "status": "error",
-                    "message": f"File not found: {path}"
-                }
-
-            # Check if we have read permission
-            if not os.access(path, os.R_OK):
-                return {
-                    "status": "error",
-                    "message": f"Permission denied: Cannot read {path}"
-                }
-                
-            # Check cache first if enabled
-            if use_cache:
-                cached_data = cache_get_file(path, encoding)
-                if cached_data:
-                    logger.info(f"Using cached data for: {path}")
-                    # Add cache hit indicator
-                    result = {**cached_data}
-                    result["from_cache"] = True
-                    return result
-
-            # Try to determine MIME type
-            mime_type, _ = mimetypes.guess_type(path)
-            if mime_type is None:
-                # Default to text if we can't determine
-                mime_type = "text/plain"
-
-            # Read the file content
-            try:
-                with open(path, 'r', encoding=encoding) as f:
-                    content = f.read()
-
-                # Get file stats
-                stats = os.stat(path)
-                
-                # Create result
-                result = {
-                    "status": "success",
-                    "path": path,
-                    "content": content,
-                    "size": stats.st_size,
-                    "mime_type": mime_type,
-                    "encoding": encoding,
-                    "modified": stats.st_mtime,
-                    "created": stats.st_ctime,
-                    "from_cache": False
-                }
-                
-                # Add to cache if enabled
-                if use_cache:
-                    cache_set_file(path, result)
-                
-                return result
-                
-            except UnicodeDecodeError:
-                # Try to read as binary for non-text files
-                try:
-                    with open(path, 'rb') as f:
-                        binary_content = f.read()
+        except Exception as e:
+            logger.error(f"Error removing bookmark: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"Error removing bookmark: {str(e)}"
+            }
 
-                    # Create binary result
-                    result = {
-                        "status": "binary",
-                        "path": path,
-                        "size": len(binary_content),
-                        "mime_type": mime_type or "application/octet-stream",
-                        "encoding": "binary",
-                        "message": f"Binary file detected ({len(binary_content)} bytes). Content not displayed.",
-                        "from_cache": False
-                    }
-                    
-                    # Add to cache if enabled
-                    if use_cache:
-                        cache_set_file(path, result)
-                    
-                    return result
-                    
-                except Exception as bin_error:
+@mcp.tool()
+def read_file(
+    path: str,
+    encoding: str = "utf-8",
+    use_cache: bool = True,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Read the contents of a file, or part of it.
+    
+    This tool allows reading the contents of a file within the allowed directories,
+    which is useful for examining code, configuration files, or documentation.
+    
+    For large files, read a byte range (`offset`/`limit`) or a line range
+    (`start_line`/`end_line`) instead of the whole file. When more of the range
+    remains, the result includes `next_cursor`; pass it back as `cursor` to get
+    the next chunk.
+    
+    Text results include a `content_hash`. Pass it back as `if_none_match` to
+    get a small `"status": "unchanged"` response instead of the content when
+    the file (or range) has not changed since.
+    
+    For improved performance, it uses a file cache to avoid reading the same file repeatedly.
+    
+    Args:
+        path: Path to the file to read
+        encoding: File encoding (default: utf-8)
+        use_cache: Whether to use the file cache (default: True)
+        offset: First byte to read
+        limit: Maximum number of bytes to return
+        start_line: First line to read (1-based)
+        end_line: Last line to read (inclusive)
+        cursor: Cursor from a previous ranged read, to continue where it stopped
+        if_none_match: Content hash from a previous read of the same file or range
+        
+    Returns:
+        Dictionary with the file content and metadata
+    """
+    # Pause monitoring during this operation
+    with MonitoringPauser(wait=False):
+        try:
+            # Ranged reads only touch the requested part of the file
+            if any(arg is not None for arg in (offset, limit, start_line, end_line, cursor)):
+                path = os.path.abspath(path)
+                refused = check_readable(path, ALLOWED_DIRECTORIES)
+                if refused is not None:
+                    return refused
+                try:
+                    return read_range(
+                        path,
+                        encoding,
+                        offset=offset,
+                        limit=limit,
+                        start_line=start_line,
+                        end_line=end_line,
+                        cursor=cursor,
+                        file_cache=librarian_context["file_cache"],
+                        use_cache=use_cache,
+                        if_none_match=if_none_match
+                    )
+                except RangeError as e:
                     return {
                         "status": "error",
-                        "message": f"Error reading binary file: {str(bin_error)}"
+                        "message": str(e)
                     }
-            except Exception as e:
-                logger.error(f"Error reading file {path}: {str(e)}")
-                return {
-                    "status": "error",
-                    "message": f"Error reading file: {str(e)}"
-                }
+
+            # Whole-file reads share read_multiple_files' checks, cache and conditional reads
+            _, result, _ = read_path(
+                path, ALLOWED_DIRECTORIES, librarian_context["file_cache"], use_cache,
+                encoding=encoding, if_none_match=if_none_match
+            )
+            return result
         except Exception as e:
             logger.error(f"Error in read_file: {str(e)}")
             return {
@@ -2987,7 +3355,15 @@ def read_file(path: str, encoding: str = "utf-8", use_cache: bool = True) -> Dic
             }
 
 @mcp.tool()
-def read_multiple_files(paths: List[str], use_cache: bool = True) -> Dict[str, Any]:
+def read_multiple_files(
+    paths: List[str],
+    use_cache: bool = True,
+    parallel: bool = True,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = DEFAULT_READ_TIMEOUT,
+    max_total_bytes: Optional[int] = DEFAULT_MAX_TOTAL_BYTES,
+    if_none_match: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
     """
     Read the contents of multiple files simultaneously.
     
@@ -2995,165 +3371,47 @@ def read_multiple_files(paths: List[str], use_cache: bool = True) -> Dict[str, A
     or compare multiple files. Each file's content is returned with its path as a
     reference. Failed reads for individual files won't stop the entire operation.
     
+    Files are read on a bounded thread pool and returned in the order requested.
+    Once the returned contents reach `max_total_bytes`, the remaining files are
+    truncated and marked with `"truncated": True`.
+    
+    Files whose content hash matches the one given in `if_none_match` are
+    returned as `"status": "unchanged"` without their content.
+    
     For improved performance, it uses a file cache to avoid reading the same files repeatedly.
     
     Args:
         paths: List of file paths to read
         use_cache: Whether to use the file cache (default: True)
+        parallel: Read the files concurrently (default: True)
+        max_workers: Maximum number of files read at once (default: the pool size)
+        timeout: Seconds to wait for each file before reporting a timeout (None waits indefinitely)
+        max_total_bytes: Cap on the total content returned (None for no cap)
+        if_none_match: Map of file paths to content hashes from previous reads
         
     Returns:
         Dictionary mapping file paths to their contents or error messages
     """
     # Pause monitoring during this operation
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
-            results = {}
-            cache_stats = {"hits": 0, "misses": 0, "total": len(paths)}
-
-            for path in paths:
-                try:
-                    # Normalize the path
-                    path = os.path.abspath(path)
-
-                    # Check if path is within allowed directories
-                    if not any(path.startswith(allowed_dir) for allowed_dir in ALLOWED_DIRECTORIES):
-                        results[path] = {
-                            "status": "error",
-                            "message": f"Access denied: {path} is not within allowed directories"
-                        }
-                        continue
-
-                    # Check if file exists
-                    if not os.path.isfile(path):
-                        # Check if indexed but not found directly
-                        indexed = False
-                        for allowed_dir in ALLOWED_DIRECTORIES:
-                            if path.startswith(allowed_dir):
-                                # Check for .ai_reference in the project
-                                rel_path = os.path.relpath(path, allowed_dir)
-                                ai_ref_path = os.path.join(allowed_dir, ".ai_reference")
-                                script_index_path = os.path.join(ai_ref_path, "script_index.json")
-                                
-                                if os.path.exists(script_index_path):
-                                    try:
-                                        with open(script_index_path, 'r', encoding='utf-8') as f:
-                                            script_index = json.load(f)
-                                        
-                                        # Look for this path in the script index
-                                        if rel_path in script_index.get("files", {}):
-                                            # Found in index but not on disk
-                                            indexed = True
-                                            results[path] = {
-                                                "status": "indexed_only",
-                                                "path": path,
-                                                "message": f"File not found directly but exists in the index.",
-                                                "indexed_path": rel_path,
-                                                "index_location": script_index_path
-                                            }
-                                            break
-                                    except Exception:
-                                        pass
-                        
-                        if not indexed:
-                            results[path] = {
-                                "status": "error",
-                                "message": f"File not found: {path}"
-                            }
-                        continue
-
-                    # Check if we have read permission
-                    if not os.access(path, os.R_OK):
-                        results[path] = {
-                            "status": "error",
-                            "message": f"Permission denied: Cannot read {path}"
-                        }
-                        continue
-                    
-                    # Check cache first if enabled
-                    if use_cache:
-                        cached_data = cache_get_file(path, 'utf-8')
-                        if cached_data:
-                            logger.info(f"Using cached data for: {path}")
-                            # Add cache hit indicator
-                            result = {**cached_data}
-                            result["from_cache"] = True
-                            results[path] = result
-                            cache_stats["hits"] += 1
-                            continue
-                    
-                    # Cache miss, need to read the file
-                    cache_stats["misses"] += 1
-
-                    # Try to determine MIME type
-                    mime_type, _ = mimetypes.guess_type(path)
-                    if mime_type is None:
-                        # Default to text if we can't determine
-                        mime_type = "text/plain"
-
-                    # Read the file content
-                    try:
-                        with open(path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-
-                        # Get file stats
-                        stats = os.stat(path)
-
-                        # Create result dictionary
-                        result = {
-                            "status": "success",
-                            "content": content,
-                            "size": stats.st_size,
-                            "mime_type": mime_type,
-                            "modified": stats.st_mtime,
-                            "encoding": "utf-8",
-                            "from_cache": False
-                        }
-                        
-                        # Add to cache if enabled
-                        if use_cache:
-                            cache_set_file(path, result)
-                            
-                        results[path] = result
-                        
-                    except UnicodeDecodeError:
-                        # Try with binary mode for non-text files
-                        try:
-                            with open(path, 'rb') as f:
-                                binary_content = f.read()
-
-                            # Create binary result
-                            result = {
-                                "status": "binary",
-                                "size": len(binary_content),
-                                "mime_type": mime_type or "application/octet-stream",
-                                "message": f"Binary file detected ({len(binary_content)} bytes)",
-                                "encoding": "binary",
-                                "from_cache": False
-                            }
-                            
-                            # Add to cache if enabled
-                            if use_cache:
-                                cache_set_file(path, result)
-                                
-                            results[path] = result
-                            
-                        except Exception as bin_error:
-                            results[path] = {
-                                "status": "error",
-                                "message": f"Error reading binary file: {str(bin_error)}"
-                            }
-                    except Exception as e:
-                        logger.error(f"Error reading file {path}: {str(e)}")
-                        results[path] = {
-                            "status": "error",
-                            "message": f"Error reading file: {str(e)}"
-                        }
-                except Exception as e:
-                    logger.error(f"Error processing file {path}: {str(e)}")
-                    results[path] = {
-                        "status": "error",
-                        "message": f"Error processing file: {str(e)}"
-                    }
+            file_cache = librarian_context["file_cache"]
+            known_hashes = {os.path.abspath(p): h for p, h in (if_none_match or {}).items()}
+
+            def read_one(path):
+                return read_path(
+                    path, ALLOWED_DIRECTORIES, file_cache, use_cache,
+                    if_none_match=known_hashes.get(os.path.abspath(path))
+                )
+
+            results, stats = read_paths(
+                paths,
+                read_one,
+                parallel=parallel,
+                max_workers=max_workers,
+                timeout=timeout,
+                max_total_bytes=max_total_bytes
+            )
             
             # Add cache statistics to result
             return {
@@ -3161,16 +3419,13 @@ def read_multiple_files(paths: List[str], use_cache: bool = True) -> Dict[str, A
                 "count": len(paths),
                 "success_count": sum(1 for r in results.values() if r.get("status") == "success"),
                 "error_count": sum(1 for r in results.values() if r.get("status") == "error"),
-                "cache_hits": cache_stats["hits"],
-                "cache_misses": cache_stats["misses"],
-                "cache_hit_ratio": cache_stats["hits"] / len(paths) if len(paths) > 0 else 0
-            }
-
-            return {
-                "status": "success",
-                "count": len(paths),
-                "successful_reads": sum(1 for p in results if results[p].get("status") == "success"),
-                "results": results
+                "unchanged_count": stats["unchanged"],
+                "cache_hits": stats["hits"],
+                "cache_misses": stats["misses"],
+                "cache_hit_ratio": stats["hits"] / len(paths) if len(paths) > 0 else 0,
+                "timeouts": stats["timeouts"],
+                "truncated_count": stats["truncated"],
+                "total_bytes": stats["total_bytes"]
             }
         except Exception as e:
             logger.error(f"Error in read_multiple_files: {str(e)}")
@@ -3700,7 +3955,15 @@ def move_file(source: str, destination: str) -> Dict[str, Any]:
             }
 
 @mcp.tool()
-def search_files(path: str, pattern: str, file_pattern: str = None, excludePatterns: List[str] = None) -> Dict[str, Any]:
+def search_files(
+    path: str,
+    pattern: str,
+    file_pattern: str = None,
+    excludePatterns: List[str] = None,
+    limit: Optional[int] = None,
+    respect_gitignore: bool = True,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Recursively search for files and directories matching a pattern.
     
@@ -3710,17 +3973,24 @@ def search_files(path: str, pattern: str, file_pattern: str = None, excludePatte
     
     For improved performance, it first checks the AI Librarian index if available.
     
+    With a limit, results are paged: the response holds the first `limit` matches and,
+    if there are more, a `next_cursor`. Passing that cursor (with the same query) returns
+    the next page from a server-side snapshot, continuing the walk where it stopped.
+    
     Args:
         path: The starting directory path to search in
         pattern: The search pattern to match (case-insensitive)
         file_pattern: Optional pattern to filter files (e.g., "*.py")
         excludePatterns: Optional list of patterns to exclude from results
+        limit: Maximum number of matches per page; enables paging
+        respect_gitignore: Skip files ignored by .gitignore when walking the filesystem
+        cursor: Cursor returned by a previous page of the same search
         
     Returns:
         Dictionary with search results
     """
     # Pause monitoring during this operation
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
             # Normalize path
             search_path = os.path.abspath(path)
@@ -3732,6 +4002,18 @@ def search_files(path: str, pattern: str, file_pattern: str = None, excludePatte
                     "message": f"Access denied: {path} is not within allowed directories"
                 }
 
+            # Ensure excludePatterns is a list
+            exclude_patterns = excludePatterns or []
+
+            # Convert pattern to lowercase for case-insensitive matching
+            pattern_lower = pattern.lower()
+
+            # Follow-up pages come from the snapshot of the first one
+            result_pages = librarian_context["result_pages"]
+            query = ("search_files", search_path, pattern_lower, file_pattern, tuple(exclude_patterns), respect_gitignore)
+            if cursor is not None:
+                return page_response(result_pages.next(cursor, query, limit), "matches", "matching files")
+
             # Check if directory exists
             if not os.path.exists(search_path):
                 return {
@@ -3746,111 +4028,118 @@ def search_files(path: str, pattern: str, file_pattern: str = None, excludePatte
                     "message": f"Not a directory: {path}"
                 }
 
-            # Ensure excludePatterns is a list
-            exclude_patterns = excludePatterns or []
-
-            # Convert pattern to lowercase for case-insensitive matching
-            pattern_lower = pattern.lower()
+            # Exclude and file patterns compiled once for every branch below
+            exclude_matcher = compile_globs(exclude_patterns)
+            file_matcher = compile_globs([file_pattern]) if file_pattern else None
+
+            def index_path_allowed(rel_file_path):
+                return ((exclude_matcher is None or not exclude_matcher.match(rel_file_path)) and
+                        (file_matcher is None or file_matcher.match(rel_file_path)))
+
+            def respond(matches, source, via=""):
+                """Build the response for the matches of one source, or None if it found nothing."""
+                meta = {"path": path, "pattern": pattern, "excludePatterns": exclude_patterns, "source": source}
+                if limit is not None:
+                    page = result_pages.open(query, matches, limit, meta)
+                    return page_response(page, "matches", "matching files") if page["count"] else None
+                matches = list(matches)
+                if not matches:
+                    return None
+                return {
+                    "status": "success",
+                    **meta,
+                    "matches": matches,
+                    "count": len(matches),
+                    "truncated": False,
+                    "message": f"Found {len(matches)} matching files in {path}{via}"
+                }
             
             # Check AI Librarian index first if available to improve performance
             ai_ref_path = os.path.join(search_path, ".ai_reference")
             script_index_path = os.path.join(ai_ref_path, "script_index.json")
             
+            # Query the SQLite index store directly when the project uses one
+            store = get_index_store(search_path)
+            if store is not None:
+                logger.info(f"Using AI Librarian index store for search: {pattern}")
+                try:
+                    matches = [
+                        rel_file_path for rel_file_path in store.search_files(pattern_lower)
+                        if index_path_allowed(rel_file_path)
+                    ]
+                    response = respond(matches, "ai_reference_index_store", " (via index store)")
+                    if response is not None:
+                        logger.info(f"Found {response['count']} matches using index store")
+                        return response
+                    else:
+                        logger.info("No matches found in index store, falling back to filesystem search")
+                except Exception as index_error:
+                    logger.warning(f"Error using index store for search: {str(index_error)}, falling back to filesystem search")
+            
             # Check if we have an index to use
-            if os.path.exists(script_index_path):
+            elif os.path.exists(script_index_path):
                 logger.info(f"Using AI Librarian index for search: {pattern}")
                 try:
-                    with open(script_index_path, 'r', encoding='utf-8') as f:
-                        script_index = json.load(f)
-                    
-                    # Quick search through the index
-                    matches = []
-                    
-                    # Filter based on file pattern if provided
-                    pattern_matcher = None
-                    if file_pattern:
-                        pattern_matcher = lambda p: fnmatch.fnmatch(p.lower(), file_pattern.lower())
-                    
-                    # Check each indexed file
-                    for rel_file_path, file_info in script_index.get("files", {}).items():
-                        # Skip excluded paths
-                        if any(fnmatch.fnmatch(rel_file_path.lower(), exclude.lower()) for exclude in exclude_patterns):
-                            continue
-                            
-                        # Apply file pattern filter if provided
-                        if pattern_matcher and not pattern_matcher(rel_file_path):
-                            continue
-                            
-                        # Check if the pattern is in the file path
-                        if pattern_lower in rel_file_path.lower():
-                            matches.append(rel_file_path)
-                            continue
-                            
-                        # Check if pattern matches any class or function
-                        if any(pattern_lower in cls.lower() for cls in file_info.get("classes", [])) or \
-                           any(pattern_lower in func.lower() for func in file_info.get("functions", [])):
-                            matches.append(rel_file_path)
-                    
-                    if matches:
-                        logger.info(f"Found {len(matches)} matches using index")
-                        return {
-                            "status": "success",
-                            "path": path,
-                            "pattern": pattern,
-                            "excludePatterns": exclude_patterns,
-                            "matches": matches,
-                            "count": len(matches),
-                            "source": "ai_reference_index",
-                            "message": f"Found {len(matches)} matching files in {path} (via index)"
-                        }
+                    script_index = load_json(script_index_path, {})
+
+                    def index_matches():
+                        # Check each indexed file
+                        for rel_file_path, file_info in script_index.get("files", {}).items():
+                            # Skip excluded paths and apply the file pattern filter
+                            if not index_path_allowed(rel_file_path):
+                                continue
+
+                            # Check if the pattern is in the file path, or matches any class or function
+                            if pattern_lower in rel_file_path.lower() or \
+                               any(pattern_lower in cls.lower() for cls in file_info.get("classes", [])) or \
+                               any(pattern_lower in func.lower() for func in file_info.get("functions", [])):
+                                yield rel_file_path
+
+                    response = respond(index_matches(), "ai_reference_index", " (via index)")
+                    if response is not None:
+                        logger.info(f"Found {response['count']} matches using index")
+                        return response
                     else:
                         logger.info("No matches found in index, falling back to filesystem search")
                 except Exception as index_error:
                     logger.warning(f"Error using index for search: {str(index_error)}, falling back to filesystem search")
             
-            # Define function to check if a path should be excluded
-            def should_exclude(item_path):
-                base_name = os.path.basename(item_path)
-                # Check if matches any exclude patterns
-                for exclude in exclude_patterns:
-                    if fnmatch.fnmatch(base_name.lower(), exclude.lower()):
-                        return True
-                    # Also check if parent directory matches exclude pattern
-                    if any(fnmatch.fnmatch(part.lower(), exclude.lower())
-                           for part in Path(item_path).parts):
-                        return True
-                # Skip common directories and hidden files/dirs by default
-                if base_name.startswith('.') or base_name in ['__pycache__', 'node_modules', '.git', 'venv', 'env']:
-                    return True
-                return False
-
-            # Fallback: Collect matching files with filesystem walk
+            # Fallback: stream matching files from a filesystem walk
             logger.info(f"Performing filesystem search for: {pattern}")
-            matches = []
-
-            for root, dirs, files in os.walk(search_path):
-                # Filter out directories that should be excluded
-                # This modifies dirs in-place to avoid traversing excluded dirs
-                dirs[:] = [d for d in dirs if not should_exclude(os.path.join(root, d))]
-
-                # Check files that match the pattern
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if pattern_lower in file.lower() and not should_exclude(file_path):
-                        # Return path relative to the search directory
-                        rel_path = os.path.relpath(file_path, search_path)
-                        matches.append(rel_path)
-
-            # Return the results
+
+            def accept(name, rel_path):
+                return pattern_lower in name.lower() and (file_matcher is None or file_matcher.match(rel_path))
+
+            # A paged walk is sequential: between pages it is a suspended
+            # generator that holds no worker threads
+            walk = (
+                rel_path.replace("/", os.sep)
+                for rel_path in iter_files(
+                    search_path,
+                    accept=accept,
+                    exclude_patterns=exclude_patterns,
+                    respect_gitignore=respect_gitignore,
+                    parallel=limit is None
+                )
+            )
+            response = respond(walk, "filesystem_walk")
+            if response is None:
+                response = {
+                    "status": "success",
+                    "path": path,
+                    "pattern": pattern,
+                    "excludePatterns": exclude_patterns,
+                    "source": "filesystem_walk",
+                    "matches": [],
+                    "count": 0,
+                    "truncated": False,
+                    "message": f"Found 0 matching files in {path}"
+                }
+            return response
+        except CursorError as e:
             return {
-                "status": "success",
-                "path": path,
-                "pattern": pattern,
-                "excludePatterns": exclude_patterns,
-                "matches": matches,
-                "count": len(matches),
-                "source": "filesystem_walk",
-                "message": f"Found {len(matches)} matching files in {path}"
+                "status": "error",
+                "message": str(e)
             }
         except Exception as e:
             logger.error(f"Error searching files: {str(e)}")
@@ -3962,8 +4251,155 @@ def write_file(path: str, content: str, encoding: str = "utf-8") -> Dict[str, An
                 "message": f"Error writing file: {str(e)}"
             }
 
+def summarize_related_files(rel_file_path: str, related_files: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Build the find_related_files response from categorized related files.
+    
+    Args:
+        rel_file_path: Path of the target file relative to the project
+        related_files: Related files organized by relationship type
+        
+    Returns:
+        Dictionary with related files and counts
+    """
+    # Count total related files
+    total_related = sum(len(files) for files in related_files.values())
+
+    # Create unique list by removing duplicates
+    unique_related = set()
+    for category, files in related_files.items():
+        for file_info in files:
+            if isinstance(file_info, dict) and "path" in file_info:
+                unique_related.add(file_info["path"])
+
+    logger.debug(f"Found {len(unique_related)} unique related files")
+    return {
+        "status": "success",
+        "file": rel_file_path,
+        "related_files": related_files,
+        "total_related": total_related,
+        "unique_related": len(unique_related),
+        "message": f"Found {len(unique_related)} unique files related to {rel_file_path}"
+    }
+
+def page_related_files(query: tuple, rel_file_path: str, related_files: Dict[str, List[Dict[str, Any]]],
+                       limit: int) -> Dict[str, Any]:
+    """
+    Build the first page of a paged find_related_files response.
+    
+    The categorized lists are flattened into one list, each entry tagged with its
+    "category", and snapshotted so later pages are served by cursor.
+    
+    Args:
+        query: Key of the find_related_files query
+        rel_file_path: Path of the target file relative to the project
+        related_files: Related files organized by relationship type
+        limit: Number of related files per page
+        
+    Returns:
+        Dictionary with the first page of related files
+    """
+    summary = summarize_related_files(rel_file_path, related_files)
+    items = [
+        {"category": category, **file_info}
+        for category, files in related_files.items()
+        for file_info in files
+        if isinstance(file_info, dict)
+    ]
+    meta = {"file": rel_file_path, "total_related": summary["total_related"], "unique_related": summary["unique_related"]}
+    page = librarian_context["result_pages"].open(query, items, limit, meta)
+    return page_response(page, "related_files", "related files")
+
+def find_related_files_from_graph(graph, target_rel_path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Find files related to a target file using the precomputed import graph.
+    
+    Import and reference relationships are lookups in the graph's adjacency
+    lists and symbol-reference table, so no source files or mini-librarians
+    are read.
+    
+    Args:
+        graph: The project's ImportGraph
+        target_rel_path: Target file path relative to the project, with forward slashes
+        
+    Returns:
+        Related files organized by relationship type
+    """
+    related_files = {
+        "imports": [],
+        "imported_by": [],
+        "name_related": [],
+        "package_related": [],
+        "class_references": [],
+        "function_calls": []
+    }
+
+    target_dir = os.path.dirname(target_rel_path)
+    target_name = os.path.splitext(os.path.basename(target_rel_path))[0]
+
+    for path in sorted(graph.files):
+        if path == target_rel_path:
+            continue
+
+        # 1. Package relationship
+        if os.path.dirname(path) == target_dir:
+            related_files["package_related"].append({
+                "path": path,
+                "relationship": "same_package"
+            })
+
+        # 2. Name relationship
+        file_name = os.path.splitext(os.path.basename(path))[0]
+        if (target_name in file_name or
+            file_name in target_name or
+            file_name.startswith(target_name) or
+            target_name.startswith(file_name)):
+            related_files["name_related"].append({
+                "path": path,
+                "relationship": "similar_name"
+            })
+
+    # 3a. Files importing the target
+    for edge in graph.get_importers(target_rel_path):
+        related_files["imports"].append({
+            "path": edge["path"],
+            "relationship": "imports_target",
+            "import_statement": edge["import"]
+        })
+
+    # 3b. Files imported by the target
+    for edge in graph.get_imports(target_rel_path):
+        related_files["imported_by"].append({
+            "path": edge["path"],
+            "relationship": "imported_by_target",
+            "import_statement": edge["import"]
+        })
+
+    # 4. Class and function references
+    target_entry = graph.files[target_rel_path]
+    for class_name in target_entry.get("classes", []):
+        for path in graph.get_symbol_references(class_name)["referenced_by"]:
+            if path != target_rel_path:
+                related_files["class_references"].append({
+                    "path": path,
+                    "relationship": "references_class",
+                    "class_name": class_name
+                })
+
+    for func_name in target_entry.get("functions", []):
+        for path in graph.get_symbol_references(func_name)["called_by"]:
+            if path != target_rel_path:
+                related_files["function_calls"].append({
+                    "path": path,
+                    "relationship": "calls_function",
+                    "function_name": func_name
+                })
+
+    return related_files
+
 @mcp.tool()
-def find_related_files(project_path: str, file_path: str) -> Dict[str, Any]:
+def find_related_files(project_path: str, file_path: str, limit: Optional[int] = None,
+                       cursor: Optional[str] = None) -> Dict[str, Any]:
     """
     Find files that are related to a specific file in the project.
     
@@ -3971,15 +4407,20 @@ def find_related_files(project_path: str, file_path: str) -> Dict[str, Any]:
     specified file through imports, class/function references, naming patterns, 
     or module/package relationships.
     
+    With a limit, the related files are returned as one flat, paged list whose
+    entries carry their "category"; pass `next_cursor` to get the next page.
+    
     Args:
         project_path: The root directory of the project
         file_path: The file to find related files for (absolute or relative to project_path)
+        limit: Maximum number of related files per page; enables paging
+        cursor: Cursor returned by a previous page for the same file
         
     Returns:
         Dictionary with related files organized by relationship type
     """
     # Pause monitoring during this operation
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
             logger.debug(f"Starting find_related_files for {file_path} in {project_path}")
             
@@ -4004,6 +4445,12 @@ def find_related_files(project_path: str, file_path: str) -> Dict[str, Any]:
                     "message": f"Access denied: {file_path} is not within allowed directories"
                 }
 
+            # Follow-up pages come from the snapshot of the first one
+            query = ("find_related_files", project_path, file_path)
+            if cursor is not None:
+                page = librarian_context["result_pages"].next(cursor, query, limit)
+                return page_response(page, "related_files", "related files")
+
             # Check if file exists
             if not os.path.isfile(file_path):
                 return {
@@ -4033,6 +4480,14 @@ def find_related_files(project_path: str, file_path: str) -> Dict[str, Any]:
                     "message": f"AI Librarian not initialized for {project_path}. Run initialize_librarian first."
                 }
 
+            # Answer from the precomputed import graph when the file is indexed
+            import_graph = load_import_graph(ai_ref_path)
+            if import_graph is not None and rel_file_path.replace("\\", "/") in import_graph.files:
+                related_files = find_related_files_from_graph(import_graph, rel_file_path.replace("\\", "/"))
+                if limit is not None:
+                    return page_related_files(query, rel_file_path, related_files, limit)
+                return summarize_related_files(rel_file_path, related_files)
+
             # Get script index
             script_index_path = os.path.join(ai_ref_path, "script_index.json")
             if not os.path.exists(script_index_path):
@@ -4042,14 +4497,12 @@ def find_related_files(project_path: str, file_path: str) -> Dict[str, Any]:
                 }
 
             # Safely load the script index
-            try:
-                with open(script_index_path, 'r', encoding='utf-8') as f:
-                    script_index = json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading script index: {str(e)}")
+            script_index = load_json_dict(script_index_path)
+            if script_index is None:
+                logger.error(f"Error loading script index: {script_index_path}")
                 return {
                     "status": "error",
-                    "message": f"Error loading script index: {str(e)}"
+                    "message": f"Error loading script index: {script_index_path}"
                 }
 
             # Get component registry
@@ -4061,8 +4514,7 @@ def find_related_files(project_path: str, file_path: str) -> Dict[str, Any]:
                 }
 
             try:
-                with open(component_registry_path, 'r', encoding='utf-8') as f:
-                    component_registry = json.load(f)
+                component_registry = load_json(component_registry_path)
                 
                 # Verify proper structure
                 if not isinstance(component_registry, dict):
@@ -4110,13 +4562,12 @@ def find_related_files(project_path: str, file_path: str) -> Dict[str, Any]:
                 mini_librarian_path = os.path.join(ai_ref_path, target_file_info["mini_librarian"])
                 if os.path.exists(mini_librarian_path):
                     try:
-                        with open(mini_librarian_path, 'r', encoding='utf-8') as f:
-                            mini_librarian = json.load(f)
-                            if isinstance(mini_librarian, dict) and "imports" in mini_librarian:
-                                if isinstance(mini_librarian["imports"], list):
-                                    target_imports = mini_librarian["imports"]
-                                else:
-                                    logger.warning(f"Imports is not a list in {mini_librarian_path}")
+                        mini_librarian = load_json(mini_librarian_path)
+                        if isinstance(mini_librarian, dict) and "imports" in mini_librarian:
+                            if isinstance(mini_librarian["imports"], list):
+                                target_imports = mini_librarian["imports"]
+                            else:
+                                logger.warning(f"Imports is not a list in {mini_librarian_path}")
                     except Exception as e:
                         logger.error(f"Error reading mini librarian at {mini_librarian_path}: {str(e)}")
 
@@ -4165,102 +4616,101 @@ def find_related_files(project_path: str, file_path: str) -> Dict[str, Any]:
 
                 if mini_librarian_path and os.path.exists(mini_librarian_path):
                     try:
-                        with open(mini_librarian_path, 'r', encoding='utf-8') as f:
-                            mini_librarian = json.load(f)
+                        mini_librarian = load_json(mini_librarian_path)
 
-                            # Safely check for imports
-                            if isinstance(mini_librarian, dict) and "imports" in mini_librarian:
-                                # 3a. Check if this file imports the target file
-                                try:
-                                    # Check if this file imports the target file
-                                    target_module = os.path.splitext(target_file_rel_path)[0].replace("/", ".")
-                                    
-                                    # Guard against non-string target_module or bad module names
-                                    if not isinstance(target_module, str) or not target_module:
-                                        logger.error(f"Invalid target module name: {target_module}")
-                                        continue
-                                    
-                                    # Make sure os.path.basename returns a string
-                                    target_basename = os.path.basename(target_module)
-                                    if not isinstance(target_basename, str) or not target_basename:
-                                        logger.error(f"Invalid target basename: {target_basename}")
-                                        continue
+                        # Safely check for imports
+                        if isinstance(mini_librarian, dict) and "imports" in mini_librarian:
+                            # 3a. Check if this file imports the target file
+                            try:
+                                # Check if this file imports the target file
+                                target_module = os.path.splitext(target_file_rel_path)[0].replace("/", ".")
                                     
-                                    # Process each import, but only if imports is a list
-                                    if isinstance(mini_librarian["imports"], list):
-                                        for imp in mini_librarian["imports"]:
-                                            # Make sure imp is a string
-                                            if not isinstance(imp, str):
-                                                logger.debug(f"Skipping non-string import: {type(imp)}")
-                                                continue
-                                            
-                                            # Compare imports directly and safely check endswith
-                                            matches_direct = imp == target_module
-                                            matches_relative = False
-                                            
-                                            # Safely check if imp ends with ".target_basename"
-                                            if isinstance(imp, str) and isinstance(target_basename, str):
-                                                suffix = "." + target_basename
-                                                if imp.endswith(suffix):
-                                                    matches_relative = True
-                                            
-                                            if matches_direct or matches_relative:
-                                                related_files["imports"].append({
-                                                    "path": path,
-                                                    "relationship": "imports_target",
-                                                    "import_statement": imp
-                                                })
-                                                break
-                                except Exception as e:
-                                    logger.error(f"Error checking imports: {str(e)}")
+                                # Guard against non-string target_module or bad module names
+                                if not isinstance(target_module, str) or not target_module:
+                                    logger.error(f"Invalid target module name: {target_module}")
                                     continue
-
-                                # 3b. Check if the target file imports this file
-                                try:
-                                    # Only process if target_imports is a list
-                                    if not isinstance(target_imports, list):
-                                        logger.debug(f"Skipping target imports check - not a list: {type(target_imports)}")
-                                        continue
-                                    
-                                    # Check if the target file imports this file
-                                    this_module = os.path.splitext(path)[0].replace("/", ".")
-                                    
-                                    # Guard against non-string this_module
-                                    if not isinstance(this_module, str) or not this_module:
-                                        logger.error(f"Invalid module name: {this_module}")
-                                        continue
                                     
-                                    this_basename = os.path.basename(this_module)
-                                    if not isinstance(this_basename, str) or not this_basename:
-                                        logger.error(f"Invalid basename: {this_basename}")
-                                        continue
+                                # Make sure os.path.basename returns a string
+                                target_basename = os.path.basename(target_module)
+                                if not isinstance(target_basename, str) or not target_basename:
+                                    logger.error(f"Invalid target basename: {target_basename}")
+                                    continue
                                     
-                                    for imp in target_imports:
+                                # Process each import, but only if imports is a list
+                                if isinstance(mini_librarian["imports"], list):
+                                    for imp in mini_librarian["imports"]:
                                         # Make sure imp is a string
                                         if not isinstance(imp, str):
-                                            logger.debug(f"Skipping non-string target import: {type(imp)}")
+                                            logger.debug(f"Skipping non-string import: {type(imp)}")
                                             continue
-                                        
+                                            
                                         # Compare imports directly and safely check endswith
-                                        matches_direct = imp == this_module
+                                        matches_direct = imp == target_module
                                         matches_relative = False
-                                        
-                                        # Safely check if imp ends with ".this_basename"
-                                        if isinstance(imp, str) and isinstance(this_basename, str):
-                                            suffix = "." + this_basename
+                                            
+                                        # Safely check if imp ends with ".target_basename"
+                                        if isinstance(imp, str) and isinstance(target_basename, str):
+                                            suffix = "." + target_basename
                                             if imp.endswith(suffix):
                                                 matches_relative = True
-                                        
+                                            
                                         if matches_direct or matches_relative:
-                                            related_files["imported_by"].append({
+                                            related_files["imports"].append({
                                                 "path": path,
-                                                "relationship": "imported_by_target",
+                                                "relationship": "imports_target",
                                                 "import_statement": imp
                                             })
                                             break
-                                except Exception as e:
-                                    logger.error(f"Error checking target imports: {str(e)}")
+                            except Exception as e:
+                                logger.error(f"Error checking imports: {str(e)}")
+                                continue
+
+                            # 3b. Check if the target file imports this file
+                            try:
+                                # Only process if target_imports is a list
+                                if not isinstance(target_imports, list):
+                                    logger.debug(f"Skipping target imports check - not a list: {type(target_imports)}")
+                                    continue
+                                    
+                                # Check if the target file imports this file
+                                this_module = os.path.splitext(path)[0].replace("/", ".")
+                                    
+                                # Guard against non-string this_module
+                                if not isinstance(this_module, str) or not this_module:
+                                    logger.error(f"Invalid module name: {this_module}")
+                                    continue
+                                    
+                                this_basename = os.path.basename(this_module)
+                                if not isinstance(this_basename, str) or not this_basename:
+                                    logger.error(f"Invalid basename: {this_basename}")
                                     continue
+                                    
+                                for imp in target_imports:
+                                    # Make sure imp is a string
+                                    if not isinstance(imp, str):
+                                        logger.debug(f"Skipping non-string target import: {type(imp)}")
+                                        continue
+                                        
+                                    # Compare imports directly and safely check endswith
+                                    matches_direct = imp == this_module
+                                    matches_relative = False
+                                        
+                                    # Safely check if imp ends with ".this_basename"
+                                    if isinstance(imp, str) and isinstance(this_basename, str):
+                                        suffix = "." + this_basename
+                                        if imp.endswith(suffix):
+                                            matches_relative = True
+                                        
+                                    if matches_direct or matches_relative:
+                                        related_files["imported_by"].append({
+                                            "path": path,
+                                            "relationship": "imported_by_target",
+                                            "import_statement": imp
+                                        })
+                                        break
+                            except Exception as e:
+                                logger.error(f"Error checking target imports: {str(e)}")
+                                continue
                     except Exception as e:
                         logger.error(f"Error processing mini librarian for {path}: {str(e)}")
                         continue
@@ -4307,26 +4757,15 @@ def find_related_files(project_path: str, file_path: str) -> Dict[str, Any]:
                                 except Exception as e:
                                     logger.error(f"Error in regex search for function {func_name}: {str(e)}")
 
-            # Count total related files
-            total_related = sum(len(files) for files in related_files.values())
-
-            # Create unique list by removing duplicates
-            unique_related = set()
-            for category, files in related_files.items():
-                for file_info in files:
-                    if isinstance(file_info, dict) and "path" in file_info:
-                        unique_related.add(file_info["path"])
+            if limit is not None:
+                return page_related_files(query, rel_file_path, related_files, limit)
+            return summarize_related_files(rel_file_path, related_files)
 
-            logger.debug(f"Found {len(unique_related)} unique related files")
+        except CursorError as e:
             return {
-                "status": "success",
-                "file": rel_file_path,
-                "related_files": related_files,
-                "total_related": total_related,
-                "unique_related": len(unique_related),
-                "message": f"Found {len(unique_related)} unique files related to {rel_file_path}"
+                "status": "error",
+                "message": str(e)
             }
-
         except Exception as e:
             logger.error(f"Error finding related files: {str(e)}")
             return {
@@ -4444,22 +4883,29 @@ def create_directory(path: str) -> Dict[str, Any]:
             }
 
 @mcp.tool()
-def directory_tree(path: str, max_depth: int = 5) -> Dict[str, Any]:
+def directory_tree(path: str, max_depth: int = 5, limit: Optional[int] = None,
+                   cursor: Optional[str] = None) -> Dict[str, Any]:
     """
     Get a recursive tree view of files and directories as a JSON structure.
     
     This tool provides a hierarchical representation of a directory structure up to a specified
     maximum depth. Great for understanding project layouts or exploring directory contents.
     
+    With a limit, the tree is returned as a paged, flat list of "entries" in the same
+    (depth-first) order, each with its relative path, type and depth. The directory is
+    only walked as far as the pages requested; pass `next_cursor` to continue.
+    
     Args:
         path: The root directory path to visualize
         max_depth: Maximum depth of recursion (default: 5)
+        limit: Maximum number of entries per page; enables paging
+        cursor: Cursor returned by a previous page of the same tree
         
     Returns:
         Dictionary containing the hierarchical file and directory structure
     """
     # Pause monitoring during this operation
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
             # Normalize the path
             dir_path = os.path.abspath(path)
@@ -4471,6 +4917,12 @@ def directory_tree(path: str, max_depth: int = 5) -> Dict[str, Any]:
                     "message": f"Access denied: {path} is not within allowed directories"
                 }
 
+            # Follow-up pages come from the snapshot of the first one
+            result_pages = librarian_context["result_pages"]
+            query = ("directory_tree", dir_path, max_depth)
+            if cursor is not None:
+                return page_response(result_pages.next(cursor, query, limit), "entries", "entries")
+
             # Check if directory exists
             if not os.path.exists(dir_path):
                 return {
@@ -4492,6 +4944,35 @@ def directory_tree(path: str, max_depth: int = 5) -> Dict[str, Any]:
                     "message": f"Permission denied: Cannot read directory {path}"
                 }
 
+            def is_excluded(entry):
+                # Skip hidden files and common excluded directories
+                return entry.name.startswith('.') or entry.name in ['__pycache__', 'node_modules', '.git', 'venv', 'env']
+
+            def iter_entries(current_path, rel_dir="", current_depth=0):
+                """Yield the tree's entries depth-first, in the order build_tree lists them"""
+                try:
+                    entries = sorted(os.scandir(current_path), key=lambda e: (e.is_file(), e.name))
+                except OSError as e:
+                    yield {"path": rel_dir, "type": "error", "depth": current_depth, "error": str(e)}
+                    return
+
+                for entry in entries:
+                    if is_excluded(entry):
+                        continue
+                    rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                    if entry.is_dir():
+                        if current_depth + 1 > max_depth:
+                            yield {"path": rel_path, "type": "directory", "depth": current_depth + 1, "truncated": True}
+                        else:
+                            yield {"path": rel_path, "type": "directory", "depth": current_depth + 1}
+                            yield from iter_entries(entry.path, rel_path, current_depth + 1)
+                    else:
+                        yield {"path": rel_path, "type": "file", "depth": current_depth + 1}
+
+            if limit is not None:
+                meta = {"path": path, "max_depth": max_depth}
+                return page_response(result_pages.open(query, iter_entries(dir_path), limit, meta), "entries", "entries")
+
             # Function to recursively build the tree
             def build_tree(current_path, current_depth=0):
                 """Build a recursive tree structure of the directory"""
@@ -4517,8 +4998,7 @@ def directory_tree(path: str, max_depth: int = 5) -> Dict[str, Any]:
 
                     # Process each entry
                     for entry in entries:
-                        # Skip hidden files and common excluded directories
-                        if entry.name.startswith('.') or entry.name in ['__pycache__', 'node_modules', '.git', 'venv', 'env']:
+                        if is_excluded(entry):
                             continue
 
                         if entry.is_dir():
@@ -4549,6 +5029,11 @@ def directory_tree(path: str, max_depth: int = 5) -> Dict[str, Any]:
                 "tree": tree,
                 "message": f"Generated directory tree for {path} with max depth {max_depth}"
             }
+        except CursorError as e:
+            return {
+                "status": "error",
+                "message": str(e)
+            }
         except Exception as e:
             logger.error(f"Error generating directory tree: {str(e)}")
             return {
@@ -4572,7 +5057,7 @@ def get_file_info(path: str) -> Dict[str, Any]:
         Dictionary with detailed file/directory metadata
     """
     # Pause monitoring during this operation
-    with MonitoringPauser():
+    with MonitoringPauser(wait=False):
         try:
             # Normalize the path
             file_path = os.path.abspath(path)
@@ -4763,6 +5248,9 @@ if TASKBOARD_AVAILABLE:
         Returns:
             Task ID
         """
+        if not validate_path(project_path, ALLOWED_DIRECTORIES):
+            return f"Error: Access denied: {project_path} is not within allowed directories"
+        
         # Call the imported function from task_board.py, not recursively call this function
         from aitoolkit.librarian.task_board import submit_background_task as _submit_task
         return _submit_task(project_path, task_type, parameters, priority)
@@ -4795,10 +5283,46 @@ if TASKBOARD_AVAILABLE:
         """
         return get_task_result_mcp(project_path, task_id)
     
+    @mcp.tool()
+    def get_task_chunks(project_path: str, task_id: str, cursor: str = None, limit: int = 20) -> str:
+        """
+        Get the partial results a background task has published so far
+        
+        Chunks are available while the task runs. Pass the returned cursor to
+        the next call to get only the chunks published since.
+        
+        Args:
+            project_path: Path to the project
+            task_id: ID of the task
+            cursor: Cursor from a previous call, to continue after the chunks it returned
+            limit: Maximum number of chunks to return
+            
+        Returns:
+            The chunks and the cursor to read the next ones
+        """
+        return get_task_chunks_mcp(project_path, task_id, cursor, limit)
+    
+    @mcp.tool()
+    async def watch_task(project_path: str, task_id: str, ctx: Context, timeout: float = 30.0,
+                         cursor: str = None) -> str:
+        """
+        Wait for a background task to finish, reporting its progress and partial results as it goes
+        
+        Args:
+            project_path: Path to the project
+            task_id: ID of the task to watch
+            timeout: Seconds to wait before returning the current status
+            cursor: Cursor from a previous call, to stream only the chunks published since
+            
+        Returns:
+            Task status and the cursor to continue watching from
+        """
+        return await watch_task_mcp(project_path, task_id, ctx, timeout, cursor)
+    
     @mcp.tool()
     def cancel_task(project_path: str, task_id: str) -> str:
         """
-        Cancel a pending background task
+        Cancel a pending or running background task
         
         Args:
             project_path: Path to the project
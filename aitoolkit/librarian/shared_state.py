@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Shared State
+
+Building blocks for the AI Librarian server's shared state:
+
+- InstrumentedLock, a lock that records how often and how long threads wait
+  for it, registered by name so the server can report lock contention
+- ProjectSnapshots, which publishes each project's index data (script index,
+  component registry, indexed files) as an immutable snapshot. Writers build
+  a new snapshot and swap the reference; readers take the current reference
+  without locking and never wait on a re-index.
+- get_project_lock, the per-project lock serializing index updates
+"""
+
+import os
+import time
+import threading
+import weakref
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping
+
+# Locks reported by get_lock_stats, keyed by name
+_lock_registry: "weakref.WeakValueDictionary[str, InstrumentedLock]" = weakref.WeakValueDictionary()
+_lock_registry_lock = threading.Lock()
+
+# Index update locks, keyed by normalized project path
+_project_locks: Dict[str, "InstrumentedLock"] = {}
+_project_locks_lock = threading.Lock()
+
+class InstrumentedLock:
+    """
+    A mutex that records acquisitions, contention and wait time.
+
+    Used as a drop-in replacement for threading.Lock in `with` statements.
+    """
+
+    def __init__(self, name: str, register: bool = True):
+        """
+        Initialize the lock.
+
+        Args:
+            name: Name reported in the statistics
+            register: Whether to report the lock through get_lock_stats
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        if register:
+            with _lock_registry_lock:
+                _lock_registry[name] = self
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        """Acquire the lock, recording the time spent waiting for it."""
+        if self._lock.acquire(False):
+            self.acquisitions += 1
+            return True
+        if not blocking:
+            return False
+
+        start = time.perf_counter()
+        acquired = self._lock.acquire(True, timeout)
+        waited = time.perf_counter() - start
+        if acquired:
+            # Counters are only updated while holding the lock
+            self.acquisitions += 1
+            self.contended += 1
+            self.total_wait += waited
+            if waited > self.max_wait:
+                self.max_wait = waited
+        return acquired
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self) -> "InstrumentedLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return acquisition and wait-time statistics (times in milliseconds)."""
+        acquisitions = self.acquisitions
+        contended = self.contended
+        total_wait = self.total_wait
+        return {
+            "acquisitions": acquisitions,
+            "contended": contended,
+            "contention_ratio": contended / acquisitions if acquisitions else 0,
+            "total_wait_ms": round(total_wait * 1000, 3),
+            "avg_wait_ms": round(total_wait * 1000 / contended, 3) if contended else 0,
+            "max_wait_ms": round(self.max_wait * 1000, 3)
+        }
+
+def get_lock_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the statistics of every registered lock.
+
+    Returns:
+        Dictionary mapping lock names to their statistics
+    """
+    with _lock_registry_lock:
+        locks = list(_lock_registry.items())
+    return {name: lock.stats() for name, lock in sorted(locks)}
+
+def get_project_lock(project_path: str) -> InstrumentedLock:
+    """
+    Get the lock serializing the index updates of a project.
+
+    Every update of a project's .ai_reference (the monitoring thread,
+    generate_librarian, reindex tasks) runs under this lock, so two updates
+    never interleave their reads of the manifest and writes of the index.
+
+    Args:
+        project_path: Path to the project root
+
+    Returns:
+        The project's lock, reported by get_lock_stats as "index:<path>"
+    """
+    key = os.path.normcase(os.path.abspath(project_path))
+    with _project_locks_lock:
+        lock = _project_locks.get(key)
+        if lock is None:
+            lock = _project_locks[key] = InstrumentedLock(f"index:{key}")
+        return lock
+
+@dataclass(frozen=True)
+class ProjectSnapshot:
+    """
+    Immutable view of a project's index data at one generation.
+
+    The contained index dictionaries are shared with the parsed JSON cache
+    and must not be modified.
+    """
+    project_path: str
+    generation: int
+    published_at: float
+    script_index: Optional[Mapping[str, Any]] = None
+    component_registry: Optional[Mapping[str, Any]] = None
+    indexed_files: Mapping[str, float] = field(default_factory=lambda: MappingProxyType({}))
+
+class ProjectSnapshots:
+    """
+    Per-project index snapshots published by atomic reference swap.
+
+    Readers call get() without taking any lock. Writers serialize on a
+    private lock, derive a new snapshot from the current one and replace the
+    snapshot table with a new dictionary, so a reader always sees either the
+    old or the new table in full.
+    """
+
+    def __init__(self, name: str = "project_snapshots"):
+        self._write_lock = InstrumentedLock(name)
+        self._snapshots: Mapping[str, ProjectSnapshot] = MappingProxyType({})
+        self._generation = 0
+
+    def get(self, project_path: str) -> Optional[ProjectSnapshot]:
+        """Return the current snapshot of a project, or None."""
+        return self._snapshots.get(project_path)
+
+    def all(self) -> Mapping[str, ProjectSnapshot]:
+        """Return the current read-only table of snapshots."""
+        return self._snapshots
+
+    def publish(self, project_path: str, **changes: Any) -> ProjectSnapshot:
+        """
+        Publish a new snapshot of a project.
+
+        Args:
+            project_path: Path to the project
+            **changes: ProjectSnapshot fields to replace (script_index,
+                component_registry, indexed_files); other fields are carried
+                over from the current snapshot
+
+        Returns:
+            The published snapshot
+        """
+        if "indexed_files" in changes:
+            changes["indexed_files"] = MappingProxyType(dict(changes["indexed_files"]))
+
+        with self._write_lock:
+            current = self._snapshots.get(project_path)
+            fields = {
+                "script_index": current.script_index if current else None,
+                "component_registry": current.component_registry if current else None,
+                "indexed_files": current.indexed_files if current else MappingProxyType({})
+            }
+            fields.update(changes)
+
+            self._generation += 1
+            snapshot = ProjectSnapshot(
+                project_path=project_path,
+                generation=self._generation,
+                published_at=time.time(),
+                **fields
+            )
+            table = dict(self._snapshots)
+            table[project_path] = snapshot
+            self._snapshots = MappingProxyType(table)
+        return snapshot
+
+    def remove(self, project_path: str) -> None:
+        """Drop the snapshot of a project."""
+        with self._write_lock:
+            if project_path in self._snapshots:
+                table = dict(self._snapshots)
+                del table[project_path]
+                self._snapshots = MappingProxyType(table)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Symbol Location Index
+
+This module maintains `.ai_reference/symbol_index.json`, a persistent map from
+every class, function and method (including nested definitions) to the file
+and line range that defines it. It lets tools such as `query_component` locate
+a component with a dictionary lookup instead of reparsing source files.
+
+Symbols can be looked up by simple name (`submit_task`) or by qualified name
+(`TaskBoard.submit_task`).
+"""
+
+import os
+import json
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+SYMBOL_INDEX_FILENAME = "symbol_index.json"
+SYMBOL_INDEX_VERSION = 1
+
+def file_symbols(info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Get the symbol list of a parsed file.
+
+    Args:
+        info: Parse result from enhanced_indexer.parse_python_file
+
+    Returns:
+        List of symbols with name, qualified_name, kind, start_line, end_line and parent
+    """
+    if "symbols" in info:
+        return info["symbols"]
+
+    # Parse results from older indexer versions only list top-level definitions
+    symbols = []
+    for class_name, class_info in info.get("classes", {}).items():
+        symbols.append({
+            "name": class_name,
+            "qualified_name": class_name,
+            "kind": "class",
+            "start_line": class_info.get("start_line"),
+            "end_line": class_info.get("end_line"),
+            "parent": None
+        })
+        for method_name, method_info in class_info.get("methods", {}).items():
+            symbols.append({
+                "name": method_name,
+                "qualified_name": f"{class_name}.{method_name}",
+                "kind": "method",
+                "start_line": method_info.get("start_line"),
+                "end_line": method_info.get("end_line"),
+                "parent": class_name
+            })
+
+    for func_name, func_info in info.get("functions", {}).items():
+        symbols.append({
+            "name": func_name,
+            "qualified_name": func_name,
+            "kind": "function",
+            "start_line": func_info.get("start_line"),
+            "end_line": func_info.get("end_line"),
+            "parent": None
+        })
+
+    return symbols
+
+class SymbolIndex:
+    """
+    In-memory symbol location index with lookups by simple and qualified name.
+    """
+
+    def __init__(self, files: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        """
+        Initialize the index.
+
+        Args:
+            files: Mapping of relative file paths to their symbol lists
+        """
+        self.files = dict(files or {})
+        self._rebuild_lookups()
+
+    def _rebuild_lookups(self) -> None:
+        self._by_name = {}
+        self._by_qualified_name = {}
+        for rel_path in sorted(self.files):
+            for symbol in self.files[rel_path]:
+                entry = dict(symbol, file=rel_path)
+                self._by_name.setdefault(symbol["name"], []).append(entry)
+                self._by_qualified_name.setdefault(symbol["qualified_name"], []).append(entry)
+
+    def update_files(self, files: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Replace the symbols of the given files."""
+        self.files.update(files)
+        self._rebuild_lookups()
+
+    def remove_files(self, rel_paths: Iterable[str]) -> None:
+        """Drop the symbols of the given files."""
+        for rel_path in rel_paths:
+            self.files.pop(rel_path, None)
+        self._rebuild_lookups()
+
+    def lookup(self, name: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find symbols by simple or qualified name.
+
+        Args:
+            name: Symbol name, e.g. "submit_task" or "TaskBoard.submit_task"
+            kind: Optional kind filter ("class", "function" or "method")
+
+        Returns:
+            List of symbols, each with its file and line range
+        """
+        lookup = self._by_qualified_name if "." in name else self._by_name
+        symbols = lookup.get(name, [])
+        if kind:
+            symbols = [symbol for symbol in symbols if symbol["kind"] == kind]
+        return list(symbols)
+
+    def names(self) -> List[str]:
+        """Return all distinct simple symbol names."""
+        return list(self._by_name.keys())
+
+    def all_names(self) -> List[str]:
+        """Return all distinct simple and qualified symbol names."""
+        return list(self._by_name.keys()) + [name for name in self._by_qualified_name if name not in self._by_name]
+
+    def __len__(self) -> int:
+        return sum(len(symbols) for symbols in self.files.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index."""
+        return {
+            "version": SYMBOL_INDEX_VERSION,
+            "files": self.files
+        }
+
+# Loaded indexes, keyed by path and invalidated when the file changes
+_index_cache: Dict[str, Tuple[Tuple[float, int], SymbolIndex]] = {}
+_index_cache_lock = threading.Lock()
+
+def load_symbol_index(ai_ref_path: str) -> Optional[SymbolIndex]:
+    """
+    Load the symbol index of a project.
+
+    Args:
+        ai_ref_path: Path to the .ai_reference directory
+
+    Returns:
+        The SymbolIndex, or None if it is missing, unreadable or outdated
+    """
+    index_path = os.path.join(ai_ref_path, SYMBOL_INDEX_FILENAME)
+    try:
+        stats = os.stat(index_path)
+    except OSError:
+        return None
+
+    signature = (stats.st_mtime, stats.st_size)
+    with _index_cache_lock:
+        cached = _index_cache.get(index_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != SYMBOL_INDEX_VERSION:
+        return None
+
+    index = SymbolIndex(data.get("files", {}))
+    with _index_cache_lock:
+        _index_cache[index_path] = (signature, index)
+    return index
+
+def save_symbol_index(ai_ref_path: str, index: SymbolIndex) -> None:
+    """
+    Write the symbol index of a project.
+
+    Args:
+        ai_ref_path: Path to the .ai_reference directory
+        index: The index to write
+    """
+    index_path = os.path.join(ai_ref_path, SYMBOL_INDEX_FILENAME)
+    # Readers do not wait for the indexer: replace the file whole so they
+    # never see a half-written one
+    temp_path = index_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index.to_dict(), f, separators=(',', ':'))
+    os.replace(temp_path, index_path)
@@ -9,11 +9,18 @@ with long-running operations to prevent timeouts and improve responsiveness.
 import os
 import json
 import time
+import asyncio
 import uuid
 import queue
+import atexit
+import weakref
 import logging
 import threading
 import traceback
+import functools
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Any, Optional, Callable, Union, Tuple
 from enum import Enum, auto
 from dataclasses import dataclass, field, asdict
@@ -21,10 +28,50 @@ from datetime import datetime, timedelta
 
 # Local imports
 from .execution_tracer import get_tracer
+from .task_cancellation import CancellationToken, TaskCancelled, shutdown_executor
+from .task_progress import TaskProgress, DEFAULT_CHUNK_PAGE
+from .result_pages import CursorError
+from .task_journal import TaskJournal
+from .process_backend import ProcessBackend, TaskEnvelope, is_picklable, default_process_workers
+from .task_handlers import MapReduceHandler, get_task_handler as get_index_task_handler, is_within_directory
 
 # Configure logger
 logger = logging.getLogger("ai_librarian.task_board")
 
+# Seconds the dispatcher waits for a free slot or a queued task before
+# re-checking deadlines and shutdown
+DISPATCH_POLL_INTERVAL = 0.25
+
+# Execution backend of each task type; types not listed run on threads.
+# CPU-bound work goes to worker processes so it does not hold the GIL:
+# component_analysis and diagnostics parse every file of their chunks, so
+# their chunks run on the worker processes. file_search, find_usages and
+# code_modification mostly read files and run their chunks on the chunk
+# threads. reindex runs on a thread: it publishes the new index to the
+# server's state and its parse step already uses a process pool.
+DEFAULT_TASK_BACKENDS = {
+    "component_analysis": "process",
+    "diagnostics": "process",
+    "deep_analysis": "process",
+    "code_analysis": "process",
+    "security_scan": "process"
+}
+BACKENDS = ("thread", "process")
+
+# Times a process-backed task is submitted when its worker dies under it
+MAX_PROCESS_ATTEMPTS = 2
+
+# Finished tasks whose partial results stay readable; older finished tasks
+# keep their progress counters but free their chunk buffers
+FINISHED_CHUNK_BUFFERS = 32
+
+# Handlers registered by the server for task types that need its state,
+# called as handler(project_path, params, token)
+_registered_handlers: Dict[str, Callable] = {}
+
+# Directories tasks may be submitted for, set by the server; None allows any
+_allowed_directories: Optional[List[str]] = None
+
 
 class TaskStatus(Enum):
     """Status of a TaskBoard task"""
@@ -53,20 +100,84 @@ class TaskResult:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+def _parse_status(value: Any) -> TaskStatus:
+    """Parse a stored task status ("COMPLETED", or "TaskStatus.COMPLETED" from older files)"""
+    if isinstance(value, TaskStatus):
+        return value
+    return TaskStatus[str(value).rsplit(".", 1)[-1]]
+
+
+def _failure_outcome(token: CancellationToken, error: Exception, execution_time_ms: float) -> Tuple[TaskStatus, TaskResult]:
+    """Map the error that ended a task to its final status and result"""
+    if isinstance(error, TaskCancelled):
+        reason = error.reason
+    elif token.cancelled:
+        # E.g. the worker process was killed because the task was cancelled
+        reason = token.reason or "timed out"
+    else:
+        return TaskStatus.FAILED, TaskResult(
+            success=False,
+            data=None,
+            error_message=str(error) or type(error).__name__,
+            execution_time_ms=execution_time_ms
+        )
+    status = TaskStatus.TIMEOUT if reason == "timed out" else TaskStatus.CANCELLED
+    return status, TaskResult(
+        success=False,
+        data=None,
+        error_message=f"Task {reason}",
+        execution_time_ms=execution_time_ms
+    )
+
+
+class _FanOut:
+    """Bookkeeping of a map-reduce task whose chunks run in parallel"""
+    
+    def __init__(self, task_id: str, task_type: str, handler: MapReduceHandler,
+                 params: Dict[str, Any], token: CancellationToken, backend: str):
+        self.task_id = task_id
+        self.task_type = task_type
+        self.handler = handler
+        self.params = params
+        self.token = token
+        self.backend = backend        # Backend whose slot the task holds
+        self.chunk_backend = backend  # Backend running the chunks
+        self.start_time = time.time()
+        self.lock = threading.Lock()
+        self.partials: List[Any] = []
+        self.remaining = 0
+        self.error: Optional[Exception] = None
+
+
+_TRACER_STATUS = {
+    TaskStatus.COMPLETED: "success",
+    TaskStatus.FAILED: "error",
+    TaskStatus.TIMEOUT: "timeout",
+    TaskStatus.CANCELLED: "cancelled"
+}
+
+
 @dataclass
 class TaskBoard:
     """
     TaskBoard for managing async tasks and communicating with mini-librarians
     """
     project_path: str
-    max_workers: int = 1  # Reduced from 4 to prevent timeout issues
+    max_workers: int = 1  # Handler threads; CPU-bound task types run on the process backend
     task_timeout: int = 120  # seconds
+    process_workers: Optional[int] = None  # Worker processes; None for one per spare core, 0 to disable
+    chunk_workers: Optional[int] = None  # Threads running map-reduce chunks; None for one per core
+    backends: Dict[str, str] = field(default_factory=dict)  # Per-task-type backend overrides
     
     # Task queues and storage
     task_queue: "queue.PriorityQueue" = field(default_factory=queue.PriorityQueue)
+    process_queue: "queue.PriorityQueue" = field(default_factory=queue.PriorityQueue)
     tasks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     results: Dict[str, TaskResult] = field(default_factory=dict)
     _cancelled_tasks: set = field(default_factory=set)  # Track cancelled tasks
+    _tokens: Dict[str, CancellationToken] = field(default_factory=dict)  # Tokens of running tasks
+    _progress: Dict[str, TaskProgress] = field(default_factory=dict)  # Progress of started tasks
+    _finished_progress: deque = field(default_factory=deque)  # Finished tasks still buffering chunks, oldest first
     
     # Locks for thread safety
     task_lock: threading.Lock = field(default_factory=threading.Lock)
@@ -80,189 +191,493 @@ class TaskBoard:
         # Create storage directory
         self.storage_path = os.path.join(self.project_path, ".ai_reference", "task_board")
         os.makedirs(self.storage_path, exist_ok=True)
+        self.journal = TaskJournal(self.storage_path)
+        
+        # Fixed-size pool running the handlers. A slot is only released when
+        # its handler returns, so handlers that outlive their timeout cannot
+        # pile up beyond max_workers.
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="TaskBoard-Handler"
+        )
+        # Chunks of map-reduce tasks run on their own threads: on the handler
+        # pool they would queue behind the task that split them
+        if self.chunk_workers is None:
+            self.chunk_workers = os.cpu_count() or 1
+        self._chunk_executor = ThreadPoolExecutor(
+            max_workers=max(1, self.chunk_workers),
+            thread_name_prefix="TaskBoard-Chunk"
+        )
+        self._futures = set()  # Executor work not finished yet, dropped on shutdown
+        self._futures_lock = threading.Lock()
+        self._queues = {"thread": self.task_queue, "process": self.process_queue}
+        self._slots = {"thread": threading.BoundedSemaphore(self.max_workers)}
+        
+        # Process pool for CPU-bound task types, started by the first task using it
+        if self.process_workers is None:
+            self.process_workers = default_process_workers()
+        self._process_backend: Optional[ProcessBackend] = None
+        if self.process_workers > 0:
+            self._process_backend = ProcessBackend(self.process_workers, on_progress=self._on_process_progress)
+            self._slots["process"] = threading.BoundedSemaphore(self.process_workers)
         
-        # Create workers
-        for i in range(self.max_workers):
-            worker = threading.Thread(
+        for backend in self._slots:
+            # Dispatcher feeding the backend in priority order and enforcing deadlines
+            dispatcher = threading.Thread(
                 target=self._worker_loop,
-                name=f"TaskBoard-Worker-{i}",
-                daemon=False
+                args=(backend,),
+                name="TaskBoard-Dispatcher" if backend == "thread" else f"TaskBoard-{backend.title()}-Dispatcher",
+                daemon=True
             )
-            self.workers.append(worker)
-            worker.start()
+            self.workers.append(dispatcher)
+            dispatcher.start()
         
-        logger.info(f"TaskBoard initialized with {self.max_workers} workers for {self.project_path}")
+        logger.info(
+            f"TaskBoard initialized with {self.max_workers} workers, {self.chunk_workers} chunk threads "
+            f"and {self.process_workers} worker processes for {self.project_path}"
+        )
         
         # Load any pending tasks from storage
         self._load_tasks()
+        
+        # The dispatchers are daemon threads so a process using the board can
+        # exit; stop the board cleanly first so the journal is written out
+        atexit.register(_shutdown_at_exit, weakref.ref(self))
+    
+    def _submit(self, fn: Callable, *args, executor: Optional[ThreadPoolExecutor] = None) -> Future:
+        """Submit work to the handler executor (or another one), tracking it until it finishes"""
+        future = (executor or self._executor).submit(fn, *args)
+        with self._futures_lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget_future)
+        return future
+    
+    def _forget_future(self, future: Future):
+        with self._futures_lock:
+            self._futures.discard(future)
+    
+    def backend_for(self, task_type: str) -> str:
+        """Get the execution backend ("thread" or "process") of a task type"""
+        backend = self.backends.get(task_type) or DEFAULT_TASK_BACKENDS.get(task_type, "thread")
+        if backend not in BACKENDS:
+            logger.warning(f"Unknown backend {backend} for task type {task_type}; using threads")
+            return "thread"
+        if backend == "process" and self._process_backend is None:
+            return "thread"
+        return backend
+    
+    def set_task_backend(self, task_type: str, backend: str):
+        """
+        Choose the execution backend of a task type for tasks submitted from now on
+        
+        Args:
+            task_type: Type of task
+            backend: "thread", or "process" for CPU-bound work
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Invalid backend: {backend}. Valid values are: {', '.join(BACKENDS)}")
+        self.backends[task_type] = backend
     
-    def _worker_loop(self):
-        """Worker thread loop for processing tasks"""
+    def _worker_loop(self, backend: str = "thread"):
+        """Dispatcher loop: start queued tasks on free backend slots and time out overdue ones"""
+        task_queue = self._queues[backend]
+        slots = self._slots[backend]
+        
         while self.running:
             try:
-                # Get task from queue with timeout to allow for shutdown
+                self._expire_deadlines()
+                if backend == "process":
+                    self._process_backend.poll()
+                
+                # Only take a task off the queue once a slot is free, so
+                # higher-priority tasks submitted meanwhile still go first
+                if not slots.acquire(timeout=DISPATCH_POLL_INTERVAL):
+                    continue
+                
                 try:
-                    priority, task_id, _ = self.task_queue.get(timeout=1.0)
-                    
-                    # Skip tasks that have been cancelled or already processed
-                    with self.task_lock:
-                        if task_id not in self.tasks or self.tasks[task_id]["status"] != TaskStatus.PENDING:
-                            self.task_queue.task_done()
-                            continue
-                        
-                        # Mark task as running
-                        self.tasks[task_id]["status"] = TaskStatus.RUNNING
-                        self.tasks[task_id]["started_at"] = datetime.now().isoformat()
-                        
-                        # Save task state
-                        self._save_task(task_id)
-                    
-                    # Execute task
-                    self._execute_task(task_id)
-                    
-                    # Mark task as completed
-                    self.task_queue.task_done()
-                    
+                    priority, task_id, _ = task_queue.get(timeout=DISPATCH_POLL_INTERVAL)
                 except queue.Empty:
+                    slots.release()
                     continue
                 
+                try:
+                    if not self._start_task(task_id, backend):
+                        slots.release()
+                finally:
+                    task_queue.task_done()
+                
             except Exception as e:
-                logger.error(f"Error in worker thread: {str(e)}")
+                logger.error(f"Error in dispatcher thread: {str(e)}")
                 traceback.print_exc()
                 
                 # Sleep a bit to avoid thrashing
                 time.sleep(0.1)
     
-    def _execute_task(self, task_id: str):
-        """Execute a task by its ID"""
-        # Get task info
+    def _start_task(self, task_id: str, backend: str = "thread") -> bool:
+        """Mark a pending task as running and submit it to its backend; the caller holds a slot"""
+        with self.task_lock:
+            task_info = self.tasks.get(task_id)
+            
+            # Skip tasks that have been cancelled or already processed, and
+            # leave pending tasks queued once the board is shutting down
+            if not task_info or task_info["status"] != TaskStatus.PENDING or not self.running:
+                return False
+            
+            progress = TaskProgress(task_id)
+            token = CancellationToken(task_info.get("timeout", self.task_timeout), progress)
+            self._tokens[task_id] = token
+            self._progress[task_id] = progress
+            
+            # Mark task as running
+            task_info["status"] = TaskStatus.RUNNING
+            task_info["started_at"] = datetime.now().isoformat()
+            task_type = task_info["task_type"]
+            params = task_info["parameters"]
+            
+            # Save task state
+            self._save_task(task_id)
+        
+        slots = self._slots[backend]
+        try:
+            handler = self._get_task_handler(task_type)
+            if isinstance(handler, MapReduceHandler):
+                # The slot is released once every chunk has been reduced
+                self._submit(self._fan_out, _FanOut(task_id, task_type, handler, params, token, backend))
+                return True
+            
+            if backend == "process":
+                envelope = TaskEnvelope(task_id, task_type, handler, params, token.remaining())
+                if handler and is_picklable(envelope):
+                    # The process slot is released by _on_process_done
+                    token.on_cancel(functools.partial(self._process_backend.kill, task_id))
+                    if self._submit_envelope(envelope, token, time.time()):
+                        return True
+                    raise RuntimeError("The process pool is shut down")
+                if handler:
+                    logger.warning(f"Handler of {task_type} cannot be sent to a worker process; running it on a thread")
+            
+            future = self._submit(self._execute_task, task_id, token)
+        except RuntimeError as e:
+            # The executor was shut down
+            self._finish_task(task_id, TaskStatus.FAILED, TaskResult(success=False, data=None, error_message=str(e)))
+            return False
+        
+        future.add_done_callback(lambda _: slots.release())
+        return True
+    
+    def _fan_out(self, job: _FanOut):
+        """Split a map-reduce task and submit its chunks to the task's backend"""
+        try:
+            job.token.check()
+            chunks = job.handler.split_work(job.params, job.token)
+        except Exception as e:
+            job.error = e
+            chunks = []
+        
+        job.partials = [None] * len(chunks)
+        job.remaining = len(chunks)
+        job.token.progress.update(0, sum(_chunk_size(chunk) for chunk in chunks))
+        if not chunks:
+            self._reduce(job)
+            return
+        
+        if job.backend == "process":
+            sample = TaskEnvelope(job.task_id, job.task_type, functools.partial(job.handler.run_chunk, chunks[0]), job.params)
+            if is_picklable(sample):
+                job.token.on_cancel(functools.partial(self._process_backend.kill, job.task_id))
+            else:
+                logger.warning(f"Chunks of {job.task_type} cannot be sent to worker processes; running them on threads")
+                job.chunk_backend = "thread"
+        
+        logger.info(f"Task {job.task_id} split into {len(chunks)} chunks on the {job.chunk_backend} backend")
+        for index, chunk in enumerate(chunks):
+            self._submit_chunk(job, index, chunk, 1)
+    
+    def _submit_chunk(self, job: _FanOut, index: int, chunk: Any, attempt: int):
+        """Run one chunk of a map-reduce task on a worker process or chunk thread"""
+        try:
+            if job.chunk_backend == "process":
+                future = self._process_backend.submit(TaskEnvelope(
+                    job.task_id, job.task_type,
+                    functools.partial(job.handler.run_chunk, chunk),
+                    job.params, job.token.remaining(), attempt
+                ))
+            else:
+                future = self._submit(job.handler.run_chunk, chunk, job.params, job.token, executor=self._chunk_executor)
+        except Exception as e:
+            # The backend is shut down or broken: record the chunk as failed
+            future = Future()
+            future.set_exception(e)
+        future.add_done_callback(functools.partial(self._chunk_done, job, index, chunk, attempt))
+    
+    def _chunk_done(self, job: _FanOut, index: int, chunk: Any, attempt: int, future):
+        """Collect the result of a chunk and reduce once the last one is in"""
+        error = None
+        try:
+            chunk_result = future.result()
+        except (BrokenProcessPool, CancelledError) as e:
+            # Another task's worker was killed and took the pool down: run the chunk again
+            if (job.chunk_backend == "process" and not job.token.cancelled
+                    and self.running and attempt < MAX_PROCESS_ATTEMPTS):
+                self._submit_chunk(job, index, chunk, attempt + 1)
+                return
+            error = e
+        except Exception as e:
+            error = e
+        
+        with job.lock:
+            if error is None:
+                job.partials[index] = chunk_result
+            elif job.error is None:
+                job.error = error
+            job.remaining -= 1
+            done = job.remaining == 0
+        
+        if error is None:
+            # Stream the chunk's result before the task is reduced
+            job.token.progress.publish(chunk_result)
+            job.token.progress.advance(_chunk_size(chunk))
+        
+        if done:
+            self._reduce(job)
+    
+    def _reduce(self, job: _FanOut):
+        """Merge the chunk results of a map-reduce task and record its outcome"""
+        try:
+            if job.error is not None:
+                raise job.error
+            job.token.check()
+            result_data = job.handler.reduce_results(job.params, job.partials)
+            status, result = TaskStatus.COMPLETED, TaskResult(
+                success=True,
+                data=result_data,
+                execution_time_ms=(time.time() - job.start_time) * 1000
+            )
+        except Exception as e:
+            if not isinstance(e, TaskCancelled) and not job.token.cancelled:
+                logger.error(f"Error executing task {job.task_id}: {str(e)}")
+            status, result = _failure_outcome(job.token, e, (time.time() - job.start_time) * 1000)
+        
+        try:
+            self._finish_task(job.task_id, status, result)
+        finally:
+            if job.chunk_backend == "process":
+                self._process_backend.forget(job.task_id)
+            self._slots[job.backend].release()
+    
+    def _submit_envelope(self, envelope: TaskEnvelope, token: CancellationToken, start_time: float) -> bool:
+        """Send a task to the process pool; its result arrives in _on_process_done"""
+        try:
+            future = self._process_backend.submit(envelope)
+        except (RuntimeError, BrokenProcessPool):
+            return False
+        future.add_done_callback(functools.partial(self._on_process_done, envelope, token, start_time))
+        return True
+    
+    def _on_process_done(self, envelope: TaskEnvelope, token: CancellationToken, start_time: float, future):
+        """Record the outcome of a process-backed task when its future completes"""
+        task_id = envelope.task_id
+        execution_time_ms = (time.time() - start_time) * 1000
+        
+        # Deliver what the handler reported before it returned
+        self._process_backend.poll()
+        
+        try:
+            result_data = future.result()
+            self._finish_task(task_id, TaskStatus.COMPLETED, TaskResult(
+                success=True,
+                data=result_data,
+                execution_time_ms=execution_time_ms
+            ))
+            
+        except (BrokenProcessPool, CancelledError) as e:
+            # The worker died: killed for this task, for another task in the
+            # same pool, or crashed. Only the first two are expected.
+            if not token.cancelled and self.running and envelope.attempt < MAX_PROCESS_ATTEMPTS:
+                envelope.attempt += 1
+                envelope.timeout = token.remaining()
+                if self._submit_envelope(envelope, token, start_time):
+                    logger.info(f"Resubmitted task {task_id} after its worker process stopped")
+                    return
+            
+            if token.cancelled:
+                reason = token.reason or "timed out"
+                status = TaskStatus.TIMEOUT if reason == "timed out" else TaskStatus.CANCELLED
+                error = f"Task {reason}"
+            else:
+                status = TaskStatus.FAILED
+                error = f"Worker process stopped: {str(e) or type(e).__name__}"
+            self._finish_task(task_id, status, TaskResult(
+                success=False,
+                data=None,
+                error_message=error,
+                execution_time_ms=execution_time_ms
+            ))
+            
+        except TaskCancelled as e:
+            status = TaskStatus.TIMEOUT if e.reason == "timed out" else TaskStatus.CANCELLED
+            self._finish_task(task_id, status, TaskResult(
+                success=False,
+                data=None,
+                error_message=str(e),
+                execution_time_ms=execution_time_ms
+            ))
+            
+        except Exception as e:
+            logger.error(f"Error executing task {task_id} in a worker process: {str(e)}")
+            self._finish_task(task_id, TaskStatus.FAILED, TaskResult(
+                success=False,
+                data=None,
+                error_message=str(e),
+                execution_time_ms=execution_time_ms
+            ))
+        
+        self._process_backend.forget(task_id)
+        self._slots["process"].release()
+    
+    def _on_process_progress(self, task_id: str, method: str, args: tuple):
+        """Apply a progress report of a handler running in a worker process"""
+        with self.task_lock:
+            progress = self._progress.get(task_id)
+        if progress and method in ("update", "advance", "set_total", "publish"):
+            getattr(progress, method)(*args)
+    
+    def _execute_task(self, task_id: str, token: CancellationToken):
+        """Run the handler of a task on an executor thread"""
+        start_time = time.time()
+        
         try:
             with self.task_lock:
                 task_info = self.tasks.get(task_id)
                 if not task_info:
                     logger.error(f"Task {task_id} not found")
                     return
-            
-            # Record start time
-            start_time = time.time()
-            
-            # Extract task details
-            task_type = task_info["task_type"]
-            params = task_info["parameters"]
-            timeout = task_info.get("timeout", self.task_timeout)
+                task_type = task_info["task_type"]
+                params = task_info["parameters"]
             
             # Get handler for task type
             handler = self._get_task_handler(task_type)
             if not handler:
                 raise ValueError(f"No handler found for task type: {task_type}")
-                
-            # Execute with timeout in a separate thread
-            result_queue = queue.Queue()
             
-            def execute_with_handler():
-                try:
-                    result = handler(params)
-                    result_queue.put((True, result, None))
-                except Exception as e:
-                    result_queue.put((False, None, str(e)))
+            token.check()
+            result_data = handler(params, token)
             
-            # Run handler in thread
-            handler_thread = threading.Thread(target=execute_with_handler)
-            handler_thread.daemon = True
-            handler_thread.start()
+            self._finish_task(task_id, TaskStatus.COMPLETED, TaskResult(
+                success=True,
+                data=result_data,
+                execution_time_ms=(time.time() - start_time) * 1000
+            ))
+            
+        except TaskCancelled as e:
+            # Usually already recorded by cancel_task or the deadline check
+            status = TaskStatus.TIMEOUT if e.reason == "timed out" else TaskStatus.CANCELLED
+            self._finish_task(task_id, status, TaskResult(
+                success=False,
+                data=None,
+                error_message=str(e),
+                execution_time_ms=(time.time() - start_time) * 1000
+            ))
             
-            # Wait for result with timeout
-            try:
-                success, result_data, error = result_queue.get(timeout=timeout)
-                execution_time_ms = (time.time() - start_time) * 1000
-                
-                # Create task result
-                task_result = TaskResult(
-                    success=success,
-                    data=result_data,
-                    error_message=error,
-                    execution_time_ms=execution_time_ms
-                )
-                
-                # Update task status
-                with self.task_lock:
-                    self.tasks[task_id]["status"] = TaskStatus.COMPLETED if success else TaskStatus.FAILED
-                    self.tasks[task_id]["completed_at"] = datetime.now().isoformat()
-                    self.tasks[task_id]["execution_time_ms"] = execution_time_ms
-                    
-                    if not success:
-                        self.tasks[task_id]["error"] = error
-                    
-                    # Store result
-                    self.results[task_id] = task_result
-                    
-                    # Save task state
-                    self._save_task(task_id)
-                
-                # Notify tracer
-                tracer = get_tracer(self.project_path)
-                tracer.record_operation(
-                    operation=f"taskboard_{task_type}",
-                    parameters=params,
-                    result_status="success" if success else "error",
-                    execution_time_ms=execution_time_ms,
-                    error_message=error,
-                    metadata={"task_id": task_id}
-                )
-                
-            except queue.Empty:
-                # Task timed out
-                with self.task_lock:
-                    self.tasks[task_id]["status"] = TaskStatus.TIMEOUT
-                    self.tasks[task_id]["completed_at"] = datetime.now().isoformat()
-                    self.tasks[task_id]["error"] = f"Task timed out after {timeout} seconds"
-                    
-                    # Create timeout result
-                    execution_time_ms = (time.time() - start_time) * 1000
-                    self.tasks[task_id]["execution_time_ms"] = execution_time_ms
-                    
-                    self.results[task_id] = TaskResult(
-                        success=False,
-                        data=None,
-                        error_message=f"Task timed out after {timeout} seconds",
-                        execution_time_ms=execution_time_ms
-                    )
-                    
-                    # Save task state
-                    self._save_task(task_id)
-                
-                # Notify tracer
-                tracer = get_tracer(self.project_path)
-                tracer.record_operation(
-                    operation=f"taskboard_{task_type}",
-                    parameters=params,
-                    result_status="timeout",
-                    execution_time_ms=timeout * 1000,
-                    error_message=f"Task timed out after {timeout} seconds",
-                    metadata={"task_id": task_id}
-                )
-                
-                # Add thread cleanup on timeout
-                if handler_thread.is_alive():
-                    logger.warning(f"Handler thread for task {task_id} is still running after timeout")
-                    # We can't forcibly terminate threads in Python, but we can try to set a flag
-                    # that the handler can check to know it should exit early
-        
         except Exception as e:
             logger.error(f"Error executing task {task_id}: {str(e)}")
             traceback.print_exc()
             
-            # Update task status
-            with self.task_lock:
-                self.tasks[task_id]["status"] = TaskStatus.FAILED
-                self.tasks[task_id]["completed_at"] = datetime.now().isoformat()
-                self.tasks[task_id]["error"] = str(e)
-                
-                # Save task state
-                self._save_task(task_id)
+            self._finish_task(task_id, TaskStatus.FAILED, TaskResult(
+                success=False,
+                data=None,
+                error_message=str(e),
+                execution_time_ms=(time.time() - start_time) * 1000
+            ))
+    
+    def _finish_task(self, task_id: str, status: TaskStatus, result: TaskResult) -> bool:
+        """
+        Record the outcome of a running task.
+        
+        The first outcome wins: a handler that returns after its task timed
+        out or was cancelled does not overwrite that status.
+        
+        Returns:
+            True if the outcome was recorded
+        """
+        with self.task_lock:
+            task_info = self.tasks.get(task_id)
+            if not task_info or task_info["status"] != TaskStatus.RUNNING:
+                return False
+            
+            task_info["status"] = status
+            task_info["cancelled_at" if status == TaskStatus.CANCELLED else "completed_at"] = datetime.now().isoformat()
+            task_info["execution_time_ms"] = result.execution_time_ms
+            if not result.success:
+                task_info["error"] = result.error_message
+            
+            # Store result
+            self.results[task_id] = result
+            self._tokens.pop(task_id, None)
+            progress = self._progress.get(task_id)
+            if progress:
+                progress.close(status.name)
+                self._finished_progress.append(task_id)
+                while len(self._finished_progress) > FINISHED_CHUNK_BUFFERS:
+                    released = self._progress.get(self._finished_progress.popleft())
+                    if released:
+                        released.release_chunks()
+            
+            # Save task state
+            self._save_task(task_id)
+            
+            task_type = task_info["task_type"]
+            params = task_info["parameters"]
+        
+        # Notify tracer
+        tracer = get_tracer(self.project_path)
+        tracer.record_operation(
+            operation=f"taskboard_{task_type}",
+            parameters=params,
+            result_status=_TRACER_STATUS[status],
+            execution_time_ms=result.execution_time_ms,
+            error_message=result.error_message,
+            metadata={"task_id": task_id}
+        )
+        return True
+    
+    def _expire_deadlines(self):
+        """Time out running tasks past their deadline and signal their handlers to stop"""
+        with self.task_lock:
+            expired = [
+                (task_id, token, self.tasks[task_id].get("timeout", self.task_timeout))
+                for task_id, token in self._tokens.items()
+                if token.expired and task_id in self.tasks
+            ]
+        
+        for task_id, token, timeout in expired:
+            token.cancel("timed out")
+            if self._finish_task(task_id, TaskStatus.TIMEOUT, TaskResult(
+                success=False,
+                data=None,
+                error_message=f"Task timed out after {timeout} seconds",
+                execution_time_ms=timeout * 1000
+            )):
+                logger.warning(f"Task {task_id} timed out after {timeout} seconds")
     
     def _get_task_handler(self, task_type: str) -> Optional[Callable]:
-        """Get the handler function for a task type"""
+        """
+        Get the handler function for a task type
+        
+        Handlers are called as handler(params, token) and should call
+        token.check() at checkpoints so cancellation and timeouts stop them.
+        Index-backed task types get a MapReduceHandler, whose chunks the
+        board runs in parallel. Task types needing the server (reindex) use the
+        handlers registered with register_task_handler.
+        """
+        handler = get_index_task_handler(self.project_path, task_type)
+        if handler is not None:
+            return handler
+        
+        registered = _registered_handlers.get(task_type)
+        if registered is not None:
+            return functools.partial(registered, self.project_path)
+        
         # This would connect to the mini-librarian system
         # For now, use some placeholder handlers
         from .server import determine_mini_librarians
@@ -274,21 +689,9 @@ class TaskBoard:
                 logger.warning(f"No mini-librarians found for task type: {task_type}")
                 return None
                 
-            # For now, return a placeholder handler
-            def handler(params):
-                logger.info(f"Executing {task_type} with mini-librarians: {mini_librarians}")
-                
-                # Do some work with the mini-librarians
-                time.sleep(0.1)  # Simulate work
-                
-                return {
-                    "status": "success",
-                    "task_type": task_type,
-                    "mini_librarians_used": mini_librarians,
-                    "result": f"Simulated execution of {task_type}"
-                }
-                
-            return handler
+            # For now, return a placeholder handler; a module-level function
+            # so it can also run in a worker process
+            return functools.partial(_placeholder_handler, task_type, mini_librarians)
             
         except Exception as e:
             logger.error(f"Error getting task handler for {task_type}: {str(e)}")
@@ -332,46 +735,110 @@ class TaskBoard:
             # Save task state
             self._save_task(task_id)
         
-        # Add to queue
-        self.task_queue.put((priority.value, task_id, time.time()))
+        # Add to the queue of the task type's backend
+        self._queues[self.backend_for(task_type)].put((priority.value, task_id, time.time()))
         
         logger.info(f"Submitted task {task_id} of type {task_type} with priority {priority.name}")
         
         return task_id
     
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
-        """Get the status of a task"""
+        """Get the status of a task, with its progress once it has started"""
         with self.task_lock:
             task_info = self.tasks.get(task_id)
             if not task_info:
                 return None
+            task_info = task_info.copy()
                 
             # Include result if available
             result = self.results.get(task_id)
             if result:
                 task_info["result"] = asdict(result)
+            
+            progress = self._progress.get(task_id)
+            if progress:
+                task_info["progress"] = progress.snapshot()
                 
             return task_info
     
+    def get_task_progress(self, task_id: str) -> Optional[TaskProgress]:
+        """Get the progress of a task; None if it has not started in this session"""
+        with self.task_lock:
+            return self._progress.get(task_id)
+    
+    def read_task_chunks(self, task_id: str, cursor: Optional[str] = None,
+                         limit: int = DEFAULT_CHUNK_PAGE) -> Optional[Dict[str, Any]]:
+        """
+        Read the partial results a task has published so far
+        
+        Args:
+            task_id: ID of the task
+            cursor: Cursor returned by a previous read; None starts at the
+                oldest buffered chunk
+            limit: Maximum number of chunks to return
+            
+        Returns:
+            The chunks with "next_cursor", "dropped", "has_more" and
+            "finished" (see TaskProgress.read), or None if the task has
+            not started
+            
+        Raises:
+            CursorError: If the cursor is invalid or belongs to another task
+        """
+        progress = self.get_task_progress(task_id)
+        if not progress:
+            return None
+        return progress.read(cursor, limit)
+    
     def cancel_task(self, task_id: str) -> bool:
-        """Cancel a pending task"""
+        """
+        Cancel a pending or running task
+        
+        A pending task is never started. A running task is marked cancelled
+        at once and its token is cancelled, which stops the handler at its
+        next checkpoint and hard-stops any process attached to the token.
+        
+        Returns:
+            True if the task was cancelled
+        """
         with self.task_lock:
             task_info = self.tasks.get(task_id)
             if not task_info:
                 return False
+            
+            if task_info["status"] == TaskStatus.PENDING:
+                # Mark task as cancelled
+                task_info["status"] = TaskStatus.CANCELLED
+                task_info["cancelled_at"] = datetime.now().isoformat()
                 
-            # Can only cancel pending tasks
-            if task_info["status"] != TaskStatus.PENDING:
-                return False
+                # Save task state
+                self._save_task(task_id)
                 
-            # Mark task as cancelled
-            task_info["status"] = TaskStatus.CANCELLED
-            task_info["cancelled_at"] = datetime.now().isoformat()
+                return True
             
-            # Save task state
-            self._save_task(task_id)
-                
-            return True
+            # Finished tasks cannot be cancelled
+            if task_info["status"] != TaskStatus.RUNNING:
+                return False
+            
+            token = self._tokens.get(task_id)
+            started_at = task_info.get("started_at")
+        
+        execution_time_ms = 0.0
+        if started_at:
+            execution_time_ms = (datetime.now() - datetime.fromisoformat(started_at)).total_seconds() * 1000
+        
+        # Record the cancellation before stopping the handler: killing a
+        # worker process completes the task's future with an error, which
+        # must not win over the cancellation
+        cancelled = self._finish_task(task_id, TaskStatus.CANCELLED, TaskResult(
+            success=False,
+            data=None,
+            error_message="Task cancelled",
+            execution_time_ms=execution_time_ms
+        ))
+        if token:
+            token.cancel("cancelled")
+        return cancelled
     
     def get_task_result(self, task_id: str) -> Optional[TaskResult]:
         """Get the result of a completed task"""
@@ -408,70 +875,91 @@ class TaskBoard:
             return tasks
     
     def _save_task(self, task_id: str):
-        """Save task state to disk"""
+        """
+        Record the task's state in the journal
+        
+        Called with task_lock held, so records are journaled in the order
+        the states changed. Only the record is built here; the journal's
+        writer thread does the disk write.
+        """
         try:
-            task_info = self.tasks[task_id]
+            task_data = self.tasks[task_id].copy()
+            task_data["status"] = task_data["status"].name
             
-            # Create task directory if it doesn't exist
-            tasks_dir = os.path.join(self.storage_path, "tasks")
-            os.makedirs(tasks_dir, exist_ok=True)
+            # Include result if available
+            result = self.results.get(task_id)
+            if result:
+                task_data["result"] = asdict(result)
+            
+            self.journal.put(task_data)
             
-            # Save task info
-            task_file = os.path.join(tasks_dir, f"{task_id}.json")
-            with open(task_file, 'w', encoding='utf-8') as f:
-                # Include result if available
-                task_data = task_info.copy()
-                result = self.results.get(task_id)
-                if result:
-                    task_data["result"] = asdict(result)
-                    
-                json.dump(task_data, f, indent=2)
-                
         except Exception as e:
             logger.error(f"Error saving task {task_id}: {str(e)}")
     
     def _load_tasks(self):
-        """Load tasks from disk"""
+        """Load tasks from the journal's snapshot and tail"""
         try:
-            # Get task directory
-            tasks_dir = os.path.join(self.storage_path, "tasks")
-            if not os.path.exists(tasks_dir):
-                return
-                
-            # Load all task files
-            for filename in os.listdir(tasks_dir):
-                if not filename.endswith('.json'):
-                    continue
-                    
-                try:
-                    task_file = os.path.join(tasks_dir, filename)
-                    with open(task_file, 'r', encoding='utf-8') as f:
-                        task_data = json.load(f)
+            migrate = not self.journal.exists()
+            records = self.journal.load()
+            if migrate:
+                records = self._load_legacy_tasks()
+            
+            interrupted = []
+            with self.task_lock:
+                for task_id, task_data in records.items():
+                    try:
+                        # Extract result if present
+                        result_data = task_data.pop("result", None)
+                        task_data["status"] = _parse_status(task_data.get("status"))
                         
-                    task_id = task_data["id"]
-                    
-                    # Extract result if present
-                    result_data = task_data.pop("result", None)
-                    
-                    # Store task info
-                    with self.task_lock:
+                        # Store task info
                         self.tasks[task_id] = task_data
                         
                         # Restore result if present
                         if result_data:
                             self.results[task_id] = TaskResult(**result_data)
-                            
-                        # Re-queue pending tasks
+                        
                         if task_data["status"] == TaskStatus.PENDING:
+                            # Re-queue pending tasks
                             priority = task_data["priority"]
-                            self.task_queue.put((priority, task_id, time.time()))
+                            self._queues[self.backend_for(task_data["task_type"])].put((priority, task_id, time.time()))
+                        elif task_data["status"] == TaskStatus.RUNNING:
+                            # The server stopped while the task ran
+                            task_data["status"] = TaskStatus.FAILED
+                            task_data["completed_at"] = datetime.now().isoformat()
+                            task_data["error"] = "Interrupted by a server restart"
+                            interrupted.append(task_id)
                             
-                except Exception as e:
-                    logger.error(f"Error loading task file {filename}: {str(e)}")
+                    except Exception as e:
+                        logger.error(f"Error loading task {task_id}: {str(e)}")
+                
+                for task_id in (self.tasks if migrate else interrupted):
+                    self._save_task(task_id)
                     
         except Exception as e:
             logger.error(f"Error loading tasks: {str(e)}")
     
+    def _load_legacy_tasks(self) -> Dict[str, Dict[str, Any]]:
+        """Read the per-task JSON files written before the journal, to import them"""
+        records = {}
+        tasks_dir = os.path.join(self.storage_path, "tasks")
+        if not os.path.isdir(tasks_dir):
+            return records
+        
+        for filename in os.listdir(tasks_dir):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(tasks_dir, filename), 'r', encoding='utf-8') as f:
+                    task_data = json.load(f)
+                records[task_data["id"]] = task_data
+            except Exception as e:
+                logger.error(f"Error loading task file {filename}: {str(e)}")
+        
+        if records:
+            logger.info(f"Importing {len(records)} task files from {tasks_dir} into the journal")
+        return records
+    
     def cleanup(self):
         """Clean up old tasks"""
         with self.task_lock:
@@ -499,32 +987,110 @@ class TaskBoard:
                 # Remove from memory
                 self.tasks.pop(task_id, None)
                 self.results.pop(task_id, None)
+                self._progress.pop(task_id, None)
                 
-                # Remove from disk
+                # Remove from the journal; dropped from disk at the next compaction
                 try:
-                    task_file = os.path.join(self.storage_path, "tasks", f"{task_id}.json")
-                    if os.path.exists(task_file):
-                        os.remove(task_file)
+                    self.journal.delete(task_id)
                 except Exception as e:
-                    logger.error(f"Error removing task file for {task_id}: {str(e)}")
+                    logger.error(f"Error removing task {task_id} from the journal: {str(e)}")
     
     def shutdown(self):
         """Shutdown the TaskBoard"""
+        if not self.running:
+            return
         logger.info("Shutting down TaskBoard...")
         
         # Signal workers to stop
         self.running = False
         
+        # No replacement pool is started when workers are killed from here on
+        if self._process_backend is not None:
+            self._process_backend.shutdown()
+        
+        # Stop running handlers at their next checkpoint
+        with self.task_lock:
+            running_tasks = list(self._tokens)
+        for task_id in running_tasks:
+            self.cancel_task(task_id)
+        
         # Wait for workers to finish (with timeout)
         for worker in self.workers:
             worker.join(timeout=1.0)
         
+        with self._futures_lock:
+            pending = list(self._futures)
+        shutdown_executor(self._executor, pending)
+        shutdown_executor(self._chunk_executor)
+        
+        # Write the outstanding records and compact the journal
+        self.journal.close()
+        
         logger.info("TaskBoard shutdown complete")
 
 
+def _shutdown_at_exit(board_ref: "weakref.ref[TaskBoard]"):
+    """atexit hook: shut down a TaskBoard that is still running"""
+    board = board_ref()
+    if board is not None:
+        board.shutdown()
+
+
+def _chunk_size(chunk: Any) -> int:
+    """Items in a map-reduce chunk, for progress; chunks without a length count as one"""
+    try:
+        return max(1, len(chunk))
+    except TypeError:
+        return 1
+
+
+def _placeholder_handler(task_type: str, mini_librarians: List[str], params: Dict[str, Any], token: CancellationToken) -> Dict[str, Any]:
+    """Placeholder handler standing in for the mini-librarian system"""
+    logger.info(f"Executing {task_type} with mini-librarians: {mini_librarians}")
+    
+    # Do some work with the mini-librarians
+    token.sleep(0.1)  # Simulate work
+    
+    return {
+        "status": "success",
+        "task_type": task_type,
+        "mini_librarians_used": mini_librarians,
+        "result": f"Simulated execution of {task_type}"
+    }
+
+
 # Singleton pattern for the TaskBoard
 _task_boards = {}
 
+def register_task_handler(task_type: str, handler: Callable):
+    """
+    Register the handler of a task type.
+    
+    Args:
+        task_type: Type of task
+        handler: Called as handler(project_path, params, token)
+    """
+    _registered_handlers[task_type] = handler
+
+
+def set_allowed_directories(directories: Optional[List[str]]):
+    """
+    Restrict background tasks to projects inside the given directories.
+    
+    Args:
+        directories: Allowed directories, or None to allow any project
+    """
+    global _allowed_directories
+    _allowed_directories = list(directories) if directories is not None else None
+
+
+def is_allowed_project(project_path: str) -> bool:
+    """Check whether background tasks may be submitted for a project."""
+    if _allowed_directories is None:
+        return True
+    return any(is_within_directory(project_path, directory) for directory in _allowed_directories)
+
+
 def get_task_board(project_path: str) -> TaskBoard:
     """
     Get or create a TaskBoard for the specified project.
@@ -567,6 +1133,9 @@ def submit_background_task(project_path: str,
     }
     priority_enum = priority_map.get(priority.lower(), TaskPriority.MEDIUM)
     
+    if not is_allowed_project(project_path):
+        return f"Error: Access denied: {project_path} is not within allowed directories"
+    
     # Get TaskBoard and submit task
     task_board = get_task_board(project_path)
     task_id = task_board.submit_task(
@@ -611,6 +1180,8 @@ def get_task_status_mcp(project_path: str, task_id: str) -> str:
         started_at = task_info.get("started_at")
         if started_at:
             response.append(f"Started: {started_at}")
+        if "progress" in task_info:
+            response.append(_format_progress(task_info["progress"]))
             
     elif status in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.TIMEOUT]:
         completed_at = task_info.get("completed_at")
@@ -631,6 +1202,10 @@ def get_task_status_mcp(project_path: str, task_id: str) -> str:
         if cancelled_at:
             response.append(f"Cancelled: {cancelled_at}")
     
+    chunks = task_info.get("progress", {}).get("chunks_published")
+    if chunks:
+        response.append(f"Partial results: {chunks} chunks published; read them with get_task_chunks")
+    
     # Include result summary if available
     if "result" in task_info:
         result = task_info["result"]
@@ -697,9 +1272,163 @@ def get_task_result_mcp(project_path: str, task_id: str) -> str:
     
     return "\n".join(response)
 
+def _format_progress(progress: Dict[str, Any]) -> str:
+    """Format a progress snapshot as one status line"""
+    if progress["total"]:
+        line = f"Progress: {progress['done']}/{progress['total']} items ({progress['percent']}%)"
+    else:
+        line = f"Progress: {progress['done']} items"
+    if progress["eta_seconds"] is not None:
+        line += f", ETA {progress['eta_seconds']:.1f}s"
+    if progress["message"]:
+        line += f" - {progress['message']}"
+    return line
+
+def _format_chunk(chunk: Dict[str, Any]) -> List[str]:
+    """Format a partial result as response lines"""
+    lines = [f"\n[Chunk {chunk['seq']}]"]
+    data = chunk["data"]
+    if isinstance(data, dict):
+        lines.extend(f"{key}: {value}" for key, value in data.items())
+    else:
+        lines.append(str(data))
+    return lines
+
+def get_task_chunks_mcp(project_path: str, task_id: str, cursor: str = None, limit: int = DEFAULT_CHUNK_PAGE) -> str:
+    """
+    Get the partial results a background task has published so far
+    
+    Args:
+        project_path: Path to the project
+        task_id: ID of the task
+        cursor: Cursor from a previous call, to continue after the chunks it returned
+        limit: Maximum number of chunks to return
+        
+    Returns:
+        The chunks and the cursor to read the next ones
+    """
+    task_board = get_task_board(project_path)
+    try:
+        page = task_board.read_task_chunks(task_id, cursor, limit)
+    except CursorError as e:
+        return f"Error: {str(e)}"
+    
+    if page is None:
+        if not task_board.get_task_status(task_id):
+            return f"Task {task_id} not found"
+        return f"Task {task_id} has no partial results (it has not started in this session)"
+    
+    response = [f"Task {task_id} Partial Results: {len(page['chunks'])} chunks"]
+    if page["dropped"]:
+        response.append(f"Missed {page['dropped']} older chunks that were dropped from the buffer")
+    
+    for chunk in page["chunks"]:
+        response.extend(_format_chunk(chunk))
+    
+    if page["has_more"]:
+        response.append("\nMore chunks are buffered; call again with the cursor")
+    elif page["finished"]:
+        response.append(f"\nTask finished ({page['finished']}); no more chunks will follow")
+    else:
+        response.append("\nTask still running; call again with the cursor for new chunks")
+    response.append(f"Cursor: {page['next_cursor']}")
+    
+    return "\n".join(response)
+
+async def watch_task_mcp(project_path: str, task_id: str, ctx: Any = None, timeout: float = 30.0,
+                         cursor: str = None) -> str:
+    """
+    Wait for a background task to finish, streaming its progress and partial results
+    
+    Progress is sent through the MCP progress channel (ctx.report_progress)
+    whenever it changes, and each new chunk, in publication order, as a log
+    message (ctx.info). Chunks that cannot be sent that way are listed in the
+    response instead. Returns early after `timeout` seconds, so long tasks can
+    be watched over several calls by passing the returned cursor back.
+    
+    Args:
+        project_path: Path to the project
+        task_id: ID of the task to watch
+        ctx: MCP request context; progress and chunks are only returned at the end without it
+        timeout: Seconds to watch before returning
+        cursor: Cursor from a previous call, to stream only the chunks published since
+        
+    Returns:
+        Task status, followed by the chunk cursor
+    """
+    task_board = get_task_board(project_path)
+    deadline = time.monotonic() + timeout
+    version = -1
+    report_progress = getattr(ctx, "report_progress", None)
+    send_chunk = getattr(ctx, "info", None)
+    unsent: List[Dict[str, Any]] = []
+    streamed = dropped = 0
+    
+    while True:
+        task_info = task_board.get_task_status(task_id)
+        if not task_info:
+            return f"Task {task_id} not found"
+        finished = task_info["status"] not in (TaskStatus.PENDING, TaskStatus.RUNNING)
+        
+        progress = task_board.get_task_progress(task_id)
+        if progress is not None and progress.version != version:
+            version = progress.version
+            if report_progress is not None:
+                snapshot = progress.snapshot()
+                try:
+                    await report_progress(snapshot["done"], snapshot["total"])
+                except Exception as e:
+                    logger.warning(f"Could not report progress of task {task_id}: {str(e)}")
+                    report_progress = None
+            
+            # Stream the chunks published since the last read, oldest first
+            while True:
+                try:
+                    page = task_board.read_task_chunks(task_id, cursor)
+                except CursorError as e:
+                    return f"Error: {str(e)}"
+                if page is None:
+                    break
+                cursor = page["next_cursor"]
+                dropped += page["dropped"]
+                for chunk in page["chunks"]:
+                    streamed += 1
+                    if send_chunk is not None:
+                        try:
+                            await send_chunk(f"Task {task_id}" + "\n".join(_format_chunk(chunk)))
+                            continue
+                        except Exception as e:
+                            logger.warning(f"Could not send partial results of task {task_id}: {str(e)}")
+                            send_chunk = None
+                    unsent.append(chunk)
+                if not page["has_more"]:
+                    break
+        
+        if finished or time.monotonic() >= deadline:
+            break
+        
+        wait = min(1.0, max(0.0, deadline - time.monotonic()))
+        if progress is None:
+            # Not started yet
+            await asyncio.sleep(min(wait, DISPATCH_POLL_INTERVAL))
+        else:
+            # Wait for the next change off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, progress.wait, version, wait)
+    
+    response = [get_task_status_mcp(project_path, task_id)]
+    if streamed or dropped:
+        response.append(f"\nStreamed {streamed} partial results")
+        if dropped:
+            response.append(f"Missed {dropped} older chunks that were dropped from the buffer")
+        for chunk in unsent:
+            response.extend(_format_chunk(chunk))
+    if cursor is not None:
+        response.append(f"Cursor: {cursor}")
+    return "\n".join(response)
+
 def cancel_task_mcp(project_path: str, task_id: str) -> str:
     """
-    Cancel a pending background task
+    Cancel a pending or running background task
     
     Args:
         project_path: Path to the project
@@ -818,6 +1547,9 @@ def task_deep_analysis(project_path: str, query: str, priority: str = "high") ->
         "use_mini_librarians": True
     }
     
+    if not is_allowed_project(project_path):
+        return f"Error: Access denied: {project_path} is not within allowed directories"
+    
     # Submit task
     task_board = get_task_board(project_path)
     task_id = task_board.submit_task(
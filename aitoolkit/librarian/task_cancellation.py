@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Task Cancellation
+
+Cooperative cancellation for TaskBoard handlers.
+
+Every task gets a CancellationToken, passed to its handler. Handlers call
+`token.check()` at natural checkpoints (between files, batches or phases)
+and use `token.sleep()` instead of `time.sleep()`; both stop the handler
+with TaskCancelled once the task is cancelled or its deadline has passed.
+
+Threads cannot be killed, so a handler that never reaches a checkpoint keeps
+its executor slot until it returns. Work that runs in a child process can be
+stopped for real: attach the process to the token and it is terminated (and
+killed if it does not exit) as soon as the token is cancelled.
+
+The token also carries the task's progress sink (`token.progress`), so
+handlers can report progress and publish partial results without another
+argument.
+"""
+
+import sys
+import time
+import logging
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Optional, Callable, Iterable
+
+try:
+    from .task_progress import ProgressSink
+except ImportError:
+    from task_progress import ProgressSink
+
+logger = logging.getLogger("ai_librarian.task_cancellation")
+
+# Seconds a terminated process gets to exit before it is killed
+PROCESS_KILL_GRACE = 2.0
+
+class TaskCancelled(Exception):
+    """Raised at a checkpoint of a cancelled or timed-out task."""
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(f"Task {reason}")
+        self.reason = reason
+
+    def __reduce__(self):
+        # Keep the reason when raised in a worker process and re-raised here
+        return (TaskCancelled, (self.reason,))
+
+class CancellationToken:
+    """
+    Cancellation flag and deadline of one task.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, progress: Optional[ProgressSink] = None):
+        """
+        Initialize the token.
+
+        Args:
+            timeout: Seconds from now after which the task counts as timed out
+            progress: Where the handler reports progress; discarded if None
+        """
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.progress = progress or ProgressSink()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the task was cancelled or ran past its deadline."""
+        return self._event.is_set() or self.expired
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """
+        Cancel the task and run the registered hard-stop callbacks.
+
+        Args:
+            reason: Why the task stops, e.g. "cancelled" or "timed out"
+
+        Returns:
+            True if this call cancelled the token, False if it already was
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {str(e)}")
+        return True
+
+    def check(self) -> None:
+        """
+        Checkpoint: stop the handler if the task should no longer run.
+
+        Raises:
+            TaskCancelled: If the token was cancelled or the deadline passed
+        """
+        if self._event.is_set():
+            raise TaskCancelled(self.reason or "cancelled")
+        if self.expired:
+            raise TaskCancelled("timed out")
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Wait like time.sleep, but wake up and stop as soon as the task is cancelled.
+
+        Raises:
+            TaskCancelled: If the task is cancelled or times out while waiting
+        """
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        self._event.wait(seconds)
+        self.check()
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        """
+        Register a callback that hard-stops work when the token is cancelled.
+
+        The callback runs immediately if the token is already cancelled.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def attach_process(self, process) -> None:
+        """
+        Terminate a child process when the token is cancelled.
+
+        Args:
+            process: A subprocess.Popen or multiprocessing.Process
+        """
+        def stop():
+            if _process_alive(process):
+                logger.info(f"Terminating process {process.pid} of a cancelled task")
+                process.terminate()
+                threading.Thread(
+                    target=_kill_after_grace,
+                    args=(process,),
+                    name=f"TaskBoard-Kill-{process.pid}",
+                    daemon=True
+                ).start()
+
+        self.on_cancel(stop)
+
+def _process_alive(process) -> bool:
+    if hasattr(process, "poll"):
+        return process.poll() is None
+    return process.is_alive()
+
+def _kill_after_grace(process) -> None:
+    """Kill a terminated process that has not exited within the grace period."""
+    if hasattr(process, "poll"):
+        try:
+            process.wait(timeout=PROCESS_KILL_GRACE)
+            return
+        except Exception:
+            pass
+    else:
+        process.join(PROCESS_KILL_GRACE)
+    if _process_alive(process):
+        logger.warning(f"Killing process {process.pid} that ignored termination")
+        process.kill()
+
+def shutdown_executor(executor, pending: Iterable[Future] = ()) -> None:
+    """
+    Stop an executor without waiting for it, dropping work that has not started.
+
+    `Executor.shutdown(cancel_futures=True)` needs Python 3.9; cancelling the
+    pending futures first does the same on 3.8.
+
+    Args:
+        executor: A ThreadPoolExecutor or ProcessPoolExecutor; drop the
+            reference to it afterwards
+        pending: Futures submitted to it that may not have started yet
+    """
+    for future in list(pending):
+        future.cancel()
+    if sys.version_info < (3, 9) and isinstance(executor, ProcessPoolExecutor):
+        # On 3.8, shutdown(wait=False) closes the call queue before the pool
+        # has told its workers to exit, and interpreter exit then waits on
+        # them forever. A 3.8 pool shuts itself down once it is no longer
+        # referenced, so callers only drop their reference.
+        return
+    executor.shutdown(wait=False)
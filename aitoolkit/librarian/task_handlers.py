@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+Task Handlers
+
+The TaskBoard handlers of the index-backed task types: component_analysis,
+find_usages, file_search, code_modification and diagnostics.
+
+Each handler is a MapReduceHandler:
+
+- split: use the project index (symbol index, import graph, trigram index)
+  to pick the files worth scanning, and cut them into chunks
+- map: scan the files of one chunk; chunks are independent, so the board
+  runs them in parallel on its workers (threads or worker processes)
+- reduce: merge the chunk results into the task result
+
+Handlers hold only module-level functions and the project path, so they and
+their chunks can be pickled and sent to worker processes.
+"""
+
+import os
+import re
+import ast
+import shutil
+import difflib
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+try:
+    from .task_cancellation import CancellationToken
+    from .trigram_index import load_trigram_index, scan_code_files, DEFAULT_CODE_EXTENSIONS
+    from .symbol_index import load_symbol_index
+    from .import_graph import load_import_graph
+    from .enhanced_indexer import parse_python_file
+except ImportError:
+    from task_cancellation import CancellationToken
+    from trigram_index import load_trigram_index, scan_code_files, DEFAULT_CODE_EXTENSIONS
+    from symbol_index import load_symbol_index
+    from import_graph import load_import_graph
+    from enhanced_indexer import parse_python_file
+
+# Files scanned by one parallel piece of work
+FILES_PER_CHUNK = 64
+
+DEFAULT_MAX_RESULTS = 100
+# Characters kept of a matching line
+MAX_LINE_TEXT = 200
+# Diff lines kept per modified file
+MAX_DIFF_LINES = 200
+MAX_ISSUES = 500
+DEFAULT_MAX_FUNCTION_LINES = 100
+
+DIAGNOSTIC_CHECKS = ("syntax", "bare_except", "todo", "long_functions", "missing_docstrings")
+_TODO_PATTERN = re.compile(r"#.*\b(TODO|FIXME|XXX|HACK)\b")
+
+@dataclass
+class MapReduceHandler:
+    """
+    A task split into per-file chunks that are scanned independently.
+    """
+    project_path: str
+    split: Callable[[str, Dict[str, Any], CancellationToken], List[Any]]
+    map_chunk: Callable[[str, Dict[str, Any], Any, CancellationToken], Any]
+    reduce: Callable[[str, Dict[str, Any], List[Any]], Any]
+
+    def split_work(self, params: Dict[str, Any], token: CancellationToken) -> List[Any]:
+        """Pick the chunks of work for a task."""
+        return self.split(self.project_path, params, token)
+
+    def run_chunk(self, chunk: Any, params: Dict[str, Any], token: CancellationToken) -> Any:
+        """Process one chunk; runs on a board worker thread or process."""
+        token.check()
+        return self.map_chunk(self.project_path, params, chunk, token)
+
+    def reduce_results(self, params: Dict[str, Any], partials: List[Any]) -> Any:
+        """Merge the chunk results, given in chunk order."""
+        return self.reduce(self.project_path, params, partials)
+
+    def __call__(self, params: Dict[str, Any], token: CancellationToken) -> Any:
+        """Run split, map and reduce in sequence, for callers that do not fan out."""
+        partials = [self.run_chunk(chunk, params, token) for chunk in self.split_work(params, token)]
+        return self.reduce_results(params, partials)
+
+# === Shared helpers ===
+
+def chunk_files(rel_paths: List[str], size: int = FILES_PER_CHUNK) -> List[List[str]]:
+    """Cut a file list into chunks of at most `size` files."""
+    return [rel_paths[i:i + size] for i in range(0, len(rel_paths), size)]
+
+def is_within_directory(path: str, directory: str) -> bool:
+    """Check whether a path, with symlinks resolved, lies inside a directory."""
+    path, directory = os.path.realpath(path), os.path.realpath(directory)
+    try:
+        return os.path.commonpath([path, directory]) == directory
+    except ValueError:
+        # Paths on different drives
+        return False
+
+def _require(params: Dict[str, Any], *names: str) -> str:
+    """Return the first non-empty parameter among the accepted names."""
+    for name in names:
+        value = params.get(name)
+        if value:
+            return str(value)
+    raise ValueError(f"Missing required parameter: {names[0]}")
+
+def _extensions_for(file_pattern: Optional[str]) -> List[str]:
+    """Map a file pattern such as "*.py" to extensions, as find_implementation does."""
+    if not file_pattern:
+        return list(DEFAULT_CODE_EXTENSIONS)
+    if "*." in file_pattern:
+        return [f".{file_pattern.split('*.')[-1]}"]
+    if "." in file_pattern:
+        return [file_pattern]
+    return list(DEFAULT_CODE_EXTENSIONS)
+
+def _candidate_files(
+    project_path: str,
+    text: Optional[str] = None,
+    regex: bool = False,
+    extensions: Optional[List[str]] = None,
+    verify: bool = False
+) -> Tuple[List[str], str]:
+    """
+    List the files that may contain a text, narrowed by the trigram index when it covers them.
+
+    The index is only as fresh as the last re-index. With `verify`, used before
+    writing files, every file added or changed since then (by mtime and size)
+    is listed as well, so a stale index cannot hide a match.
+
+    Returns:
+        Sorted relative paths and the source of the list ("trigram_index" or "filesystem_walk")
+    """
+    extensions = extensions or list(DEFAULT_CODE_EXTENSIONS)
+    trigram_index = None
+    if all(ext in DEFAULT_CODE_EXTENSIONS for ext in extensions):
+        trigram_index = load_trigram_index(project_path)
+
+    if trigram_index is not None:
+        if text is None:
+            candidates = trigram_index.candidates(None)
+        elif regex:
+            candidates = trigram_index.regex_candidates(text)
+        else:
+            candidates = trigram_index.literal_candidates(text)
+        files = [rel_path for rel_path in candidates if rel_path.endswith(tuple(extensions))]
+        if verify:
+            files = sorted(set(files) | set(_files_changed_since(project_path, trigram_index, extensions)))
+        return files, "trigram_index"
+
+    files = scan_code_files(project_path, extensions)
+    return sorted(os.path.relpath(path, project_path) for path in files), "filesystem_walk"
+
+def _files_changed_since(project_path: str, trigram_index, extensions: List[str]) -> List[str]:
+    """List the files whose mtime or size differ from what the trigram index recorded."""
+    changed = []
+    for path in scan_code_files(project_path, extensions):
+        rel_path = os.path.relpath(path, project_path).replace('\\', '/')
+        try:
+            stats = os.stat(path)
+        except OSError:
+            continue
+        if trigram_index.meta.get(rel_path) != [stats.st_mtime, stats.st_size]:
+            changed.append(rel_path)
+    return changed
+
+def _read_lines(project_path: str, rel_path: str) -> Optional[List[str]]:
+    """Read a project file as lines; None if it is gone or not text."""
+    try:
+        with open(os.path.join(project_path, rel_path), 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def _line_text(line: str) -> str:
+    return line.strip()[:MAX_LINE_TEXT]
+
+def _line_matcher(params: Dict[str, Any], text: str) -> Callable[[str], bool]:
+    """Build a case-insensitive line test for a literal or regex search."""
+    if params.get("regex"):
+        try:
+            pattern = re.compile(text, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression '{text}': {str(e)}")
+        return lambda line: pattern.search(line) is not None
+    lowered = text.lower()
+    return lambda line: lowered in line.lower()
+
+def _word_pattern(name: str) -> "re.Pattern":
+    return re.compile(rf"(?<![\w]){re.escape(name)}(?![\w])")
+
+# === file_search ===
+
+def _split_file_search(project_path: str, params: Dict[str, Any], token: CancellationToken) -> List[Any]:
+    query = _require(params, "query", "search_text", "pattern")
+    _line_matcher(params, query)  # Reject invalid patterns before fanning out
+    files, _ = _candidate_files(project_path, query, bool(params.get("regex")), _extensions_for(params.get("file_pattern")))
+    return chunk_files(files)
+
+def _map_file_search(project_path: str, params: Dict[str, Any], chunk: List[str], token: CancellationToken) -> List[Dict[str, Any]]:
+    matches_line = _line_matcher(params, _require(params, "query", "search_text", "pattern"))
+    results = []
+    for rel_path in chunk:
+        token.check()
+        lines = _read_lines(project_path, rel_path)
+        if lines is None:
+            continue
+        matches = [
+            {"line": number, "text": _line_text(line)}
+            for number, line in enumerate(lines, 1)
+            if matches_line(line)
+        ]
+        if matches:
+            results.append({"file": rel_path, "matches": matches})
+    return results
+
+def _reduce_file_search(project_path: str, params: Dict[str, Any], partials: List[Any]) -> Dict[str, Any]:
+    max_results = int(params.get("max_results", DEFAULT_MAX_RESULTS))
+    results = [result for partial in partials for result in partial]
+    total_matches = sum(len(result["matches"]) for result in results)
+    return {
+        "status": "success",
+        "query": _require(params, "query", "search_text", "pattern"),
+        "results": results[:max_results],
+        "files_matched": len(results),
+        "total_matches": total_matches,
+        "truncated": len(results) > max_results,
+        "result": f"{total_matches} matches in {len(results)} files"
+    }
+
+# === find_usages ===
+
+def _split_find_usages(project_path: str, params: Dict[str, Any], token: CancellationToken) -> List[Any]:
+    name = _require(params, "name", "symbol", "component")
+    files, _ = _candidate_files(project_path, name, False, _extensions_for(params.get("file_pattern")))
+    return chunk_files(files)
+
+def _usage_kind(line: str, name: str) -> str:
+    """Classify an occurrence of a name by the line it is on."""
+    escaped = re.escape(name)
+    stripped = line.lstrip()
+    if re.match(rf"(async\s+def|def|class|function|func|fn)\s+{escaped}(?![\w])", stripped):
+        return "definition"
+    if stripped.startswith(("import ", "from ", "#include", "require", "using ")):
+        return "import"
+    if re.search(rf"(?<![\w]){escaped}\s*\(", line):
+        return "call"
+    return "reference"
+
+def _map_find_usages(project_path: str, params: Dict[str, Any], chunk: List[str], token: CancellationToken) -> List[Dict[str, Any]]:
+    name = _require(params, "name", "symbol", "component")
+    pattern = _word_pattern(name)
+    results = []
+    for rel_path in chunk:
+        token.check()
+        lines = _read_lines(project_path, rel_path)
+        if lines is None:
+            continue
+        usages = [
+            {"line": number, "kind": _usage_kind(line, name), "text": _line_text(line)}
+            for number, line in enumerate(lines, 1)
+            if pattern.search(line)
+        ]
+        if usages:
+            results.append({"file": rel_path, "usages": usages})
+    return results
+
+def _reduce_find_usages(project_path: str, params: Dict[str, Any], partials: List[Any]) -> Dict[str, Any]:
+    name = _require(params, "name", "symbol", "component")
+    max_results = int(params.get("max_results", DEFAULT_MAX_RESULTS))
+    results = [result for partial in partials for result in partial]
+
+    counts: Dict[str, int] = {}
+    definitions = []
+    for result in results:
+        for usage in result["usages"]:
+            counts[usage["kind"]] = counts.get(usage["kind"], 0) + 1
+            if usage["kind"] == "definition":
+                definitions.append({"file": result["file"], "line": usage["line"]})
+
+    total = sum(counts.values())
+    return {
+        "status": "success",
+        "name": name,
+        "definitions": definitions,
+        "usages": results[:max_results],
+        "counts": counts,
+        "files_matched": len(results),
+        "total_usages": total,
+        "truncated": len(results) > max_results,
+        "result": f"{total} usages of {name} in {len(results)} files"
+    }
+
+# === component_analysis ===
+
+def _split_component_analysis(project_path: str, params: Dict[str, Any], token: CancellationToken) -> List[Any]:
+    component = _require(params, "component", "component_name", "name")
+    simple_name = component.rsplit(".", 1)[-1]
+    ai_ref_path = os.path.join(project_path, ".ai_reference")
+
+    files = set()
+    symbol_index = load_symbol_index(ai_ref_path)
+    if symbol_index is not None:
+        files.update(symbol["file"] for symbol in symbol_index.lookup(component))
+
+    import_graph = load_import_graph(ai_ref_path)
+    if import_graph is not None:
+        references = import_graph.get_symbol_references(component.split(".", 1)[0])
+        for key in ("defined_in", "referenced_by", "called_by"):
+            files.update(references.get(key, []))
+
+    if not files:
+        # Without the indexes, scan the Python files mentioning the name
+        candidates, _ = _candidate_files(project_path, simple_name, False, [".py"])
+        files.update(candidates)
+
+    return chunk_files(sorted(rel_path for rel_path in files if rel_path.endswith(".py")))
+
+def _component_details(info: Dict[str, Any], symbol: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe a definition from the parse result of its file."""
+    details = {
+        "name": symbol["qualified_name"],
+        "kind": symbol["kind"],
+        "start_line": symbol.get("start_line"),
+        "end_line": symbol.get("end_line")
+    }
+    if symbol["kind"] == "class":
+        class_info = info.get("classes", {}).get(symbol["name"], {})
+        details["docstring"] = class_info.get("docstring")
+        details["bases"] = class_info.get("bases", [])
+        details["methods"] = sorted(class_info.get("methods", {}))
+    else:
+        if symbol["kind"] == "method":
+            function_info = info.get("classes", {}).get(symbol.get("parent"), {}).get("methods", {}).get(symbol["name"], {})
+        else:
+            function_info = info.get("functions", {}).get(symbol["name"], {})
+        details["docstring"] = function_info.get("docstring")
+        details["parameters"] = [param.get("name") for param in function_info.get("parameters", [])]
+        details["calls"] = sorted({call.get("name") for call in function_info.get("calls", []) if call.get("name")})
+    return details
+
+def _map_component_analysis(project_path: str, params: Dict[str, Any], chunk: List[str], token: CancellationToken) -> Dict[str, Any]:
+    component = _require(params, "component", "component_name", "name")
+    simple_name = component.rsplit(".", 1)[-1]
+    pattern = _word_pattern(simple_name)
+
+    definitions = []
+    used_in = []
+    for rel_path in chunk:
+        token.check()
+        info = parse_python_file(os.path.join(project_path, rel_path))
+        if info.get("error"):
+            continue
+
+        for symbol in info.get("symbols", []):
+            if component in (symbol["name"], symbol["qualified_name"]):
+                definitions.append(dict(_component_details(info, symbol), file=rel_path))
+
+        references = info.get("references", {})
+        if simple_name in references.get("names", []) or simple_name in references.get("calls", []):
+            lines = _read_lines(project_path, rel_path) or []
+            used_in.append({
+                "file": rel_path,
+                "calls": simple_name in references.get("calls", []),
+                "lines": [number for number, line in enumerate(lines, 1) if pattern.search(line)],
+                "imports": [imp["name"] for imp in info.get("imports", []) if imp["name"].rsplit(".", 1)[-1] == simple_name]
+            })
+    return {"definitions": definitions, "used_in": used_in}
+
+def _reduce_component_analysis(project_path: str, params: Dict[str, Any], partials: List[Any]) -> Dict[str, Any]:
+    component = _require(params, "component", "component_name", "name")
+    definitions = [definition for partial in partials for definition in partial["definitions"]]
+    used_in = [usage for partial in partials for usage in partial["used_in"]]
+
+    # Files that use the component besides the ones defining it
+    defining_files = {definition["file"] for definition in definitions}
+    dependents = [usage["file"] for usage in used_in if usage["file"] not in defining_files]
+    return {
+        "status": "success" if definitions or used_in else "not_found",
+        "component": component,
+        "definitions": definitions,
+        "used_in": used_in,
+        "dependents": dependents,
+        "result": (
+            f"{component}: {len(definitions)} definitions, used in {len(dependents)} other files"
+            if definitions or used_in else f"Component {component} not found"
+        )
+    }
+
+# === code_modification ===
+
+def _modification_params(params: Dict[str, Any]) -> Tuple[str, str]:
+    search = _require(params, "search", "search_text", "pattern")
+    if "replace" not in params:
+        raise ValueError("Missing required parameter: replace")
+    return search, str(params["replace"])
+
+def _split_code_modification(project_path: str, params: Dict[str, Any], token: CancellationToken) -> List[Any]:
+    search, _ = _modification_params(params)
+    if params.get("regex"):
+        try:
+            re.compile(search)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression '{search}': {str(e)}")
+    # Verify against the filesystem: a file edited since the last re-index must
+    # not be skipped (or previewed differently from what apply writes)
+    files, _ = _candidate_files(
+        project_path, search, bool(params.get("regex")), _extensions_for(params.get("file_pattern")), verify=True
+    )
+    return chunk_files(files)
+
+def _map_code_modification(project_path: str, params: Dict[str, Any], chunk: List[str], token: CancellationToken) -> List[Dict[str, Any]]:
+    search, replace = _modification_params(params)
+    apply = bool(params.get("apply"))
+    pattern = re.compile(search) if params.get("regex") else None
+
+    results = []
+    for rel_path in chunk:
+        token.check()
+        # Resolve symlinks so a link pointing out of the project is never written through
+        path = os.path.realpath(os.path.join(project_path, rel_path))
+        if not is_within_directory(path, project_path):
+            results.append({
+                "file": rel_path,
+                "replacements": 0,
+                "applied": False,
+                "error": "File resolves to a location outside the project"
+            })
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+
+        if pattern is not None:
+            new_content, count = pattern.subn(replace, content)
+        else:
+            count = content.count(search)
+            new_content = content.replace(search, replace)
+        if not count:
+            continue
+
+        diff = list(difflib.unified_diff(
+            content.splitlines(), new_content.splitlines(),
+            fromfile=f"a/{rel_path}", tofile=f"b/{rel_path}", lineterm=""
+        ))
+        entry = {
+            "file": rel_path,
+            "replacements": count,
+            "diff": "\n".join(diff[:MAX_DIFF_LINES]),
+            "diff_truncated": len(diff) > MAX_DIFF_LINES,
+            "applied": False
+        }
+
+        if apply:
+            # Stop before writing if the task was cancelled meanwhile
+            token.check()
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(new_content)
+                # Keep the permission bits (e.g. executable scripts)
+                shutil.copymode(path, temp_path)
+                os.replace(temp_path, path)
+                entry["applied"] = True
+            except OSError as e:
+                entry["error"] = str(e)
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        results.append(entry)
+    return results
+
+def _reduce_code_modification(project_path: str, params: Dict[str, Any], partials: List[Any]) -> Dict[str, Any]:
+    results = [result for partial in partials for result in partial]
+    replacements = sum(result["replacements"] for result in results)
+    applied = bool(params.get("apply"))
+    failed = [result["file"] for result in results if result.get("error")]
+    verb = "Replaced" if applied else "Would replace"
+    return {
+        "status": "error" if failed else "success",
+        "applied": applied,
+        "files": results,
+        "files_changed": len(results) - len(failed),
+        "failed_files": failed,
+        "total_replacements": replacements,
+        "result": f"{verb} {replacements} occurrences in {len(results)} files"
+                  + ("" if applied else "; pass apply=true to write the changes")
+    }
+
+# === diagnostics ===
+
+def _split_diagnostics(project_path: str, params: Dict[str, Any], token: CancellationToken) -> List[Any]:
+    checks = params.get("checks") or DIAGNOSTIC_CHECKS
+    unknown = [check for check in checks if check not in DIAGNOSTIC_CHECKS]
+    if unknown:
+        raise ValueError(f"Unknown checks: {', '.join(unknown)}. Valid checks are: {', '.join(DIAGNOSTIC_CHECKS)}")
+    files, _ = _candidate_files(project_path, None, False, [".py"])
+    return chunk_files(files)
+
+def _diagnose_file(rel_path: str, content: str, checks, max_function_lines: int) -> List[Dict[str, Any]]:
+    """Run the enabled checks on one Python file."""
+    issues = []
+
+    def issue(check: str, line: int, message: str):
+        issues.append({"file": rel_path, "line": line, "check": check, "message": message})
+
+    if "todo" in checks:
+        for number, line in enumerate(content.splitlines(), 1):
+            match = _TODO_PATTERN.search(line)
+            if match:
+                issue("todo", number, _line_text(line[match.start():]))
+
+    try:
+        tree = ast.parse(content)
+    except SyntaxError as e:
+        if "syntax" in checks:
+            issue("syntax", e.lineno or 1, f"Syntax error: {e.msg}")
+        return issues
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ExceptHandler) and node.type is None and "bare_except" in checks:
+            issue("bare_except", node.lineno, "Bare except clause catches every exception")
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            public = not node.name.startswith("_")
+            if "missing_docstrings" in checks and public and ast.get_docstring(node) is None:
+                kind = "Class" if isinstance(node, ast.ClassDef) else "Function"
+                issue("missing_docstrings", node.lineno, f"{kind} {node.name} has no docstring")
+            if "long_functions" in checks and not isinstance(node, ast.ClassDef):
+                length = (node.end_lineno or node.lineno) - node.lineno + 1
+                if length > max_function_lines:
+                    issue("long_functions", node.lineno, f"Function {node.name} is {length} lines long")
+    return issues
+
+def _map_diagnostics(project_path: str, params: Dict[str, Any], chunk: List[str], token: CancellationToken) -> Dict[str, Any]:
+    checks = set(params.get("checks") or DIAGNOSTIC_CHECKS)
+    max_function_lines = int(params.get("max_function_lines", DEFAULT_MAX_FUNCTION_LINES))
+    issues = []
+    lines = 0
+    checked = 0
+    for rel_path in chunk:
+        token.check()
+        try:
+            with open(os.path.join(project_path, rel_path), 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+        checked += 1
+        lines += content.count("\n") + 1
+        issues.extend(_diagnose_file(rel_path, content, checks, max_function_lines))
+    return {"issues": issues, "files_checked": checked, "lines": lines}
+
+def _reduce_diagnostics(project_path: str, params: Dict[str, Any], partials: List[Any]) -> Dict[str, Any]:
+    issues = [issue for partial in partials for issue in partial["issues"]]
+    counts: Dict[str, int] = {}
+    for issue in issues:
+        counts[issue["check"]] = counts.get(issue["check"], 0) + 1
+    files_checked = sum(partial["files_checked"] for partial in partials)
+    return {
+        "status": "success",
+        "files_checked": files_checked,
+        "lines": sum(partial["lines"] for partial in partials),
+        "counts": counts,
+        "issues": issues[:MAX_ISSUES],
+        "truncated": len(issues) > MAX_ISSUES,
+        "result": f"{len(issues)} issues in {files_checked} files"
+    }
+
+# Task type -> (split, map, reduce)
+TASK_HANDLERS = {
+    "component_analysis": (_split_component_analysis, _map_component_analysis, _reduce_component_analysis),
+    "find_usages": (_split_find_usages, _map_find_usages, _reduce_find_usages),
+    "file_search": (_split_file_search, _map_file_search, _reduce_file_search),
+    "code_modification": (_split_code_modification, _map_code_modification, _reduce_code_modification),
+    "diagnostics": (_split_diagnostics, _map_diagnostics, _reduce_diagnostics)
+}
+
+def get_task_handler(project_path: str, task_type: str) -> Optional[MapReduceHandler]:
+    """
+    Get the handler of an index-backed task type.
+
+    Args:
+        project_path: Path to the project
+        task_type: Type of task
+
+    Returns:
+        The handler, or None if the task type has none here
+    """
+    functions = TASK_HANDLERS.get(task_type)
+    if functions is None:
+        return None
+    split, map_chunk, reduce = functions
+    return MapReduceHandler(project_path, split, map_chunk, reduce)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Task Journal
+
+Persistence for the TaskBoard as an append-only JSONL journal plus a
+periodic snapshot, instead of rewriting one JSON file per task on every
+state change.
+
+- Every state change appends one record holding the task's full state
+  ("put") or its removal ("delete"). Records are idempotent, so replaying
+  one twice does no harm.
+- `append` only queues the record. A writer thread writes whatever has
+  queued up since its last write and makes the whole batch durable with one
+  fsync (group commit), so callers never wait on the disk.
+- After `compact_every` records, the writer writes the current state to
+  `snapshot.json` (temporary file, fsync, rename) and starts a new journal.
+- On startup, `load` reads the snapshot and replays the journal written
+  after it. A torn last line from a crash is ignored and cut off, so the
+  records of the next session are appended after the last good one.
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger("ai_librarian.task_journal")
+
+JOURNAL_FILENAME = "journal.jsonl"
+SNAPSHOT_FILENAME = "snapshot.json"
+SNAPSHOT_VERSION = 1
+
+# Journal records after which the state is compacted into a new snapshot
+DEFAULT_COMPACT_EVERY = 1000
+
+class TaskJournal:
+    """
+    Write-ahead journal of task states with group commit and snapshots.
+    """
+
+    def __init__(self, directory: str, compact_every: int = DEFAULT_COMPACT_EVERY, sync: bool = True):
+        """
+        Open the journal.
+
+        Args:
+            directory: Directory holding the journal and snapshot
+            compact_every: Journal records after which a snapshot is written
+            sync: fsync each batch; turn off only where durability does not matter
+        """
+        self.directory = directory
+        self.journal_path = os.path.join(directory, JOURNAL_FILENAME)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILENAME)
+        self.compact_every = compact_every
+        self.sync = sync
+        os.makedirs(directory, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._pending: List[Dict[str, Any]] = []
+        self._appended = 0  # Records queued so far
+        self._written = 0   # Records durable so far
+        self._closed = False
+
+        # State as of the last written record, for compaction
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._since_snapshot = 0
+        self._file = None
+        self._writer: Optional[threading.Thread] = None
+
+        self.batches = 0
+        self.snapshots = 0
+
+    # === Startup ===
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Replay the snapshot and journal, and start accepting records.
+
+        Returns:
+            The latest state of each task, keyed by task ID
+        """
+        state: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") == SNAPSHOT_VERSION:
+                state.update(snapshot.get("tasks", {}))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error reading task snapshot {self.snapshot_path}: {str(e)}")
+
+        replayed = 0
+        good_end = 0  # Byte offset just past the last readable line
+        torn = False
+        try:
+            with open(self.journal_path, 'rb') as f:
+                for line_number, line in enumerate(f, 1):
+                    if line.strip():
+                        try:
+                            # Every record is written with its newline; one without it is torn
+                            if not line.endswith(b"\n"):
+                                raise ValueError("missing newline")
+                            record = json.loads(line.decode('utf-8'))
+                        except ValueError:
+                            # A torn write from a crash; anything after it is unreliable
+                            logger.warning(f"Ignoring journal from unreadable line {line_number} on")
+                            torn = True
+                            break
+                        _apply(state, record)
+                        replayed += 1
+                    good_end += len(line)
+        except FileNotFoundError:
+            pass
+
+        if torn:
+            # Cut the torn tail off, or the next record would be appended to it
+            # and be lost along with it on the next load
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_end)
+                if self.sync:
+                    os.fsync(f.fileno())
+
+        self._state = state
+        self._since_snapshot = replayed
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+        self._writer = threading.Thread(target=self._write_loop, name="TaskBoard-Journal", daemon=True)
+        self._writer.start()
+
+        logger.info(f"Loaded {len(state)} tasks from journal ({replayed} records after the snapshot)")
+        return {task_id: dict(record) for task_id, record in state.items()}
+
+    def exists(self) -> bool:
+        """Whether a snapshot or journal has been written."""
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    # === Writing ===
+
+    def put(self, task: Dict[str, Any]) -> None:
+        """Queue the full state of a task; it must have an "id"."""
+        self._append({"op": "put", "task": task})
+
+    def delete(self, task_id: str) -> None:
+        """Queue the removal of a task."""
+        self._append({"op": "delete", "id": task_id})
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Task journal is closed")
+            self._pending.append(record)
+            self._appended += 1
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every record queued so far is durable.
+
+        Returns:
+            True if they are, False on timeout
+        """
+        with self._cond:
+            target = self._appended
+            return self._cond.wait_for(lambda: self._written >= target or self._writer is None, timeout)
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                batch, self._pending = self._pending, []
+                if not batch and self._closed:
+                    return
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Error writing task journal: {str(e)}")
+
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a batch of records with one flush and one fsync."""
+        lines = []
+        for record in batch:
+            lines.append(json.dumps(record, separators=(',', ':'), default=str))
+            _apply(self._state, record)
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+        self.batches += 1
+
+        self._since_snapshot += len(batch)
+        if self._since_snapshot >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Write the current state as the snapshot and start an empty journal.
+
+        Only called from the writer thread, or after it has stopped.
+        """
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": SNAPSHOT_VERSION, "tasks": self._state}, f, separators=(',', ':'), default=str)
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+        # A crash before the truncation replays records already in the
+        # snapshot, which leaves the same state
+        self._file.close()
+        self._file = open(self.journal_path, 'w', encoding='utf-8')
+        self._since_snapshot = 0
+        self.snapshots += 1
+
+    def close(self) -> None:
+        """Write the remaining records, compact and close the files."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+        if self._file is not None:
+            try:
+                if self._since_snapshot:
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Error compacting task journal: {str(e)}")
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return record, batch and snapshot counts."""
+        with self._cond:
+            return {
+                "tasks": len(self._state),
+                "records_written": self._written,
+                "records_pending": self._appended - self._written,
+                "batches": self.batches,
+                "snapshots": self.snapshots,
+                "records_since_snapshot": self._since_snapshot
+            }
+
+def _apply(state: Dict[str, Dict[str, Any]], record: Dict[str, Any]) -> None:
+    """Apply one journal record to a state."""
+    if record.get("op") == "put":
+        task = record.get("task") or {}
+        if "id" in task:
+            state[task["id"]] = task
+    elif record.get("op") == "delete":
+        state.pop(record.get("id"), None)
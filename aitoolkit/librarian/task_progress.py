@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Task Progress
+
+Progress reports and partial results of running TaskBoard tasks.
+
+Handlers reach their task's progress through `token.progress`:
+
+- `update(done, total)` / `advance(count)` report items done out of a
+  total; the board derives the rate and an ETA from them.
+- `publish(chunk)` appends an incremental result to the task's buffer.
+
+The buffer is bounded: once `max_chunks` chunks are held, the oldest are
+dropped. The board also frees the buffers of all but its most recently
+finished tasks. Clients read it with a cursor (the sequence number of the next chunk
+to read), so a slow reader learns how many chunks it missed instead of
+holding the handler back.
+
+Map-reduce tasks need no handler code for this: the board reports the files
+done and publishes each chunk's result as it arrives. Handlers running in a
+worker process report through the process backend, which forwards to the
+task's TaskProgress.
+"""
+
+import json
+import time
+import base64
+import threading
+from collections import deque
+from typing import Dict, Any, Optional
+
+try:
+    from .result_pages import CursorError
+except ImportError:
+    from result_pages import CursorError
+
+DEFAULT_MAX_CHUNKS = 256
+DEFAULT_CHUNK_PAGE = 20
+
+class ProgressSink:
+    """
+    Progress interface handed to handlers; this base class discards everything.
+    """
+
+    def update(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        """Report `done` items finished, out of `total` if known."""
+
+    def advance(self, count: int = 1, message: Optional[str] = None) -> None:
+        """Report `count` more items finished."""
+
+    def set_total(self, total: int) -> None:
+        """Set the number of items the task will process."""
+
+    def publish(self, chunk: Any) -> None:
+        """Append a partial result to the task's buffer."""
+
+class TaskProgress(ProgressSink):
+    """
+    Progress counters and bounded partial-result buffer of one task.
+    """
+
+    def __init__(self, task_id: str, max_chunks: int = DEFAULT_MAX_CHUNKS):
+        """
+        Initialize the progress of a task.
+
+        Args:
+            task_id: ID of the task
+            max_chunks: Partial results kept before the oldest are dropped
+        """
+        self.task_id = task_id
+        self.done = 0
+        self.total: Optional[int] = None
+        self.message: Optional[str] = None
+        self.finished: Optional[str] = None  # Final status name once the task ends
+        self.started = time.monotonic()
+        self._chunks: deque = deque(maxlen=max_chunks)
+        self._next_seq = 0  # Sequence number of the next published chunk
+        self._cond = threading.Condition()
+        self.version = 0    # Bumped on every change, for waiters
+
+    def _changed(self) -> None:
+        """Wake waiters; the caller holds the condition."""
+        self.version += 1
+        self._cond.notify_all()
+
+    def update(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        with self._cond:
+            self.done = done
+            if total is not None:
+                self.total = total
+            if message is not None:
+                self.message = message
+            self._changed()
+
+    def advance(self, count: int = 1, message: Optional[str] = None) -> None:
+        with self._cond:
+            self.done += count
+            if message is not None:
+                self.message = message
+            self._changed()
+
+    def set_total(self, total: int) -> None:
+        with self._cond:
+            self.total = total
+            self._changed()
+
+    def publish(self, chunk: Any) -> None:
+        with self._cond:
+            self._chunks.append((self._next_seq, chunk))
+            self._next_seq += 1
+            self._changed()
+
+    def close(self, status: str) -> None:
+        """Mark the task as finished with a final status name."""
+        with self._cond:
+            self.finished = status
+            self._changed()
+
+    def release_chunks(self) -> None:
+        """Free the buffered partial results; the counters stay and reads report the chunks as dropped."""
+        with self._cond:
+            self._chunks.clear()
+
+    def wait(self, version: int, timeout: Optional[float] = None) -> int:
+        """
+        Wait until the progress changes after `version` or the task finishes.
+
+        Returns:
+            The current version
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version or self.finished, timeout)
+            return self.version
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the progress counters.
+
+        Returns:
+            Dictionary with "done", "total", "percent", "rate" (items per
+            second), "eta_seconds", "message", "chunks_published" and
+            "chunks_buffered"; unknown values are None
+        """
+        with self._cond:
+            elapsed = time.monotonic() - self.started
+            rate = self.done / elapsed if self.done and elapsed > 0 else None
+            percent = eta = None
+            if self.total:
+                percent = round(100.0 * min(self.done, self.total) / self.total, 1)
+                if rate and not self.finished:
+                    eta = round(max(0, self.total - self.done) / rate, 1)
+            return {
+                "done": self.done,
+                "total": self.total,
+                "percent": percent,
+                "rate": round(rate, 2) if rate else None,
+                "eta_seconds": eta,
+                "message": self.message,
+                "chunks_published": self._next_seq,
+                "chunks_buffered": len(self._chunks)
+            }
+
+    def read(self, cursor: Optional[str] = None, limit: int = DEFAULT_CHUNK_PAGE) -> Dict[str, Any]:
+        """
+        Read buffered partial results from a cursor on.
+
+        Args:
+            cursor: Cursor returned by a previous read; None starts at the
+                oldest buffered chunk
+            limit: Maximum number of chunks to return
+
+        Returns:
+            Dictionary with "chunks" (each with "seq" and "data"), "next_cursor",
+            "dropped" (chunks evicted before they could be read), "has_more"
+            and "finished"
+
+        Raises:
+            CursorError: If the cursor is malformed or belongs to another task
+        """
+        if limit <= 0:
+            raise CursorError("limit must be positive")
+        start = decode_chunk_cursor(cursor, self.task_id) if cursor is not None else None
+
+        with self._cond:
+            oldest = self._chunks[0][0] if self._chunks else self._next_seq
+            if start is None:
+                start = oldest
+            dropped = max(0, oldest - start)
+            chunks = [
+                {"seq": seq, "data": data}
+                for seq, data in self._chunks
+                if seq >= start
+            ][:limit]
+            next_seq = chunks[-1]["seq"] + 1 if chunks else max(start, oldest)
+            return {
+                "chunks": chunks,
+                "next_cursor": encode_chunk_cursor(self.task_id, next_seq),
+                "dropped": dropped,
+                "has_more": next_seq < self._next_seq,
+                "finished": self.finished
+            }
+
+def encode_chunk_cursor(task_id: str, seq: int) -> str:
+    """Encode the position of the next chunk to read as an opaque cursor."""
+    payload = json.dumps({"t": task_id, "s": seq})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_chunk_cursor(cursor: str, task_id: str) -> int:
+    """Decode a cursor produced by encode_chunk_cursor for a task."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        cursor_task, seq = str(data["t"]), int(data["s"])
+    except Exception:
+        raise CursorError("Invalid cursor")
+    if cursor_task != task_id:
+        raise CursorError("Cursor belongs to another task")
+    return seq
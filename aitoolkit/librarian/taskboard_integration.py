@@ -50,6 +50,29 @@ TASK_TYPE_REGISTRY = {
         "description": "Break down complex tasks into smaller units",
         "mini_librarians": ["task-analyzer", "dependency-mapper"],
         "handler": "_handle_task_decomposition"
+    },
+    
+    # Index-backed tasks, run as parallel map-reduce over files; their handlers
+    # are looked up by task type in task_handlers.TASK_HANDLERS
+    "component_analysis": {
+        "description": "Locate a component's definitions and the files using it",
+        "mini_librarians": ["component-analyzer"]
+    },
+    "find_usages": {
+        "description": "Find and classify every usage of a name",
+        "mini_librarians": ["file-indexer", "component-analyzer"]
+    },
+    "file_search": {
+        "description": "Search file contents for a text or regular expression",
+        "mini_librarians": ["file-indexer"]
+    },
+    "code_modification": {
+        "description": "Preview or apply a search-and-replace across files",
+        "mini_librarians": ["file-indexer", "component-analyzer", "code-modifier"]
+    },
+    "diagnostics": {
+        "description": "Check Python files for syntax errors and common issues",
+        "mini_librarians": ["diagnostics-runner"]
     }
 }
 
@@ -124,6 +147,8 @@ def register_taskboard_mcp_tools(server_context: Dict[str, Any]) -> None:
         submit_background_task,
         get_task_status_mcp,
         get_task_result_mcp,
+        get_task_chunks_mcp,
+        watch_task_mcp,
         cancel_task_mcp,
         list_tasks_mcp,
         task_deep_analysis
@@ -162,9 +187,30 @@ def register_taskboard_mcp_tools(server_context: Dict[str, Any]) -> None:
         ]
     }
     
+    tools["get_task_chunks"] = {
+        "function": get_task_chunks_mcp,
+        "description": "Get the partial results a background task has published so far",
+        "parameters": [
+            {"name": "project_path", "type": "string", "description": "Path to the project"},
+            {"name": "task_id", "type": "string", "description": "ID of the task"},
+            {"name": "cursor", "type": "string", "description": "Cursor from a previous call, to continue after the chunks it returned"},
+            {"name": "limit", "type": "integer", "description": "Maximum number of chunks to return", "default": 20}
+        ]
+    }
+    
+    tools["watch_task"] = {
+        "function": watch_task_mcp,
+        "description": "Wait for a background task to finish, reporting its progress as it goes",
+        "parameters": [
+            {"name": "project_path", "type": "string", "description": "Path to the project"},
+            {"name": "task_id", "type": "string", "description": "ID of the task to watch"},
+            {"name": "timeout", "type": "number", "description": "Seconds to wait before returning the current status", "default": 30.0}
+        ]
+    }
+    
     tools["cancel_task"] = {
         "function": cancel_task_mcp,
-        "description": "Cancel a pending background task",
+        "description": "Cancel a pending or running background task",
         "parameters": [
             {"name": "project_path", "type": "string", "description": "Path to the project"},
             {"name": "task_id", "type": "string", "description": "ID of the task to cancel"}
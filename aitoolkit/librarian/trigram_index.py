@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Trigram Index
+
+This module maintains `.ai_reference/trigram_index.bin`, a case-insensitive
+trigram posting-list index over the project's code files. `find_implementation`
+intersects the postings of the query's trigrams to get a small set of candidate
+files and only reads those to verify matches, instead of scanning every file.
+
+Regular expressions are supported by extracting the literal runs every match
+must contain; patterns without such literals fall back to scanning all files.
+
+The index is updated incrementally: changed files get a new file id and their
+old id is tombstoned, and the postings are compacted once enough ids are dead.
+"""
+
+import os
+import json
+import struct
+import logging
+import threading
+from array import array
+from typing import Dict, List, Optional, Set, Tuple, Iterable
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+    from re import _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+# Configure logging
+logger = logging.getLogger("ai_librarian.trigram_index")
+
+TRIGRAM_INDEX_FILENAME = "trigram_index.bin"
+TRIGRAM_INDEX_VERSION = 1
+
+# File types indexed by default; matches find_implementation's default search set
+DEFAULT_CODE_EXTENSIONS = [".py", ".js", ".ts", ".java", ".c", ".cpp", ".cs", ".go", ".rb", ".php"]
+EXCLUDED_DIRS = ['venv', 'env', 'node_modules', '__pycache__', '.git']
+
+# Rebuild the postings once this fraction of file ids is tombstoned
+COMPACTION_THRESHOLD = 0.5
+
+_HEADER = struct.Struct("<I")
+
+def extract_trigrams(text: str) -> Set[str]:
+    """Return the set of lowercase trigrams in a piece of text."""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _literal_runs(parsed) -> Optional[List[str]]:
+    """
+    Collect the literal runs every match of a parsed regex must contain.
+
+    Returns None when the pattern has a top-level alternation, in which case
+    no literal is required.
+    """
+    runs = []
+    current = []
+
+    def flush():
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    for op, av in parsed:
+        if op is sre_constants.LITERAL:
+            current.append(chr(av))
+        elif op is sre_constants.SUBPATTERN:
+            flush()
+            inner = _literal_runs(av[-1])
+            if inner:
+                runs.extend(inner)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            flush()
+            min_count, _, item = av
+            if min_count >= 1:
+                inner = _literal_runs(item)
+                if inner:
+                    runs.extend(inner)
+        elif op is sre_constants.BRANCH:
+            if len(parsed) == 1:
+                return None
+            flush()
+        elif op is sre_constants.AT:
+            # Anchors match empty strings and do not break a literal run
+            continue
+        else:
+            flush()
+
+    flush()
+    return runs
+
+def regex_trigrams(pattern: str) -> Optional[Set[str]]:
+    """
+    Extract the trigrams every match of a regular expression must contain.
+
+    Args:
+        pattern: Regular expression
+
+    Returns:
+        Set of required lowercase trigrams, or None if none can be derived
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None
+
+    runs = _literal_runs(parsed)
+    if not runs:
+        return None
+
+    trigrams = set()
+    for run in runs:
+        trigrams |= extract_trigrams(run)
+    return trigrams or None
+
+class TrigramIndex:
+    """
+    Trigram posting lists over a set of files.
+
+    Each file gets an integer id; postings map a trigram to a sorted array of
+    ids. Replaced or deleted files keep their id in the postings but are marked
+    dead (`files[id] is None`) until the next compaction.
+    """
+
+    def __init__(self):
+        self.files = []        # id -> relative path (None for tombstoned ids)
+        self.ids = {}          # relative path -> live id
+        self.meta = {}         # relative path -> [mtime, size]
+        self.postings = {}     # trigram -> array('I') of ids
+
+    @property
+    def dead_count(self) -> int:
+        return len(self.files) - len(self.ids)
+
+    def add_file(self, rel_path: str, content: str, mtime: float, size: int) -> None:
+        """Index (or re-index) a file's content."""
+        self.remove_file(rel_path)
+
+        file_id = len(self.files)
+        self.files.append(rel_path)
+        self.ids[rel_path] = file_id
+        self.meta[rel_path] = [mtime, size]
+
+        for trigram in extract_trigrams(content):
+            posting = self.postings.get(trigram)
+            if posting is None:
+                posting = self.postings[trigram] = array('I')
+            posting.append(file_id)
+
+    def remove_file(self, rel_path: str) -> None:
+        """Tombstone a file's id."""
+        file_id = self.ids.pop(rel_path, None)
+        if file_id is not None:
+            self.files[file_id] = None
+        self.meta.pop(rel_path, None)
+
+    def compact(self) -> None:
+        """Drop tombstoned ids and renumber the remaining files."""
+        remap = {}
+        files = []
+        for old_id, rel_path in enumerate(self.files):
+            if rel_path is not None:
+                remap[old_id] = len(files)
+                files.append(rel_path)
+
+        postings = {}
+        for trigram, posting in self.postings.items():
+            new_posting = array('I', (remap[i] for i in posting if i in remap))
+            if new_posting:
+                postings[trigram] = new_posting
+
+        self.files = files
+        self.ids = {rel_path: i for i, rel_path in enumerate(files)}
+        self.postings = postings
+
+    def candidates(self, trigrams: Optional[Iterable[str]]) -> List[str]:
+        """
+        Get the files that contain all of the given trigrams.
+
+        Args:
+            trigrams: Required trigrams; None or empty means every file is a candidate
+
+        Returns:
+            Sorted list of candidate relative paths
+        """
+        trigrams = list(trigrams or [])
+        if not trigrams:
+            return sorted(self.ids)
+
+        postings = []
+        for trigram in trigrams:
+            posting = self.postings.get(trigram)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        # Intersect starting from the rarest trigram
+        postings.sort(key=len)
+        file_ids = set(postings[0])
+        for posting in postings[1:]:
+            file_ids.intersection_update(posting)
+            if not file_ids:
+                return []
+
+        return sorted(
+            self.files[file_id] for file_id in file_ids if self.files[file_id] is not None
+        )
+
+    def literal_candidates(self, text: str) -> List[str]:
+        """Get candidate files for a case-insensitive substring search."""
+        return self.candidates(extract_trigrams(text))
+
+    def regex_candidates(self, pattern: str) -> List[str]:
+        """Get candidate files for a case-insensitive regular expression search."""
+        return self.candidates(regex_trigrams(pattern))
+
+    def save(self, index_path: str) -> None:
+        """
+        Write the index.
+
+        The file holds a length-prefixed JSON header (files, metadata and the
+        size of every posting list) followed by the concatenated postings.
+        """
+        if self.files and self.dead_count / len(self.files) >= COMPACTION_THRESHOLD:
+            self.compact()
+
+        trigrams = list(self.postings.keys())
+        header = json.dumps({
+            "version": TRIGRAM_INDEX_VERSION,
+            "files": self.files,
+            "meta": self.meta,
+            "trigrams": trigrams,
+            "counts": [len(self.postings[trigram]) for trigram in trigrams]
+        }, separators=(',', ':')).encode('utf-8')
+
+        temp_path = index_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(_HEADER.pack(len(header)))
+            f.write(header)
+            for trigram in trigrams:
+                self.postings[trigram].tofile(f)
+        os.replace(temp_path, index_path)
+
+    @classmethod
+    def load(cls, index_path: str) -> Optional["TrigramIndex"]:
+        """Read an index written by save(), or return None if it is invalid."""
+        try:
+            with open(index_path, 'rb') as f:
+                (header_size,) = _HEADER.unpack(f.read(_HEADER.size))
+                header = json.loads(f.read(header_size).decode('utf-8'))
+                if header.get("version") != TRIGRAM_INDEX_VERSION:
+                    return None
+
+                data = array('I')
+                data.frombytes(f.read())
+        except Exception as e:
+            logger.warning(f"Error loading trigram index {index_path}: {str(e)}")
+            return None
+
+        index = cls()
+        index.files = header["files"]
+        index.ids = {rel_path: i for i, rel_path in enumerate(index.files) if rel_path is not None}
+        index.meta = header["meta"]
+
+        offset = 0
+        for trigram, count in zip(header["trigrams"], header["counts"]):
+            index.postings[trigram] = data[offset:offset + count]
+            offset += count
+
+        return index
+
+def scan_code_files(project_path: str, extensions: Optional[List[str]] = None) -> List[str]:
+    """
+    List the code files of a project that the trigram index covers.
+
+    Args:
+        project_path: Path to the project root
+        extensions: File extensions to include (defaults to DEFAULT_CODE_EXTENSIONS)
+
+    Returns:
+        List of absolute file paths
+    """
+    extensions = tuple(extensions or DEFAULT_CODE_EXTENSIONS)
+    code_files = []
+
+    for root, dirs, files in os.walk(project_path):
+        # Skip hidden directories and common excluded directories
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in EXCLUDED_DIRS]
+
+        for filename in files:
+            if filename.endswith(extensions):
+                code_files.append(os.path.join(root, filename))
+
+    return code_files
+
+# Loaded indexes, keyed by path and invalidated when the file changes
+_index_cache: Dict[str, Tuple[Tuple[float, int], TrigramIndex]] = {}
+_index_cache_lock = threading.Lock()
+
+def load_trigram_index(project_path: str) -> Optional[TrigramIndex]:
+    """
+    Load the trigram index of a project.
+
+    Args:
+        project_path: Path to the project root
+
+    Returns:
+        The TrigramIndex, or None if it has not been built
+    """
+    index_path = os.path.join(project_path, ".ai_reference", TRIGRAM_INDEX_FILENAME)
+    try:
+        stats = os.stat(index_path)
+    except OSError:
+        return None
+
+    signature = (stats.st_mtime, stats.st_size)
+    with _index_cache_lock:
+        cached = _index_cache.get(index_path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    index = TrigramIndex.load(index_path)
+    if index is not None:
+        with _index_cache_lock:
+            _index_cache[index_path] = (signature, index)
+    return index
+
+def update_trigram_index(
+    project_path: str,
+    rebuild: bool = False,
+    changed_paths: Optional[Iterable[str]] = None
+) -> Dict[str, int]:
+    """
+    Bring a project's trigram index up to date.
+
+    Only files whose mtime or size changed are re-read.
+
+    Args:
+        project_path: Path to the project root
+        rebuild: Discard the existing index and index every file again
+        changed_paths: Changed file or directory paths relative to the project,
+            as reported by a file watcher; None walks the whole project
+
+    Returns:
+        Counts of indexed, updated and removed files
+    """
+    ai_ref_path = os.path.join(project_path, ".ai_reference")
+    index_path = os.path.join(ai_ref_path, TRIGRAM_INDEX_FILENAME)
+
+    index = None
+    if not rebuild and os.path.exists(index_path):
+        index = TrigramIndex.load(index_path)
+    if index is None:
+        index = TrigramIndex()
+        changed_paths = None
+
+    if changed_paths is None:
+        code_files = scan_code_files(project_path)
+        stale = set(index.ids)
+    else:
+        code_files, stale = _changed_code_files(project_path, changed_paths, index)
+
+    updated = 0
+    seen = set()
+    for file_path in code_files:
+        rel_path = os.path.relpath(file_path, project_path).replace('\\', '/')
+        seen.add(rel_path)
+
+        try:
+            stats = os.stat(file_path)
+        except OSError:
+            seen.discard(rel_path)
+            continue
+
+        if index.meta.get(rel_path) == [stats.st_mtime, stats.st_size]:
+            continue
+
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (UnicodeDecodeError, OSError):
+            # Binary or unreadable files are not searchable
+            index.remove_file(rel_path)
+            continue
+
+        index.add_file(rel_path, content, stats.st_mtime, stats.st_size)
+        updated += 1
+
+    removed = [rel_path for rel_path in stale if rel_path not in seen and rel_path in index.ids]
+    for rel_path in removed:
+        index.remove_file(rel_path)
+
+    if updated or removed or not os.path.exists(index_path):
+        os.makedirs(ai_ref_path, exist_ok=True)
+        index.save(index_path)
+
+    return {
+        "indexed": len(index.ids),
+        "updated": updated,
+        "removed": len(removed)
+    }
+
+def _changed_code_files(
+    project_path: str,
+    changed_paths: Iterable[str],
+    index: TrigramIndex
+) -> Tuple[List[str], Set[str]]:
+    """
+    Expand watcher-reported paths into the code files to re-check.
+
+    Returns:
+        Tuple of (absolute paths of existing code files, indexed relative paths
+        that are removed unless they still exist)
+    """
+    extensions = tuple(DEFAULT_CODE_EXTENSIONS)
+    code_files = set()
+    stale = set()
+
+    for rel_path in changed_paths:
+        rel_path = rel_path.replace('\\', '/').strip('/')
+        if rel_path in ('', '.'):
+            return scan_code_files(project_path), set(index.ids)
+
+        parts = rel_path.split('/')
+        if any(part.startswith('.') or part in EXCLUDED_DIRS for part in parts[:-1]):
+            continue
+
+        full_path = os.path.join(project_path, rel_path)
+        prefix = rel_path + '/'
+        stale.update(path for path in index.ids if path == rel_path or path.startswith(prefix))
+
+        if os.path.isdir(full_path):
+            code_files.update(scan_code_files(full_path))
+        elif rel_path.endswith(extensions) and os.path.isfile(full_path):
+            code_files.add(full_path)
+
+    return sorted(code_files), stale
@@ -48,7 +48,8 @@ class UnifiedContextBuilder:
             "tool_registry": None,
             "tool_profiles": {},
             "relationship_groups": {},
-            "decision_trees": {}
+            "decision_trees": {},
+            "file_tools": {}
         }
     
     def build_context(self) -> Dict[str, Any]:
@@ -171,11 +172,26 @@ class UnifiedContextBuilder:
             context["components"][component_name] = {
                 "name": component_name,
                 "type": component_info.get("type", "unknown"),
-                "file": component_info.get("file", ""),
+                "file": self._component_file(component_info),
                 "references": component_info.get("references", []),
                 "source": "ai_librarian"
             }
     
+    def _component_file(self, component_info: Dict[str, Any]) -> str:
+        """
+        Get the file of a registry component relative to the project.
+        
+        Args:
+            component_info: Component entry from the component registry
+            
+        Returns:
+            Relative file path with forward slashes, or "" if unknown
+        """
+        file_path = component_info.get("file") or component_info.get("primary_file") or ""
+        if file_path and os.path.isabs(file_path):
+            file_path = os.path.relpath(file_path, self.project_path)
+        return file_path.replace('\\', '/')
+    
     def _integrate_tool_reference_data(self, context: Dict[str, Any]) -> None:
         """
         Integrate Tool Reference data into the unified context.
@@ -227,26 +243,103 @@ class UnifiedContextBuilder:
             context: The unified context to update
         """
         cross_refs = {}
+        self._add_component_cross_references(context, cross_refs, context["components"])
+        self._add_tool_cross_references(context, cross_refs)
+        context["cross_references"] = cross_refs
+    
+    def _add_component_cross_references(
+        self,
+        context: Dict[str, Any],
+        cross_refs: Dict[str, Any],
+        components: Dict[str, Any]
+    ) -> None:
+        """
+        Add the tools referenced in the files of the given components.
         
-        # Find tool references in component files
-        for component_name, component_info in context["components"].items():
+        Args:
+            context: The unified context
+            cross_refs: Cross-references to update
+            components: Components whose files should be searched
+        """
+        for component_name, component_info in components.items():
             file_path = component_info.get("file", "")
             if file_path:
                 tools_in_file = self._find_tools_in_file(file_path)
                 if tools_in_file:
-                    if component_name not in cross_refs:
-                        cross_refs[component_name] = {"related_tools": []}
-                    cross_refs[component_name]["related_tools"].extend(tools_in_file)
+                    cross_refs.setdefault(component_name, {}).setdefault("related_tools", []).extend(tools_in_file)
+    
+    def _add_tool_cross_references(self, context: Dict[str, Any], cross_refs: Dict[str, Any]) -> None:
+        """
+        Add the components referenced in every tool's profile.
         
-        # Find components referenced in tool descriptions
+        Args:
+            context: The unified context
+            cross_refs: Cross-references to update
+        """
         for tool_id, tool_info in context["tools"].items():
             components_in_tool = self._find_components_in_tool(tool_id, tool_info)
             if components_in_tool:
                 if tool_id not in cross_refs:
                     cross_refs[tool_id] = {"related_components": []}
                 cross_refs[tool_id]["related_components"] = components_in_tool
+    
+    def update_context(self, context: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update a previously built context for a set of changed files.
         
-        context["cross_references"] = cross_refs
+        Components are refreshed from the component registry, but only the files
+        in the change set are searched again for tool references, so the work is
+        proportional to the change rather than to the project.
+        
+        Args:
+            context: Context returned by an earlier build_context call
+            changes: Change set with "added", "modified", "deleted" and "renamed"
+                lists of paths relative to the project
+            
+        Returns:
+            The updated context
+        """
+        if not self.ai_librarian_available:
+            return context
+        
+        changed_files = set(changes.get("added", [])) | set(changes.get("modified", []))
+        changed_files.update(pair["to"] for pair in changes.get("renamed", []))
+        
+        old_components = context.get("components", {})
+        self._load_ai_librarian_data()
+        context["components"] = {}
+        self._integrate_ai_librarian_data(context)
+        
+        if self.tool_reference_available:
+            self._load_tool_reference_data()
+            cross_refs = {name: dict(entry) for name, entry in context.get("cross_references", {}).items()}
+            
+            # Drop the file-based references of components that changed or disappeared
+            stale = [
+                name for name in old_components
+                if name not in context["components"] or old_components[name].get("file") in changed_files
+            ]
+            for name in stale:
+                cross_refs.get(name, {}).pop("related_tools", None)
+            
+            updated = {
+                name: info for name, info in context["components"].items()
+                if name not in old_components or info.get("file") in changed_files
+            }
+            self._add_component_cross_references(context, cross_refs, updated)
+            
+            # Tool profiles only need searching again when component names changed
+            if set(old_components) != set(context["components"]):
+                for entry in cross_refs.values():
+                    entry.pop("related_components", None)
+                self._add_tool_cross_references(context, cross_refs)
+            
+            context["cross_references"] = {name: entry for name, entry in cross_refs.items() if entry}
+        
+        from datetime import datetime
+        context["last_updated"] = datetime.now().isoformat()
+        
+        return context
     
     def _find_tools_in_file(self, file_path: str) -> List[str]:
         """
@@ -263,6 +356,10 @@ class UnifiedContextBuilder:
         # Skip if no tool registry
         if not self.cache["tool_registry"]:
             return tools_found
+        
+        # Several components usually share a file, so search each file once
+        if file_path in self.cache["file_tools"]:
+            return list(self.cache["file_tools"][file_path])
             
         # Get all tool IDs
         tool_ids = list(self.cache["tool_registry"].get("tools", {}).keys())
@@ -281,7 +378,8 @@ class UnifiedContextBuilder:
         except Exception as e:
             logger.error(f"Error searching for tools in file {file_path}: {str(e)}")
         
-        return tools_found
+        self.cache["file_tools"][file_path] = tools_found
+        return list(tools_found)
     
     def _find_components_in_tool(self, tool_id: str, tool_info: Dict[str, Any]) -> List[str]:
         """
@@ -314,6 +412,21 @@ class UnifiedContextBuilder:
         
         return components_found
 
+def update_unified_context(project_path: str, context: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Update a unified context for a set of changed files.
+    
+    Args:
+        project_path: Root path of the project
+        context: Context from an earlier build_unified_context call
+        changes: Change set with "added", "modified", "deleted" and "renamed"
+        
+    Returns:
+        The updated context
+    """
+    builder = UnifiedContextBuilder(project_path)
+    return builder.update_context(context, changes)
+
 def build_unified_context(project_path: str) -> Dict[str, Any]:
     """
     Build a unified context for the specified project.
@@ -20,7 +20,7 @@ import time
 from typing import Dict, List, Any, Optional
 
 # Import the Unified Context Builder and Bidirectional Reference System
-from aitoolkit.librarian.unified_context import UnifiedContextBuilder, build_unified_context
+from aitoolkit.librarian.unified_context import UnifiedContextBuilder, build_unified_context, update_unified_context
 from aitoolkit.librarian.bidirectional_refs import BidirectionalReferenceSystem, build_bidirectional_references
 
 # Configure logging
@@ -417,6 +417,39 @@ def register_unified_context_tools(mcp):
     
     logger.info("Registered unified context tools")
 
+def apply_project_changes(project_path: str, changes: Dict[str, Any]) -> bool:
+    """
+    Bring a cached unified context up to date with a change set from the indexer.
+    
+    Args:
+        project_path: The root directory of the project
+        changes: Change set with "added", "modified", "deleted" and "renamed"
+        
+    Returns:
+        True if a cached context was updated, False if none was cached
+    """
+    with unified_context_data["context_lock"]:
+        context = unified_context_data["context"].get(project_path)
+    
+    if context is None:
+        return False
+    
+    try:
+        context = update_unified_context(project_path, dict(context), changes)
+    except Exception as e:
+        logger.error(f"Error updating unified context for {project_path}: {str(e)}")
+        # Drop the cached context so the next request rebuilds it
+        with unified_context_data["context_lock"]:
+            unified_context_data["context"].pop(project_path, None)
+        return False
+    
+    with unified_context_data["context_lock"]:
+        unified_context_data["context"][project_path] = context
+        unified_context_data["last_updated"] = time.time()
+    
+    logger.info(f"Updated unified context for {project_path}")
+    return True
+
 # Function to be called when the module is imported
 def initialize():
     """Initialize the unified context integration module."""
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the enhanced indexer's per-file parsing cost.
+
+Times enhanced_indexer.parse_python_file on a set of (by default large)
+modules and reports the best and mean time per file.
+
+Usage:
+    python benchmark_indexer.py [file ...] [--repeat N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Get the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the librarian directory to the path
+sys.path.insert(0, os.path.join(project_root, 'aitoolkit', 'librarian'))
+
+from enhanced_indexer import parse_python_file
+
+DEFAULT_FILES = [
+    os.path.join(project_root, 'aitoolkit', 'librarian', 'server.py'),
+    os.path.join(project_root, 'aitoolkit', 'librarian', 'enhanced_indexer.py'),
+    os.path.join(project_root, 'aitoolkit', 'librarian', 'task_board.py'),
+]
+
+def benchmark_file(file_path: str, repeat: int) -> dict:
+    """Parse a file `repeat` times and collect timings."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse_python_file(file_path)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "best": min(timings),
+        "mean": sum(timings) / len(timings),
+        "classes": len(result.get("classes", {})),
+        "functions": len(result.get("functions", {})),
+        "error": result.get("error")
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark enhanced indexer parsing")
+    parser.add_argument("files", nargs="*", help="Python files to parse (defaults to large toolkit modules)")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of runs per file")
+    args = parser.parse_args()
+
+    files = args.files or DEFAULT_FILES
+
+    print(f"{'file':<40} {'lines':>7} {'best ms':>9} {'mean ms':>9} {'classes':>8} {'funcs':>6}")
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            line_count = sum(1 for _ in f)
+
+        stats = benchmark_file(file_path, args.repeat)
+        name = os.path.relpath(file_path, project_root)
+        print(f"{name:<40} {line_count:>7} {stats['best'] * 1000:>9.1f} {stats['mean'] * 1000:>9.1f} "
+              f"{stats['classes']:>8} {stats['functions']:>6}")
+        if stats["error"]:
+            print(f"  error: {stats['error']}")
+
+if __name__ == "__main__":
+    main()
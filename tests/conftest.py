@@ -0,0 +1,66 @@
+"""
+Shared pytest setup for the AI Dev Toolkit tests.
+
+Makes the repository root importable, so tests import the toolkit as
+`aitoolkit.librarian.<module>` the way the server does.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+@pytest.fixture
+def make_task_board(tmp_path):
+    """Build TaskBoards for a temporary project and shut them down after the test."""
+    from aitoolkit.librarian.task_board import TaskBoard
+
+    boards = []
+
+    def make(**kwargs):
+        kwargs.setdefault("process_workers", 0)
+        board = TaskBoard(str(tmp_path), **kwargs)
+        boards.append(board)
+        return board
+
+    yield make
+    for board in boards:
+        board.shutdown()
+
+def wait_for_task(board, task_id, timeout=30.0):
+    """Wait until a task leaves PENDING/RUNNING and return its status name."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = board.get_task_status(task_id)["status"].name
+        if status not in ("PENDING", "RUNNING"):
+            return status
+        time.sleep(0.02)
+    raise AssertionError(f"Task {task_id} still {status} after {timeout} seconds")
+
+def write_file(project, rel_path, text):
+    """Write a file below a project directory, creating its parents."""
+    path = project / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def write_project(project):
+    """Write a small Python package used by the indexing tests."""
+    write_file(project, "pkg/__init__.py", "")
+    write_file(project, "pkg/a.py",
+               "import os\n\nclass A:\n    \"\"\"The A.\"\"\"\n    def run(self):\n        return helper()\n\n"
+               "def helper():\n    return 1\n")
+    write_file(project, "pkg/b.py", "from pkg.a import A\n\ndef use():\n    return A().run()\n")
+    write_file(project, "pkg/c.py", "def gone():\n    pass\n")
+    write_file(project, "pkg/old_name.py", "def moved():\n    return 'moved'\n")
+
+def change_project(project):
+    """Add, modify, delete and rename files of the package from write_project."""
+    write_file(project, "pkg/b.py", "from pkg.a import A, helper\n\ndef use():\n    return helper()\n")
+    os.remove(str(project / "pkg/c.py"))
+    write_file(project, "pkg/d.py", "def fresh():\n    \"\"\"New.\"\"\"\n    return 2\n")
+    os.rename(str(project / "pkg/old_name.py"), str(project / "pkg/new_name.py"))
@@ -0,0 +1,68 @@
+"""
+Tests for conditional reads with content hashes (aitoolkit/librarian/content_hash.py).
+"""
+
+import os
+
+from aitoolkit.librarian.content_hash import ContentHashes, check_unchanged, content_hash
+from aitoolkit.librarian import file_reader
+from aitoolkit.librarian.file_cache import FileCache
+from aitoolkit.librarian.file_reader import read_path
+
+def test_content_hash_is_stable_and_content_sensitive():
+    assert content_hash(b"x = 1\n") == content_hash(b"x = 1\n")
+    assert content_hash(b"x = 1\n") != content_hash(b"x = 2\n")
+    assert len(content_hash(b"")) == 32
+
+def test_remembered_hash_is_dropped_when_the_file_changes(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    hashes = ContentHashes()
+    hashes.remember(str(path), os.stat(str(path)), "digest")
+
+    assert hashes.lookup(str(path))[0] == "digest"
+
+    stats = os.stat(str(path))
+    os.utime(str(path), ns=(stats.st_atime_ns, stats.st_mtime_ns + 10 ** 9))
+    assert hashes.lookup(str(path)) is None
+    assert hashes.lookup(str(tmp_path / "missing.py")) is None
+
+def test_conditional_read_of_unchanged_file(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    allowed = [str(tmp_path)]
+
+    _, first, _ = read_path(str(path), allowed, use_cache=False)
+    digest = first["content_hash"]
+    assert digest == content_hash(b"x = 1\n")
+
+    _, second, _ = read_path(str(path), allowed, use_cache=False, if_none_match=digest)
+    assert second["status"] == "unchanged"
+    assert second["content_hash"] == digest
+    assert "content" not in second
+    assert check_unchanged(str(path), digest)["status"] == "unchanged"
+
+def test_conditional_read_of_changed_file_returns_content(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    allowed = [str(tmp_path)]
+    _, first, _ = read_path(str(path), allowed, use_cache=False)
+
+    path.write_text("x = 22\n")
+    _, second, _ = read_path(str(path), allowed, use_cache=False, if_none_match=first["content_hash"])
+    assert second["status"] == "success"
+    assert second["content"] == "x = 22\n"
+    assert second["content_hash"] != first["content_hash"]
+
+def test_cached_read_honours_if_none_match(tmp_path, monkeypatch):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    allowed = [str(tmp_path)]
+    cache = FileCache(shards=1)
+    _, first, _ = read_path(str(path), allowed, file_cache=cache)
+
+    # Skip the remembered-hash shortcut so the read is served from the cache
+    monkeypatch.setattr(file_reader, "check_unchanged", lambda path, if_none_match: None)
+    _, second, cache_hit = read_path(str(path), allowed, file_cache=cache, if_none_match=first["content_hash"])
+    assert cache_hit
+    assert second["status"] == "unchanged"
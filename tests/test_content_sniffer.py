@@ -0,0 +1,59 @@
+"""
+Tests for binary detection and encoding sniffing (aitoolkit/librarian/content_sniffer.py).
+"""
+
+import codecs
+
+import pytest
+
+from aitoolkit.librarian.content_sniffer import SNIFF_BYTES, ContentSniffer, sniff_bytes
+from aitoolkit.librarian.file_reader import read_whole_file
+
+@pytest.mark.parametrize("prefix, binary, encoding, reason", [
+    (b"", False, "utf-8", "empty"),
+    (b"def f():\n    return '\xc3\xa9'\n", False, "utf-8", "utf8"),
+    (codecs.BOM_UTF8 + b"x = 1\n", False, "utf-8-sig", "bom"),
+    (codecs.BOM_UTF16_LE + "x = 1\n".encode("utf-16-le"), False, "utf-16", "bom"),
+    (codecs.BOM_UTF32_LE + "x = 1\n".encode("utf-32-le"), False, "utf-32", "bom"),
+    (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", True, None, "nul_bytes"),
+    (bytes(range(1, 8)) * 20, True, None, "control_bytes"),
+    (bytes(range(0x80, 0x100)) * 4, True, None, "invalid_utf8"),
+    (b"caf\xe9 cr\xe8me br\xfbl\xe9e, and plenty of plain text around it\n", False, "cp1252", "legacy_8bit"),
+])
+def test_sniff_bytes(prefix, binary, encoding, reason):
+    assert sniff_bytes(prefix) == {"binary": binary, "encoding": encoding, "reason": reason}
+
+def test_character_cut_at_end_of_prefix_is_not_an_error():
+    prefix = "é".encode("utf-8") * 10
+    assert sniff_bytes(prefix[:-1], truncated=True)["reason"] == "utf8"
+
+def test_verdicts_are_cached_per_file_version(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n")
+    sniffer = ContentSniffer()
+
+    assert not sniffer.sniff(str(path))["binary"]
+    sniffer.sniff(str(path))
+    assert sniffer.stats() == {"entries": 1, "hits": 1, "sniffs": 1}
+
+    path.write_bytes(b"\x00\x01\x02 binary now")
+    assert sniffer.sniff(str(path))["binary"]
+    assert sniffer.stats()["sniffs"] == 2
+
+def test_read_whole_file_uses_sniffed_encoding(tmp_path):
+    path = tmp_path / "bom.py"
+    path.write_bytes(codecs.BOM_UTF16_LE + "name = 'wörld'\n".encode("utf-16-le"))
+
+    result = read_whole_file(str(path))
+    assert result["status"] == "success"
+    assert result["encoding"] == "utf-16"
+    assert result["content"] == "name = 'wörld'\n"
+
+def test_binary_file_is_described_not_read(tmp_path):
+    path = tmp_path / "blob.bin"
+    path.write_bytes(b"\x00" * (SNIFF_BYTES * 4))
+
+    result = read_whole_file(str(path))
+    assert result["status"] == "binary"
+    assert result["size"] == SNIFF_BYTES * 4
+    assert "content" not in result
@@ -0,0 +1,9 @@
+
+def hello_world():
+    """A simple test function."""
+    return "Hello, World!"
+    
+class TestClass:
+    """A simple test class."""
+    def method(self):
+        return "Hello from TestClass!"
@@ -0,0 +1,154 @@
+"""
+Tests for the enhanced indexer (aitoolkit/librarian/enhanced_indexer.py).
+"""
+
+import os
+import json
+import glob
+
+from conftest import write_project, change_project
+from aitoolkit.librarian import enhanced_indexer
+from aitoolkit.librarian.enhanced_indexer import (
+    initialize_enhanced_librarian, parse_files_parallel, parse_python_file, load_manifest
+)
+
+INDEX_ARTIFACTS = (
+    "script_index.json", "component_registry.json", "symbol_index.json",
+    "import_graph.json", "search_index.json"
+)
+
+def index_artifacts(project):
+    """The index files, without the fields recording when and how they were generated."""
+    ai_ref_path = os.path.join(str(project), ".ai_reference")
+    artifacts = {}
+    for name in INDEX_ARTIFACTS:
+        with open(os.path.join(ai_ref_path, name), encoding="utf-8") as f:
+            artifacts[name] = json.load(f)
+    for path in glob.glob(os.path.join(ai_ref_path, "scripts", "*.json")):
+        with open(path, encoding="utf-8") as f:
+            artifacts["scripts/" + os.path.basename(path)] = json.load(f)
+    artifacts["script_index.json"]["project_info"].pop("updated", None)
+    artifacts["component_registry.json"].pop("latest_changes", None)
+    return artifacts
+
+def write_modules(directory, count):
+    paths = []
+    for i in range(count):
+        path = directory / f"mod_{i}.py"
+        path.write_text(
+            f'"""Module {i}."""\n\n'
+            f"class Widget{i}:\n    def run(self):\n        return helper_{i}()\n\n"
+            f"def helper_{i}():\n    return {i}\n"
+        )
+        paths.append(str(path))
+    return paths
+
+def test_parallel_parse_matches_in_process_parse(tmp_path):
+    paths = write_modules(tmp_path, enhanced_indexer.PARALLEL_PARSE_THRESHOLD + 8)
+
+    parsed = parse_files_parallel(paths, max_workers=2, chunk_size=4)
+
+    assert list(parsed) == paths
+    assert parsed == {path: parse_python_file(path) for path in paths}
+
+def test_incremental_update_matches_full_rebuild(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+    change_project(tmp_path)
+
+    message, file_count, _ = initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+    assert "incrementally" in message
+    changes = load_manifest(str(tmp_path / ".ai_reference"))["changes"]
+    assert (changes["added"], changes["modified"], changes["deleted"]) == (["pkg/d.py"], ["pkg/b.py"], ["pkg/c.py"])
+    assert changes["renamed"] == [{"from": "pkg/old_name.py", "to": "pkg/new_name.py"}]
+    incremental = index_artifacts(tmp_path)
+
+    initialize_enhanced_librarian(str(tmp_path), full_rebuild=True, max_workers=1)
+    assert incremental == index_artifacts(tmp_path)
+    assert file_count == 5
+
+def test_watcher_paths_update_matches_full_rebuild(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+    change_project(tmp_path)
+
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1, changed_paths=[
+        "pkg/b.py", "pkg/c.py", "pkg/d.py", "pkg/old_name.py", "pkg/new_name.py"
+    ])
+    incremental = index_artifacts(tmp_path)
+
+    initialize_enhanced_librarian(str(tmp_path), full_rebuild=True, max_workers=1)
+    assert incremental == index_artifacts(tmp_path)
+
+def test_touched_files_are_not_reparsed(tmp_path, monkeypatch):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+
+    # Same content, new mtime: the content hash says unchanged
+    os.utime(str(tmp_path / "pkg/a.py"), (1, 1))
+    parsed = []
+    monkeypatch.setattr(enhanced_indexer, "parse_files_parallel", lambda files, workers=None: parsed.extend(files) or {})
+
+    message, _, _ = initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+    assert "up to date" in message
+    assert parsed == []
+
+SAMPLE_MODULE = '''"""Module docstring."""
+import os
+from pkg.a import A as B
+from . import sibling
+
+LIMIT = 10
+
+class Widget(B):
+    """A widget."""
+
+    def run(self, n: int) -> str:
+        """Run it."""
+        os.path.join("a", "b")
+        return helper(n)
+
+    async def later(self):
+        pass
+
+def helper(n):
+    def inner():
+        pass
+    return str(n)
+'''
+
+def test_parse_extracts_module_structure(tmp_path):
+    path = tmp_path / "sample.py"
+    path.write_text(SAMPLE_MODULE)
+    info = parse_python_file(str(path))
+
+    widget = info["classes"]["Widget"]
+    assert (widget["start_line"], widget["end_line"], widget["docstring"], widget["bases"]) == (8, 17, "A widget.", ["B"])
+    run = widget["methods"]["run"]
+    assert run["parameters"] == [{"name": "self"}, {"name": "n", "type": "int"}]
+    assert run["return_type"] == "str"
+    assert [call["name"] for call in run["calls"]] == ["os.path.join", "helper"]
+    assert "later" in widget["methods"]
+
+    assert list(info["functions"]) == ["helper"]
+    assert info["imports"] == [
+        {"name": "os", "line": 2},
+        {"name": "pkg.a.A", "line": 3},
+        {"name": "sibling", "line": 4, "level": 1}
+    ]
+    assert info["constants"] == {"LIMIT": {"line": 6, "value": 10}}
+
+    # Nested definitions are listed as symbols with their parent
+    symbols = {symbol["qualified_name"]: symbol for symbol in info["symbols"]}
+    assert set(symbols) == {"Widget", "Widget.run", "Widget.later", "helper", "helper.inner"}
+    assert symbols["Widget.run"]["kind"] == "method"
+    assert symbols["helper.inner"]["parent"] == "helper"
+    assert set(info["references"]["calls"]) == {"helper", "join", "str"}
+
+def test_parse_reports_syntax_errors(tmp_path):
+    path = tmp_path / "broken.py"
+    path.write_text("def broken(:\n")
+    info = parse_python_file(str(path))
+
+    assert "error" in info
+    assert info["classes"] == {} and info["functions"] == {} and info["symbols"] == []
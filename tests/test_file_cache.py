@@ -0,0 +1,101 @@
+"""
+Tests for the byte-budgeted LRU file cache (aitoolkit/librarian/file_cache.py).
+"""
+
+import os
+
+import pytest
+
+from aitoolkit.librarian.file_cache import FileCache, entry_size
+
+def cached_file(tmp_path, name, size):
+    """Write a file and return its path with the file data the server caches for it."""
+    path = tmp_path / name
+    content = "x" * size
+    path.write_text(content)
+    return str(path), {"content": content, "modified": os.path.getmtime(str(path))}
+
+def test_hit_refreshes_lru_order(tmp_path):
+    cache = FileCache(max_bytes=10 ** 6, max_entries=2, shards=1)
+    a, a_data = cached_file(tmp_path, "a.py", 10)
+    b, b_data = cached_file(tmp_path, "b.py", 10)
+    c, c_data = cached_file(tmp_path, "c.py", 10)
+
+    cache.set(a, a_data)
+    cache.set(b, b_data)
+    assert cache.get(a)["content"] == a_data["content"]
+
+    # b is now the least recently used entry and makes room for c
+    cache.set(c, c_data)
+    assert cache.paths() == [a, c]
+    assert cache.get(b) is None
+    assert cache.stats()["evictions"] == 1
+
+def test_bytes_are_accounted_and_budget_enforced(tmp_path):
+    a, a_data = cached_file(tmp_path, "a.py", 1000)
+    b, b_data = cached_file(tmp_path, "b.py", 1000)
+    size = entry_size(a_data)
+    cache = FileCache(max_bytes=size + size // 2, max_entry_bytes=size, shards=1)
+
+    assert cache.set(a, a_data)
+    assert cache.bytes_held == size
+
+    # Two entries do not fit in the budget: the older one is evicted
+    assert cache.set(b, b_data)
+    assert cache.paths() == [b]
+    assert cache.bytes_held == size
+
+    cache.invalidate(b)
+    assert cache.bytes_held == 0 and len(cache) == 0
+
+def test_oversize_policy(tmp_path):
+    path, data = cached_file(tmp_path, "big.py", 4000)
+    size = entry_size(data)
+
+    rejecting = FileCache(max_bytes=size * 2, max_entry_bytes=size - 1, shards=1)
+    assert not rejecting.set(path, data)
+    assert rejecting.stats()["rejections"] == 1
+
+    admitting = FileCache(max_bytes=size * 2, max_entry_bytes=size - 1, oversize_policy="admit", shards=1)
+    assert admitting.set(path, data)
+
+    # Nothing larger than the whole budget is admitted
+    too_small = FileCache(max_bytes=size - 1, oversize_policy="admit", shards=1)
+    assert not too_small.set(path, data)
+
+    with pytest.raises(ValueError):
+        FileCache(oversize_policy="sometimes")
+
+def test_changed_file_is_a_miss(tmp_path):
+    cache = FileCache(shards=1)
+    path, data = cached_file(tmp_path, "a.py", 10)
+    cache.set(path, data)
+
+    stats = os.stat(path)
+    os.utime(path, (stats.st_atime, stats.st_mtime + 10))
+
+    assert cache.get(path) is None
+    assert len(cache) == 0
+    assert cache.stats()["by_size_class"]["small"]["stale"] == 1
+
+def test_ranges_are_dropped_with_their_file(tmp_path):
+    cache = FileCache(shards=2)
+    path, data = cached_file(tmp_path, "a.py", 10)
+    cache.set(path, data)
+    cache.set(path, {"content": "xx", "modified": data["modified"]}, range_key="lines=1-2")
+
+    assert cache.get(path, range_key="lines=1-2")["content"] == "xx"
+    cache.invalidate(path)
+    assert cache.get(path) is None
+    assert cache.get(path, range_key="lines=1-2") is None
+
+def test_configure_evicts_down_to_new_limits(tmp_path):
+    cache = FileCache(max_bytes=10 ** 6, max_entries=10, shards=1)
+    paths = []
+    for i in range(5):
+        path, data = cached_file(tmp_path, f"m{i}.py", 10)
+        cache.set(path, data)
+        paths.append(path)
+
+    cache.configure(max_entries=2)
+    assert cache.paths() == paths[-2:]
@@ -0,0 +1,88 @@
+"""
+Tests for batch file reads (aitoolkit/librarian/file_reader.py).
+"""
+
+import os
+import time
+import threading
+from functools import partial
+
+from aitoolkit.librarian.file_cache import FileCache
+from aitoolkit.librarian.file_reader import read_path, read_paths
+
+class SlowReader:
+    """read_one stand-in that sleeps per path and records concurrent reads."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, path):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delays.get(path, 0))
+        with self.lock:
+            self.active -= 1
+        content = f"content of {path}"
+        return os.path.abspath(path), {"status": "success", "content": content, "size": len(content)}, False
+
+def test_results_keep_request_order_and_bounded_concurrency():
+    paths = [f"/p/{i}.py" for i in range(8)]
+    reader = SlowReader({path: 0.05 * (8 - i) for i, path in enumerate(paths)})
+
+    results, stats = read_paths(paths, reader, max_workers=3)
+
+    assert list(results) == paths
+    assert reader.max_active <= 3
+    assert stats["misses"] == 8
+
+def test_slow_read_times_out_without_failing_the_batch():
+    reader = SlowReader({"/p/slow.py": 1.0})
+
+    results, stats = read_paths(["/p/slow.py", "/p/fast.py"], reader, timeout=0.1)
+
+    assert stats["timeouts"] == 1
+    assert results["/p/slow.py"]["status"] == "error"
+    assert "Timed out" in results["/p/slow.py"]["message"]
+    assert results["/p/fast.py"]["status"] == "success"
+
+def test_total_byte_cap_truncates_later_files(tmp_path):
+    for name in ("a.py", "b.py", "c.py"):
+        (tmp_path / name).write_text("x" * 100)
+    paths = [str(tmp_path / name) for name in ("a.py", "b.py", "c.py")]
+    read_one = partial(read_path, allowed_directories=[str(tmp_path)])
+
+    results, stats = read_paths(paths, read_one, max_total_bytes=150)
+
+    assert results[paths[0]]["content"] == "x" * 100
+    assert results[paths[1]]["content"] == "x" * 50
+    assert results[paths[1]]["truncated"]
+    assert results[paths[2]]["content"] == ""
+    assert stats["truncated"] == 2
+    assert stats["total_bytes"] == 150
+
+def test_sequential_reads_use_the_cache(tmp_path):
+    (tmp_path / "a.py").write_text("a = 1\n")
+    path = str(tmp_path / "a.py")
+    read_one = partial(read_path, allowed_directories=[str(tmp_path)], file_cache=FileCache(shards=1))
+
+    _, first = read_paths([path], read_one, parallel=False)
+    results, second = read_paths([path], read_one, parallel=False)
+
+    assert (first["misses"], second["hits"]) == (1, 1)
+    assert results[path]["from_cache"]
+
+def test_read_path_refuses_paths_outside_allowed_directories(tmp_path):
+    allowed = tmp_path / "allowed"
+    allowed.mkdir()
+    (tmp_path / "secret.py").write_text("x = 1\n")
+
+    _, result, _ = read_path(str(tmp_path / "secret.py"), [str(allowed)])
+    assert result["status"] == "error"
+    assert "Access denied" in result["message"]
+
+    _, result, _ = read_path(str(allowed / "missing.py"), [str(allowed)])
+    assert result["message"].startswith("File not found")
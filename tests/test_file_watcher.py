@@ -0,0 +1,96 @@
+"""
+Tests for file watching and change collection (aitoolkit/librarian/file_watcher.py).
+"""
+
+import os
+
+from conftest import write_file
+
+from aitoolkit.librarian.file_watcher import (
+    ChangeCollector, FileEvent, PollingWatcher, create_watcher, is_watched_path,
+    snapshot_files
+)
+
+EXTENSIONS = (".py",)
+
+def test_is_watched_path_skips_excluded_dirs_and_extensions(tmp_path):
+    project = str(tmp_path)
+    assert is_watched_path(project, os.path.join(project, "pkg", "a.py"), EXTENSIONS)
+    assert not is_watched_path(project, os.path.join(project, "pkg", "a.txt"), EXTENSIONS)
+    assert not is_watched_path(project, os.path.join(project, ".git", "a.py"), EXTENSIONS)
+    assert not is_watched_path(project, os.path.join(project, "node_modules", "x", "a.py"), EXTENSIONS)
+    assert not is_watched_path(project, os.path.join(os.path.dirname(project), "a.py"), EXTENSIONS)
+    assert is_watched_path(project, os.path.join(project, "pkg"), EXTENSIONS, is_directory=True)
+    assert not is_watched_path(project, os.path.join(project, "__pycache__"), EXTENSIONS, is_directory=True)
+
+def test_polling_watcher_reports_created_modified_and_deleted(tmp_path):
+    write_file(tmp_path, "pkg/a.py", "a = 1\n")
+    write_file(tmp_path, "pkg/b.py", "b = 1\n")
+    write_file(tmp_path, ".git/hooks/x.py", "x = 1\n")
+    watcher = PollingWatcher(str(tmp_path), lambda project, events: None, EXTENSIONS)
+    watcher._snapshot = snapshot_files(str(tmp_path), EXTENSIONS)
+    assert watcher.poll() == []
+
+    write_file(tmp_path, "pkg/a.py", "a = 2  # longer\n")
+    os.remove(str(tmp_path / "pkg/b.py"))
+    write_file(tmp_path, "pkg/c.py", "c = 1\n")
+    write_file(tmp_path, "pkg/notes.txt", "ignored\n")
+    write_file(tmp_path, ".git/hooks/y.py", "y = 1\n")
+
+    events = {(event.event_type, os.path.relpath(event.path, str(tmp_path))) for event in watcher.poll()}
+    assert events == {
+        ("modified", os.path.join("pkg", "a.py")),
+        ("deleted", os.path.join("pkg", "b.py")),
+        ("created", os.path.join("pkg", "c.py"))
+    }
+
+def test_create_watcher_falls_back_to_polling_on_request(tmp_path):
+    watcher = create_watcher(str(tmp_path), lambda project, events: None, EXTENSIONS,
+                             backend="polling", poll_interval=60)
+    try:
+        assert isinstance(watcher, PollingWatcher)
+        assert watcher.interval == 60
+    finally:
+        watcher.stop()
+
+def test_collector_waits_for_quiet_period(tmp_path):
+    project = str(tmp_path)
+    collector = ChangeCollector()
+    collector.add_events(project, [FileEvent("modified", os.path.join(project, "pkg", "a.py"))])
+    collector.add_events(project, [
+        FileEvent("moved", os.path.join(project, "old.py"), dest_path=os.path.join(project, "new.py"))
+    ])
+
+    # Still inside the quiet period: nothing is ready yet
+    assert collector.drain_ready(60) == {}
+
+    assert collector.drain_ready(0) == {project: {"pkg/a.py", "old.py", "new.py"}}
+    # Drained changes are not reported twice
+    assert collector.drain_ready(0) == {}
+
+def test_collector_rescan_and_discard(tmp_path):
+    project, other = str(tmp_path / "p"), str(tmp_path / "q")
+    collector = ChangeCollector()
+    collector.add_events(project, [FileEvent("modified", os.path.join(project, "a.py"))])
+    collector.add_events(project, [FileEvent("overflow", project)])
+    collector.request_rescan(other)
+
+    # An overflow or an explicit rescan asks for a full scan instead of paths
+    assert collector.drain_ready(0) == {project: None, other: None}
+
+    collector.add_events(project, [FileEvent("created", os.path.join(project, "b.py"))])
+    collector.discard(project)
+    assert collector.drain_ready(0) == {}
+
+def test_collector_normalizes_project_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    project = str(tmp_path / "p")
+    collector = ChangeCollector()
+    # The watcher reports under its absolute path, the server under the path it was given
+    collector.request_rescan("p" + os.sep)
+    collector.add_events(project, [FileEvent("modified", os.path.join(project, "a.py"))])
+    assert collector.drain_ready(0) == {project: None}
+
+    collector.add_events(project + os.sep, [FileEvent("modified", os.path.join(project, "a.py"))])
+    collector.discard("p")
+    assert collector.drain_ready(0) == {}
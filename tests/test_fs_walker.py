@@ -0,0 +1,80 @@
+"""
+Tests for the filesystem walker (aitoolkit/librarian/fs_walker.py).
+"""
+
+from conftest import write_file
+from aitoolkit.librarian.fs_walker import GitIgnore, compile_globs, iter_files
+
+def gitignore(text):
+    return GitIgnore(tuple(GitIgnore.parse(text, "")))
+
+def test_compile_globs_matches_any_pattern_case_insensitively():
+    regex = compile_globs(["*.pyc", "build"])
+    assert regex.match("module.PYC")
+    assert regex.match("build")
+    assert not regex.match("builder.py")
+    assert compile_globs([]) is None
+
+def test_gitignore_negation_overrides_earlier_rule():
+    rules = gitignore("*.log\n!keep.log\n")
+    assert rules.is_ignored("debug.log", False)
+    assert rules.is_ignored("sub/debug.log", False)
+    assert not rules.is_ignored("keep.log", False)
+    assert not rules.is_ignored("sub/keep.log", False)
+
+def test_gitignore_anchored_and_directory_only_patterns():
+    rules = gitignore("/dist\nbuild/\ndocs/*.html\n# comment\n")
+    assert rules.is_ignored("dist", True)
+    assert not rules.is_ignored("pkg/dist", True)
+    assert rules.is_ignored("pkg/build", True)
+    assert not rules.is_ignored("build", False)
+    assert rules.is_ignored("docs/index.html", False)
+    assert not rules.is_ignored("pkg/docs/index.html", False)
+
+def test_gitignore_double_star():
+    rules = gitignore("**/generated/**\nlogs/**/*.txt\n")
+    assert rules.is_ignored("a/b/generated/x.py", False)
+    assert rules.is_ignored("logs/x.txt", False)
+    assert rules.is_ignored("logs/a/b/x.txt", False)
+    assert not rules.is_ignored("other/x.txt", False)
+
+def make_tree(root):
+    write_file(root, "a.py", "")
+    write_file(root, "notes.txt", "")
+    write_file(root, "pkg/b.py", "")
+    write_file(root, "pkg/gen/c.py", "")
+    write_file(root, "pkg/.gitignore", "gen/\n")
+    write_file(root, "lib/d.py", "")
+    write_file(root, "lib/skip_me.py", "")
+    write_file(root, "node_modules/m.py", "")
+    write_file(root, ".hidden/h.py", "")
+    write_file(root, ".gitignore", "*.txt\n")
+
+def test_walk_applies_every_filter(tmp_path):
+    make_tree(tmp_path)
+    python_files = lambda name, rel_path: name.endswith(".py")
+
+    found = set(iter_files(str(tmp_path), accept=python_files, exclude_patterns=["skip_*"]))
+    assert found == {"a.py", "pkg/b.py", "lib/d.py"}
+
+    unfiltered = set(iter_files(str(tmp_path), respect_gitignore=False, parallel=False))
+    assert unfiltered == {"a.py", "notes.txt", "pkg/b.py", "pkg/gen/c.py", "lib/d.py", "lib/skip_me.py"}
+
+def test_parallel_and_sequential_walks_agree(tmp_path):
+    make_tree(tmp_path)
+    for i in range(5):
+        write_file(tmp_path, f"dir{i}/sub/f{i}.py", "")
+
+    sequential = list(iter_files(str(tmp_path), parallel=False))
+    parallel = list(iter_files(str(tmp_path), parallel=True, max_workers=3))
+    assert sorted(parallel) == sorted(sequential)
+
+def test_walk_stops_when_the_caller_has_enough(tmp_path):
+    for i in range(4):
+        for j in range(50):
+            write_file(tmp_path, f"dir{i}/f{j}.py", "")
+
+    walk = iter_files(str(tmp_path))
+    first = [next(walk) for _ in range(3)]
+    walk.close()
+    assert len(set(first)) == 3
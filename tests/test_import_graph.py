@@ -0,0 +1,62 @@
+"""
+Tests for the import graph (aitoolkit/librarian/import_graph.py).
+"""
+
+from aitoolkit.librarian.import_graph import ImportGraph, load_import_graph, module_name_for_path, save_import_graph
+
+def entry(*imports, classes=(), functions=(), names=(), calls=()):
+    return {
+        "imports": [{"name": name, "level": level} for name, level in imports],
+        "classes": list(classes),
+        "functions": list(functions),
+        "names": list(names),
+        "calls": list(calls)
+    }
+
+def sample_graph():
+    return ImportGraph({
+        "pkg/__init__.py": entry(),
+        "pkg/core.py": entry(("os", 0), classes=["Engine"], functions=["start"]),
+        "pkg/sub/__init__.py": entry((".helpers", 1)),
+        "pkg/sub/helpers.py": entry(("..core", 2), ("pkg.core.Engine", 0), names=["Engine"], calls=["start"]),
+        "app.py": entry(("pkg.sub", 0), ("core", 0), names=["Engine"])
+    })
+
+def test_module_names():
+    assert module_name_for_path("pkg/core.py") == "pkg.core"
+    assert module_name_for_path("pkg/sub/__init__.py") == "pkg.sub"
+    assert module_name_for_path("__init__.py") == ""
+
+def test_imports_resolve_to_project_files():
+    graph = sample_graph()
+    # Relative imports, names imported from a module, and stdlib modules left out
+    assert graph.get_imports("pkg/sub/helpers.py") == [{"path": "pkg/core.py", "import": "..core"}]
+    assert graph.get_imports("pkg/sub/__init__.py") == [{"path": "pkg/sub/helpers.py", "import": ".helpers"}]
+    assert graph.get_imports("pkg/core.py") == []
+    # A unique module suffix resolves imports of scripts that extend sys.path
+    assert [edge["path"] for edge in graph.get_imports("app.py")] == ["pkg/sub/__init__.py", "pkg/core.py"]
+
+def test_reverse_edges_and_symbol_references():
+    graph = sample_graph()
+    assert sorted(edge["path"] for edge in graph.get_importers("pkg/core.py")) == ["app.py", "pkg/sub/helpers.py"]
+    assert graph.get_symbol_references("Engine") == {
+        "defined_in": ["pkg/core.py"],
+        "referenced_by": ["app.py", "pkg/sub/helpers.py"],
+        "called_by": []
+    }
+    assert graph.get_symbol_references("start")["called_by"] == ["pkg/sub/helpers.py"]
+
+def test_updates_match_a_graph_built_from_scratch():
+    graph = sample_graph()
+    graph.remove_files(["pkg/sub/helpers.py"])
+    graph.update_files({"pkg/extra.py": entry((".core", 1), calls=["start"])})
+
+    files = dict(sample_graph().files)
+    del files["pkg/sub/helpers.py"]
+    files["pkg/extra.py"] = entry((".core", 1), calls=["start"])
+    assert graph.to_dict() == ImportGraph(files).to_dict()
+
+def test_saved_graph_loads_with_its_tables(tmp_path):
+    save_import_graph(str(tmp_path), sample_graph())
+    loaded = load_import_graph(str(tmp_path))
+    assert loaded.to_dict() == sample_graph().to_dict()
@@ -0,0 +1,60 @@
+"""
+Tests for the SQLite index store (aitoolkit/librarian/index_store.py).
+"""
+
+import os
+
+import pytest
+
+from conftest import write_file, write_project, change_project
+from aitoolkit.librarian.enhanced_indexer import initialize_enhanced_librarian
+from aitoolkit.librarian.index_store import SQLITE_AVAILABLE, get_index_store
+
+pytestmark = pytest.mark.skipif(not SQLITE_AVAILABLE, reason="sqlite3 is not available")
+
+def store_contents(project):
+    store = get_index_store(str(project))
+    return {
+        rel_path: (store.get_file_info(rel_path), store.get_file_symbols(rel_path), store.get_imports(rel_path))
+        for rel_path in store.list_files()
+    }
+
+def test_store_answers_symbol_import_and_call_queries(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1, use_index_store=True)
+    store = get_index_store(str(tmp_path))
+
+    assert os.path.exists(str(tmp_path / ".ai_reference" / "index.db"))
+    assert store.file_count() == 5
+    assert [symbol["file"] for symbol in store.find_symbols("A", kind="class")] == ["pkg/a.py"]
+    assert store.find_symbols("A.run")[0]["kind"] == "method"
+    assert [row["file"] for row in store.find_importers("pkg.a")] == ["pkg/b.py"]
+    assert {row["caller"] for row in store.find_callers("run")} == {"use"}
+    assert "pkg/a.py" in store.search_files("helper")
+
+def test_like_wildcards_in_queries_are_literal(tmp_path):
+    write_file(tmp_path, "m.py", "def load_all():\n    pass\n\ndef loadXall():\n    pass\n")
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1, use_index_store=True)
+
+    names = [symbol["name"] for symbol in get_index_store(str(tmp_path)).search_symbols("load_")]
+    assert names == ["load_all"]
+
+def test_incremental_store_update_matches_full_rebuild(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1, use_index_store=True)
+    change_project(tmp_path)
+
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+    incremental = store_contents(tmp_path)
+    assert sorted(incremental) == ["pkg/__init__.py", "pkg/a.py", "pkg/b.py", "pkg/d.py", "pkg/new_name.py"]
+
+    initialize_enhanced_librarian(str(tmp_path), full_rebuild=True, max_workers=1)
+    assert incremental == store_contents(tmp_path)
+
+def test_export_writes_mini_librarians(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1, use_index_store=True)
+    ai_ref_path = str(tmp_path / ".ai_reference")
+
+    assert get_index_store(str(tmp_path)).export_json(ai_ref_path) == 5
+    assert len(os.listdir(os.path.join(ai_ref_path, "scripts"))) >= 5
@@ -0,0 +1,101 @@
+"""
+Tests for the per-project indexing lock and MonitoringPauser in server.py.
+"""
+
+import time
+import threading
+
+import pytest
+
+from conftest import wait_for_task
+from aitoolkit.librarian import server
+from aitoolkit.librarian.shared_state import get_project_lock
+
+class FakeIndexer:
+    """Stand-in for initialize_enhanced_librarian that records overlapping runs."""
+
+    def __init__(self, duration=0.2):
+        self.duration = duration
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = {}
+        self.max_total = 0
+        self.saw_project_lock = []
+
+    def __call__(self, project_path, full_rebuild=False, **kwargs):
+        self.saw_project_lock.append(get_project_lock(project_path).locked())
+        with self.lock:
+            self.active[project_path] = self.active.get(project_path, 0) + 1
+            self.max_active[project_path] = max(self.max_active.get(project_path, 0), self.active[project_path])
+            self.max_total = max(self.max_total, sum(self.active.values()))
+        time.sleep(self.duration)
+        with self.lock:
+            self.active[project_path] -= 1
+        return "Enhanced AI Librarian is up to date (0 files)", 0, 0
+
+@pytest.fixture
+def fake_indexer(monkeypatch):
+    indexer = FakeIndexer()
+    monkeypatch.setattr(server, "initialize_enhanced_librarian", indexer)
+    return indexer
+
+def run_in_threads(*calls):
+    threads = [threading.Thread(target=fn, args=args) for fn, *args in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+def test_updates_of_one_project_do_not_overlap(fake_indexer, tmp_path):
+    project = str(tmp_path)
+    run_in_threads(*[(server.update_librarian_for_project, project)] * 3)
+
+    assert fake_indexer.max_active[project] == 1
+    assert all(fake_indexer.saw_project_lock)
+
+def test_updates_of_different_projects_run_in_parallel(fake_indexer, tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    run_in_threads((server.update_librarian_for_project, str(first)), (server.update_librarian_for_project, str(second)))
+
+    assert fake_indexer.max_total == 2
+
+def test_reindex_task_takes_the_indexing_lock(fake_indexer, make_task_board):
+    board = make_task_board()
+    task_id = board.submit_task("reindex", {"full_rebuild": True})
+
+    assert wait_for_task(board, task_id) == "COMPLETED"
+    assert board.get_task_result(task_id).data["status"] == "success"
+    assert fake_indexer.saw_project_lock == [True]
+
+def test_failed_reindex_task_is_recorded_as_failed(monkeypatch, make_task_board):
+    def broken_indexer(project_path, full_rebuild=False, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(server, "initialize_enhanced_librarian", broken_indexer)
+    board = make_task_board()
+    task_id = board.submit_task("reindex", {"full_rebuild": True})
+
+    assert wait_for_task(board, task_id) == "FAILED"
+    assert "disk full" in board.get_task_result(task_id).error_message
+
+def test_pauser_waits_for_a_running_update():
+    started = threading.Event()
+
+    def monitor_update():
+        with server.monitor_update_lock:
+            started.set()
+            time.sleep(0.3)
+
+    monitor = threading.Thread(target=monitor_update)
+    monitor.start()
+    started.wait(5)
+    try:
+        begin = time.monotonic()
+        with server.MonitoringPauser(wait=False):
+            assert time.monotonic() - begin < 0.2
+        with server.MonitoringPauser():
+            assert time.monotonic() - begin >= 0.25
+    finally:
+        monitor.join()
+    assert not server.librarian_context["paused"]
@@ -0,0 +1,68 @@
+"""
+Tests for the parsed JSON cache (aitoolkit/librarian/json_cache.py).
+"""
+
+import os
+import json
+
+from aitoolkit.librarian.json_cache import ParsedJSONCache, load_json_dict
+
+def write_json(path, data, mtime=None):
+    path.write_text(json.dumps(data))
+    if mtime is not None:
+        os.utime(str(path), (mtime, mtime))
+
+def test_unchanged_file_returns_the_shared_object(tmp_path):
+    cache = ParsedJSONCache()
+    path = tmp_path / "registry.json"
+    write_json(path, {"components": {"A": {}}})
+
+    first = cache.load(str(path))
+    assert cache.load(str(path)) is first
+    assert cache.stats()["hits"] == 1 and cache.stats()["loads"] == 1
+
+def test_changed_file_is_parsed_again(tmp_path):
+    cache = ParsedJSONCache()
+    path = tmp_path / "registry.json"
+    write_json(path, {"version": 1}, mtime=1000)
+    cache.load(str(path))
+    generation = cache.get_generation(str(path))
+
+    # Same size, new mtime
+    write_json(path, {"version": 2}, mtime=2000)
+    assert cache.load(str(path)) == {"version": 2}
+    assert cache.get_generation(str(path)) > generation
+
+def test_missing_or_invalid_file_returns_default(tmp_path):
+    cache = ParsedJSONCache()
+    path = tmp_path / "index.json"
+    write_json(path, {"ok": True})
+    cache.load(str(path))
+
+    path.write_text("{not json")
+    assert cache.load(str(path), default={}) == {}
+    assert cache.stats()["entries"] == 0
+
+    os.remove(str(path))
+    assert cache.load(str(path)) is None
+    assert cache.get_generation(str(tmp_path / "never.json")) == 0
+
+def test_lru_bound_and_invalidate(tmp_path):
+    cache = ParsedJSONCache(max_entries=2)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"{i}.json"
+        write_json(path, {"i": i})
+        cache.load(str(path))
+        paths.append(str(path))
+    assert cache.stats()["entries"] == 2
+
+    cache.invalidate(paths[2])
+    assert cache.stats()["entries"] == 1
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
+
+def test_load_json_dict_accepts_only_objects(tmp_path):
+    path = tmp_path / "list.json"
+    write_json(path, [1, 2, 3])
+    assert load_json_dict(str(path)) is None
@@ -0,0 +1,65 @@
+"""
+Tests for fuzzy component-name lookup (aitoolkit/librarian/name_matcher.py)
+and query_component's suggestions for unknown names.
+"""
+
+from conftest import write_project
+from aitoolkit.librarian import server
+from aitoolkit.librarian.enhanced_indexer import initialize_enhanced_librarian
+from aitoolkit.librarian.name_matcher import NameMatcher, get_name_matcher, name_trigrams
+
+NAMES = ["TaskBoard", "TaskBoard.submit_task", "FileCache", "file_cache_stats", "ProjectSnapshots", "parse_file"]
+
+def suggested(matcher, query, **kwargs):
+    return [suggestion["name"] for suggestion in matcher.suggest(query, **kwargs)]
+
+def test_name_trigrams_are_padded_and_distinct():
+    assert name_trigrams("aaaa") == ["$aa", "aaa", "aa$"]
+
+def test_case_and_underscore_variants_score_one():
+    matcher = NameMatcher(NAMES)
+    suggestions = matcher.suggest("filecache")
+    assert suggestions[0] == {"name": "FileCache", "score": 1.0}
+
+def test_typo_and_missing_prefix_are_suggested():
+    matcher = NameMatcher(NAMES)
+    assert suggested(matcher, "TaskBaord")[0] == "TaskBoard"
+    assert suggested(matcher, "Snapshots")[0] == "ProjectSnapshots"
+    assert suggested(matcher, "submit_tsk")[0] == "TaskBoard.submit_task"
+
+def test_unrelated_query_gets_no_suggestions():
+    matcher = NameMatcher(NAMES)
+    assert matcher.suggest("zzqqxx") == []
+    assert matcher.suggest("") == []
+    assert len(suggested(matcher, "file", min_score=0.0, limit=2)) == 2
+
+def test_exact_name_is_not_suggested_to_itself():
+    matcher = NameMatcher(NAMES, {"FileCache": ["cache.py"]})
+    assert "FileCache" in matcher
+    assert "FileCache" not in suggested(matcher, "FileCache")
+    assert matcher.files_for("FileCache") == ["cache.py"]
+    assert matcher.files_for("Missing") == []
+
+def test_matcher_is_rebuilt_only_when_the_source_changes():
+    builds = []
+
+    def build():
+        builds.append(1)
+        return NameMatcher(NAMES)
+
+    source = object()
+    first = get_name_matcher("test#matcher", source, build, signature=1)
+    assert get_name_matcher("test#matcher", source, build, signature=1) is first
+    assert get_name_matcher("test#matcher", source, build, signature=2) is not first
+    get_name_matcher("test#matcher", object(), build, signature=2)
+    assert len(builds) == 3
+
+def test_query_component_miss_lists_suggestions(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+
+    result = server.query_component(str(tmp_path), "helpr")
+    assert result["status"] == "error"
+    assert not result["found"]
+    assert result["suggestions"][0]["name"] == "helper"
+    assert "Did you mean: helper" in result["message"]
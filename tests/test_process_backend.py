@@ -0,0 +1,146 @@
+"""
+Tests for the TaskBoard's process backend (aitoolkit/librarian/process_backend.py).
+
+The handlers below run in worker processes, so they live at module level
+in this importable module.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+import multiprocessing.spawn
+
+from conftest import REPO_ROOT, wait_for_task
+from aitoolkit.librarian.process_worker import worker_main
+
+SERVER_PATH = os.path.join(REPO_ROOT, "aitoolkit", "librarian", "server.py")
+
+# Runs server.py as the __main__ module, the way `python server.py` does,
+# without its `if __name__ == "__main__"` block (mcp.run() would wait for a
+# client), then runs a file_search task on the process backend
+SERVER_DRIVER = r'''
+import sys, json, time, types
+server_path, project = sys.argv[1], sys.argv[2]
+main = types.ModuleType("__server_main__")
+main.__file__ = server_path
+sys.modules["__main__"] = main
+# The project is an allowed directory, as when the server is launched for it
+sys.argv = [server_path, project]
+with open(server_path, encoding="utf-8") as f:
+    exec(compile(f.read(), server_path, "exec"), main.__dict__)
+
+from aitoolkit.librarian.task_board import get_task_board, submit_background_task
+board = get_task_board(project)
+board.set_task_backend("file_search", "process")
+response = submit_background_task(project, "file_search", {"query": "alpha"})
+task_id = response.split("ID: ", 1)[1].split()[0]
+deadline = time.time() + 60
+while time.time() < deadline and board.get_task_status(task_id)["status"].name in ("PENDING", "RUNNING"):
+    time.sleep(0.05)
+info = board.get_task_status(task_id)
+result = board.get_task_result(task_id)
+print("RESULT " + json.dumps({
+    "status": info["status"].name,
+    "error": info.get("error"),
+    "data": result.data if result else None
+}, default=str))
+'''
+
+def sleep_handler(params, token):
+    time.sleep(params["sleep"])
+    return {"status": "success", "pid": os.getpid()}
+
+def progress_handler(params, token):
+    token.progress.set_total(3)
+    for i in range(3):
+        token.progress.publish({"item": i})
+        token.progress.advance(1)
+    return {"status": "success"}
+
+def test_pool_starts_on_first_submit(make_task_board):
+    board = make_task_board(process_workers=1, backends={"sleep": "process"})
+    board._get_task_handler = lambda task_type: sleep_handler
+
+    # Building the board must not start processes: the server builds its
+    # boards while server.py is still being imported
+    assert not board._process_backend.started
+
+    task_id = board.submit_task("sleep", {"sleep": 0})
+    assert wait_for_task(board, task_id) == "COMPLETED"
+    assert board._process_backend.started
+    assert board.get_task_result(task_id).data["pid"] != os.getpid()
+
+def test_worker_main_only_changes_the_spawning_threads_preparation_data():
+    main = sys.modules["__main__"]
+    seen_by_other_thread = []
+
+    with worker_main():
+        data = multiprocessing.spawn.get_preparation_data("worker")
+        other = threading.Thread(
+            target=lambda: seen_by_other_thread.append(multiprocessing.spawn.get_preparation_data("other"))
+        )
+        other.start()
+        other.join()
+        # The parent's own __main__ is never swapped
+        assert sys.modules["__main__"] is main
+
+    assert data["init_main_from_name"] == "aitoolkit.librarian.process_worker"
+    assert seen_by_other_thread[0].get("init_main_from_name") != "aitoolkit.librarian.process_worker"
+
+def test_process_task_under_server_entry_point(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "a.py").write_text("def alpha():\n    return 1\n\ndef beta():\n    return alpha()\n")
+
+    completed = subprocess.run(
+        [sys.executable, "-c", SERVER_DRIVER, SERVER_PATH, str(project)],
+        cwd=str(tmp_path),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        universal_newlines=True,
+        timeout=120
+    )
+    assert "bootstrapping phase" not in completed.stdout
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("RESULT ")]
+    assert lines, completed.stdout[-4000:]
+
+    outcome = json.loads(lines[-1][len("RESULT "):])
+    assert outcome["status"] == "COMPLETED", outcome["error"]
+    assert outcome["data"]["total_matches"] == 2
+
+def test_cancel_kills_worker_and_resubmits_others(make_task_board):
+    board = make_task_board(process_workers=2, backends={"sleep": "process"})
+    board._get_task_handler = lambda task_type: sleep_handler
+
+    stuck = board.submit_task("sleep", {"sleep": 60})
+    other = board.submit_task("sleep", {"sleep": 1})
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline and len(board._process_backend._pids) < 2:
+        board._process_backend.poll()
+        time.sleep(0.05)
+
+    # Killing the stuck task's worker breaks the pool under the other task,
+    # which is submitted again to a new pool
+    assert board.cancel_task(stuck)
+    assert board.get_task_status(stuck)["status"].name == "CANCELLED"
+    assert wait_for_task(board, other) == "COMPLETED"
+    assert board._process_backend.stats()["restarts"] == 1
+
+    again = board.submit_task("sleep", {"sleep": 0})
+    assert wait_for_task(board, again) == "COMPLETED"
+
+def test_worker_progress_reaches_the_board(make_task_board):
+    board = make_task_board(process_workers=1, backends={"progress": "process"})
+    board._get_task_handler = lambda task_type: progress_handler
+
+    task_id = board.submit_task("progress", {})
+    assert wait_for_task(board, task_id) == "COMPLETED"
+
+    progress = board.get_task_status(task_id)["progress"]
+    assert (progress["done"], progress["total"]) == (3, 3)
+    chunks = board.read_task_chunks(task_id)["chunks"]
+    assert [chunk["data"]["item"] for chunk in chunks] == [0, 1, 2]
@@ -0,0 +1,84 @@
+"""
+Tests for change-set detection (check_project_changes in server.py and the
+manifest comparison in aitoolkit/librarian/enhanced_indexer.py).
+"""
+
+import os
+
+from conftest import write_file, write_project, change_project
+from aitoolkit.librarian import server
+from aitoolkit.librarian.enhanced_indexer import (
+    initialize_enhanced_librarian, load_manifest, changed_paths_for, detect_path_changes
+)
+
+def manifest_files(project):
+    return load_manifest(os.path.join(str(project), ".ai_reference"))["files"]
+
+def test_check_project_changes_without_manifest(tmp_path):
+    write_project(tmp_path)
+    assert server.check_project_changes(str(tmp_path)) is None
+
+def test_check_project_changes_returns_the_delta(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+
+    unchanged = server.check_project_changes(str(tmp_path))
+    assert not unchanged["has_changes"]
+    assert unchanged["added"] == unchanged["modified"] == unchanged["deleted"] == unchanged["renamed"] == []
+
+    change_project(tmp_path)
+    changes = server.check_project_changes(str(tmp_path))
+    assert changes["has_changes"]
+    assert changes["added"] == ["pkg/d.py"]
+    assert changes["modified"] == ["pkg/b.py"]
+    assert changes["deleted"] == ["pkg/c.py"]
+    assert changes["renamed"] == [{"from": "pkg/old_name.py", "to": "pkg/new_name.py"}]
+
+def test_touched_file_with_same_content_is_not_a_change(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+
+    path = str(tmp_path / "pkg/a.py")
+    stats = os.stat(path)
+    os.utime(path, (stats.st_atime, stats.st_mtime + 10))
+
+    assert not server.check_project_changes(str(tmp_path))["has_changes"]
+
+def test_changed_paths_for_lists_every_touched_path():
+    changes = {
+        "added": ["d.py"],
+        "modified": ["b.py"],
+        "deleted": ["c.py"],
+        "renamed": [{"from": "old.py", "to": "new.py"}]
+    }
+    assert changed_paths_for(changes) == ["b.py", "c.py", "d.py", "new.py", "old.py"]
+    assert changed_paths_for({}) == []
+
+def test_detect_path_changes_checks_only_given_paths(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+    files = manifest_files(tmp_path)
+    change_project(tmp_path)
+
+    # Only b.py is reported: the other changes are not looked at
+    changes, new_manifest = detect_path_changes(str(tmp_path), ["pkg/b.py"], files)
+    assert changes == {"added": [], "modified": ["pkg/b.py"], "deleted": [], "renamed": []}
+    assert "pkg/c.py" in new_manifest
+
+    # A directory covers every indexed file below it, including deleted ones
+    changes, new_manifest = detect_path_changes(str(tmp_path), ["pkg"], files)
+    assert changes["added"] == ["pkg/d.py"]
+    assert changes["modified"] == ["pkg/b.py"]
+    assert changes["deleted"] == ["pkg/c.py"]
+    assert changes["renamed"] == [{"from": "pkg/old_name.py", "to": "pkg/new_name.py"}]
+    assert "pkg/c.py" not in new_manifest
+
+def test_detect_path_changes_ignores_unindexed_paths(tmp_path):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+    files = manifest_files(tmp_path)
+    write_file(tmp_path, "notes.txt", "not code\n")
+    write_file(tmp_path, ".venv/lib/x.py", "x = 1\n")
+
+    changes, _ = detect_path_changes(str(tmp_path), ["notes.txt", ".venv/lib/x.py"], files)
+    assert not any(changes.values())
@@ -0,0 +1,106 @@
+"""
+Tests for ranged file reads (aitoolkit/librarian/ranged_reader.py).
+"""
+
+import os
+import stat
+
+import pytest
+
+from aitoolkit.librarian.ranged_reader import RangeError, get_line_offsets, read_range
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 11)), encoding="utf-8")
+    return str(path)
+
+def test_line_range(text_file):
+    result = read_range(text_file, start_line=3, end_line=4)
+    assert result["content"] == "line 3\nline 4\n"
+    assert (result["start_line"], result["end_line"], result["total_lines"]) == (3, 4, 10)
+
+def test_end_line_past_eof_is_clamped(text_file):
+    result = read_range(text_file, start_line=9, end_line=50)
+    assert result["content"] == "line 9\nline 10\n"
+    assert (result["start_line"], result["end_line"]) == (9, 10)
+
+def test_start_line_past_eof_is_an_error(text_file):
+    with pytest.raises(RangeError, match="past the end of the file"):
+        read_range(text_file, start_line=11)
+
+def test_line_offsets_ignore_trailing_newline(text_file):
+    offsets = get_line_offsets(text_file)
+    assert len(offsets) == 10
+    assert offsets[1] == len("line 1\n")
+
+def test_byte_ranges_keep_utf8_characters_whole(tmp_path):
+    path = tmp_path / "utf8.txt"
+    path.write_text("aé€b", encoding="utf-8")  # 1 + 2 + 3 + 1 bytes
+
+    # A limit that would cut "€" in half returns the characters before it
+    first = read_range(str(path), offset=0, limit=4)
+    assert first["content"] == "aé"
+    assert first["has_more"]
+
+    # An offset inside "é" moves forward to the next character
+    assert read_range(str(path), offset=2)["content"] == "€b"
+
+def test_byte_ranges_of_single_byte_encodings_are_not_aligned(tmp_path):
+    path = tmp_path / "cp1252.txt"
+    path.write_bytes("caf\u00e9 \u2013 na\u00efve".encode("cp1252"))
+
+    # Bytes 0x80-0xBF are whole characters in cp1252, not UTF-8 continuations
+    result = read_range(str(path), offset=5)
+    assert result["encoding"] == "cp1252"
+    assert result["content"] == "\u2013 na\u00efve"
+
+def test_utf16_ranges_skip_the_bom_and_keep_code_units_whole(tmp_path):
+    path = tmp_path / "utf16.txt"
+    text = "ab\U0001f600cd\n"  # The emoji is a surrogate pair
+    path.write_bytes(text.encode("utf-16"))
+
+    # Offsets inside the BOM or a code unit move forward; a limit never splits a pair
+    first = read_range(str(path), offset=1, limit=7)
+    assert (first["offset"], first["content"]) == (2, "ab")
+    assert read_range(str(path), offset=3)["content"] == "b\U0001f600cd\n"
+    assert read_range(str(path), offset=8)["content"] == "cd\n"
+
+    pages = [first["content"]]
+    result = first
+    while result["has_more"]:
+        result = read_range(str(path), cursor=result["next_cursor"])
+        pages.append(result["content"])
+    assert "".join(pages) == text
+
+def test_cursor_pages_through_the_file(text_file):
+    pages = []
+    result = read_range(text_file, limit=16)
+    pages.append(result["content"])
+    while result["has_more"]:
+        result = read_range(text_file, cursor=result["next_cursor"])
+        pages.append(result["content"])
+
+    with open(text_file, encoding="utf-8") as f:
+        assert "".join(pages) == f.read()
+    assert len(pages) > 1
+
+def test_cursor_stops_working_once_the_file_changes(text_file):
+    result = read_range(text_file, limit=16)
+    with open(text_file, "a", encoding="utf-8") as f:
+        f.write("line 11\n")
+    os.utime(text_file, ns=(0, 0))
+
+    with pytest.raises(RangeError, match="changed"):
+        read_range(text_file, cursor=result["next_cursor"])
+
+def test_line_tables_are_persisted_in_a_private_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"x" * 99 + b"\n" + b"y" * (1024 * 1024))
+
+    get_line_offsets(str(path))
+    index_dir = tmp_path / "cache" / "ai_librarian" / "line_index"
+    assert len(os.listdir(str(index_dir))) == 1
+    if hasattr(os, "getuid"):
+        assert stat.S_IMODE(os.stat(str(index_dir)).st_mode) == 0o700
@@ -0,0 +1,101 @@
+"""
+Tests for cursor-based result paging (aitoolkit/librarian/result_pages.py).
+"""
+
+import pytest
+
+from aitoolkit.librarian import result_pages
+from aitoolkit.librarian.result_pages import CursorError, ResultSnapshots, page_response
+
+QUERY = ("search_files", "/p", "*.py")
+
+def collect(snapshots, first):
+    """Follow next_cursor from a first page to the end."""
+    items, page = list(first["items"]), first
+    while page["next_cursor"]:
+        page = snapshots.next(page["next_cursor"], QUERY)
+        items.extend(page["items"])
+    return items
+
+def test_pages_cover_a_list_exactly_once():
+    snapshots = ResultSnapshots()
+    first = snapshots.open(QUERY, list(range(25)), limit=10, meta={"query": "*.py"})
+
+    assert first["total_count"] == 25
+    assert first["meta"] == {"query": "*.py"}
+    assert collect(snapshots, first) == list(range(25))
+    assert snapshots.stats()["pages_served"] == 3
+
+def test_lazy_source_is_advanced_only_as_far_as_requested():
+    produced = []
+
+    def source():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    snapshots = ResultSnapshots()
+    first = snapshots.open(QUERY, source(), limit=5)
+    assert first["items"] == [0, 1, 2, 3, 4]
+    assert first["total_count"] is None
+    # One item past the page tells whether there is a next page
+    assert len(produced) == 6
+
+    second = snapshots.next(first["next_cursor"], QUERY)
+    assert second["items"] == [5, 6, 7, 8, 9]
+    assert len(produced) == 11
+
+def test_single_page_result_keeps_no_snapshot():
+    snapshots = ResultSnapshots()
+    page = snapshots.open(QUERY, [1, 2], limit=10)
+    assert page["next_cursor"] is None and not page["has_more"]
+    assert snapshots.stats()["snapshots"] == 0
+
+def test_cursor_errors():
+    snapshots = ResultSnapshots()
+    first = snapshots.open(QUERY, list(range(20)), limit=5)
+
+    with pytest.raises(CursorError, match="different query"):
+        snapshots.next(first["next_cursor"], ("search_files", "/p", "*.md"))
+    with pytest.raises(CursorError, match="Invalid"):
+        snapshots.next("not-a-cursor", QUERY)
+    with pytest.raises(CursorError):
+        snapshots.open(QUERY, [], limit=0)
+
+def test_expired_snapshot_closes_its_source(monkeypatch):
+    closed = []
+
+    def source():
+        try:
+            yield from range(100)
+        finally:
+            closed.append(True)
+
+    clock = [1000.0]
+    monkeypatch.setattr(result_pages.time, "monotonic", lambda: clock[0])
+    snapshots = ResultSnapshots(ttl=60)
+    first = snapshots.open(QUERY, source(), limit=10)
+
+    clock[0] += 61
+    with pytest.raises(CursorError, match="expired"):
+        snapshots.next(first["next_cursor"], QUERY)
+    assert closed == [True]
+    assert snapshots.stats()["expired"] == 1
+
+def test_least_recently_used_snapshot_is_evicted():
+    snapshots = ResultSnapshots(max_snapshots=2)
+    pages = [snapshots.open(QUERY, list(range(20)), limit=5) for _ in range(3)]
+
+    with pytest.raises(CursorError, match="expired"):
+        snapshots.next(pages[0]["next_cursor"], QUERY)
+    assert snapshots.next(pages[2]["next_cursor"], QUERY)["items"] == [5, 6, 7, 8, 9]
+
+def test_page_response_message():
+    snapshots = ResultSnapshots()
+    response = page_response(snapshots.open(QUERY, list(range(12)), limit=5), "matches", "matching files")
+    assert response["matches"] == [0, 1, 2, 3, 4]
+    assert response["truncated"]
+    assert response["message"] == "Returned matching files 1-5 of 12; pass next_cursor to get the next page"
+
+    empty = page_response(snapshots.open(QUERY, [], limit=5), "matches", "matching files")
+    assert empty["message"] == "No matching files found"
@@ -0,0 +1,88 @@
+"""
+Tests for BM25-ranked code search (aitoolkit/librarian/search_index.py).
+"""
+
+import os
+
+import pytest
+
+from conftest import write_file, write_project
+from aitoolkit.librarian import search_index
+from aitoolkit.librarian.enhanced_indexer import initialize_enhanced_librarian
+from aitoolkit.librarian.search_index import SearchIndex, load_search_index, search_entry, tokenize
+
+def entry(rel_path, symbols=(), docstring="", functions=None):
+    """Search entry of a file with the given symbol names and module docstring."""
+    info = {
+        "symbols": [{"name": name, "qualified_name": name, "kind": "function", "start_line": i + 1}
+                    for i, name in enumerate(symbols)],
+        "functions": functions or {},
+        "classes": {}
+    }
+    if docstring:
+        info["functions"]["_doc"] = {"docstring": docstring, "parameters": []}
+    return search_entry(rel_path, info)
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("parseHTTPResponse") == ["parsehttpresponse", "parse", "http", "response"]
+    assert tokenize("load_config_file") == ["load_config_file", "load", "config", "file"]
+    assert tokenize("Return the value of x") == ["value"]
+
+def test_symbol_match_outranks_docstring_match():
+    index = SearchIndex({
+        "docs.py": entry("docs.py", symbols=["render"], docstring="Evict stale cache entries."),
+        "cache.py": entry("cache.py", symbols=["evict_entries"])
+    })
+    results = index.search("evict")
+    assert [result["file"] for result in results] == ["cache.py", "docs.py"]
+    assert results[0]["symbols"] == [{"name": "evict_entries", "kind": "function", "line": 1}]
+
+def test_rare_term_outweighs_common_term():
+    files = {f"mod{i}.py": entry(f"mod{i}.py", symbols=["handler"]) for i in range(8)}
+    files["special.py"] = entry("special.py", symbols=["tokenizer"])
+    files["both.py"] = entry("both.py", symbols=["handler", "tokenizer"])
+    index = SearchIndex(files)
+
+    ranked = [result["file"] for result in index.search("handler tokenizer", top_k=3)]
+    assert ranked[0] == "both.py"
+    assert ranked[1] == "special.py"
+
+def test_top_k_and_unknown_terms():
+    index = SearchIndex({f"m{i}.py": entry(f"m{i}.py", symbols=["widget"]) for i in range(20)})
+    assert len(index.search("widget", top_k=5)) == 5
+    assert index.search("nonexistent") == []
+    assert index.search("widget", top_k=0) == []
+
+def test_update_and_remove_files():
+    index = SearchIndex({"a.py": entry("a.py", symbols=["alpha"])})
+    index.update_files({"b.py": entry("b.py", symbols=["alpha", "beta"])})
+    assert {result["file"] for result in index.search("alpha")} == {"a.py", "b.py"}
+
+    index.remove_files(["a.py"])
+    assert [result["file"] for result in index.search("alpha")] == ["b.py"]
+    assert len(index) == 1
+
+def test_numpy_and_pure_python_scores_agree(monkeypatch):
+    pytest.importorskip("numpy")
+    files = {
+        "a.py": entry("a.py", symbols=["parse_config", "load"], docstring="Parse the configuration."),
+        "b.py": entry("b.py", symbols=["config_loader"]),
+        "c.py": entry("c.py", symbols=["render_page"], docstring="Render a config page.")
+    }
+    vectorized = SearchIndex(files).search("parse config")
+    monkeypatch.setattr(search_index, "NUMPY_AVAILABLE", False)
+    looped = SearchIndex(files).search("parse config")
+
+    assert [r["file"] for r in vectorized] == [r["file"] for r in looped]
+    assert [r["score"] for r in vectorized] == pytest.approx([r["score"] for r in looped], rel=1e-4)
+
+def test_indexer_writes_a_searchable_index(tmp_path):
+    write_project(tmp_path)
+    write_file(tmp_path, "pkg/http_client.py",
+               "def fetch_response(url):\n    \"\"\"Fetch an HTTP response.\"\"\"\n    return url\n")
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+
+    index = load_search_index(os.path.join(str(tmp_path), ".ai_reference"))
+    results = index.search("http response")
+    assert results[0]["file"] == "pkg/http_client.py"
+    assert results[0]["symbols"][0]["name"] == "fetch_response"
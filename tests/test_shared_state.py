@@ -0,0 +1,85 @@
+"""
+Tests for the server's shared-state building blocks (aitoolkit/librarian/shared_state.py).
+"""
+
+import threading
+import dataclasses
+
+import pytest
+
+from aitoolkit.librarian.shared_state import InstrumentedLock, ProjectSnapshots, get_lock_stats
+
+def test_lock_records_contention():
+    lock = InstrumentedLock("test:contention", register=False)
+    holding = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with lock:
+            holding.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    holding.wait(5)
+    assert not lock.acquire(blocking=False)
+
+    threading.Timer(0.05, release.set).start()
+    with lock:
+        pass
+    thread.join()
+
+    stats = lock.stats()
+    assert stats["acquisitions"] == 2
+    assert stats["contended"] == 1
+    assert stats["contention_ratio"] == 0.5
+    assert stats["max_wait_ms"] > 0
+
+def test_registered_locks_are_reported():
+    lock = InstrumentedLock("test:registered")
+    with lock:
+        pass
+    private = InstrumentedLock("test:private", register=False)
+
+    stats = get_lock_stats()
+    assert stats["test:registered"]["acquisitions"] == 1
+    assert "test:private" not in stats
+    del lock, private
+
+def test_publish_carries_over_unchanged_fields():
+    snapshots = ProjectSnapshots("test_snapshots")
+    first = snapshots.publish("/p", script_index={"files": 1}, indexed_files={"/p/a.py": 1.0})
+    second = snapshots.publish("/p", component_registry={"components": {}})
+
+    assert second.generation > first.generation
+    assert second.script_index == {"files": 1}
+    assert second.component_registry == {"components": {}}
+    assert dict(second.indexed_files) == {"/p/a.py": 1.0}
+    assert snapshots.get("/p") is second
+
+    # The earlier snapshot is left as it was for readers still holding it
+    assert first.component_registry is None
+
+def test_snapshots_are_read_only():
+    snapshots = ProjectSnapshots("test_snapshots_read_only")
+    files = {"/p/a.py": 1.0}
+    snapshot = snapshots.publish("/p", indexed_files=files)
+    files["/p/b.py"] = 2.0
+
+    assert dict(snapshot.indexed_files) == {"/p/a.py": 1.0}
+    with pytest.raises(TypeError):
+        snapshot.indexed_files["/p/c.py"] = 3.0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.generation = 0
+
+def test_table_is_swapped_not_mutated():
+    snapshots = ProjectSnapshots("test_snapshots_swap")
+    snapshots.publish("/p")
+    table = snapshots.all()
+
+    snapshots.publish("/q")
+    snapshots.remove("/p")
+
+    assert set(table) == {"/p"}
+    assert set(snapshots.all()) == {"/q"}
+    assert snapshots.get("/p") is None
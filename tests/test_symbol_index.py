@@ -0,0 +1,56 @@
+"""
+Tests for the symbol location index (aitoolkit/librarian/symbol_index.py)
+and query_component's use of it.
+"""
+
+from conftest import write_project
+from aitoolkit.librarian import server
+from aitoolkit.librarian.enhanced_indexer import initialize_enhanced_librarian
+from aitoolkit.librarian.symbol_index import SymbolIndex, load_symbol_index, save_symbol_index
+
+def symbol(name, qualified_name, kind, start_line, end_line, parent=None):
+    return {"name": name, "qualified_name": qualified_name, "kind": kind,
+            "start_line": start_line, "end_line": end_line, "parent": parent}
+
+def sample_index():
+    return SymbolIndex({
+        "a.py": [symbol("Board", "Board", "class", 1, 9), symbol("submit", "Board.submit", "method", 3, 5, "Board")],
+        "b.py": [symbol("submit", "submit", "function", 1, 2)]
+    })
+
+def test_lookup_by_simple_and_qualified_name():
+    index = sample_index()
+    assert [entry["file"] for entry in index.lookup("submit")] == ["a.py", "b.py"]
+    assert [entry["file"] for entry in index.lookup("submit", kind="function")] == ["b.py"]
+    assert index.lookup("Board.submit")[0]["start_line"] == 3
+    assert index.lookup("missing") == []
+
+def test_update_and_remove_files():
+    index = sample_index()
+    index.update_files({"b.py": [symbol("other", "other", "function", 1, 2)]})
+    assert [entry["file"] for entry in index.lookup("submit")] == ["a.py"]
+
+    index.remove_files(["a.py"])
+    assert index.lookup("Board") == []
+    assert len(index) == 1
+
+def test_saved_index_loads_back(tmp_path):
+    save_symbol_index(str(tmp_path), sample_index())
+    loaded = load_symbol_index(str(tmp_path))
+    assert loaded.files == sample_index().files
+
+    save_symbol_index(str(tmp_path), SymbolIndex())
+    assert len(load_symbol_index(str(tmp_path))) == 0
+
+def test_query_component_reads_lines_without_parsing(tmp_path, monkeypatch):
+    write_project(tmp_path)
+    initialize_enhanced_librarian(str(tmp_path), max_workers=1)
+
+    def no_parsing(*args, **kwargs):
+        raise AssertionError("query_component parsed a source file")
+    monkeypatch.setattr(server.ast, "parse", no_parsing)
+
+    result = server.query_component(str(tmp_path), "A.run")
+    assert result["source"] == "symbol_index"
+    assert result["results"][0]["file_path"] == "pkg/a.py"
+    assert result["results"][0]["code"].strip().startswith("def run(self):")
@@ -0,0 +1,146 @@
+"""
+Tests for cooperative cancellation (aitoolkit/librarian/task_cancellation.py)
+and the TaskBoard's bounded handler executor.
+"""
+
+import sys
+import time
+import threading
+import subprocess
+
+import pytest
+
+from conftest import wait_for_task
+from aitoolkit.librarian.task_board import TaskPriority
+from aitoolkit.librarian.task_cancellation import CancellationToken, TaskCancelled
+
+class Handlers:
+    """Handlers recording how many run at once and which ones started."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.started = []
+
+    def __call__(self, params, token):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.started.append(params.get("name"))
+        try:
+            if params.get("ignore_checkpoints"):
+                time.sleep(params["sleep"])
+            else:
+                token.sleep(params.get("sleep", 0))
+            return {"status": "success"}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+@pytest.fixture
+def handlers():
+    return Handlers()
+
+def make_board(make_task_board, handlers, **kwargs):
+    board = make_task_board(**kwargs)
+    board._get_task_handler = lambda task_type: handlers
+    return board
+
+def test_token_check_and_reason():
+    token = CancellationToken()
+    token.check()
+    assert token.cancel("cancelled")
+    assert not token.cancel("again")
+    with pytest.raises(TaskCancelled) as raised:
+        token.check()
+    assert raised.value.reason == "cancelled"
+
+def test_token_deadline():
+    token = CancellationToken(timeout=0.05)
+    assert 0 < token.remaining() <= 0.05
+    start = time.monotonic()
+    with pytest.raises(TaskCancelled, match="timed out"):
+        token.sleep(10)
+    assert time.monotonic() - start < 1
+    assert token.expired and token.cancelled
+
+def test_sleep_wakes_up_on_cancel():
+    token = CancellationToken()
+    threading.Timer(0.05, token.cancel).start()
+    start = time.monotonic()
+    with pytest.raises(TaskCancelled):
+        token.sleep(10)
+    assert time.monotonic() - start < 1
+
+def test_on_cancel_callbacks():
+    token = CancellationToken()
+    calls = []
+    token.on_cancel(lambda: calls.append("registered"))
+    token.cancel()
+    token.on_cancel(lambda: calls.append("late"))
+    assert calls == ["registered", "late"]
+
+def test_attached_process_is_terminated():
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    token = CancellationToken()
+    token.attach_process(process)
+    token.cancel()
+    assert process.wait(timeout=10) is not None
+
+def test_handlers_never_exceed_max_workers(make_task_board, handlers):
+    board = make_board(make_task_board, handlers, max_workers=2)
+    task_ids = [board.submit_task("work", {"sleep": 0.1}) for _ in range(6)]
+    for task_id in task_ids:
+        assert wait_for_task(board, task_id) == "COMPLETED"
+    assert handlers.max_active == 2
+
+def test_higher_priority_task_starts_first(make_task_board, handlers):
+    board = make_board(make_task_board, handlers, max_workers=1)
+    blocker = board.submit_task("work", {"name": "blocker", "sleep": 0.3})
+    time.sleep(0.1)
+    low = board.submit_task("work", {"name": "low"}, priority=TaskPriority.LOW)
+    high = board.submit_task("work", {"name": "high"}, priority=TaskPriority.HIGH)
+    for task_id in (blocker, low, high):
+        wait_for_task(board, task_id)
+    assert handlers.started == ["blocker", "high", "low"]
+
+def test_cancel_pending_and_running_tasks(make_task_board, handlers):
+    board = make_board(make_task_board, handlers, max_workers=1)
+    running = board.submit_task("work", {"name": "running", "sleep": 30})
+    pending = board.submit_task("work", {"name": "pending"})
+    time.sleep(0.2)
+
+    assert board.cancel_task(pending)
+    assert board.cancel_task(running)
+    assert board.get_task_status(running)["status"].name == "CANCELLED"
+
+    # The running handler stops at its checkpoint and frees its slot; the
+    # cancelled pending task never starts
+    after = board.submit_task("work", {"name": "after"})
+    assert wait_for_task(board, after, timeout=5) == "COMPLETED"
+    assert handlers.started == ["running", "after"]
+    assert not board.cancel_task(after)
+
+def test_timeout_frees_the_slot_at_the_next_checkpoint(make_task_board, handlers):
+    board = make_board(make_task_board, handlers, max_workers=1)
+    slow = board.submit_task("work", {"sleep": 30}, timeout=1)
+    assert wait_for_task(board, slow, timeout=10) == "TIMEOUT"
+    assert "timed out" in board.get_task_status(slow)["error"]
+
+    after = board.submit_task("work", {})
+    assert wait_for_task(board, after, timeout=5) == "COMPLETED"
+
+def test_handler_ignoring_checkpoints_keeps_its_slot(make_task_board, handlers):
+    board = make_board(make_task_board, handlers, max_workers=1)
+    stubborn = board.submit_task("work", {"sleep": 2, "ignore_checkpoints": True}, timeout=1)
+    assert wait_for_task(board, stubborn, timeout=10) == "TIMEOUT"
+
+    # The timed-out handler is still running, so the next task waits for it
+    after = board.submit_task("work", {})
+    time.sleep(0.3)
+    assert board.get_task_status(after)["status"].name == "PENDING"
+    assert wait_for_task(board, after, timeout=10) == "COMPLETED"
+    assert handlers.max_active == 1
+    # Its late return does not overwrite the timeout
+    assert board.get_task_status(stubborn)["status"].name == "TIMEOUT"
@@ -0,0 +1,122 @@
+"""
+Tests for the index-backed TaskBoard handlers (aitoolkit/librarian/task_handlers.py)
+and how the board fans out their chunks.
+"""
+
+import os
+import stat
+import threading
+
+from conftest import wait_for_task
+from aitoolkit.librarian.task_board import (
+    DEFAULT_TASK_BACKENDS, set_allowed_directories, submit_background_task
+)
+from aitoolkit.librarian.task_cancellation import CancellationToken
+from aitoolkit.librarian.task_handlers import MapReduceHandler, TASK_HANDLERS, get_task_handler
+from aitoolkit.librarian.trigram_index import update_trigram_index
+
+def run_handler(project, task_type, params):
+    return get_task_handler(str(project), task_type)(params, CancellationToken())
+
+def test_parsing_task_types_default_to_processes():
+    backends = {task_type: DEFAULT_TASK_BACKENDS.get(task_type, "thread") for task_type in TASK_HANDLERS}
+    assert backends == {
+        "component_analysis": "process",
+        "diagnostics": "process",
+        "file_search": "thread",
+        "find_usages": "thread",
+        "code_modification": "thread"
+    }
+
+def test_diagnostics_chunks_run_on_worker_processes(make_task_board, tmp_path):
+    (tmp_path / "a.py").write_text("def f():\n    try:\n        pass\n    except:\n        pass\n")
+    board = make_task_board(process_workers=1)
+    assert board.backend_for("diagnostics") == "process"
+
+    task_id = board.submit_task("diagnostics", {"checks": ["bare_except"]})
+    assert wait_for_task(board, task_id) == "COMPLETED", board.get_task_result(task_id).error_message
+    assert board._process_backend.started
+    assert board.get_task_result(task_id).data["issues"][0]["check"] == "bare_except"
+
+def test_chunks_run_in_parallel_with_one_handler_thread(make_task_board):
+    board = make_task_board(max_workers=1, chunk_workers=2)
+    # Both chunks must be running at once to get past the barrier
+    barrier = threading.Barrier(2, timeout=10)
+
+    def map_chunk(project_path, params, chunk, token):
+        barrier.wait()
+        return chunk
+
+    handler = MapReduceHandler(
+        board.project_path,
+        split=lambda project_path, params, token: [1, 2],
+        map_chunk=map_chunk,
+        reduce=lambda project_path, params, partials: sum(partials)
+    )
+    board._get_task_handler = lambda task_type: handler
+
+    task_id = board.submit_task("parallel", {})
+    assert wait_for_task(board, task_id) == "COMPLETED", board.get_task_result(task_id).error_message
+    assert board.get_task_result(task_id).data == 3
+
+def test_file_search_on_the_board(make_task_board, tmp_path):
+    (tmp_path / "a.py").write_text("needle = 1\n")
+    (tmp_path / "b.py").write_text("haystack = 2\nprint(needle)\n")
+    board = make_task_board()
+
+    task_id = board.submit_task("file_search", {"query": "needle"})
+    assert wait_for_task(board, task_id) == "COMPLETED"
+    result = board.get_task_result(task_id).data
+    assert result["total_matches"] == 2
+
+def test_code_modification_keeps_file_mode(tmp_path):
+    script = tmp_path / "tool.py"
+    script.write_text("#!/usr/bin/env python3\nprint('old')\n")
+    os.chmod(str(script), 0o755)
+
+    result = run_handler(tmp_path, "code_modification", {"search": "old", "replace": "new", "apply": True})
+
+    assert result["files_changed"] == 1
+    assert script.read_text() == "#!/usr/bin/env python3\nprint('new')\n"
+    assert stat.S_IMODE(os.stat(str(script)).st_mode) == 0o755
+
+def test_code_modification_sees_files_changed_after_indexing(tmp_path):
+    (tmp_path / "a.py").write_text("value = 1\n")
+    (tmp_path / "b.py").write_text("value = 2\n")
+    update_trigram_index(str(tmp_path))
+
+    # Edited and added after the trigram index was built
+    (tmp_path / "b.py").write_text("value = 2\nlegacy_call()\n")
+    (tmp_path / "c.py").write_text("legacy_call()\n")
+
+    result = run_handler(tmp_path, "code_modification", {"search": "legacy_call", "replace": "modern_call", "apply": True})
+
+    assert sorted(entry["file"] for entry in result["files"]) == ["b.py", "c.py"]
+    assert "modern_call()" in (tmp_path / "c.py").read_text()
+
+def test_code_modification_does_not_write_through_links_out_of_the_project(tmp_path):
+    project, outside = tmp_path / "project", tmp_path / "outside"
+    project.mkdir()
+    outside.mkdir()
+    target = outside / "target.py"
+    target.write_text("secret = 'old'\n")
+    os.symlink(str(target), str(project / "link.py"))
+
+    result = run_handler(project, "code_modification", {"search": "old", "replace": "new", "apply": True})
+
+    assert target.read_text() == "secret = 'old'\n"
+    assert result["failed_files"] == ["link.py"]
+
+def test_submitting_outside_the_allowed_directories_is_rejected(tmp_path):
+    allowed, outside = tmp_path / "allowed", tmp_path / "allowed-not"
+    allowed.mkdir()
+    outside.mkdir()
+    set_allowed_directories([str(allowed)])
+    try:
+        response = submit_background_task(str(outside), "code_modification",
+                                          {"search": "a", "replace": "b", "apply": True})
+    finally:
+        set_allowed_directories(None)
+
+    assert response.startswith("Error: Access denied")
+    assert not (outside / ".ai_reference").exists()
@@ -0,0 +1,101 @@
+"""
+Tests for TaskBoard persistence (aitoolkit/librarian/task_journal.py).
+"""
+
+import os
+import json
+
+import pytest
+
+from conftest import wait_for_task
+from aitoolkit.librarian.task_journal import JOURNAL_FILENAME, SNAPSHOT_FILENAME, TaskJournal
+
+def open_journal(directory, **kwargs):
+    kwargs.setdefault("sync", False)
+    journal = TaskJournal(str(directory), **kwargs)
+    return journal, journal.load()
+
+def test_replay_after_crash_without_snapshot(tmp_path):
+    journal, state = open_journal(tmp_path)
+    assert state == {}
+    journal.put({"id": "t1", "status": "PENDING"})
+    journal.put({"id": "t2", "status": "PENDING"})
+    journal.put({"id": "t1", "status": "COMPLETED"})
+    journal.delete("t2")
+    assert journal.flush(timeout=5)
+
+    # Reopened without close(): only the journal holds the records
+    assert not os.path.exists(str(tmp_path / SNAPSHOT_FILENAME))
+    _, state = open_journal(tmp_path)
+    assert state == {"t1": {"id": "t1", "status": "COMPLETED"}}
+
+def test_torn_last_line_is_ignored(tmp_path):
+    journal, _ = open_journal(tmp_path)
+    journal.put({"id": "t1", "status": "RUNNING"})
+    journal.flush(timeout=5)
+    with open(str(tmp_path / JOURNAL_FILENAME), "a", encoding="utf-8") as f:
+        f.write('{"op":"put","task":{"id":"t1","sta')
+
+    journal, state = open_journal(tmp_path)
+    assert state == {"t1": {"id": "t1", "status": "RUNNING"}}
+
+    # Records of the next session are not appended to the torn fragment
+    journal.put({"id": "t2", "status": "PENDING"})
+    journal.put({"id": "t3", "status": "PENDING"})
+    journal.flush(timeout=5)
+    _, state = open_journal(tmp_path)
+    assert sorted(state) == ["t1", "t2", "t3"]
+
+def test_compaction_writes_snapshot_and_empties_journal(tmp_path):
+    journal, _ = open_journal(tmp_path, compact_every=5)
+    for i in range(5):
+        journal.put({"id": f"t{i}", "status": "COMPLETED"})
+    journal.flush(timeout=5)
+
+    assert journal.stats()["snapshots"] == 1
+    assert os.path.getsize(str(tmp_path / JOURNAL_FILENAME)) == 0
+    with open(str(tmp_path / SNAPSHOT_FILENAME), encoding="utf-8") as f:
+        assert len(json.load(f)["tasks"]) == 5
+
+    # Records after the snapshot are replayed on top of it
+    journal.put({"id": "t0", "status": "FAILED"})
+    journal.flush(timeout=5)
+    _, state = open_journal(tmp_path)
+    assert len(state) == 5
+    assert state["t0"]["status"] == "FAILED"
+
+def test_close_compacts_and_rejects_new_records(tmp_path):
+    journal, _ = open_journal(tmp_path)
+    journal.put({"id": "t1", "status": "COMPLETED"})
+    journal.close()
+
+    assert os.path.getsize(str(tmp_path / JOURNAL_FILENAME)) == 0
+    _, state = open_journal(tmp_path)
+    assert state == {"t1": {"id": "t1", "status": "COMPLETED"}}
+    with pytest.raises(RuntimeError):
+        journal.put({"id": "t2"})
+
+def test_records_are_written_in_batches(tmp_path):
+    journal, _ = open_journal(tmp_path)
+    # Queue every record before the writer can take any of them
+    with journal._cond:
+        for i in range(200):
+            journal.put({"id": f"t{i % 10}", "n": i})
+    journal.flush(timeout=5)
+
+    stats = journal.stats()
+    assert stats["records_written"] == 200
+    assert stats["records_pending"] == 0
+    assert stats["batches"] == 1
+    assert stats["tasks"] == 10
+
+def test_board_restores_tasks_from_the_journal(make_task_board):
+    board = make_task_board()
+    board._get_task_handler = lambda task_type: lambda params, token: {"status": "success", "echo": params["x"]}
+    task_id = board.submit_task("echo", {"x": 42})
+    assert wait_for_task(board, task_id) == "COMPLETED"
+    board.shutdown()
+
+    restored = make_task_board()
+    assert restored.get_task_status(task_id)["status"].name == "COMPLETED"
+    assert restored.get_task_result(task_id).data == {"status": "success", "echo": 42}
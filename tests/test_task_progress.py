@@ -0,0 +1,127 @@
+"""
+Tests for task progress and partial results (aitoolkit/librarian/task_progress.py)
+and the watch_task tool built on them.
+"""
+
+import time
+import asyncio
+
+import pytest
+
+from conftest import wait_for_task
+from aitoolkit.librarian import task_board as task_board_module
+from aitoolkit.librarian.result_pages import CursorError
+from aitoolkit.librarian.task_progress import TaskProgress, encode_chunk_cursor
+
+class RecordingContext:
+    """Stand-in for the MCP request context."""
+
+    def __init__(self):
+        self.progress = []
+        self.messages = []
+
+    async def report_progress(self, done, total=None):
+        self.progress.append((done, total))
+
+    async def info(self, message):
+        self.messages.append(message)
+
+def publishing_handler(params, token):
+    token.progress.set_total(params["count"])
+    for i in range(params["count"]):
+        time.sleep(0.02)
+        token.progress.publish({"item": i})
+        token.progress.advance(1)
+    return {"status": "success"}
+
+def test_chunks_are_read_with_a_cursor():
+    progress = TaskProgress("task-1")
+    for i in range(5):
+        progress.publish(i)
+
+    first = progress.read(limit=3)
+    assert [chunk["data"] for chunk in first["chunks"]] == [0, 1, 2]
+    assert first["has_more"]
+
+    second = progress.read(first["next_cursor"], limit=3)
+    assert [chunk["data"] for chunk in second["chunks"]] == [3, 4]
+    assert not second["has_more"] and second["dropped"] == 0
+
+    progress.publish(5)
+    assert [chunk["data"] for chunk in progress.read(second["next_cursor"])["chunks"]] == [5]
+
+def test_slow_reader_learns_how_many_chunks_were_dropped():
+    progress = TaskProgress("task-1", max_chunks=3)
+    cursor = progress.read()["next_cursor"]
+    for i in range(5):
+        progress.publish(i)
+
+    page = progress.read(cursor)
+    assert page["dropped"] == 2
+    assert [chunk["data"] for chunk in page["chunks"]] == [2, 3, 4]
+
+def test_cursor_of_another_task_is_rejected():
+    progress = TaskProgress("task-1")
+    with pytest.raises(CursorError):
+        progress.read(encode_chunk_cursor("task-2", 0))
+    with pytest.raises(CursorError):
+        progress.read("not a cursor")
+
+def test_snapshot_reports_percent_and_eta():
+    progress = TaskProgress("task-1")
+    progress.update(5, 10)
+    snapshot = progress.snapshot()
+    assert (snapshot["done"], snapshot["total"], snapshot["percent"]) == (5, 10, 50.0)
+    assert snapshot["eta_seconds"] is not None
+
+    progress.close("COMPLETED")
+    assert progress.snapshot()["eta_seconds"] is None
+
+def test_only_recently_finished_tasks_keep_their_chunks(make_task_board, monkeypatch):
+    monkeypatch.setattr(task_board_module, "FINISHED_CHUNK_BUFFERS", 1)
+    board = make_task_board()
+    board._get_task_handler = lambda task_type: publishing_handler
+
+    first = board.submit_task("publish", {"count": 2})
+    assert wait_for_task(board, first) == "COMPLETED"
+    second = board.submit_task("publish", {"count": 2})
+    assert wait_for_task(board, second) == "COMPLETED"
+
+    # The older task's buffer is freed; readers learn its chunks were dropped
+    page = board.read_task_chunks(first, encode_chunk_cursor(first, 0))
+    assert (page["chunks"], page["dropped"]) == ([], 2)
+    assert board.get_task_status(first)["progress"]["done"] == 2
+    assert len(board.read_task_chunks(second)["chunks"]) == 2
+
+def test_watch_task_streams_chunks_in_order(make_task_board, monkeypatch):
+    board = make_task_board()
+    board._get_task_handler = lambda task_type: publishing_handler
+    monkeypatch.setitem(task_board_module._task_boards, board.project_path, board)
+
+    task_id = board.submit_task("publish", {"count": 8})
+    ctx = RecordingContext()
+    response = asyncio.run(task_board_module.watch_task_mcp(board.project_path, task_id, ctx, timeout=30))
+
+    assert wait_for_task(board, task_id) == "COMPLETED"
+    seqs = [int(message.split("[Chunk ", 1)[1].split("]", 1)[0]) for message in ctx.messages]
+    assert seqs == list(range(8))
+    assert ctx.progress[-1] == (8, 8)
+    assert "Streamed 8 partial results" in response
+
+def test_watch_task_without_context_returns_unsent_chunks(make_task_board, monkeypatch):
+    board = make_task_board()
+    board._get_task_handler = lambda task_type: publishing_handler
+    monkeypatch.setitem(task_board_module._task_boards, board.project_path, board)
+
+    task_id = board.submit_task("publish", {"count": 3})
+    assert wait_for_task(board, task_id) == "COMPLETED"
+    response = asyncio.run(task_board_module.watch_task_mcp(board.project_path, task_id, None, timeout=5))
+
+    assert [line for line in response.splitlines() if line.startswith("[Chunk")] == [
+        "[Chunk 0]", "[Chunk 1]", "[Chunk 2]"
+    ]
+    cursor = response.rsplit("Cursor: ", 1)[1].strip()
+
+    # Watching again from the cursor streams nothing new
+    again = asyncio.run(task_board_module.watch_task_mcp(board.project_path, task_id, None, timeout=5, cursor=cursor))
+    assert "[Chunk" not in again
@@ -0,0 +1,84 @@
+"""
+Tests for the trigram index (aitoolkit/librarian/trigram_index.py).
+"""
+
+import os
+import re
+
+import pytest
+
+from conftest import write_file
+from aitoolkit.librarian.trigram_index import (
+    TrigramIndex, extract_trigrams, regex_trigrams, update_trigram_index, load_trigram_index,
+    TRIGRAM_INDEX_FILENAME
+)
+
+@pytest.mark.parametrize("pattern, trigrams", [
+    ("foo(bar|baz)qux", {"foo", "qux"}),         # Alternatives require nothing
+    ("(abc)+def", {"abc", "def"}),               # A group repeated at least once is required
+    ("(foo)?barbaz", {"bar", "arb", "rba", "baz"}),  # An optional group is not
+    ("ab?cde", {"cde"}),                         # An optional character splits the run
+    ("[abc]def", {"def"}),
+    ("^class\\s+Task", {"cla", "las", "ass", "tas", "ask"}),
+    ("Foo\\.Bar", {"foo", "oo.", "o.b", ".ba", "bar"}),
+])
+def test_regex_trigrams_are_required_by_every_match(pattern, trigrams):
+    assert regex_trigrams(pattern) == trigrams
+
+@pytest.mark.parametrize("pattern", ["a|b", "foo|barbaz", ".*", "ab", "[unclosed"])
+def test_regex_without_required_literals_matches_every_file(pattern):
+    assert regex_trigrams(pattern) is None
+
+def test_candidates_are_case_insensitive_supersets():
+    index = TrigramIndex()
+    contents = {
+        "a.py": "class TaskBoard:\n    pass\n",
+        "b.py": "board = make_board()\n",
+        "c.py": "def submit_task():\n    pass\n",
+    }
+    for rel_path, content in contents.items():
+        index.add_file(rel_path, content, 0.0, len(content))
+
+    assert index.literal_candidates("taskboard") == ["a.py"]
+    assert index.literal_candidates("board") == ["a.py", "b.py"]
+    assert index.literal_candidates("ab") == ["a.py", "b.py", "c.py"]
+    pattern = "submit_\\w+\\("
+    assert index.regex_candidates(pattern) == [
+        rel_path for rel_path, content in sorted(contents.items()) if re.search(pattern, content)
+    ]
+
+def test_replaced_files_are_tombstoned_and_compacted(tmp_path):
+    index = TrigramIndex()
+    index.add_file("a.py", "alpha", 0.0, 5)
+    index.add_file("a.py", "gamma", 1.0, 5)
+    assert index.literal_candidates("alpha") == []
+    assert index.dead_count == 1
+
+    path = str(tmp_path / TRIGRAM_INDEX_FILENAME)
+    index.save(path)
+    loaded = TrigramIndex.load(path)
+    assert loaded.dead_count == 0
+    assert loaded.literal_candidates("gamma") == ["a.py"]
+
+def test_incremental_update_matches_rebuild(tmp_path):
+    write_file(tmp_path, "a.py", "alpha = 1\n")
+    write_file(tmp_path, "pkg/b.py", "beta = 2\n")
+    write_file(tmp_path, "node_modules/skip.js", "alpha\n")
+    assert update_trigram_index(str(tmp_path))["indexed"] == 2
+
+    write_file(tmp_path, "a.py", "gamma = 3\n")
+    write_file(tmp_path, "pkg/c.py", "alpha = 4\n")
+    os.remove(str(tmp_path / "pkg" / "b.py"))
+    counts = update_trigram_index(str(tmp_path), changed_paths=["a.py", "pkg"])
+    assert (counts["updated"], counts["removed"]) == (2, 1)
+    incremental = load_trigram_index(str(tmp_path))
+
+    update_trigram_index(str(tmp_path), rebuild=True)
+    rebuilt = load_trigram_index(str(tmp_path))
+    for text in ("alpha", "beta", "gamma"):
+        assert incremental.literal_candidates(text) == rebuilt.literal_candidates(text)
+    assert incremental.literal_candidates("alpha") == ["pkg/c.py"]
+
+def test_extract_trigrams():
+    assert extract_trigrams("AbCd") == {"abc", "bcd"}
+    assert extract_trigrams("ab") == set()